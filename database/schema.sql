@@ -23,6 +23,10 @@
 --  10. tb_productDashboard     : 대시보드 집계 데이터
 --  11. tb_analysisHistory      : 분석 이력
 --  12. tb_log                  : 사용자 활동 로그
+--  13. tb_reviewToken          : 리뷰별 토큰 빈도 (워드클라우드)
+--  14. tb_reviewTokenized      : 리뷰 토큰화 완료 표시
+--  15. tb_productInsightFingerprint : 인사이트 입력 fingerprint (재생성 판단)
+--  16. tb_analysisJob          : 제품 리뷰 분석 작업 (체크포인트 / 재개)
 -- ============================================================================
 
 -- 1. 사용자 테이블
@@ -211,3 +215,76 @@ CREATE TABLE `tb_log` (
     FOREIGN KEY (`user_id`) REFERENCES `tb_user` (`user_id`)
     ON DELETE RESTRICT ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 13. 리뷰 토큰 빈도 테이블 (워드클라우드: 리뷰별 명사/형용사 출현 횟수)
+CREATE TABLE `tb_reviewToken` (
+  `review_id` INT NOT NULL,
+  `token`     VARCHAR(50) COLLATE utf8mb4_bin NOT NULL,
+  `cnt`       SMALLINT UNSIGNED NOT NULL,
+  PRIMARY KEY (`review_id`, `token`),
+  CONSTRAINT `fk_rt_review` 
+    FOREIGN KEY (`review_id`) REFERENCES `tb_review` (`review_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 14. 리뷰 토큰화 완료 테이블 (토큰이 없는 리뷰도 다시 토큰화하지 않도록 표시)
+CREATE TABLE `tb_reviewTokenized` (
+  `review_id`    INT NOT NULL,
+  `token_count`  INT NOT NULL DEFAULT '0',
+  `tokenized_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`review_id`),
+  CONSTRAINT `fk_rtz_review` 
+    FOREIGN KEY (`review_id`) REFERENCES `tb_review` (`review_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 15. 인사이트 입력 fingerprint 테이블 (입력 변화가 작으면 인사이트 재생성 생략)
+CREATE TABLE `tb_productInsightFingerprint` (
+  `product_id`     INT NOT NULL,
+  `insight_id`     INT NOT NULL,
+  `total_reviews`  INT NOT NULL,
+  `keyword_counts` JSON NOT NULL,
+  `sample_digest`  CHAR(64) NOT NULL,
+  `prompt_hash`    CHAR(64) NOT NULL,
+  `updated_at`     DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`product_id`),
+  KEY `idx_pif_insight` (`insight_id`),
+  CONSTRAINT `fk_pif_product` 
+    FOREIGN KEY (`product_id`) REFERENCES `tb_product` (`product_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_pif_insight` 
+    FOREIGN KEY (`insight_id`) REFERENCES `tb_productInsight` (`insight_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 16. 제품 리뷰 분석 작업 테이블 (페이지마다 체크포인트, 중단되면 다른 워커가 last_review_id 다음부터 재개)
+CREATE TABLE `tb_analysisJob` (
+  `job_id`         CHAR(32) NOT NULL,
+  `product_id`     INT NOT NULL,
+  `domain`         VARCHAR(30) DEFAULT NULL,
+  `status`         ENUM('queued', 'running', 'completed', 'failed') NOT NULL DEFAULT 'queued',
+  `stage`          ENUM('analysis', 'post') NOT NULL DEFAULT 'analysis',
+  `total`          INT DEFAULT NULL,
+  `analyzed`       INT NOT NULL DEFAULT '0',
+  `written`        INT NOT NULL DEFAULT '0',
+  `last_review_id` INT NOT NULL DEFAULT '0',
+  `max_review_id`  INT DEFAULT NULL,
+  `attempts`       INT NOT NULL DEFAULT '0',
+  `owner`          VARCHAR(100) DEFAULT NULL,
+  `progress`       TINYINT NOT NULL DEFAULT '0',
+  `message`        VARCHAR(255) DEFAULT NULL,
+  `result`         JSON DEFAULT NULL,
+  `error`          TEXT,
+  `created_at`     DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at`     DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  `heartbeat_at`   DATETIME DEFAULT NULL,
+  -- 실행 중/대기 중인 작업만 product_id, 끝난 작업은 NULL → 제품당 활성 작업 1개를 DB가 보장 (여러 워커)
+  `active_product_id` INT GENERATED ALWAYS AS (IF(`status` IN ('queued', 'running'), `product_id`, NULL)) STORED,
+  PRIMARY KEY (`job_id`),
+  UNIQUE KEY `uq_aj_active_product` (`active_product_id`),
+  KEY `idx_aj_product_status` (`product_id`, `status`),
+  KEY `idx_aj_status_heartbeat` (`status`, `heartbeat_at`),
+  CONSTRAINT `fk_aj_product` 
+    FOREIGN KEY (`product_id`) REFERENCES `tb_product` (`product_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -1,15 +1,53 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import json
 import asyncio
+import time
 from typing import List, Optional
 from app.domains.steam import pipeline as steam
 from app.domains.cosmetics import pipeline as cosmetics
 from app.domains.electronics import pipeline as electronics
-from utils.generate_wordcloud_from_db import generate_wordcloud_from_db, generate_wordcloud_base64
-from utils.generate_insight import generate_insight_from_db
+from utils.generate_wordcloud_from_db import (
+    TokensPending,
+    generate_wordcloud_base64,
+    get_wordcloud_png,
+    wordcloud_etag,
+)
+from utils.wordcloud_cache import wordcloud_cache_stats
+from utils.wordcloud_jobs import enqueue_wordcloud, wordcloud_job_stats, wordcloud_job_status
+from utils.generate_insight import agenerate_insight_from_db
+from utils.insight_cache import llm_cache_stats
+from utils.llm_client import llm_client_stats
+from utils.insight_bulk import bulk_insight_job_status, bulk_insight_jobs, start_bulk_insight_job
+from utils.analysis_jobs import (
+    COMPLETED,
+    FAILED,
+    STAGE_ANALYSIS,
+    STAGE_POST,
+    CheckpointedAnalysis,
+    CheckpointedMultiAnalysis,
+    JobOwnershipLost,
+    advance_job_stage,
+    analysis_job_stats,
+    analysis_job_status,
+    analysis_jobs,
+    claim_product_jobs,
+    finish_product_job,
+    get_analysis_job,
+    init_job_scope,
+    keep_jobs_alive,
+    release_product_jobs,
+    set_job_stage,
+    start_analysis_job,
+    start_detached,
+)
 from utils.db_connect import get_connection
+from app.models.scheduler import get_scheduler, scheduler_stats
+from app.models.result_cache import result_cache_stats
+from app.models.sentence_cache import sentence_cache_stats
+from utils.executors import run_inference, run_io
+from utils.metrics import ANALYSES_IN_FLIGHT, ANALYSES_TOTAL, REVIEWS_ANALYZED, ROWS_WRITTEN, observe_stage
 import os
 from dotenv import load_dotenv
 
@@ -23,6 +61,18 @@ class AnalyzeBatchRequest(BaseModel):
     aspect_th: float = 0.35
     margin: float = 0.03
 
+class AnalyzeProductsRequest(BaseModel):
+    product_ids: List[int]
+    domain: Optional[str] = None
+
+class BulkInsightRequest(BaseModel):
+    product_ids: Optional[List[int]] = None
+    category_id: Optional[int] = None
+    force: bool = False
+    user_id: Optional[int] = None
+    concurrency: Optional[int] = None
+    deadline_minutes: Optional[float] = None
+
 # 도메인별 파이프라인 매핑
 DOMAIN_PIPELINES = {
     "steam": steam,
@@ -46,15 +96,12 @@ def health():
 @router.post("/analyze-batch")
 def analyze_batch(req: AnalyzeBatchRequest, domain: str = "steam"):
     try:
-        pipeline = DOMAIN_PIPELINES.get(domain, steam)
+        domain_name = domain if domain in DOMAIN_PIPELINES else "steam"
+        pipeline = DOMAIN_PIPELINES[domain_name]
         
-        # 배치 함수가 있으면 사용, 없으면 순차 처리
-        if hasattr(pipeline, 'analyze_reviews'):
-            print(f"⚡ 배치 처리 모드 사용 (도메인: {domain})")
-            results = pipeline.analyze_reviews(req.texts, debug=False, batch_size=16)
-        else:
-            print(f"⚡ 순차 처리 모드 사용 (도메인: {domain})")
-            results = [pipeline.analyze_review(t) for t in req.texts]
+        # 도메인별 스케줄러가 동시 요청을 모아 큰 배치로 추론한 뒤 요청별 결과를 돌려줌
+        scheduler = get_scheduler(domain_name, pipeline.analyze_reviews, pipeline.cfg.get("max_batch_items"))
+        results = scheduler.analyze(req.texts)
         
         return {"items": results, "count": len(results)}
     except Exception as e:
@@ -62,339 +109,904 @@ def analyze_batch(req: AnalyzeBatchRequest, domain: str = "steam"):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-# 제품 리뷰 전체 분석 파이프라인 엔드포인트 (SSE 스트리밍)
-# 기존 전체 분석 파이프라인
-@router.post("/products/{product_id}/reviews/analysis")
-async def analyze_product_reviews(product_id: int, domain: Optional[str] = None):
+# 배치 스케줄러 상태 (큐 깊이, 평균 배치 크기)
+@router.get("/analyze-batch/stats")
+def analyze_batch_stats():
+    return {"schedulers": scheduler_stats()}
+
+# 추론 결과 캐시 상태 (hit/miss 카운터)
+@router.get("/cache/stats")
+def cache_stats():
+    return {
+        "result_cache": result_cache_stats(),
+        "phase1_sentence_cache": sentence_cache_stats(),
+        "wordcloud_cache": wordcloud_cache_stats(),
+        "wordcloud_jobs": wordcloud_job_stats(),
+        "insight_llm_cache": llm_cache_stats(),
+        "insight_llm_client": llm_client_stats(),
+    }
+
+# =========================================================
+# 제품 분석 파이프라인용 블로킹 DB 헬퍼 (io 실행기에서 실행)
+# =========================================================
+PRODUCT_INFO_SQL = """
+    SELECT p.product_id, p.category_id, p.user_id, c.category_name
+    FROM tb_product p
+    LEFT JOIN tb_productCategory c ON p.category_id = c.category_id
+    WHERE p.product_id = %s
+"""
+
+
+def _open_cursor():
+    conn = get_connection()
+    return conn, conn.cursor()
+
+
+def _fetchone(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return cursor.fetchone()
+
+
+def _fetchall(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def _ensure_connection(conn, cursor, product_id):
     """
-    특정 product_id의 리뷰를 전체 분석 파이프라인으로 처리 (SSE 스트리밍):
-    1. DB에서 리뷰 및 제품 정보 조회
-    2. 카테고리에 맞는 도메인 모델로 분석
-    3. tb_reviewAnalysis에 분석 결과 저장
-    4. 인사이트 생성 (LangChain + OpenAI)
-    5. tb_productDashboard 업데이트 (프로시저 호출)
-    6. 워드클라우드 생성
+    DB 연결 상태 확인 및 재연결
+    Returns: (conn, cursor, product_info 또는 None, 재연결 여부)
     """
-    
-    async def generate_progress():
-        """진행 상황을 SSE 형식으로 스트리밍"""
-        conn = None
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        print("✅ DB 연결 상태 정상")
+        return conn, cursor, None, False
+    except Exception as conn_check_err:
+        print(f"⚠️ DB 연결 끊어짐 감지, 재연결 시도... ({conn_check_err})")
         try:
-            # 진행률 전송 헬퍼 함수
-            def send_progress(step: str, progress: int, message: str):
-                data = json.dumps({
-                    "step": step,
-                    "progress": progress,
-                    "message": message
-                })
-                return f"data: {data}\n\n"
-            
-            # 0% - 시작
-            yield send_progress("start", 0, "분석 시작")
-            await asyncio.sleep(0.1)
-            
-            # 1️⃣ DB 연결 및 제품 정보 조회
-            yield send_progress("init", 5, "DB 연결 중...")
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                SELECT p.product_id, p.category_id, p.user_id, c.category_name
-                FROM tb_product p
-                LEFT JOIN tb_productCategory c ON p.category_id = c.category_id
-                WHERE p.product_id = %s
-                """,
-                (product_id,)
-            )
-            product_info = cursor.fetchone()
-            
-            if not product_info:
-                yield send_progress("error", 0, f"제품을 찾을 수 없습니다 (product_id={product_id})")
-                return
-            
-            category_id = product_info["category_id"]
-            user_id = product_info["user_id"]
-            
-            # 도메인 결정 (외부 파라미터 domain 사용)
-            domain_name = domain if domain is not None else CATEGORY_TO_DOMAIN.get(category_id, "steam")
-            
-            yield send_progress("init", 10, f"제품 정보 조회 완료 (도메인: {domain_name})")
-            print(f"📦 제품 {product_id} 분석 시작 (카테고리: {category_id}, 도메인: {domain_name})")
-            
-            # 도메인 파이프라인 선택
-            pipeline = DOMAIN_PIPELINES.get(domain_name, steam)
-            
-            # 2️⃣ 리뷰 불러오기 (분석되지 않은 리뷰만)
-            cursor.execute(
+            cursor.close()
+        except:
+            pass
+        try:
+            conn.close()
+        except:
+            pass
+        conn, cursor = _open_cursor()
+        product_info = _fetchone(cursor, PRODUCT_INFO_SQL, (product_id,))
+        print("✅ DB 재연결 완료")
+        return conn, cursor, product_info, True
+
+
+def _fetch_keywords(conn, cursor, category_id, max_retries=3):
+    """키워드 조회 (실패 시 재연결 후 재시도)"""
+    for retry in range(max_retries):
+        try:
+            keywords = _fetchall(
+                cursor,
                 """
-                SELECT DISTINCT r.review_id, r.review_text 
-                FROM tb_review r
-                LEFT JOIN tb_reviewAnalysis ra ON r.review_id = ra.review_id
-                WHERE r.product_id = %s AND ra.review_id IS NULL
+                SELECT keyword_id, keyword_text 
+                FROM tb_keyword 
+                WHERE category_id = %s
                 """,
-                (product_id,)
+                (category_id,)
             )
-            reviews = cursor.fetchall()
-            
-            if not reviews:
-                # 분석되지 않은 리뷰가 없는 경우
-                yield send_progress("info", 100, "분석할 새로운 리뷰가 없습니다")
-                
-                # 기존 분석 결과 반환
-                final_result = {
-                    "success": True,
-                    "product_id": product_id,
-                    "category_id": category_id,
-                    "domain": domain,
-                    "review_count": 0,
-                    "analyzed_count": 0,
-                    "inserted_count": 0,
-                    "insight_id": None,
-                    "wordcloud_path": None,
-                    "message": "분석할 새로운 리뷰가 없습니다"
-                }
-                yield f"data: {json.dumps({'step': 'result', 'progress': 100, 'data': final_result})}\n\n"
-                return
-            
-            review_count = len(reviews)
-            yield send_progress("loading", 15, f"분석할 리뷰 {review_count}개 발견")
-            print(f"📝 분석할 리뷰 {review_count}개 발견")
-            
-            # 3️⃣ 리뷰 분석 수행
-            yield send_progress("analysis", 20, f"{domain_name} 도메인 모델로 분석 시작...")
-            print(f"🧠 {domain_name} 도메인 모델로 분석 시작...")
-            
-            analysis_results = []
-            
-            # 배치 함수가 있으면 사용, 없으면 순차 처리
-            if hasattr(pipeline, 'analyze_reviews'):
-                batch_size = 8
-                print(f"⚡ 배치 처리 모드 사용 (배치 크기: {batch_size})")
-                
-                # 리뷰 텍스트만 추출
-                review_texts = [r["review_text"] for r in reviews]
-                
-                # 배치 분석 수행 (진행률 업데이트)
-                total_batches = (len(review_texts) + batch_size - 1) // batch_size
-                
-                for batch_idx in range(0, len(review_texts), batch_size):
-                    batch = review_texts[batch_idx:batch_idx + batch_size]
-                    batch_results = pipeline.analyze_reviews(batch, debug=False, batch_size=batch_size)
-                    
-                    # 결과 매핑
-                    for i, result in enumerate(batch_results):
-                        review_idx = batch_idx + i
-                        if review_idx < len(reviews):
-                            analysis_results.append({
-                                "review_id": reviews[review_idx]["review_id"],
-                                "result": result
-                            })
-                    
-                    # 진행률 계산 (20% ~ 50%)
-                    current_batch = (batch_idx // batch_size) + 1
-                    progress = 20 + int((current_batch / total_batches) * 30)
-                    yield send_progress("analysis", progress, f"분석 중... ({current_batch}/{total_batches} 배치)")
-                    await asyncio.sleep(0.1)
-            else:
-                print(f"⚡ 순차 처리 모드 사용")
-                for idx, review in enumerate(reviews):
-                    review_id = review["review_id"]
-                    review_text = review["review_text"]
-                    result = pipeline.analyze_review(review_text)
-                    analysis_results.append({
-                        "review_id": review_id,
-                        "result": result
-                    })
-                    
-                    # 진행률 계산 (20% ~ 50%)
-                    if (idx + 1) % 10 == 0 or idx == len(reviews) - 1:
-                        progress = 20 + int(((idx + 1) / len(reviews)) * 30)
-                        yield send_progress("analysis", progress, f"분석 중... ({idx + 1}/{len(reviews)} 리뷰)")
-                        await asyncio.sleep(0.1)
-            
-            yield send_progress("analysis", 50, f"분석 완료: {len(analysis_results)}개 리뷰")
-            print(f"✅ 분석 완료: {len(analysis_results)}개 리뷰")
-            
-            # 3-1️⃣ DB 연결 상태 확인 및 재연결
-            try:
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                print("✅ DB 연결 상태 정상")
-            except Exception as conn_check_err:
-                yield send_progress("reconnect", 52, "DB 재연결 중...")
-                print(f"⚠️ DB 연결 끊어짐 감지, 재연결 시도... ({conn_check_err})")
+            return conn, cursor, keywords
+        except Exception as kw_err:
+            if retry < max_retries - 1:
+                print(f"⚠️ 키워드 조회 실패 (재시도 {retry + 1}/{max_retries}): {kw_err}")
                 try:
                     cursor.close()
-                except:
-                    pass
-                try:
                     conn.close()
                 except:
                     pass
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT p.product_id, p.category_id, p.user_id, c.category_name
-                    FROM tb_product p
-                    LEFT JOIN tb_productCategory c ON p.category_id = c.category_id
-                    WHERE p.product_id = %s
-                    """,
-                    (product_id,)
-                )
-                product_info = cursor.fetchone()
-                category_id = product_info["category_id"]
-                user_id = product_info["user_id"]
-                print("✅ DB 재연결 완료")
-            
-            # 4️⃣ 키워드 매핑
-            yield send_progress("mapping", 55, "키워드 매핑 중...")
-            max_retries = 3
-            keywords = None
-            for retry in range(max_retries):
-                try:
-                    cursor.execute(
-                        """
-                        SELECT keyword_id, keyword_text 
-                        FROM tb_keyword 
-                        WHERE category_id = %s
-                        """,
-                        (category_id,)
-                    )
-                    keywords = cursor.fetchall()
-                    break
-                except Exception as kw_err:
-                    if retry < max_retries - 1:
-                        print(f"⚠️ 키워드 조회 실패 (재시도 {retry + 1}/{max_retries}): {kw_err}")
-                        try:
-                            cursor.close()
-                            conn.close()
-                        except:
-                            pass
-                        conn = get_connection()
-                        cursor = conn.cursor()
-                    else:
-                        raise
-            
-            keyword_map = {kw["keyword_text"]: kw["keyword_id"] for kw in keywords}
-            yield send_progress("mapping", 58, f"키워드 {len(keyword_map)}개 매핑 완료")
-            print(f"🔑 키워드 {len(keyword_map)}개 매핑 완료")
-            
-            # 5️⃣ tb_reviewAnalysis에 분석 결과 저장
-            yield send_progress("saving", 60, "분석 결과 저장 중...")
-            insert_count = 0
-            for item in analysis_results:
-                review_id = item["review_id"]
-                result = item["result"]
-                
-                for aspect_result in result.get("results", []):
-                    aspect = aspect_result.get("aspect")
-                    label = aspect_result.get("label")
-                    
-                    keyword_id = keyword_map.get(aspect)
-                    if not keyword_id:
-                        print(f"⚠️ 키워드 없음: {aspect}")
-                        continue
-                    
-                    if label == "중립":
-                        continue
-                    
-                    sentiment = "positive" if label == "긍정" else "negative"
-                    
-                    cursor.execute(
-                        """
-                        INSERT INTO tb_reviewAnalysis (keyword_id, review_id, sentiment, analyzed_at)
-                        VALUES (%s, %s, %s, NOW())
-                        ON DUPLICATE KEY UPDATE 
-                            sentiment = VALUES(sentiment), 
-                            analyzed_at = NOW()
-                        """,
-                        (keyword_id, review_id, sentiment)
-                    )
-                    insert_count += 1
-            
-            conn.commit()
-            yield send_progress("saving", 65, f"tb_reviewAnalysis에 {insert_count}건 저장 완료")
-            print(f"💾 tb_reviewAnalysis에 {insert_count}건 저장 완료")
-            
-            # 6️⃣ 인사이트 생성
-            yield send_progress("insight", 70, "AI 인사이트 생성 중...")
-            print(f"💡 인사이트 생성 시작...")
+                conn, cursor = _open_cursor()
+            else:
+                raise
+
+
+def _update_dashboard(conn, cursor, product_id):
+    cursor.execute("CALL sp_update_product_dashboard(%s)", (product_id,))
+    conn.commit()
+
+
+def _link_dashboard_insight(conn, cursor, product_id, insight_id):
+    """대시보드의 insight_id가 방금 저장한 인사이트를 가리키도록 보정 (이미 같으면 변경 없음)"""
+    cursor.execute(
+        """
+        UPDATE tb_productDashboard
+        SET insight_id = %s
+        WHERE product_id = %s AND NOT (insight_id <=> %s)
+        """,
+        (insight_id, product_id, insight_id),
+    )
+    conn.commit()
+
+
+async def _relay_progress(start):
+    """
+    start(on_progress) 코루틴을 실행하면서 on_progress로 들어온 메시지를 바로 전달
+    yield (메시지, None) ... 마지막에 (None, 코루틴 결과)
+    """
+    messages = asyncio.Queue()
+    task = asyncio.create_task(start(messages.put_nowait))
+    try:
+        while not task.done() or not messages.empty():
+            getter = asyncio.ensure_future(messages.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result(), None
+            else:
+                getter.cancel()
+    except BaseException:
+        task.cancel()
+        raise
+    yield None, task.result()
+
+
+class _EventMerger:
+    """
+    여러 비동기 제너레이터(단계)를 동시에 실행하고 이벤트를 생성되는 순서대로 전달
+    - events()를 소비하는 중에도 add()로 단계 추가 가능 (예: 제품 분석이 끝날 때마다 후처리 시작)
+    - 모든 단계가 끝나면 종료, 소비자가 중단하면 남은 단계는 취소
+    """
+
+    _FINISHED = object()
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+        self._tasks = []
+        self._remaining = 0
+
+    def add(self, stage):
+        self._remaining += 1
+        self._tasks.append(asyncio.create_task(self._pump(stage)))
+
+    async def _pump(self, stage):
+        try:
+            async for event in stage:
+                await self._queue.put(event)
+        finally:
+            await self._queue.put(self._FINISHED)
+
+    async def events(self):
+        try:
+            while self._remaining:
+                event = await self._queue.get()
+                if event is self._FINISHED:
+                    self._remaining -= 1
+                    continue
+                yield event
+        except BaseException:
+            for task in self._tasks:
+                task.cancel()
+            # 단계가 정리(분석 스레드 종료 등)를 마칠 때까지 기다린 뒤 전파
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            raise
+        for result in await asyncio.gather(*self._tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                raise result
+
+
+async def _interleave(*stages):
+    """여러 단계를 동시에 실행하고 이벤트를 생성되는 순서대로 전달 (_EventMerger 참고)"""
+    merger = _EventMerger()
+    for stage in stages:
+        merger.add(stage)
+    async for event in merger.events():
+        yield event
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _on_own_connection(fn, *args):
+    """풀에서 새 연결을 받아 fn(conn, cursor, *args) 실행 후 반납"""
+    conn, cursor = _open_cursor()
+    try:
+        return fn(conn, cursor, *args)
+    finally:
+        _close_quietly(conn)
+
+
+async def _post_analysis_events(product_id, domain_name, user_id, send_progress, results, conn=None, cursor=None):
+    """
+    분석 결과 커밋 이후 후처리 단계를 동시에 실행하며 진행 이벤트 전달 (70% ~ 95%)
+    - 인사이트: agenerate_insight_from_db가 풀에서 자체 연결 사용, LLM 응답은 스트리밍으로 중간 진행 전달
+    - 대시보드: 전달받은 연결(없으면 새 연결)로 프로시저 호출
+    - 워드클라우드: 백그라운드 작업 큐에 예약 (기다리지 않음)
+    각 단계의 진행 이벤트는 끝나는 순서대로 섞여서 전송
+    results에 {"insight_id", "dashboard", "wordcloud_job"} 기록
+    """
+    def on_connection(fn, *args):
+        if conn is None:
+            return run_io(_on_own_connection, fn, *args)
+        return run_io(fn, conn, cursor, *args)
+
+    wc_job = enqueue_wordcloud(product_id, domain_name)
+    results.update({"insight_id": None, "dashboard": False, "wordcloud_job": wc_job})
+    print(f"🌈 워드클라우드 생성 예약 (product_id={product_id}, state={wc_job['state']}, coalesced={wc_job['coalesced']})")
+    yield send_progress("wordcloud", 70, "워드클라우드 생성 예약됨 (백그라운드)")
+
+    post_stages = 2
+    post_done = 0
+
+    def stage_progress():
+        return 70 + 25 * post_done // post_stages
+
+    async def insight_stage():
+        nonlocal post_done
+        yield send_progress("insight", stage_progress(), "AI 인사이트 생성 중...")
+        print(f"💡 인사이트 생성 시작... (product_id={product_id})")
+        stage_started = time.monotonic()
+        try:
             insight_id = None
-            try:
-                insight_id = generate_insight_from_db(product_id, user_id=user_id)
-                if insight_id:
-                    yield send_progress("insight", 80, f"인사이트 생성 완료")
-                    print(f"✅ 인사이트 생성 완료 (insight_id={insight_id})")
+            async for message, result in _relay_progress(
+                lambda on_progress: agenerate_insight_from_db(product_id, user_id=user_id, on_progress=on_progress)
+            ):
+                if message is not None:
+                    yield send_progress("insight", stage_progress(), message)
                 else:
-                    yield send_progress("insight", 80, "인사이트 생성 실패 (리뷰 데이터 부족)")
-                    print(f"⚠️ 인사이트 생성 실패 (리뷰 데이터 부족 또는 오류)")
-            except Exception as insight_err:
-                yield send_progress("insight", 80, f"인사이트 생성 오류: {str(insight_err)}")
-                print(f"⚠️ 인사이트 생성 오류: {insight_err}")
-            
-            # 7️⃣ 대시보드 업데이트
-            yield send_progress("dashboard", 85, "대시보드 업데이트 중...")
-            try:
-                cursor.execute("CALL sp_update_product_dashboard(%s)", (product_id,))
-                conn.commit()
-                yield send_progress("dashboard", 88, "대시보드 업데이트 완료")
-                print(f"📊 대시보드 업데이트 완료 (프로시저 호출)")
-            except Exception as proc_err:
-                print(f"⚠️ 프로시저 호출 실패: {proc_err}")
-            
-            # 8️⃣ 워드클라우드 생성
-            yield send_progress("wordcloud", 90, "워드클라우드 생성 중...")
-            print(f"🌈 워드클라우드 생성 시작...")
-            wc_path = generate_wordcloud_from_db(product_id, domain_name)
-            
-            if wc_path:
-                yield send_progress("wordcloud", 98, "워드클라우드 생성 완료")
+                    insight_id = result
+            results["insight_id"] = insight_id
+            post_done += 1
+            if insight_id:
+                yield send_progress("insight", stage_progress(), f"인사이트 생성 완료")
+                print(f"✅ 인사이트 생성 완료 (insight_id={insight_id})")
             else:
-                yield send_progress("wordcloud", 98, "워드클라우드 생성 실패")
-                print(f"⚠️ 워드클라우드 생성 실패")
-            
-            # 9️⃣ 완료
+                yield send_progress("insight", stage_progress(), "인사이트 생성 실패 (리뷰 데이터 부족)")
+                print(f"⚠️ 인사이트 생성 실패 (리뷰 데이터 부족 또는 오류)")
+        except Exception as insight_err:
+            post_done += 1
+            yield send_progress("insight", stage_progress(), f"인사이트 생성 오류: {str(insight_err)}")
+            print(f"⚠️ 인사이트 생성 오류: {insight_err}")
+        observe_stage("insight", domain_name, time.monotonic() - stage_started)
+
+    async def dashboard_stage():
+        nonlocal post_done
+        yield send_progress("dashboard", stage_progress(), "대시보드 업데이트 중...")
+        stage_started = time.monotonic()
+        try:
+            await on_connection(_update_dashboard, product_id)
+            results["dashboard"] = True
+            post_done += 1
+            yield send_progress("dashboard", stage_progress(), "대시보드 업데이트 완료")
+            print(f"📊 대시보드 업데이트 완료 (프로시저 호출, product_id={product_id})")
+        except Exception as proc_err:
+            post_done += 1
+            yield send_progress("dashboard", stage_progress(), "대시보드 업데이트 실패")
+            print(f"⚠️ 프로시저 호출 실패: {proc_err}")
+        observe_stage("dashboard", domain_name, time.monotonic() - stage_started)
+
+    async for event in _interleave(insight_stage(), dashboard_stage()):
+        yield event
+
+    # 프로시저가 인사이트 저장보다 먼저 실행됐을 수 있으므로 새 insight_id 연결 보정
+    insight_id = results["insight_id"]
+    if insight_id and results["dashboard"]:
+        try:
+            await on_connection(_link_dashboard_insight, product_id, insight_id)
+        except Exception as link_err:
+            print(f"⚠️ 대시보드 insight_id 연결 실패: {link_err}")
+    yield send_progress("post", 95, "인사이트/대시보드 처리 완료")
+
+
+# =========================================================
+# 제품 리뷰 전체 분석 파이프라인 (내구성 있는 작업, SSE 스트리밍)
+# - POST /products/{id}/reviews/analysis는 tb_analysisJob 작업을 시작(또는 합류)하고 이벤트를 구독
+# - 작업 본문은 run_product_analysis_job, 실행/체크포인트/재개는 utils/analysis_jobs.py
+# =========================================================
+async def run_product_analysis_job(job):
+    """
+    특정 product_id의 리뷰를 전체 분석 파이프라인으로 처리 (진행 이벤트 dict를 yield):
+    1. DB에서 리뷰 및 제품 정보 조회
+    2. 카테고리에 맞는 도메인 모델로 분석
+    3. tb_reviewAnalysis에 분석 결과 저장 (2~3은 페이지 단위 fetch → infer → write 스트리밍)
+       - 페이지마다 작업 체크포인트를 같은 트랜잭션으로 커밋, 재개하면 마지막 체크포인트 다음 리뷰부터
+    4. 분석 결과 커밋 후 아래 단계를 동시에 실행 (진행 이벤트는 끝나는 순서대로 전송)
+       - 인사이트 생성 (LangChain + OpenAI, 별도 연결)
+       - tb_productDashboard 업데이트 (프로시저 호출)
+       - 워드클라우드 생성 예약 (백그라운드 작업, 완료 시 wordcloud_path 갱신)
+    5. 모든 단계가 끝나면 최종 결과 전송
+
+    블로킹 단계(DB, 추론, 인사이트)는 전용 실행기에서 실행되고
+    이 제너레이터는 결과를 기다리며 진행 상황만 전송합니다.
+    워드클라우드는 기다리지 않으며 상태는 GET /v1/products/{id}/wordcloud/status로 확인합니다.
+    """
+    product_id = job.product_id
+    conn = None
+    domain_name = job.row["domain"]
+    status = "error"
+    run_started = time.monotonic()
+    ANALYSES_IN_FLIGHT.inc()
+    try:
+        # 진행률 이벤트 헬퍼 함수
+        def send_progress(step: str, progress: int, message: str):
+            return {"step": step, "progress": progress, "message": message}
+
+        # 0% - 시작 (재개한 작업이면 체크포인트 안내)
+        if job.resumed:
+            yield send_progress(
+                "start", 0, f"분석 재개 (단계: {job.row['stage']}, 저장된 리뷰 {job.row['analyzed']}/{job.row['total']}개)"
+            )
+        else:
+            yield send_progress("start", 0, "분석 시작")
+        await asyncio.sleep(0.1)
+
+        # 1️⃣ DB 연결 및 제품 정보 조회
+        yield send_progress("init", 5, "DB 연결 중...")
+        stage_started = time.monotonic()
+        conn, cursor = await run_io(_open_cursor)
+        product_info = await run_io(_fetchone, cursor, PRODUCT_INFO_SQL, (product_id,))
+
+        if not product_info:
+            status = "not_found"
+            yield send_progress("error", 0, f"제품을 찾을 수 없습니다 (product_id={product_id})")
+            return
+
+        category_id = product_info["category_id"]
+        user_id = product_info["user_id"]
+
+        # 도메인 결정 (요청 파라미터 domain 사용, 재개한 작업은 처음 결정한 도메인 유지)
+        domain_name = domain_name if domain_name is not None else CATEGORY_TO_DOMAIN.get(category_id, "steam")
+        observe_stage("product_lookup", domain_name, time.monotonic() - stage_started)
+
+        yield send_progress("init", 10, f"제품 정보 조회 완료 (도메인: {domain_name})")
+        print(f"📦 제품 {product_id} 분석 시작 (카테고리: {category_id}, 도메인: {domain_name}, job_id={job.job_id})")
+
+        # 도메인 파이프라인 선택
+        pipeline = DOMAIN_PIPELINES.get(domain_name, steam)
+
+        # 2️⃣ 키워드 매핑 (스트리밍 저장 전에 준비)
+        yield send_progress("mapping", 12, "키워드 매핑 중...")
+        stage_started = time.monotonic()
+        conn, cursor, keywords = await run_io(_fetch_keywords, conn, cursor, category_id)
+        observe_stage("keyword_mapping", domain_name, time.monotonic() - stage_started)
+
+        keyword_map = {kw["keyword_text"]: kw["keyword_id"] for kw in keywords}
+        print(f"🔑 키워드 {len(keyword_map)}개 매핑 완료")
+
+        # 3️⃣ 작업 범위 확인 (처음 시작한 작업: 미분석 리뷰 수 / 재개한 작업: 저장된 범위)
+        stage_started = time.monotonic()
+        review_count, _ = await run_io(init_job_scope, conn, cursor, job, domain_name)
+        observe_stage("review_count", domain_name, time.monotonic() - stage_started)
+
+        if not review_count:
+            # 분석되지 않은 리뷰가 없는 경우
+            status = "empty"
+            yield send_progress("info", 100, "분석할 새로운 리뷰가 없습니다")
+
+            # 기존 분석 결과 반환
             final_result = {
                 "success": True,
+                "job_id": job.job_id,
                 "product_id": product_id,
                 "category_id": category_id,
                 "domain": domain_name,
-                "review_count": review_count,
-                "analyzed_count": len(analysis_results),
-                "inserted_count": insert_count,
-                "insight_id": insight_id,
-                "wordcloud_path": wc_path,
-                "message": "리뷰 분석, 인사이트 생성 및 대시보드 업데이트 완료"
+                "review_count": 0,
+                "analyzed_count": 0,
+                "inserted_count": 0,
+                "insight_id": None,
+                "wordcloud_path": None,
+                "message": "분석할 새로운 리뷰가 없습니다"
             }
-            
-            yield send_progress("complete", 100, "분석 완료!")
-            # 최종 결과도 함께 전송
-            yield f"data: {json.dumps({'step': 'result', 'progress': 100, 'data': final_result})}\n\n"
-            
-        except HTTPException as he:
-            error_data = json.dumps({
-                "step": "error",
-                "progress": 0,
-                "message": he.detail
-            })
-            yield f"data: {error_data}\n\n"
+            yield {"step": "result", "progress": 100, "data": final_result}
+            return
+
+        if job.row["stage"] == STAGE_ANALYSIS:
+            resumed_from = job.row["analyzed"]
+            if resumed_from:
+                yield send_progress("loading", 15, f"분석할 리뷰 {review_count}개 중 {resumed_from}개는 이미 저장됨, 이어서 분석")
+            else:
+                yield send_progress("loading", 15, f"분석할 리뷰 {review_count}개 발견")
+            print(f"📝 분석할 리뷰 {review_count}개 (체크포인트: {resumed_from}개 저장됨)")
+
+            # 4️⃣ 리뷰 분석 + 저장 (fetch → infer → write 스트리밍, 페이지마다 체크포인트, 20% ~ 65%)
+            yield send_progress("analysis", 20, f"{domain_name} 도메인 모델로 분석 시작...")
+            print(f"🧠 {domain_name} 도메인 모델로 스트리밍 분석 시작...")
+
+            stream = CheckpointedAnalysis(job, pipeline, keyword_map)
+            async for event in stream.run():
+                progress = 20 + int(min(event["analyzed"] / review_count, 1.0) * 45)
+                yield send_progress(
+                    "analysis",
+                    progress,
+                    f"분석 중... ({event['analyzed']}/{review_count} 리뷰, {event['written']}건 저장)"
+                )
+
+            stream_stats = stream.stats()
+            # 스트리밍 단계는 겹쳐서 실행되므로 단계별 누적 시간 + 전체 wall time을 따로 기록
+            observe_stage("review_fetch", domain_name, stream_stats["fetch_ms"] / 1000)
+            observe_stage("inference", domain_name, stream_stats["infer_ms"] / 1000)
+            observe_stage("save", domain_name, stream_stats["write_ms"] / 1000)
+            observe_stage("analysis_wall", domain_name, stream_stats["wall_ms"] / 1000)
+            REVIEWS_ANALYZED.inc(stream_stats["analyzed"], domain=domain_name)
+            ROWS_WRITTEN.inc(stream_stats["written"], domain=domain_name)
+            print(
+                f"💾 이번 실행에서 분석 {stream_stats['analyzed']}개 리뷰, {stream_stats['written']}건 저장 "
+                f"(fetch {stream_stats['fetch_ms']}ms, infer {stream_stats['infer_ms']}ms, "
+                f"write {stream_stats['write_ms']}ms, wall {stream_stats['wall_ms']}ms, overlap x{stream_stats['overlap']})"
+            )
+
+            # 4-1️⃣ DB 연결 상태 확인 및 재연결 (분석 중 유휴 상태였던 연결)
+            conn, cursor, refreshed_info, reconnected = await run_io(_ensure_connection, conn, cursor, product_id)
+            if reconnected:
+                yield send_progress("reconnect", 67, "DB 재연결 완료")
+                category_id = refreshed_info["category_id"]
+                user_id = refreshed_info["user_id"]
+
+            # 분석 완료 기록 → 이후 재개하면 후처리부터
+            await run_io(set_job_stage, conn, cursor, job, STAGE_POST)
+
+        analyzed_count = job.row["analyzed"]
+        insert_count = job.row["written"]
+        yield send_progress("saving", 65, f"분석 {analyzed_count}개 리뷰, tb_reviewAnalysis에 {insert_count}건 저장 완료")
+
+        # 5️⃣~7️⃣ 후처리 단계 동시 실행 (인사이트 / 대시보드 / 워드클라우드 예약, 대시보드는 분석에 쓰던 연결 사용)
+        # 각 단계의 진행 이벤트는 끝나는 순서대로 섞여서 전송되고, 모두 끝난 뒤 최종 결과 전송
+        post_results = {}
+        async for event in _post_analysis_events(product_id, domain_name, user_id, send_progress, post_results, conn, cursor):
+            yield event
+        wc_job = post_results["wordcloud_job"]
+        insight_id = post_results["insight_id"]
+
+        # 8️⃣ 완료
+        status = "success"
+        final_result = {
+            "success": True,
+            "job_id": job.job_id,
+            "product_id": product_id,
+            "category_id": category_id,
+            "domain": domain_name,
+            "review_count": review_count,
+            "analyzed_count": analyzed_count,
+            "inserted_count": insert_count,
+            "insight_id": insight_id,
+            "wordcloud_path": None,
+            "wordcloud_job": wc_job,
+            "message": "리뷰 분석, 인사이트 생성 및 대시보드 업데이트 완료"
+        }
+
+        yield send_progress("complete", 100, "분석 완료!")
+        # 최종 결과도 함께 전송
+        yield {"step": "result", "progress": 100, "data": final_result}
+
+    except (asyncio.CancelledError, JobOwnershipLost):
+        # 서버 종료 / 소유권 상실 → 작업은 체크포인트에서 재개
+        status = "interrupted"
+        raise
+    except Exception as e:
+        import traceback
+        print("❌ [ERROR] 리뷰 분석 파이프라인 오류 발생:")
+        traceback.print_exc()
+        yield {"step": "error", "progress": 0, "message": f"분석 실패: {str(e)}"}
+    finally:
+        ANALYSES_IN_FLIGHT.dec()
+        ANALYSES_TOTAL.inc(domain=domain_name or "unknown", status=status)
+        observe_stage("total", domain_name, time.monotonic() - run_started)
+        if conn:
+            await run_io(_close_quietly, conn)
+
+
+def _last_event_id(request: Request, after: Optional[int]) -> int:
+    """재접속 위치: ?after= 또는 SSE 표준 Last-Event-ID 헤더 (없으면 처음부터)"""
+    if after is not None:
+        return after
+    try:
+        return int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        return 0
+
+
+async def _job_event_stream(job, after: int = 0):
+    """작업 이벤트 → SSE (id = 작업 내 이벤트 번호, 연결이 끊겨도 작업은 계속 실행)"""
+    async for seq, event in job.events(after):
+        yield f"id: {seq}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.post("/products/{product_id}/reviews/analysis")
+async def analyze_product_reviews(request: Request, product_id: int, domain: Optional[str] = None, after: Optional[int] = None):
+    """
+    제품 리뷰 분석 작업을 시작하고 진행 이벤트를 SSE로 전송 (단계는 run_product_analysis_job 참고)
+    - 같은 제품을 이 워커에서 분석 중이면 새로 시작하지 않고 그 작업에 합류 (지난 이벤트부터 다시 전송)
+    - 중단된 작업이 있으면 마지막 체크포인트부터 재개
+    - 모든 이벤트에 job_id 포함, 연결이 끊기면 GET /v1/analysis/jobs/{job_id}/events로 다시 구독
+    - 다른 워커(또는 여러 제품 분석 요청)가 같은 제품을 분석 중이면 409
+    """
+    try:
+        job, attached = await start_analysis_job(product_id, domain)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if attached:
+        print(f"🔗 제품 {product_id} 분석 작업에 합류 (job_id={job.job_id})")
+    return StreamingResponse(_job_event_stream(job, _last_event_id(request, after)), media_type="text/event-stream")
+
+
+@router.get("/analysis/jobs")
+def list_analysis_jobs():
+    return {"jobs": analysis_jobs(), "stats": analysis_job_stats()}
+
+
+@router.get("/analysis/jobs/{job_id}")
+async def get_analysis_job_status(job_id: str):
+    status = await analysis_job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"분석 작업을 찾을 수 없습니다 (job_id={job_id})")
+    return status
+
+
+@router.get("/analysis/jobs/{job_id}/events")
+async def get_analysis_job_events(request: Request, job_id: str, after: Optional[int] = None):
+    """
+    실행 중인 작업에 SSE로 다시 연결 (Last-Event-ID 또는 ?after= 이후 이벤트부터)
+    이 워커에 없는 작업(끝났거나 다른 워커/여러 제품 분석에서 실행 중)은 저장된 상태를 이벤트 1개로 전송
+    """
+    job = get_analysis_job(job_id)
+    if job is not None:
+        return StreamingResponse(_job_event_stream(job, _last_event_id(request, after)), media_type="text/event-stream")
+
+    status = await analysis_job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"분석 작업을 찾을 수 없습니다 (job_id={job_id})")
+    if status["status"] == "completed" and status["result"]:
+        event = {"step": "result", "progress": 100, "data": status["result"], "job_id": job_id}
+    elif status["status"] == "failed":
+        event = {"step": "error", "progress": 0, "message": status["error"] or "분석 실패", "job_id": job_id}
+    else:
+        event = {
+            "step": "status",
+            "progress": status["progress"] or 0,
+            "message": f"실행 중 (owner={status['owner']}, {status['analyzed']}/{status['total']} 리뷰 저장됨)",
+            "job_id": job_id,
+        }
+
+    async def single_event():
+        yield f"data: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(single_event(), media_type="text/event-stream")
+
+
+# =========================================================
+# 여러 제품 리뷰 한 번에 분석 (SSE 스트리밍)
+# - 제품을 도메인별로 묶고, 도메인마다 하나의 스트림이 제품 경계와 무관하게 모델 배치를 채움
+#   → 리뷰가 적은 제품이 많아도 배치가 꽉 차서 제품별로 요청하는 것보다 추론 호출 수가 적음
+# - 제품 하나의 분석이 끝나면(커밋 완료) 그 제품의 후처리를 바로 시작 (최대 MULTI_ANALYSIS_POST_CONCURRENCY개 동시)
+# - 모든 이벤트에 product_id와 제품별 progress, 전체 완료 수(overall)가 포함됨
+# - 제품마다 tb_analysisJob 작업을 확보하고 제품별로 체크포인트 → 같은 제품을 동시에 두 곳에서 분석하지 않고,
+#   중단되면 제품별 작업으로 이어서 재개
+# =========================================================
+MULTI_ANALYSIS_MAX_PRODUCTS = int(os.getenv("MULTI_ANALYSIS_MAX_PRODUCTS", 200))
+MULTI_ANALYSIS_POST_CONCURRENCY = int(os.getenv("MULTI_ANALYSIS_POST_CONCURRENCY", 4))
+
+
+def _fetch_products(cursor, product_ids):
+    placeholders = ",".join(["%s"] * len(product_ids))
+    rows = _fetchall(
+        cursor,
+        f"""
+        SELECT p.product_id, p.category_id, p.user_id, c.category_name
+        FROM tb_product p
+        LEFT JOIN tb_productCategory c ON p.category_id = c.category_id
+        WHERE p.product_id IN ({placeholders})
+        """,
+        list(product_ids),
+    )
+    return {row["product_id"]: row for row in rows}
+
+
+def _fetch_keyword_maps(conn, cursor, category_ids):
+    """카테고리별 키워드 맵 {category_id: {keyword_text: keyword_id}}"""
+    keyword_maps = {}
+    for category_id in category_ids:
+        conn, cursor, keywords = _fetch_keywords(conn, cursor, category_id)
+        keyword_maps[category_id] = {kw["keyword_text"]: kw["keyword_id"] for kw in keywords}
+    return conn, cursor, keyword_maps
+
+
+async def _analyze_products(product_ids: List[int], domain: Optional[str]):
+    """
+    여러 product_id의 미분석 리뷰를 한 번에 분석 (진행 이벤트 dict를 yield, start_detached로 실행):
+    1. 제품 정보/키워드를 제품 수와 무관한 횟수의 쿼리로 조회
+    2. 제품마다 분석 작업(tb_analysisJob) 확보 (중단된 작업은 체크포인트부터, 다른 곳에서 실행 중이면 busy로 건너뜀)
+    3. 도메인별 CheckpointedMultiAnalysis 스트림을 동시에 실행 (배치는 제품 경계를 넘어 채움)
+       - 제품별 결과와 작업 체크포인트는 tb_reviewAnalysis와 같은 페이지 트랜잭션으로 커밋
+    4. 제품 분석이 끝나는 대로 해당 제품의 후처리(인사이트/대시보드/워드클라우드) 실행 후 작업 완료 기록
+    5. 모든 제품이 끝나면 제품별 결과 + 배치 통계 전송
+    서버 종료/오류로 끝나지 못한 제품 작업은 소유권을 반납 → 제품별 작업으로 재개 (run_product_analysis_job)
+    """
+    conn = None
+    run_started = time.monotonic()
+    outcomes = {}   # product_id → 제품별 최종 결과
+    live = {}       # 이 요청이 소유한 작업 {job_id: 마지막 이벤트} (heartbeat 대상, 끝나면 빠짐)
+    heartbeat = None
+    ANALYSES_IN_FLIGHT.inc()
+
+    def overall():
+        return {"done": sum(1 for o in outcomes.values() if o.get("finished")), "total": len(product_ids)}
+
+    def send(step: str, progress: int, message: str, product_id: Optional[int] = None):
+        payload = {"step": step, "progress": progress, "message": message, "overall": overall()}
+        if product_id is not None:
+            payload["product_id"] = product_id
+            job_id = outcomes[product_id].get("job_id")
+            if job_id:
+                payload["job_id"] = job_id
+                if job_id in live:
+                    live[job_id] = payload
+        return payload
+
+    def finish(product_id, status, **fields):
+        outcome = outcomes[product_id]
+        outcome.update(fields, status=status, finished=True)
+        ANALYSES_TOTAL.inc(domain=outcome.get("domain") or "unknown", status=status)
+
+    def result_of(product_id):
+        return {k: v for k, v in outcomes[product_id].items() if k not in ("finished", "analysis_done")}
+
+    async def close_job(product_id, status, error=None):
+        """제품 작업 종료 기록 (소유권을 잃은 작업은 기록하지 않음)"""
+        job_id = outcomes[product_id]["job_id"]
+        if live.pop(job_id, None) is None:
+            return
+        try:
+            result = result_of(product_id) if status == COMPLETED else None
+            if not await run_io(finish_product_job, job_id, status, result, error):
+                print(f"⚠️ [AnalysisJob {job_id}] 다른 워커가 작업을 가져가 종료 상태를 기록하지 않음")
         except Exception as e:
-            import traceback
-            print("❌ [ERROR] 리뷰 분석 파이프라인 오류 발생:")
-            traceback.print_exc()
-            error_data = json.dumps({
-                "step": "error",
-                "progress": 0,
-                "message": f"분석 실패: {str(e)}"
-            })
-            yield f"data: {error_data}\n\n"
-        finally:
-            if conn:
-                conn.close()
-    
-    return StreamingResponse(generate_progress(), media_type="text/event-stream")
+            print(f"⚠️ [AnalysisJob {job_id}] 작업 상태 저장 실패: {e}")
+
+    try:
+        yield send("start", 0, f"제품 {len(product_ids)}개 분석 시작")
+
+        # 1️⃣ 제품 정보 / 키워드 (제품 수와 무관한 쿼리 횟수)
+        stage_started = time.monotonic()
+        conn, cursor = await run_io(_open_cursor)
+        products = await run_io(_fetch_products, cursor, product_ids)
+        for product_id in product_ids:
+            info = products.get(product_id)
+            if info is None:
+                outcomes[product_id] = {"product_id": product_id, "domain": None}
+                finish(product_id, "not_found", success=False, message="제품을 찾을 수 없습니다")
+                yield send("error", 0, f"제품을 찾을 수 없습니다 (product_id={product_id})", product_id)
+                continue
+            outcomes[product_id] = {
+                "product_id": product_id,
+                "category_id": info["category_id"],
+                "domain": domain if domain is not None else CATEGORY_TO_DOMAIN.get(info["category_id"], "steam"),
+                "review_count": 0,
+                "analyzed_count": 0,
+                "inserted_count": 0,
+                "insight_id": None,
+                "wordcloud_path": None,
+            }
+
+        found = [pid for pid in product_ids if pid in products]
+        conn, cursor, keyword_maps = await run_io(
+            _fetch_keyword_maps, conn, cursor, sorted({products[pid]["category_id"] for pid in found})
+        )
+
+        # 2️⃣ 제품별 분석 작업 확보 (작업 범위 = 지금까지 들어온 미분석 리뷰, 쿼리 1회 + 제품별 작업 행)
+        jobs, busy, empty = ({}, {}, [])
+        if found:
+            jobs, busy, empty = await claim_product_jobs(cursor, {pid: outcomes[pid]["domain"] for pid in found})
+        for row in jobs.values():
+            live[row["job_id"]] = {}
+        heartbeat = asyncio.create_task(keep_jobs_alive(live))
+        observe_stage("product_lookup", "multi", time.monotonic() - stage_started)
+        remaining = sum(row["total"] - row["analyzed"] for row in jobs.values())
+        yield send("init", 10, f"제품 {len(found)}개 조회 완료, 분석 작업 {len(jobs)}개 (미분석 리뷰 {remaining}개)")
+
+        groups = {}        # domain → {product_id: {"job", "keyword_map"}}
+        post_only = []     # 분석은 끝나고 후처리 중에 중단된 작업
+        for product_id in found:
+            if product_id in busy:
+                active = busy[product_id]
+                outcomes[product_id]["job_id"] = active["job_id"]
+                message = f"이미 분석 중인 작업이 있습니다 (owner={active['owner']})"
+                finish(product_id, "busy", success=False, message=message)
+                yield send("error", 0, message, product_id)
+                continue
+            if product_id in empty:
+                finish(product_id, "empty", success=True, message="분석할 새로운 리뷰가 없습니다")
+                yield send("info", 100, "분석할 새로운 리뷰가 없습니다", product_id)
+                continue
+            row = jobs[product_id]
+            outcomes[product_id].update(
+                job_id=row["job_id"],
+                domain=row["domain"],   # 재개한 작업은 처음 결정한 도메인 유지
+                review_count=row["total"],
+                analyzed_count=row["analyzed"],
+                inserted_count=row["written"],
+            )
+            if row["stage"] == STAGE_POST:
+                outcomes[product_id]["analysis_done"] = True
+                post_only.append(product_id)
+                continue
+            if row["analyzed"]:
+                yield send("loading", 15, f"분석할 리뷰 {row['total']}개 중 {row['analyzed']}개는 이미 저장됨, 이어서 분석", product_id)
+            groups.setdefault(row["domain"], {})[product_id] = {
+                "job": row,
+                "keyword_map": keyword_maps[products[product_id]["category_id"]],
+            }
+
+        # 3️⃣ 도메인별 스트림 + 제품별 후처리를 하나의 이벤트 흐름으로 합침
+        merger = _EventMerger()
+        post_slots = asyncio.Semaphore(MULTI_ANALYSIS_POST_CONCURRENCY)
+        batch_stats = {}
+
+        async def post_stage(product_id, resumed=False):
+            outcome = outcomes[product_id]
+            job_id = outcome["job_id"]
+
+            def send_progress(step, progress, message):
+                return send(step, progress, message, product_id)
+
+            # 분석 완료 기록 → 이후 재개하면 후처리부터
+            if job_id not in live or not (resumed or await run_io(advance_job_stage, job_id, STAGE_POST)):
+                live.pop(job_id, None)
+                finish(product_id, "interrupted", success=False, message="다른 워커가 작업을 가져감")
+                yield send_progress("interrupted", 65, "다른 워커가 작업을 가져감")
+                return
+            try:
+                async with post_slots:
+                    post_results = {}
+                    async for event in _post_analysis_events(
+                        product_id, outcome["domain"], products[product_id]["user_id"], send_progress, post_results
+                    ):
+                        yield event
+            except Exception as e:
+                print(f"❌ 제품 {product_id} 후처리 실패: {e}")
+                finish(product_id, "error", success=False, message=f"분석 실패: {str(e)}")
+                await close_job(product_id, FAILED, f"분석 실패: {str(e)}")
+                yield send_progress("error", 0, f"분석 실패: {str(e)}")
+                return
+            finish(
+                product_id,
+                "success",
+                success=True,
+                insight_id=post_results["insight_id"],
+                wordcloud_job=post_results["wordcloud_job"],
+                message="리뷰 분석, 인사이트 생성 및 대시보드 업데이트 완료",
+            )
+            await close_job(product_id, COMPLETED)
+            yield send_progress("complete", 100, "분석 완료!")
+
+        def product_done(product):
+            outcome = outcomes[product["product_id"]]
+            if outcome.get("analysis_done"):
+                return None   # 완료 표시 이후 같은 제품 이벤트가 한 번 더 온 경우 (후처리는 이미 시작됨)
+            outcome["analysis_done"] = True
+            outcome["analyzed_count"] = product["analyzed"]
+            outcome["inserted_count"] = product["written"]
+            merger.add(post_stage(product["product_id"]))
+            return send("saving", 65, f"분석 {product['analyzed']}개 리뷰, {product['written']}건 저장 완료", product["product_id"])
+
+        async def analysis_stage(domain_name, group):
+            stream = CheckpointedMultiAnalysis(domain_name, DOMAIN_PIPELINES.get(domain_name, steam), group)
+            print(f"🧠 {domain_name} 도메인: 제품 {len(group)}개, 리뷰 {stream.total}개 스트리밍 분석 시작...")
+            for product_id in group:
+                yield send("analysis", 20, f"{domain_name} 도메인 모델로 분석 대기 중...", product_id)
+            try:
+                async for event in stream.run():
+                    for product in event.get("products", []):
+                        if product["done"]:
+                            event = product_done(product)
+                            if event:
+                                yield event
+                            continue
+                        progress = 20 + int(min(product["analyzed"] / product["total"], 1.0) * 45)
+                        yield send(
+                            "analysis",
+                            progress,
+                            f"분석 중... ({product['analyzed']}/{product['total']} 리뷰, {product['written']}건 저장)",
+                            product["product_id"],
+                        )
+                for product in stream.finish():
+                    event = product_done(product)
+                    if event:
+                        yield event
+            except JobOwnershipLost as e:
+                # 페이지는 롤백됨, 나머지 제품 작업은 요청이 끝날 때 반납 → 체크포인트부터 재개
+                print(f"⚠️ {domain_name} 도메인 분석 중 작업 소유권 상실 (job_id={e}) → 중단")
+                live.pop(str(e), None)
+                for product_id, product in stream.products.items():
+                    if not product["done"]:
+                        finish(product_id, "interrupted", success=False, message="작업이 중단되었습니다 (재개 예정)")
+                        yield send("interrupted", 0, "작업이 중단되었습니다 (재개 예정)", product_id)
+            except Exception as e:
+                print(f"❌ {domain_name} 도메인 분석 실패: {e}")
+                for product_id, product in stream.products.items():
+                    if not product["done"]:
+                        finish(product_id, "error", success=False, message=f"분석 실패: {str(e)}")
+                        await close_job(product_id, FAILED, f"분석 실패: {str(e)}")
+                        yield send("error", 0, f"분석 실패: {str(e)}", product_id)
+
+            for product_id, product in stream.products.items():
+                if outcomes[product_id].get("analysis_done"):
+                    outcomes[product_id].update(analyzed_count=product["analyzed"], inserted_count=product["written"])
+
+            stream_stats = stream.stats()
+            batch_stats[domain_name] = {
+                "products": len(group),
+                "reviews": stream_stats["analyzed"],
+                "pages": stream_stats["pages"],
+                "reviews_per_page": round(stream_stats["analyzed"] / stream_stats["pages"], 1) if stream_stats["pages"] else 0,
+                "wall_ms": stream_stats["wall_ms"],
+                "overlap": stream_stats["overlap"],
+            }
+            observe_stage("review_fetch", domain_name, stream_stats["fetch_ms"] / 1000)
+            observe_stage("inference", domain_name, stream_stats["infer_ms"] / 1000)
+            observe_stage("save", domain_name, stream_stats["write_ms"] / 1000)
+            observe_stage("analysis_wall", domain_name, stream_stats["wall_ms"] / 1000)
+            REVIEWS_ANALYZED.inc(stream_stats["analyzed"], domain=domain_name)
+            ROWS_WRITTEN.inc(stream_stats["written"], domain=domain_name)
+            print(f"💾 {domain_name} 도메인 분석 완료 ({batch_stats[domain_name]})")
+
+        for domain_name, group in groups.items():
+            merger.add(analysis_stage(domain_name, group))
+        for product_id in post_only:
+            yield send("saving", 65, "분석 결과 저장됨, 후처리부터 재개", product_id)
+            merger.add(post_stage(product_id, resumed=True))
+        async for event in merger.events():
+            yield event
+
+        # 4️⃣ 완료
+        results = [result_of(pid) for pid in product_ids]
+        final_result = {
+            "success": all(r.get("success") for r in results),
+            "product_count": len(product_ids),
+            "products": results,
+            "batches": batch_stats,
+        }
+        yield send("complete", 100, "전체 분석 완료!")
+        yield {"step": "result", "progress": 100, "data": final_result}
+
+    except Exception as e:
+        import traceback
+        print("❌ [ERROR] 다중 제품 분석 파이프라인 오류 발생:")
+        traceback.print_exc()
+        yield send("error", 0, f"분석 실패: {str(e)}")
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+        # 끝나지 못한 제품 작업(서버 종료/오류/소유권 상실로 중단된 도메인)은 반납 → 재개 루프가 체크포인트부터 재개
+        if live:
+            try:
+                await run_io(release_product_jobs, list(live))
+                print(f"♻️ 끝나지 않은 제품 분석 작업 {len(live)}개 반납 (재개 예정)")
+            except Exception as e:
+                print(f"⚠️ 제품 분석 작업 반납 실패 (heartbeat 만료 후 재개): {e}")
+        ANALYSES_IN_FLIGHT.dec()
+        for product_id, outcome in outcomes.items():
+            if not outcome.get("finished"):
+                ANALYSES_TOTAL.inc(domain=outcome.get("domain") or "unknown", status="interrupted")
+        observe_stage("total", "multi", time.monotonic() - run_started)
+        if conn:
+            await run_io(_close_quietly, conn)
+
+
+@router.post("/products/reviews/analysis")
+async def analyze_products_reviews(req: AnalyzeProductsRequest):
+    """
+    여러 제품 분석을 시작하고 진행 이벤트를 SSE로 전송 (단계는 _analyze_products 참고)
+    - 분석은 응답과 분리되어 실행 → 연결이 끊겨도 계속, 제품별 상태는 이벤트의 job_id로 GET /v1/analysis/jobs/{job_id}
+    - 이벤트 형식: {"step", "product_id", "job_id", "progress"(제품별 0~100), "message", "overall": {"done", "total"}}
+      product_id가 없는 이벤트(start/init/complete/result)는 요청 전체에 대한 것입니다.
+    """
+    product_ids = list(dict.fromkeys(req.product_ids))
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="product_ids가 비어 있습니다")
+    if len(product_ids) > MULTI_ANALYSIS_MAX_PRODUCTS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MULTI_ANALYSIS_MAX_PRODUCTS}개 제품까지 분석할 수 있습니다")
+    if req.domain is not None and req.domain not in DOMAIN_PIPELINES:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 도메인: {req.domain}")
+
+    batch = start_detached(_analyze_products(product_ids, req.domain))
+    return StreamingResponse(_job_event_stream(batch), media_type="text/event-stream")
 
 
 # 워드클라우드 단독 생성 (기간 필터 포함)
@@ -405,6 +1017,7 @@ def create_wordcloud(product_id: int, domain: Optional[str] = None, start_date:
     - start_date/end_date: YYYY-MM-DD 형식 (옵션)
     - domain: steam/cosmetics/electronics (옵션)
     리뷰가 없으면 200으로 success=false를 반환합니다(404 대신).
+    토큰화되지 않은 리뷰가 있으면 워드클라우드 작업을 예약하고 202 (요청 경로에서 토큰화하지 않음)
     """
     try:
         domain_name = domain or "steam"
@@ -416,8 +1029,127 @@ def create_wordcloud(product_id: int, domain: Optional[str] = None, start_date:
                 "message": "워드클라우드 생성 대상 리뷰가 없습니다."
             }
         return {"success": True, "wordcloud": wc_base64}
+    except TokensPending as e:
+        return _wordcloud_pending(product_id, domain or _product_domain(product_id), e)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# 워드클라우드 PNG (조건부 요청 지원)
+WORDCLOUD_MAX_AGE = int(os.getenv("WORDCLOUD_MAX_AGE", 0))
+WORDCLOUD_RETRY_AFTER = int(os.getenv("WORDCLOUD_RETRY_AFTER", 5))   # 토큰화 대기(202) 응답의 Retry-After (초)
+
+
+def _product_domain(product_id: int) -> Optional[str]:
+    conn, cursor = _open_cursor()
+    try:
+        product = _fetchone(cursor, PRODUCT_INFO_SQL, (product_id,))
+    finally:
+        _close_quietly(conn)
+    return CATEGORY_TO_DOMAIN.get(product["category_id"], "steam") if product else None
+
+
+def _wordcloud_pending(product_id: int, domain_name: Optional[str], pending: TokensPending) -> JSONResponse:
+    """토큰화 대기 → 워드클라우드 작업(토큰화 + 렌더링) 예약 후 202, 진행 상황은 GET /v1/products/{id}/wordcloud/status"""
+    job = enqueue_wordcloud(product_id, domain_name or "steam")
+    return JSONResponse(
+        status_code=202,
+        headers={"Retry-After": str(WORDCLOUD_RETRY_AFTER)},
+        content={
+            "success": False,
+            "pending": True,
+            "pending_reviews": pending.pending,
+            "wordcloud": None,
+            "job": job,
+            "message": "새 리뷰를 토큰화하는 중입니다. 잠시 후 다시 요청하세요.",
+        },
+    )
+
+
+@router.get("/products/{product_id}/wordcloud.png")
+def get_wordcloud_image(
+    product_id: int,
+    request: Request,
+    domain: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    """
+    워드클라우드 원본 PNG를 반환합니다. (base64 변환 없음)
+    - ETag: 렌더 캐시 키 (리뷰 워터마크/불용어/기간 등이 같으면 동일)
+    - If-None-Match가 일치하면 렌더링 없이 304
+    - domain 생략 시 제품 카테고리로 결정
+    - 토큰화되지 않은 리뷰가 있으면 워드클라우드 작업을 예약하고 202 (JSON, Retry-After)
+    """
+    domain_name = domain or _product_domain(product_id)
+    if domain_name is None:
+        raise HTTPException(status_code=404, detail=f"제품을 찾을 수 없습니다: {product_id}")
+
+    headers = {"Cache-Control": f"private, max-age={WORDCLOUD_MAX_AGE}, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        key = wordcloud_etag(product_id, domain_name, start_date, end_date)
+        if key and f'"{key}"' in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers={**headers, "ETag": f'"{key}"'})
+
+    try:
+        rendered = get_wordcloud_png(product_id, domain_name, start_date, end_date)
+    except TokensPending as e:
+        return _wordcloud_pending(product_id, domain_name, e)
+    if not rendered:
+        raise HTTPException(status_code=404, detail="워드클라우드 생성 대상 리뷰가 없습니다.")
+    key, png = rendered
+    return Response(content=png, media_type="image/png", headers={**headers, "ETag": f'"{key}"'})
+
+
+# 워드클라우드 백그라운드 작업 상태
+@router.get("/products/{product_id}/wordcloud/status")
+def get_wordcloud_status(product_id: int):
+    """
+    최근 워드클라우드 작업 상태 (queued / running / done / failed)
+    작업 기록이 없으면 job=null (서버 재시작 이후 예약되지 않음)
+    """
+    return {"product_id": product_id, "job": wordcloud_job_status(product_id)}
+
+
+# 대량 인사이트 재생성 작업 시작 (백그라운드, 한 번에 하나)
+@router.post("/insights/bulk", status_code=202)
+async def start_bulk_insights(req: BulkInsightRequest):
+    """
+    product_ids 또는 category_id(둘 다 주면 카테고리 안의 지정 제품)의 인사이트를 일괄 재생성
+    - force=false면 입력 변화가 작은 제품은 건너뜀
+    - deadline_minutes가 지나면 새 제품 시작을 멈춤 (남은 제품은 deferred)
+    진행 상황: GET /v1/insights/bulk/{job_id}
+    """
+    if not req.product_ids and req.category_id is None:
+        raise HTTPException(status_code=400, detail="product_ids 또는 category_id가 필요합니다")
+    try:
+        return await start_bulk_insight_job(
+            product_ids=req.product_ids,
+            category_id=req.category_id,
+            force=req.force,
+            user_id=req.user_id,
+            concurrency=req.concurrency,
+            deadline_minutes=req.deadline_minutes,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# 대량 인사이트 작업 목록 (최근 작업부터)
+@router.get("/insights/bulk")
+def list_bulk_insights():
+    return {"jobs": bulk_insight_jobs()}
+
+
+# 대량 인사이트 작업 진행 상황 (처리 수, 생성/유지/실패, 처리량, ETA)
+@router.get("/insights/bulk/{job_id}")
+def get_bulk_insights(job_id: str):
+    job = bulk_insight_job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다 (job_id={job_id})")
+    return job
@@ -3,8 +3,9 @@ import json
 import time
 from typing import List, Dict, Any
 
-import torch
-from transformers import pipeline as hf_pipeline
+from app.models.backends import backend_device, load_text_classification_pipeline, resolve_backend
+from app.models.batching import plan_batches, run_batches
+from app.models.result_cache import cached_analyze, model_signature
 
 #설정 로드
 
@@ -15,6 +16,18 @@ ASPECTS = cfg["aspect_labels"]
 ASPECT_GROUPS = cfg["aspect_groups"]
 LABEL_MAP = cfg["label_map"]
 
+# 결과 캐시 시그니처 (모델이 바뀌면 기존 캐시 무효화)
+MODEL_SIGNATURE = model_signature(
+    model=cfg["absa_model"], aspects=ASPECTS, groups=ASPECT_GROUPS, labels=LABEL_MAP, backend=resolve_backend(cfg)
+)
+
+DEFAULT_MAX_LENGTH = 256   # 단건/배치 공통 토큰 길이 (None이면 이 값으로 잘라냄)
+
+
+def _cache_variant(max_length):
+    """단건/배치가 같은 max_length면 같은 결과이므로 같은 variant로 캐시 (서로의 결과 재사용)"""
+    return model_signature(max_length=max_length or DEFAULT_MAX_LENGTH)
+
 # =========================================================
 # 1. 모델 초기화 (캐싱)
 _pipeline_cache = None
@@ -25,15 +38,11 @@ def get_absa_pipeline():
     global _pipeline_cache, _pipeline_device
     if _pipeline_cache is None:
         try:
-            _pipeline_device = 0 if torch.cuda.is_available() else -1
-            print(f"화장품 ABSA model 로드 중: {cfg['absa_model']} (device={_pipeline_device})")
+            backend = resolve_backend(cfg)
+            _pipeline_device = backend_device(backend, 0, -1)
+            print(f"화장품 ABSA model 로드 중: {cfg['absa_model']} (device={_pipeline_device}, backend={backend})")
             t0_load = time.monotonic()
-            _pipeline_cache = hf_pipeline(
-                task="text-classification",
-                model=cfg['absa_model'],
-                tokenizer=cfg['absa_model'],
-                device=_pipeline_device,
-            )
+            _pipeline_cache = load_text_classification_pipeline(cfg['absa_model'], backend, _pipeline_device)
             load_ms = (time.monotonic() - t0_load) * 1000
             print(f"[Cosmetics] ABSA 모델 로드 완료: {load_ms:.1f}ms")
         except Exception as e:
@@ -50,7 +59,7 @@ def _analyze_single_aspect(absa, aspect: str, text: str, max_length: int | None,
         input_text,
         truncation=True,
         padding=True,
-        max_length=max_length if max_length else 256,
+        max_length=max_length if max_length else DEFAULT_MAX_LENGTH,
         batch_size=16,
         top_k=None,
     )
@@ -71,7 +80,7 @@ def _analyze_single_aspect(absa, aspect: str, text: str, max_length: int | None,
     return {"label": label_kr, "score": score}
 
 
-def analyze_aspects_single_phase(text, debug=False, max_length: int | None = 256):
+def analyze_aspects_single_phase(text, debug=False, max_length: int | None = DEFAULT_MAX_LENGTH):
     """
     단일 모델로 모든 aspect에 대해 감성 분석 수행
     Returns: {aspect: {"label": "긍정/중립/부정", "score": 0.95}}
@@ -154,26 +163,39 @@ def _prepare_batch_inputs(texts: List[str]) -> List[tuple[int, str, str]]:
 
 
 def _run_batch_inference(absa, expanded_inputs, batch_size, max_length, num_texts):
-    """배치 추론 실행"""
+    """배치 추론 실행 (길이 기반 버킷 → 원래 순서로 복원)"""
     start = time.monotonic()
-    preds_all = []
-    
-    for i in range(0, len(expanded_inputs), batch_size):
-        chunk = expanded_inputs[i:i + batch_size]
-        inputs = [item[2] for item in chunk]
-        preds_chunk = absa(
-            inputs,
+    inputs = [item[2] for item in expanded_inputs]
+    max_length = max_length if max_length else DEFAULT_MAX_LENGTH
+
+    buckets, stats = plan_batches(
+        absa.tokenizer,
+        inputs,
+        batch_size,
+        bucketing=cfg.get("length_bucketing", True),
+        max_tokens=cfg.get("max_batch_tokens", 8192),
+        max_items=cfg.get("max_batch_items", 128),
+        max_length=max_length,
+    )
+
+    def infer(batch):
+        return absa(
+            batch,
             truncation=True,
             padding=True,
-            max_length=max_length if max_length else 256,
-            batch_size=batch_size,
+            max_length=max_length,
+            batch_size=len(batch),
             top_k=None
         )
-        preds_all.extend(preds_chunk)
-    
+
+    preds_all = run_batches(inputs, buckets, infer)
+
     elapsed = (time.monotonic() - start) * 1000
-    print(f"[Cosmetics] 배치 추론 완료: reviews={num_texts}, inputs={len(expanded_inputs)}, {elapsed:.1f}ms")
-    
+    print(
+        f"[Cosmetics] 배치 추론 완료: reviews={num_texts}, inputs={len(expanded_inputs)}, "
+        f"batches={len(buckets)}, padding={stats['padding_ratio']:.1%}, {elapsed:.1f}ms"
+    )
+
     return preds_all, elapsed
 
 
@@ -229,7 +251,21 @@ def _convert_to_steam_format(texts, per_text_aspect):
     return outputs
 
 
-def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16, max_length: int | None = 256) -> List[Dict[str, Any]]:
+def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16, max_length: int | None = DEFAULT_MAX_LENGTH) -> List[Dict[str, Any]]:
+    """결과 캐시에 없는 텍스트만 모델로 분석"""
+    if not texts:
+        return []
+
+    return cached_analyze(
+        "cosmetics",
+        MODEL_SIGNATURE,
+        texts,
+        lambda misses: _analyze_reviews_uncached(misses, debug, batch_size, max_length),
+        _cache_variant(max_length),
+    )
+
+
+def _analyze_reviews_uncached(texts: List[str], debug: bool, batch_size: int, max_length: int | None) -> List[Dict[str, Any]]:
     """여러 리뷰 텍스트를 Batch로 분석하여 Steam 호환 형식으로 반환"""
     if not texts:
         return []
@@ -259,7 +295,7 @@ def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16,
 # 4. 통합 리뷰 분석 (Steam 인터페이스와 호환)
 def analyze_review(text, debug=False):
     """
-    Steam pipeline과 동일한 인터페이스
+    Steam pipeline과 동일한 인터페이스 (debug가 아니면 결과 캐시 적용)
     Returns: {
         "text": "리뷰 텍스트",
         "aspects": ["가격", "기능/효과", ...],
@@ -269,6 +305,18 @@ def analyze_review(text, debug=False):
         ]
     }
     """
+    if debug:
+        return _analyze_review_uncached(text, debug=True)
+    return cached_analyze(
+        "cosmetics",
+        MODEL_SIGNATURE,
+        [text],
+        lambda misses: [_analyze_review_uncached(t) for t in misses],
+        _cache_variant(DEFAULT_MAX_LENGTH),
+    )[0]
+
+
+def _analyze_review_uncached(text, debug=False):
     t0_total = time.monotonic()
     
     # 1. 35개 aspect별 분석
@@ -1,6 +1,11 @@
 import json
 import os
-from transformers import pipeline as hf_pipeline
+import time
+from typing import Any, Dict, List
+
+from app.models.backends import backend_device, load_text_classification_pipeline, resolve_backend
+from app.models.batching import plan_batches, run_batches
+from app.models.result_cache import cached_analyze, model_signature
 
 # =========================================================
 # 설정 로드
@@ -12,46 +17,96 @@ ASPECTS = cfg["aspect_labels"]
 ASPECT_GROUPS = cfg["aspect_groups"]
 LABEL_MAP = cfg["label_map"]
 
+# 결과 캐시 시그니처 (모델이 바뀌면 기존 캐시 무효화)
+MODEL_SIGNATURE = model_signature(
+    model=cfg["model"], aspects=ASPECTS, groups=ASPECT_GROUPS, labels=LABEL_MAP, backend=resolve_backend(cfg)
+)
+
+DEFAULT_MAX_LENGTH = 256   # 단건/배치 공통 토큰 길이 (None이면 이 값으로 잘라냄)
+
+
+def _cache_variant(max_length):
+    """단건/배치가 같은 max_length면 같은 결과이므로 같은 variant로 캐시 (서로의 결과 재사용)"""
+    return model_signature(max_length=max_length or DEFAULT_MAX_LENGTH)
+
+
 # =========================================================
 # 1️⃣ 모델 초기화 (캐싱)
 # =========================================================
 _pipeline_cache = None
+_pipeline_device = -1  # -1: CPU, 0+: GPU index
 
 
 def get_absa_pipeline():
     """ABSA 파이프라인 싱글톤 (한 번만 로드)"""
-    global _pipeline_cache
+    global _pipeline_cache, _pipeline_device
     if _pipeline_cache is None:
-        print(f"📦 Loading Electronics ABSA model: {cfg['model']}")
-        _pipeline_cache = hf_pipeline(
-            task="text-classification",
-            model=cfg["model"],
-            tokenizer=cfg["model"],
-            return_all_scores=True,
-        )
+        backend = resolve_backend(cfg)
+        _pipeline_device = backend_device(backend, 0, -1)
+        print(f"📦 Loading Electronics ABSA model: {cfg['model']} (device={_pipeline_device}, backend={backend})")
+        t0_load = time.monotonic()
+        _pipeline_cache = load_text_classification_pipeline(cfg["model"], backend, _pipeline_device)
+        load_ms = (time.monotonic() - t0_load) * 1000
+        print(f"[Electronics] ABSA 모델 로드 완료: {load_ms:.1f}ms")
     return _pipeline_cache
 
 
 # =========================================================
-# 2️⃣ Aspect별 감성 분석
+# 2️⃣ Aspect별 감성 분석 (리뷰 × aspect 확장 배치)
 # =========================================================
-def analyze_aspects_single_phase(text, debug=False):
-    """
-    단일 모델로 모든 aspect에 대해 감성 분석 수행
-    Returns: {aspect: {"label": "긍정/중립/부정", "score": 0.95}}
-    """
-    absa = get_absa_pipeline()
-    results = {}
+def _prepare_batch_inputs(texts: List[str]) -> List[tuple[int, str, str]]:
+    """각 리뷰에 대해 모든 aspect 결합"""
+    expanded_inputs = []
+    for ti, text in enumerate(texts):
+        for aspect in ASPECTS:
+            expanded_inputs.append((ti, aspect, f"{aspect}: {text}"))
+    return expanded_inputs
+
+
+def _run_batch_inference(absa, expanded_inputs, batch_size, max_length, num_texts):
+    """배치 추론 실행 (길이 기반 버킷 → 원래 순서로 복원)"""
+    start = time.monotonic()
+    inputs = [item[2] for item in expanded_inputs]
+    max_length = max_length if max_length else DEFAULT_MAX_LENGTH
+
+    buckets, stats = plan_batches(
+        absa.tokenizer,
+        inputs,
+        batch_size,
+        bucketing=cfg.get("length_bucketing", True),
+        max_tokens=cfg.get("max_batch_tokens", 8192),
+        max_items=cfg.get("max_batch_items", 128),
+        max_length=max_length,
+    )
+
+    def infer(batch):
+        return absa(
+            batch,
+            truncation=True,
+            padding=True,
+            max_length=max_length,
+            batch_size=len(batch),
+            top_k=None,
+        )
 
-    if debug:
-        print(f"\n🔍 [DEBUG] 리뷰 분석 중: {text[:50]}...")
+    preds_all = run_batches(inputs, buckets, infer)
 
-    for aspect in ASPECTS:
-        input_text = f"{aspect}: {text}"
-        preds = absa(input_text)
+    elapsed = (time.monotonic() - start) * 1000
+    print(
+        f"[Electronics] 배치 추론 완료: reviews={num_texts}, inputs={len(expanded_inputs)}, "
+        f"batches={len(buckets)}, padding={stats['padding_ratio']:.1%}, {elapsed:.1f}ms"
+    )
 
+    return preds_all, elapsed
+
+
+def _reconstruct_aspect_results(expanded_inputs, preds_all, texts, debug=False):
+    """예측 결과를 텍스트별 aspect 맵으로 재구성"""
+    per_text_aspect = [dict() for _ in texts]
+
+    for (ti, aspect, _), pred in zip(expanded_inputs, preds_all):
         # 가장 높은 점수의 라벨 선택
-        best_pred = max(preds[0], key=lambda x: x["score"])
+        best_pred = max(pred, key=lambda x: x["score"])
         label_raw = best_pred["label"]
         score = round(best_pred["score"], 4)
 
@@ -62,10 +117,25 @@ def analyze_aspects_single_phase(text, debug=False):
         if label_raw == "LABEL_3":
             continue
 
-        # 라벨 변환
         label_kr = LABEL_MAP.get(label_raw, "중립")
+        per_text_aspect[ti][aspect] = {"label": label_kr, "score": score}
+
+    return per_text_aspect
+
+
+def analyze_aspects_single_phase(text, debug=False, max_length: int | None = DEFAULT_MAX_LENGTH):
+    """
+    단일 모델로 모든 aspect에 대해 감성 분석 수행 (20개 aspect를 한 번의 배치로)
+    Returns: {aspect: {"label": "긍정/중립/부정", "score": 0.95}}
+    """
+    absa = get_absa_pipeline()
 
-        results[aspect] = {"label": label_kr, "score": score}
+    if debug:
+        print(f"\n🔍 [DEBUG] 리뷰 분석 중: {text[:50]}...")
+
+    expanded_inputs = _prepare_batch_inputs([text])
+    preds_all, _ = _run_batch_inference(absa, expanded_inputs, len(expanded_inputs), max_length, 1)
+    results = _reconstruct_aspect_results(expanded_inputs, preds_all, [text], debug=debug)[0]
 
     if debug:
         print(f"  ✅ 탐지된 aspect 수: {len(results)}")
@@ -114,12 +184,38 @@ def compress_to_groups(aspect_results):
     return compressed
 
 
+def _calculate_pos_neg_scores(label: str, avg_score: float) -> tuple[float, float]:
+    """POS/NEG 점수 생성 (모델 점수 기반)"""
+    if label == "긍정":
+        return avg_score, 1 - avg_score
+    elif label == "부정":
+        return 1 - avg_score, avg_score
+    else:  # 중립
+        return 0.5, 0.5
+
+
+def _to_steam_format(text, aspect_results):
+    """aspect 결과 → 6개 그룹 압축 → Steam 형식"""
+    compressed = compress_to_groups(aspect_results)
+    results = []
+    detected_aspects = []
+
+    for group_name, data in compressed.items():
+        pos, neg = _calculate_pos_neg_scores(data["label"], data["avg_score"])
+        results.append(
+            {"aspect": group_name, "label": data["label"], "POS": round(pos, 3), "NEG": round(neg, 3)}
+        )
+        detected_aspects.append(group_name)
+
+    return {"text": text, "aspects": detected_aspects, "results": results}
+
+
 # =========================================================
 # 4️⃣ 통합 리뷰 분석 (Steam 인터페이스 호환)
 # =========================================================
 def analyze_review(text, debug=False):
     """
-    Steam pipeline과 동일한 인터페이스
+    Steam pipeline과 동일한 인터페이스 (debug가 아니면 결과 캐시 적용)
     Returns: {
         "text": "리뷰 텍스트",
         "aspects": ["가격", "기능/성능", ...],
@@ -129,38 +225,65 @@ def analyze_review(text, debug=False):
         ]
     }
     """
-    # 1. 20개 aspect별 분석
+    if debug:
+        return _analyze_review_uncached(text, debug=True)
+    return cached_analyze(
+        "electronics",
+        MODEL_SIGNATURE,
+        [text],
+        lambda misses: [_analyze_review_uncached(t) for t in misses],
+        _cache_variant(DEFAULT_MAX_LENGTH),
+    )[0]
+
+
+def _analyze_review_uncached(text, debug=False):
+    # 1. 20개 aspect별 분석 → 2. 6개 그룹 압축 → 3. Steam 형식 변환
     aspect_results = analyze_aspects_single_phase(text, debug=debug)
+    return _to_steam_format(text, aspect_results)
 
-    # 2. 6개 그룹으로 압축
-    compressed = compress_to_groups(aspect_results)
 
-    # 3. Steam 형식으로 변환
-    results = []
-    detected_aspects = []
+# =========================================================
+# 5️⃣ 배치(Batch) 분석 (여러 리뷰 한 번에)
+# =========================================================
+def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16, max_length: int | None = DEFAULT_MAX_LENGTH) -> List[Dict[str, Any]]:
+    """결과 캐시에 없는 텍스트만 모델로 분석"""
+    if not texts:
+        return []
+
+    return cached_analyze(
+        "electronics",
+        MODEL_SIGNATURE,
+        texts,
+        lambda misses: _analyze_reviews_uncached(misses, debug, batch_size, max_length),
+        _cache_variant(max_length),
+    )
+
+
+def _analyze_reviews_uncached(texts: List[str], debug: bool, batch_size: int, max_length: int | None) -> List[Dict[str, Any]]:
+    """여러 리뷰 텍스트를 리뷰 × aspect로 확장해 Batch로 분석하고 Steam 호환 형식으로 반환"""
+    if not texts:
+        return []
+
+    t0_total = time.monotonic()
+    absa = get_absa_pipeline()
 
-    for group_name, data in compressed.items():
-        label = data["label"]
-        avg_score = data["avg_score"]
-
-        # POS/NEG 점수 생성 (모델 점수 기반)
-        if label == "긍정":
-            pos = avg_score
-            neg = 1 - avg_score
-        elif label == "부정":
-            neg = avg_score
-            pos = 1 - avg_score
-        else:  # 중립
-            pos = 0.5
-            neg = 0.5
+    # 1. 입력 준비 (리뷰 × 20개 aspect)
+    expanded_inputs = _prepare_batch_inputs(texts)
 
-        results.append(
-            {"aspect": group_name, "label": label, "POS": round(pos, 3), "NEG": round(neg, 3)}
-        )
+    # 2. 배치 추론
+    preds_all, elapsed = _run_batch_inference(absa, expanded_inputs, batch_size, max_length, len(texts))
 
-        detected_aspects.append(group_name)
+    # 3. 결과 재구성
+    per_text_aspect = _reconstruct_aspect_results(expanded_inputs, preds_all, texts)
 
-    return {"text": text, "aspects": detected_aspects, "results": results}
+    # 4. 최종 변환
+    outputs = [_to_steam_format(text, aspect_map) for text, aspect_map in zip(texts, per_text_aspect)]
+
+    if debug:
+        total_ms = (time.monotonic() - t0_total) * 1000
+        print(f"[Electronics] 배치 end-to-end: reviews={len(texts)}, inputs={len(expanded_inputs)}, total={total_ms:.1f}ms (inference={elapsed:.1f}ms)")
+
+    return outputs
 
 
 # =========================================================
@@ -9,11 +9,36 @@ import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
 from app.models import ModelRegistry
+from app.models.backends import resolve_backend
+from app.models.batching import plan_batches, run_batches
+from app.models.result_cache import cached_analyze, model_signature
+from app.models.sentence_cache import get_sentence_cache
 from .keywords import BOOST_KEYWORDS, NEG_TRIGGERS
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
 cfg = json.load(open(CONFIG_PATH, encoding="utf-8"))
 ASPECTS = cfg["aspect_labels"]
+SINGLE_MAX_SENTENCES = 10
+BATCH_MAX_SENTENCES = 8
+
+# 결과 캐시 시그니처 (모델이 바뀌면 기존 캐시 무효화)
+MODEL_SIGNATURE = model_signature(
+    phase1=cfg["phase1_model"], phase2=cfg["phase2_model"], aspects=ASPECTS, backend=resolve_backend(cfg)
+)
+
+
+def _registry():
+    """config.json의 backend(pytorch / onnx / onnx-int8)로 모델 번들 조회"""
+    return ModelRegistry.get(cfg["phase1_model"], cfg["phase2_model"], resolve_backend(cfg))
+
+
+def _cache_variant(threshold, max_sentences):
+    return model_signature(
+        threshold=threshold,
+        max_sentences=max_sentences,
+        boost_value=cfg["boost_value"],
+        margin=cfg["margin"],
+    )
 
 
 # =========================================================
@@ -43,26 +68,13 @@ def boost_aspects(text, probs_dict):
 # 3️⃣ Phase-1 측면 예측
 # =========================================================
 def detect_aspects_multi(text, threshold=0.35):
-    reg = ModelRegistry.get(cfg["phase1_model"], cfg["phase2_model"])
-    tok, model = reg["aspect_tokenizer"], reg["aspect_model"]
-    device = reg["device"]
-
-    sentences = split_sentences(text)
-    total = {}
-
-    print(f"\n[Steam DEBUG] 문장별 측면 확률 로그")
-    for s in sentences:
-        inputs = tok(s, return_tensors="pt", truncation=True, padding=True).to(device)
-        with torch.no_grad():
-            logits = model(**inputs).logits
-            probs = torch.sigmoid(logits).cpu().numpy()[0]
-        detected = {ASPECTS[i]: float(probs[i]) for i in range(len(ASPECTS))}
-        detected = boost_aspects(s, detected)
-        for asp, prob in detected.items():
-            print(f" - {asp:6s} | {s[:35]:35s} → {prob:.3f}")
-            if prob >= threshold:
-                total[asp] = max(total.get(asp, 0), prob)
-    return total
+    """문장 전체를 한 번의 forward로 측면 예측 (배치 Phase-1 재사용)"""
+    reg = _registry()
+    all_sentences = _collect_sentences([text], SINGLE_MAX_SENTENCES, 5)
+    return _run_phase1(
+        reg["aspect_tokenizer"], reg["aspect_model"], reg["device"],
+        all_sentences, max(len(all_sentences), 1), threshold, 1, verbose=False,
+    )[0]
 
 
 # =========================================================
@@ -78,33 +90,48 @@ def polarity_correction(text, aspect, label):
 # 5️⃣ Phase-2 감정 분류
 # =========================================================
 def analyze_sentiment(aspect, text):
-    reg = ModelRegistry.get(cfg["phase1_model"], cfg["phase2_model"])
-    tok, model = reg["sent_tokenizer"], reg["sent_model"]
-    device = reg["device"]
-    ctx = text if aspect not in text else text[text.find(aspect) - 20 : text.find(aspect) + 30]
-    inputs = tok(f"[{aspect}] {ctx}", return_tensors="pt", truncation=True, padding=True).to(device)
-    with torch.no_grad():
-        probs = torch.softmax(model(**inputs).logits, dim=-1).cpu().numpy()[0]
-    pos, neg = float(probs[1]), float(probs[0])
-    if abs(pos - neg) < cfg["margin"]:
-        label = "중립"
-    else:
-        label = "긍정" if pos > neg else "부정"
-    return {
-        "aspect": aspect,
-        "POS": pos,
-        "NEG": neg,
-        "label": polarity_correction(text, aspect, label),
-    }
+    reg = _registry()
+    sentiment_inputs = _build_sentiment_inputs([text], [{aspect: 1.0}])
+    return _run_phase2(
+        reg["sent_tokenizer"], reg["sent_model"], reg["device"], sentiment_inputs, 1, verbose=False
+    )[0]
 
 
 # =========================================================
 # 6️⃣ 단일 리뷰 분석
 # =========================================================
-def analyze_review(text):
-    detected = detect_aspects_multi(text)
-    results = [analyze_sentiment(asp, text) for asp in detected.keys()]
-    return {"text": text, "aspects": list(detected.keys()), "results": results}
+def analyze_review(text, threshold: float = 0.35):
+    """
+    배치 엔진과 같은 경로로 단일 리뷰 분석 (결과 캐시 적용)
+    - Phase-1: 리뷰의 모든 문장을 한 번의 forward로
+    - Phase-2: 감지된 모든 측면을 한 번의 forward로
+    """
+    return cached_analyze(
+        "steam",
+        MODEL_SIGNATURE,
+        [text],
+        lambda misses: [_analyze_review_uncached(t, threshold) for t in misses],
+        _cache_variant(threshold, SINGLE_MAX_SENTENCES),
+    )[0]
+
+
+def _analyze_review_uncached(text, threshold):
+    reg = _registry()
+    texts = [text]
+
+    all_sentences = _collect_sentences(texts, SINGLE_MAX_SENTENCES, 5)
+    detected_aspects_per_text = _run_phase1(
+        reg["aspect_tokenizer"], reg["aspect_model"], reg["device"],
+        all_sentences, max(len(all_sentences), 1), threshold, 1, verbose=False,
+    )
+
+    sentiment_inputs = _build_sentiment_inputs(texts, detected_aspects_per_text)
+    sentiment_results = _run_phase2(
+        reg["sent_tokenizer"], reg["sent_model"], reg["device"],
+        sentiment_inputs, max(len(sentiment_inputs), 1), verbose=False,
+    )
+
+    return _merge_results(texts, detected_aspects_per_text, sentiment_inputs, sentiment_results)[0]
 
 
 # =========================================================
@@ -119,36 +146,63 @@ def _collect_sentences(texts, max_sentences_per_review: int, min_length: int):
     return all_sentences
 
 
-def _run_phase1(aspect_tok, aspect_model, device, all_sentences, batch_size, threshold, text_count):
-    detected_aspects_per_text: List[Dict[str, float]] = [{} for _ in range(text_count)]
-    total_batches = (len(all_sentences) + batch_size - 1) // batch_size
-    print(f"[Steam] Phase-1: 총 {len(all_sentences)}개 문장, {total_batches}개 배치 처리 예정")
-
-    for i in range(0, len(all_sentences), batch_size):
-        batch_num = i // batch_size + 1
-        chunk = all_sentences[i : i + batch_size]
-        sentences_batch = [item[1] for item in chunk]
+def _plan(tok, texts, batch_size):
+    return plan_batches(
+        tok,
+        texts,
+        batch_size,
+        bucketing=cfg.get("length_bucketing", True),
+        max_tokens=cfg.get("max_batch_tokens", 4096),
+        max_items=cfg.get("max_batch_items", 64),
+    )
 
-        print(f"[Steam] Phase-1 진행: {batch_num}/{total_batches} 배치 처리 중... ({len(chunk)}개 문장)")
 
-        inputs = aspect_tok(sentences_batch, return_tensors="pt", truncation=True, padding=True).to(device)
+def _run_phase1(aspect_tok, aspect_model, device, all_sentences, batch_size, threshold, text_count, verbose=True):
+    detected_aspects_per_text: List[Dict[str, float]] = [{} for _ in range(text_count)]
+    sentences = [item[1] for item in all_sentences]
+
+    # 문장 캐시에 없는 고유 문장만 모델로 보냄 (boost 적용 전 확률을 캐시)
+    cache = get_sentence_cache(f"{cfg['phase1_model']}|{resolve_backend(cfg)}")
+    probs_by_sentence = cache.get_many(sentences) if cache else {}
+    pending = [s for s in dict.fromkeys(sentences) if s not in probs_by_sentence]
+
+    buckets, stats = _plan(aspect_tok, pending, batch_size)
+    if verbose:
+        print(
+            f"[Steam] Phase-1: 총 {len(all_sentences)}개 문장 중 {len(pending)}개 추론, "
+            f"{len(buckets)}개 배치 처리 예정 (padding {stats['padding_ratio']:.1%})"
+        )
+
+    def infer(batch):
+        inputs = aspect_tok(batch, return_tensors="pt", truncation=True, padding=True).to(device)
         with torch.no_grad():
             logits = aspect_model(**inputs).logits
-            probs = torch.sigmoid(logits).cpu().numpy()
+            return torch.sigmoid(logits).cpu().numpy()
+
+    def on_batch(batch_num, total, size):
+        print(f"[Steam] Phase-1 진행: {batch_num}/{total} 배치 완료 ({size}개 문장)")
 
-        detected_count = 0
-        for (ti, sentence), prob_row in zip(chunk, probs):
-            detected = {ASPECTS[j]: float(prob_row[j]) for j in range(len(ASPECTS))}
-            detected = boost_aspects(sentence, detected)
+    if pending:
+        fresh = dict(zip(pending, run_batches(pending, buckets, infer, on_batch if verbose else None)))
+        if cache:
+            cache.put_many(fresh)
+        probs_by_sentence.update(fresh)
+    probs_all = [probs_by_sentence[s] for s in sentences]
 
-            for asp, prob in detected.items():
-                if prob >= threshold:
-                    prev = detected_aspects_per_text[ti].get(asp, 0)
-                    detected_aspects_per_text[ti][asp] = max(prev, prob)
-                    if prev == 0:
-                        detected_count += 1
+    detected_count = 0
+    for (ti, sentence), prob_row in zip(all_sentences, probs_all):
+        detected = {ASPECTS[j]: float(prob_row[j]) for j in range(len(ASPECTS))}
+        detected = boost_aspects(sentence, detected)
 
-        print(f"[Steam] Phase-1 배치 {batch_num}/{total_batches} 완료: {detected_count}개 측면 감지")
+        for asp, prob in detected.items():
+            if prob >= threshold:
+                prev = detected_aspects_per_text[ti].get(asp, 0)
+                detected_aspects_per_text[ti][asp] = max(prev, prob)
+                if prev == 0:
+                    detected_count += 1
+
+    if verbose:
+        print(f"[Steam] Phase-1 완료: {detected_count}개 측면 감지")
 
     return detected_aspects_per_text
 
@@ -162,45 +216,49 @@ def _build_sentiment_inputs(texts, detected_aspects_per_text):
     return sentiment_inputs
 
 
-def _run_phase2(sent_tok, sent_model, device, sentiment_inputs, batch_size):
+def _run_phase2(sent_tok, sent_model, device, sentiment_inputs, batch_size, verbose=True):
     sentiment_results: List[Dict[str, Any]] = [None] * len(sentiment_inputs)
-    total_batches = (len(sentiment_inputs) + batch_size - 1) // batch_size
-
-    print(f"[Steam] Phase-2: 총 {len(sentiment_inputs)}개 측면-감정 쌍 {total_batches}개 배치 처리 예정")
+    inputs_texts = [f"[{item[1]}] {item[3]}" for item in sentiment_inputs]
+    buckets, stats = _plan(sent_tok, inputs_texts, batch_size)
 
-    for i in range(0, len(sentiment_inputs), batch_size):
-        batch_num = i // batch_size + 1
-        chunk = sentiment_inputs[i : i + batch_size]
-
-        print(f"[Steam] Phase-2 진행: {batch_num}/{total_batches} 배치 처리 중... ({len(chunk)}개 측면-감정 쌍)")
-
-        inputs_texts = [f"[{item[1]}] {item[3]}" for item in chunk]
-        inputs = sent_tok(inputs_texts, return_tensors="pt", truncation=True, padding=True).to(device)
+    if verbose:
+        print(
+            f"[Steam] Phase-2: 총 {len(sentiment_inputs)}개 측면-감정 쌍 {len(buckets)}개 배치 처리 예정 "
+            f"(padding {stats['padding_ratio']:.1%})"
+        )
 
+    def infer(batch):
+        inputs = sent_tok(batch, return_tensors="pt", truncation=True, padding=True).to(device)
         with torch.no_grad():
             logits = sent_model(**inputs).logits
-            probs = torch.softmax(logits, dim=-1).cpu().numpy()
-
-        pos_count = neg_count = neu_count = 0
-        for idx, (ti, aspect, text, _), prob_row in zip(range(i, i + len(chunk)), chunk, probs):
-            pos, neg = float(prob_row[1]), float(prob_row[0])
-            if abs(pos - neg) < cfg["margin"]:
-                label = "중립"
-                neu_count += 1
-            else:
-                label = "긍정" if pos > neg else "부정"
-                pos_count += label == "긍정"
-                neg_count += label == "부정"
-
-            label = polarity_correction(text, aspect, label)
-            sentiment_results[idx] = {
-                "aspect": aspect,
-                "POS": pos,
-                "NEG": neg,
-                "label": label,
-            }
-
-        print(f"[Steam] Phase-2 배치 {batch_num}/{total_batches} 완료: 긍정 {pos_count}, 부정 {neg_count}, 중립 {neu_count}")
+            return torch.softmax(logits, dim=-1).cpu().numpy()
+
+    def on_batch(batch_num, total, size):
+        print(f"[Steam] Phase-2 진행: {batch_num}/{total} 배치 완료 ({size}개 측면-감정 쌍)")
+
+    probs_all = run_batches(inputs_texts, buckets, infer, on_batch if verbose else None)
+
+    pos_count = neg_count = neu_count = 0
+    for idx, ((ti, aspect, text, _), prob_row) in enumerate(zip(sentiment_inputs, probs_all)):
+        pos, neg = float(prob_row[1]), float(prob_row[0])
+        if abs(pos - neg) < cfg["margin"]:
+            label = "중립"
+            neu_count += 1
+        else:
+            label = "긍정" if pos > neg else "부정"
+            pos_count += label == "긍정"
+            neg_count += label == "부정"
+
+        label = polarity_correction(text, aspect, label)
+        sentiment_results[idx] = {
+            "aspect": aspect,
+            "POS": pos,
+            "NEG": neg,
+            "label": label,
+        }
+
+    if verbose:
+        print(f"[Steam] Phase-2 완료: 긍정 {pos_count}, 부정 {neg_count}, 중립 {neu_count}")
 
     return sentiment_results
 
@@ -226,11 +284,22 @@ def _merge_results(texts, detected_aspects_per_text, sentiment_inputs, sentiment
 def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16, threshold: float = 0.35) -> List[Dict[str, Any]]:
     """
     여러 리뷰 텍스트를 Batch로 분석해 Steam 형식으로 반환
+    (결과 캐시에 없는 텍스트만 모델로 분석)
     """
     if not texts:
         return []
 
-    reg = ModelRegistry.get(cfg["phase1_model"], cfg["phase2_model"])
+    return cached_analyze(
+        "steam",
+        MODEL_SIGNATURE,
+        texts,
+        lambda misses: _analyze_reviews_uncached(misses, debug, batch_size, threshold),
+        _cache_variant(threshold, BATCH_MAX_SENTENCES),
+    )
+
+
+def _analyze_reviews_uncached(texts, debug, batch_size, threshold):
+    reg = _registry()
     aspect_tok, aspect_model = reg["aspect_tokenizer"], reg["aspect_model"]
     sent_tok, sent_model = reg["sent_tokenizer"], reg["sent_model"]
     device = reg["device"]
@@ -240,8 +309,7 @@ def analyze_reviews(texts: List[str], debug: bool = False, batch_size: int = 16,
     print(f"[Steam] Phase-1 측면 예측 시작: {len(texts)}개 리뷰")
     start_phase1 = time.monotonic()
 
-    MAX_SENTENCES_PER_REVIEW = 8
-    all_sentences = _collect_sentences(texts, MAX_SENTENCES_PER_REVIEW, 5)
+    all_sentences = _collect_sentences(texts, BATCH_MAX_SENTENCES, 5)
     detected_aspects_per_text = _run_phase1(aspect_tok, aspect_model, device, all_sentences, batch_size, threshold, len(texts))
 
     elapsed_phase1 = (time.monotonic() - start_phase1) * 1000
@@ -0,0 +1,238 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+from dotenv import load_dotenv
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+from transformers import pipeline as hf_pipeline
+from transformers.modeling_outputs import SequenceClassifierOutput
+
+from .result_cache import CACHE_DIR
+
+load_dotenv()
+
+# =========================================================
+# 추론 백엔드 (도메인 config.json의 "backend")
+# - pytorch   : 기존 eager PyTorch FP32
+# - onnx      : ONNX 그래프로 변환 후 onnxruntime(CPU) 실행
+# - onnx-int8 : ONNX 그래프를 동적 INT8 양자화 후 실행
+# - 변환 결과는 ONNX_CACHE_DIR/<모델>-<revision>/ 에 한 번만 만들고 재사용
+# =========================================================
+BACKENDS = ("pytorch", "onnx", "onnx-int8")
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(CACHE_DIR, "onnx"))
+ONNX_OPSET = int(os.getenv("ONNX_OPSET", 14))
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", 0))  # 0: onnxruntime 기본값
+
+_export_lock = threading.Lock()
+
+
+def resolve_backend(cfg: Dict[str, Any]) -> str:
+    backend = cfg.get("backend", "pytorch")
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 backend: {backend} (가능: {', '.join(BACKENDS)})")
+    return backend
+
+
+# =========================================================
+# 변환 (export / quantize) — 디스크 캐시
+# =========================================================
+def _model_dir(model_name: str, config) -> str:
+    revision = (getattr(config, "_commit_hash", None) or "local")[:12]
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+    return os.path.join(ONNX_CACHE_DIR, f"{safe_name}-{revision}")
+
+
+def _atomic_target(path: str) -> str:
+    return f"{path}.{os.getpid()}.tmp"
+
+
+class _LogitsOnly(torch.nn.Module):
+    """ModelOutput 대신 logits 텐서만 반환 (ONNX 출력 이름 고정용)"""
+
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *args):
+        return self.model(**dict(zip(self.input_names, args))).logits
+
+
+def export_onnx(model_name: str, tokenizer, config) -> str:
+    """FP32 ONNX 그래프 경로 (없으면 변환)"""
+    model_dir = _model_dir(model_name, config)
+    path = os.path.join(model_dir, "model.onnx")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(model_dir, exist_ok=True)
+    print(f"[Backend] ONNX 변환 시작: {model_name}")
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer(["샘플 리뷰 문장입니다", "짧은 문장"], return_tensors="pt", padding=True)
+    input_names = [name for name in tokenizer.model_input_names if name in sample]
+
+    tmp = _atomic_target(path)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model, input_names),
+            tuple(sample[name] for name in input_names),
+            tmp,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(tmp, path)
+
+    with open(os.path.join(model_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {"model": model_name, "revision": getattr(config, "_commit_hash", None), "opset": ONNX_OPSET, "inputs": input_names},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"[Backend] ONNX 변환 완료: {path}")
+    return path
+
+
+def quantize_int8(fp32_path: str) -> str:
+    """동적 INT8 양자화 그래프 경로 (없으면 변환)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    path = os.path.join(os.path.dirname(fp32_path), "model.int8.onnx")
+    if os.path.exists(path):
+        return path
+
+    print(f"[Backend] INT8 동적 양자화 시작: {fp32_path}")
+    tmp = _atomic_target(path)
+    quantize_dynamic(fp32_path, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, path)
+    print(f"[Backend] INT8 동적 양자화 완료: {path}")
+    return path
+
+
+def _onnx_path(model_name: str, backend: str, tokenizer, config) -> str:
+    with _export_lock:
+        path = export_onnx(model_name, tokenizer, config)
+        if backend == "onnx-int8":
+            path = quantize_int8(path)
+    return path
+
+
+# =========================================================
+# ONNX 실행 래퍼
+# =========================================================
+class OnnxSequenceClassifier:
+    """
+    AutoModelForSequenceClassification 대용 (model(**inputs).logits 호환)
+    - 입력은 torch 텐서 / numpy 배열 모두 허용, 출력 logits는 CPU torch 텐서
+    """
+
+    def __init__(self, path: str, config):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if ORT_INTRA_OP_THREADS:
+            options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = config
+        self.path = path
+        self.device = torch.device("cpu")
+
+    def run_logits(self, inputs) -> np.ndarray:
+        feed = {}
+        for name in self.input_names:
+            value = inputs[name]
+            if isinstance(value, torch.Tensor):
+                value = value.cpu().numpy()
+            feed[name] = np.asarray(value, dtype=np.int64)
+        return self.session.run(["logits"], feed)[0]
+
+    def __call__(self, **inputs):
+        return SequenceClassifierOutput(logits=torch.from_numpy(self.run_logits(inputs)))
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+
+def _scores(logits: np.ndarray, config) -> np.ndarray:
+    """HF text-classification 파이프라인과 같은 후처리 (multi-label/단일 라벨이면 sigmoid)"""
+    if config.problem_type == "multi_label_classification" or config.num_labels == 1:
+        return 1 / (1 + np.exp(-logits))
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class OnnxTextClassificationPipeline:
+    """
+    cosmetics/electronics가 쓰는 hf_pipeline("text-classification") 호출 방식 호환
+    - absa(text | [texts], truncation, padding, max_length, batch_size, top_k)
+    - .tokenizer / .model 속성 유지 (길이 버킷 계획, 벤치마크에서 사용)
+    """
+
+    def __init__(self, tokenizer, model: OnnxSequenceClassifier):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.id2label = model.config.id2label
+
+    def __call__(self, inputs, truncation=True, padding=True, max_length=None, batch_size=16, top_k=1, **_):
+        single = isinstance(inputs, str)
+        texts: List[str] = [inputs] if single else list(inputs)
+        batch_size = max(int(batch_size or 1), 1)
+
+        outputs = []
+        for i in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[i : i + batch_size],
+                truncation=truncation,
+                padding=padding,
+                max_length=max_length,
+                return_tensors="np",
+            )
+            for row in _scores(self.model.run_logits(encoded), self.model.config):
+                ranked = sorted(
+                    ({"label": self.id2label[j], "score": float(s)} for j, s in enumerate(row)),
+                    key=lambda x: x["score"],
+                    reverse=True,
+                )
+                outputs.append(ranked if top_k is None else ranked[:top_k])
+
+        return outputs[0] if single else outputs
+
+
+# =========================================================
+# 로더
+# =========================================================
+def load_sequence_classifier(model_name: str, backend: str = "pytorch", device: str = "cpu"):
+    """(tokenizer, model) — ModelRegistry용"""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == "pytorch":
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).to(device).eval()
+        return tokenizer, model
+
+    config = AutoConfig.from_pretrained(model_name)
+    return tokenizer, OnnxSequenceClassifier(_onnx_path(model_name, backend, tokenizer, config), config)
+
+
+def load_text_classification_pipeline(model_name: str, backend: str = "pytorch", device: int = -1):
+    """hf_pipeline("text-classification") 또는 같은 호출 방식의 ONNX 파이프라인"""
+    if backend == "pytorch":
+        return hf_pipeline(task="text-classification", model=model_name, tokenizer=model_name, device=device)
+
+    tokenizer, model = load_sequence_classifier(model_name, backend)
+    return OnnxTextClassificationPipeline(tokenizer, model)
+
+
+def backend_device(backend: str, cuda_device, cpu_device):
+    """onnxruntime 백엔드는 CPU 전용 (CPUExecutionProvider)"""
+    if backend != "pytorch":
+        return cpu_device
+    return cuda_device if torch.cuda.is_available() else cpu_device
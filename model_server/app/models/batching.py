@@ -0,0 +1,108 @@
+from typing import Any, Callable, List, Optional, Sequence
+
+DEFAULT_MAX_TOKENS = 4096
+DEFAULT_MAX_ITEMS = 64
+
+
+# =========================================================
+# 길이 기반 동적 배치 (Length-bucketed dynamic batching)
+# =========================================================
+def measure_lengths(tokenizer, texts: Sequence[str], max_length: Optional[int] = None) -> List[int]:
+    """
+    토크나이저 기준 입력별 토큰 길이 (special token 포함, truncation 적용)
+    """
+    if not texts:
+        return []
+    kwargs = {"truncation": True, "add_special_tokens": True}
+    if max_length:
+        kwargs["max_length"] = max_length
+    encoded = tokenizer(list(texts), **kwargs)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def make_buckets(lengths: Sequence[int], max_tokens: int = DEFAULT_MAX_TOKENS, max_items: int = DEFAULT_MAX_ITEMS) -> List[List[int]]:
+    """
+    입력 인덱스를 길이 내림차순으로 정렬한 뒤 토큰 예산 단위로 묶음
+    - 배치 비용 = 배치 내 최장 길이 × 아이템 수 (패딩 포함)
+    - 비용이 max_tokens를 넘거나 아이템 수가 max_items에 도달하면 새 배치 시작
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+
+    for idx in order:
+        length = max(int(lengths[idx]), 1)
+        longest = max(current_max, length)
+        if current and (len(current) >= max_items or longest * (len(current) + 1) > max_tokens):
+            buckets.append(current)
+            current, longest = [], length
+        current.append(idx)
+        current_max = longest
+
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def make_fixed_batches(count: int, batch_size: int) -> List[List[int]]:
+    """입력 순서 그대로 batch_size개씩 자르는 기존 방식 (비교/비활성화용)"""
+    return [list(range(i, min(i + batch_size, count))) for i in range(0, count, batch_size)]
+
+
+def padding_stats(lengths: Sequence[int], buckets: Sequence[Sequence[int]]) -> dict:
+    """실제 토큰 수와 패딩 포함 토큰 수 (로그/벤치마크용)"""
+    real = sum(lengths)
+    padded = sum(max(lengths[i] for i in bucket) * len(bucket) for bucket in buckets if bucket)
+    return {
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "padding_ratio": round(1 - real / padded, 4) if padded else 0.0,
+    }
+
+
+def run_batches(
+    inputs: Sequence[Any],
+    buckets: Sequence[Sequence[int]],
+    infer_fn: Callable[[List[Any]], Sequence[Any]],
+    on_batch: Optional[Callable[[int, int, int], None]] = None,
+) -> List[Any]:
+    """
+    배치별로 infer_fn을 실행하고 결과를 원래 입력 위치로 되돌려 반환
+    - infer_fn: 배치 입력 리스트 → 같은 길이의 결과 시퀀스
+    - on_batch: (배치 번호, 전체 배치 수, 배치 크기) 진행 콜백
+    """
+    outputs: List[Any] = [None] * len(inputs)
+    total = len(buckets)
+    for batch_num, bucket in enumerate(buckets, 1):
+        preds = infer_fn([inputs[i] for i in bucket])
+        for idx, pred in zip(bucket, preds):
+            outputs[idx] = pred
+        if on_batch:
+            on_batch(batch_num, total, len(bucket))
+    return outputs
+
+
+def plan_batches(
+    tokenizer,
+    texts: Sequence[str],
+    batch_size: int,
+    bucketing: bool = True,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_length: Optional[int] = None,
+):
+    """
+    도메인 파이프라인 공용 진입점
+    Returns: (buckets, stats)
+    - bucketing=True  : 길이 정렬 + 토큰 예산 배치, 배치당 아이템 수는 min(batch_size, max_items)
+    - bucketing=False : 입력 순서 고정 크기 배치 (기존 동작)
+    batch_size는 호출자가 정한 배치당 최대 입력 수이므로 두 방식 모두에서 지켜짐 (0/None이면 max_items)
+    """
+    batch_size = batch_size or max_items
+    lengths = measure_lengths(tokenizer, texts, max_length)
+    if bucketing:
+        buckets = make_buckets(lengths, max_tokens, min(batch_size, max_items))
+    else:
+        buckets = make_fixed_batches(len(texts), batch_size)
+    return buckets, padding_stats(lengths, buckets)
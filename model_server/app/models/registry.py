@@ -1,33 +1,36 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import json, os
+from .backends import backend_device, load_sequence_classifier
 
 class ModelRegistry:
     """
     ✅ 모델 캐시 관리 클래스
     - 모델을 한 번만 로드하고 전역적으로 재사용
     - 도메인별 Phase1/Phase2 모델 캐시
+    - backend: pytorch / onnx / onnx-int8 (app/models/backends.py)
     """
     _cache = {}
 
-    @classmethod
-    def get(cls, phase1_model_name, phase2_model_name):
+    @staticmethod
+    def _key(phase1_model_name, phase2_model_name, backend):
         key = f"{phase1_model_name}|{phase2_model_name}"
+        return key if backend == "pytorch" else f"{key}|{backend}"
+
+    @classmethod
+    def get(cls, phase1_model_name, phase2_model_name, backend="pytorch"):
+        key = cls._key(phase1_model_name, phase2_model_name, backend)
 
         if key not in cls._cache:
             print(f"📦 Loading models for: {key}")
-            device = "cuda" if torch.cuda.is_available() else "cpu"
+            device = backend_device(backend, "cuda", "cpu")
 
             # Phase1: Aspect Classifier
-            aspect_tokenizer = AutoTokenizer.from_pretrained(phase1_model_name)
-            aspect_model = AutoModelForSequenceClassification.from_pretrained(phase1_model_name).to(device).eval()
+            aspect_tokenizer, aspect_model = load_sequence_classifier(phase1_model_name, backend, device)
 
             # Phase2: Sentiment Classifier
-            sent_tokenizer = AutoTokenizer.from_pretrained(phase2_model_name)
-            sent_model = AutoModelForSequenceClassification.from_pretrained(phase2_model_name).to(device).eval()
+            sent_tokenizer, sent_model = load_sequence_classifier(phase2_model_name, backend, device)
 
             cls._cache[key] = {
                 "device": device,
+                "backend": backend,
                 "aspect_tokenizer": aspect_tokenizer,
                 "aspect_model": aspect_model,
                 "sent_tokenizer": sent_tokenizer,
@@ -35,3 +38,12 @@ class ModelRegistry:
             }
 
         return cls._cache[key]
+
+    @classmethod
+    def register(cls, phase1_model_name, phase2_model_name, bundle, backend="pytorch"):
+        """
+        이미 준비된 모델 번들을 캐시에 등록 (벤치마크용 대체 모델 주입 등)
+        bundle: get()이 반환하는 것과 같은 키 구성
+        """
+        cls._cache[cls._key(phase1_model_name, phase2_model_name, backend)] = bundle
+        return bundle
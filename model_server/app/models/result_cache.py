@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# 추론 결과 캐시 (도메인 + 모델 시그니처 + 정규화 텍스트 해시)
+# - 1차: 메모리 LRU (RESULT_CACHE_MEMORY_ITEMS)
+# - 2차: SQLite 파일 (서버 재시작 후에도 유지)
+# - config.json의 모델이 바뀌면 시그니처가 달라져 자동으로 무효화
+#   · 행 수 상한(RESULT_CACHE_MAX_ROWS)을 넘으면 가장 오래 안 쓴 행부터 제거 (조회될 때마다 accessed_at 갱신)
+#     → 더 이상 조회되지 않는 이전 시그니처 행이 먼저 빠지고, 자주 쓰는 현재 시그니처 행은 남음
+#   · 같은 도메인에 시그니처가 여러 개 동시에 쓰여도(파라미터별 등) 서로의 결과를 지우지 않음
+# - threshold 등 결과에 영향을 주는 파라미터는 variant로 키에만 포함
+# =========================================================
+_MODEL_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(_MODEL_SERVER_DIR, "cache"))
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+RESULT_CACHE_MEMORY_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", 50000))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", os.path.join(CACHE_DIR, "results.sqlite3"))
+RESULT_CACHE_MAX_ROWS = int(os.getenv("RESULT_CACHE_MAX_ROWS", 1000000))   # SQLite 행 수 상한 (0이면 무제한)
+
+_WS_RE = re.compile(r"[ \t\u00a0\u3000]+")
+_SQL_CHUNK = 500
+_TOUCH_BATCH = 500   # 적중한 키의 accessed_at을 모아서 갱신하는 단위
+
+
+def normalize_text(text: str) -> str:
+    """NFC 정규화 + 앞뒤 공백 제거 + 연속 공백 축약 (줄바꿈은 문장 분리에 쓰이므로 유지)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return _WS_RE.sub(" ", text.strip())
+
+
+def model_signature(**parts: Any) -> str:
+    """모델 id(및 라벨 구성)나 분석 파라미터로 짧은 시그니처 생성"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_key(domain: str, signature: str, variant: str, normalized: str) -> str:
+    raw = f"{domain}\x1f{signature}\x1f{variant}\x1f{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self, path: str = RESULT_CACHE_PATH, memory_items: int = RESULT_CACHE_MEMORY_ITEMS, max_rows: int = RESULT_CACHE_MAX_ROWS
+    ):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._touched = set()   # accessed_at 갱신을 기다리는 적중 키 (메모리/디스크)
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evicted": 0}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key         TEXT PRIMARY KEY,
+                domain      TEXT NOT NULL,
+                model_sig   TEXT NOT NULL,
+                result      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(results)")}
+        if "accessed_at" not in columns:   # accessed_at 이전에 만든 캐시 파일
+            self._db.execute("ALTER TABLE results ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._db.execute("UPDATE results SET accessed_at = created_at")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_domain_sig ON results (domain, model_sig)")
+        self._db.execute("DROP INDEX IF EXISTS idx_results_created")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+        self._disk_rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    # -----------------------------------------------------
+    # 제거 (행 수 상한)
+    # -----------------------------------------------------
+    def _flush_touched(self):
+        """적중한 키의 accessed_at 갱신 (조회마다 쓰지 않고 모아서)"""
+        if not self._touched:
+            return
+        keys, self._touched = list(self._touched), set()
+        now = time.time()
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i : i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            self._db.execute(f"UPDATE results SET accessed_at = ? WHERE key IN ({placeholders})", [now, *chunk])
+
+    def _evict(self):
+        """행 수가 상한을 넘으면 가장 오래 안 쓴 행부터 10% 여유를 두고 삭제 (이전 시그니처 행이 먼저 빠짐)"""
+        if not self.max_rows or self._disk_rows <= self.max_rows:
+            return
+        self._flush_touched()
+        excess = self._disk_rows - self.max_rows + self.max_rows // 10
+        cur = self._db.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed_at LIMIT ?)", (excess,)
+        )
+        self._counters["evicted"] += cur.rowcount
+        self._disk_rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        print(f"[ResultCache] 행 수 상한({self.max_rows}) 초과: 오래 안 쓴 결과 {cur.rowcount}건 삭제")
+
+    # -----------------------------------------------------
+    # 조회 / 저장
+    # -----------------------------------------------------
+    def _remember(self, key: str, payload: str):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        missing = []
+        for key in keys:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                found[key] = payload
+                self._touched.add(key)
+            else:
+                missing.append(key)
+        self._counters["memory_hits"] += len(found)
+
+        for i in range(0, len(missing), _SQL_CHUNK):
+            chunk = missing[i : i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT key, result FROM results WHERE key IN ({placeholders})", chunk).fetchall()
+            for key, payload in rows:
+                found[key] = payload
+                self._remember(key, payload)
+                self._touched.add(key)
+                self._counters["disk_hits"] += 1
+        if len(self._touched) >= _TOUCH_BATCH:
+            self._flush_touched()
+        return found
+
+    def _store(self, domain: str, signature: str, items: Dict[str, str]):
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO results (key, domain, model_sig, result, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, domain, signature, payload, now, now) for key, payload in items.items()],
+        )
+        for key, payload in items.items():
+            self._remember(key, payload)
+        self._disk_rows += len(items)   # 교체된 행도 더하므로 실제보다 클 수 있음 (_evict에서 다시 셈)
+        self._evict()
+
+    # -----------------------------------------------------
+    # 공개 API
+    # -----------------------------------------------------
+    def analyze(
+        self,
+        domain: str,
+        signature: str,
+        texts: List[str],
+        analyze_fn: Callable[[List[str]], List[Dict[str, Any]]],
+        variant: str = "",
+    ) -> List[Dict[str, Any]]:
+        """
+        캐시에 있는 텍스트는 저장된 결과를, 없는 텍스트만 analyze_fn으로 분석
+        (같은 요청 안의 중복 텍스트도 한 번만 분석), 결과는 입력 순서대로 반환
+        """
+        if not texts:
+            return []
+
+        keys = [_cache_key(domain, signature, variant, normalize_text(t)) for t in texts]
+        with self._lock:
+            found = self._lookup(list(dict.fromkeys(keys)))
+
+        miss_texts: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in miss_texts:
+                miss_texts[key] = text
+
+        if miss_texts:
+            miss_keys = list(miss_texts)
+            results = analyze_fn([miss_texts[k] for k in miss_keys])
+            fresh = {k: json.dumps(r, ensure_ascii=False) for k, r in zip(miss_keys, results)}
+            with self._lock:
+                self._counters["misses"] += len(fresh)
+                self._store(domain, signature, fresh)
+            found.update(fresh)
+
+        outputs = []
+        for key, text in zip(keys, texts):
+            result = json.loads(found[key])
+            result["text"] = text
+            outputs.append(result)
+        return outputs
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+            disk_items = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            "enabled": RESULT_CACHE_ENABLED,
+            **counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "memory_capacity": self.memory_items,
+            "disk_items": disk_items,
+            "disk_capacity": self.max_rows,
+            "path": self.path,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._db.close()
+
+
+# =========================================================
+# 전역 캐시 (최초 사용 시 생성)
+# =========================================================
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _result_cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
+
+
+def cached_analyze(domain: str, signature: str, texts: List[str], analyze_fn, variant: str = ""):
+    """캐시가 꺼져 있으면 analyze_fn을 그대로 호출"""
+    cache = get_result_cache()
+    if cache is None:
+        return analyze_fn(texts)
+    return cache.analyze(domain, signature, texts, analyze_fn, variant)
+
+
+def result_cache_stats() -> Dict[str, Any]:
+    cache = get_result_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+def close_result_cache():
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is not None:
+            _result_cache.close()
+            _result_cache = None
@@ -0,0 +1,244 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.executors import submit_inference
+
+# =========================================================
+# 요청 간 마이크로 배치 스케줄러 (도메인별)
+# - 동시 요청의 텍스트를 큐에 모아 모델 크기 배치로 합쳐 한 번에 추론
+# - 첫 요청 도착 후 max_wait_ms 안에 모인 요청까지 합침 (지연 상한)
+# - 결과는 요청별로 잘라서 각 호출자에게 반환
+# - 추론은 inference 실행기에서 실행 (스트리밍 분석 등 다른 모델 호출과 같은 줄에서 직렬화)
+# =========================================================
+DEFAULT_MAX_BATCH_REVIEWS = int(os.getenv("SCHEDULER_MAX_BATCH_REVIEWS", 128))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("SCHEDULER_MAX_WAIT_MS", 20))
+# 도메인 설정(max_batch_items)이 없을 때 파이프라인에 전달할 batch_size
+# → 합친 배치 안에서는 도메인 토큰 예산(max_batch_tokens)과 max_batch_items가 모델 배치를 결정
+DEFAULT_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", 64))
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class InferenceScheduler:
+    """
+    단일 워커 스레드가 요청을 모아 analyze_fn(texts, debug=False, batch_size=...)를 inference 실행기에 제출
+    여러 요청을 합친 리스트로 호출하고 결과를 원래 요청 단위로 분배
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        analyze_fn: Callable[..., List[Dict[str, Any]]],
+        max_batch_reviews: int = DEFAULT_MAX_BATCH_REVIEWS,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.domain = domain
+        self.analyze_fn = analyze_fn
+        self.max_batch_reviews = max_batch_reviews
+        self.max_wait = max_wait_ms / 1000
+        self.batch_size = batch_size
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._carry: Optional[_Request] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pending_reviews = 0
+        self._stats = {
+            "batches": 0,
+            "requests": 0,
+            "reviews": 0,
+            "last_batch_reviews": 0,
+            "max_batch_reviews_seen": 0,
+            "total_wait_ms": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._worker, name=f"scheduler-{domain}", daemon=True)
+        self._thread.start()
+
+    # -----------------------------------------------------
+    # 호출자 API
+    # -----------------------------------------------------
+    def submit(self, texts: List[str]) -> Future:
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        with self._lock:
+            if self._closed:
+                request.future.set_exception(RuntimeError(f"{self.domain} 스케줄러가 종료되었습니다"))
+                return request.future
+            self._pending_reviews += len(request.texts)
+            self._queue.put(request)
+        return request.future
+
+    def analyze(self, texts: List[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.submit(texts).result(timeout=timeout)
+
+    def shutdown(self):
+        """종료 신호 전에 들어온 요청까지 처리하고 워커 종료 (남은 요청은 예외로 완료)"""
+        with self._lock:
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            pending = self._pending_reviews
+        batches = s["batches"]
+        return {
+            "domain": self.domain,
+            "queue_depth": self._queue.qsize() + (1 if self._carry else 0),
+            "queued_reviews": pending,
+            "batches": batches,
+            "requests": s["requests"],
+            "reviews": s["reviews"],
+            "avg_batch_reviews": round(s["reviews"] / batches, 2) if batches else 0.0,
+            "avg_requests_per_batch": round(s["requests"] / batches, 2) if batches else 0.0,
+            "last_batch_reviews": s["last_batch_reviews"],
+            "max_batch_reviews_seen": s["max_batch_reviews_seen"],
+            "avg_wait_ms": round(s["total_wait_ms"] / s["requests"], 2) if s["requests"] else 0.0,
+            "max_batch_reviews": self.max_batch_reviews,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_size": self.batch_size,
+        }
+
+    # -----------------------------------------------------
+    # 워커
+    # -----------------------------------------------------
+    def _next_request(self, timeout: Optional[float]):
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        if timeout is None:
+            return self._queue.get()
+        if timeout <= 0:
+            return self._queue.get_nowait()
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self):
+        """첫 요청 + 마감 시간 안에 도착한 요청들을 max_batch_reviews까지 합침"""
+        first = self._next_request(None)
+        if first is None:
+            return None, True
+
+        batch = [first]
+        count = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+
+        while count < self.max_batch_reviews:
+            # 마감이 지났으면 이미 큐에 쌓인 요청만 추가로 합침
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._next_request(remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            if count + len(request.texts) > self.max_batch_reviews:
+                # 초과분은 다음 배치의 첫 요청으로
+                self._carry = request
+                break
+            batch.append(request)
+            count += len(request.texts)
+
+        return batch, False
+
+    def _run(self, batch: List[_Request]):
+        texts = [t for request in batch for t in request.texts]
+        started = time.monotonic()
+        try:
+            results = submit_inference(self.analyze_fn, texts, debug=False, batch_size=self.batch_size).result()
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+        else:
+            offset = 0
+            for request in batch:
+                n = len(request.texts)
+                request.future.set_result(results[offset : offset + n])
+                offset += n
+        finally:
+            with self._lock:
+                self._pending_reviews -= len(texts)
+                self._stats["batches"] += 1
+                self._stats["requests"] += len(batch)
+                self._stats["reviews"] += len(texts)
+                self._stats["last_batch_reviews"] = len(texts)
+                self._stats["max_batch_reviews_seen"] = max(self._stats["max_batch_reviews_seen"], len(texts))
+                self._stats["total_wait_ms"] += sum((started - r.enqueued_at) * 1000 for r in batch)
+
+        print(f"[Scheduler:{self.domain}] 배치 실행: requests={len(batch)}, reviews={len(texts)}")
+
+    def _fail_pending(self):
+        """종료 후 남은 요청(다음 배치로 넘긴 요청 + 큐)을 예외로 완료 → 호출자가 무한 대기하지 않음"""
+        pending = [self._carry] if self._carry is not None else []
+        self._carry = None
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                pending.append(request)
+        error = RuntimeError(f"{self.domain} 스케줄러가 종료되었습니다")
+        for request in pending:
+            request.future.set_exception(error)
+        with self._lock:
+            self._pending_reviews -= sum(len(r.texts) for r in pending)
+        if pending:
+            print(f"[Scheduler:{self.domain}] 종료: 처리하지 못한 요청 {len(pending)}개 실패 처리")
+
+    def _worker(self):
+        stop = False
+        try:
+            while not stop:
+                batch, stop = self._collect()
+                if batch:
+                    self._run(batch)
+        finally:
+            self._fail_pending()
+
+
+# =========================================================
+# 도메인별 스케줄러 레지스트리
+# =========================================================
+_schedulers: Dict[str, InferenceScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(
+    domain: str, analyze_fn: Callable[..., List[Dict[str, Any]]], batch_size: Optional[int] = None
+) -> InferenceScheduler:
+    """batch_size: 도메인 config.json의 max_batch_items (없으면 SCHEDULER_BATCH_SIZE)"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(domain)
+        if scheduler is None:
+            scheduler = InferenceScheduler(domain, analyze_fn, batch_size=batch_size or DEFAULT_BATCH_SIZE)
+            _schedulers[domain] = scheduler
+        return scheduler
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    with _schedulers_lock:
+        return {domain: s.stats() for domain, s in _schedulers.items()}
+
+
+def shutdown_schedulers():
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+        _schedulers.clear()
+    for scheduler in schedulers:
+        scheduler.shutdown()
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# 문장 단위 Phase-1 캐시 (문장 → sigmoid 확률 벡터, boost 적용 전)
+# - "재밌어요", "최적화 엉망" 같은 짧은 문장은 리뷰/제품을 넘나들며 반복됨
+# - 메모리 예산(SENTENCE_CACHE_MAX_MB) 기준 LRU 제거, 0이면 비활성화
+# =========================================================
+SENTENCE_CACHE_MAX_MB = float(os.getenv("SENTENCE_CACHE_MAX_MB", 64))
+
+# OrderedDict 노드 + 키/값 참조 등 엔트리당 대략적인 고정 비용
+_ENTRY_OVERHEAD = 120
+
+
+class SentenceProbCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _entry_size(sentence: str, probs: np.ndarray) -> int:
+        return sys.getsizeof(sentence) + probs.nbytes + _ENTRY_OVERHEAD
+
+    def get_many(self, sentences: Iterable[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for sentence in sentences:
+                if sentence in found:
+                    continue
+                probs = self._entries.get(sentence)
+                if probs is None:
+                    self._counters["misses"] += 1
+                    continue
+                self._entries.move_to_end(sentence)
+                found[sentence] = probs
+                self._counters["hits"] += 1
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for sentence, probs in items.items():
+                # 배치 배열의 view를 그대로 두면 배치 전체가 메모리에 남으므로 복사
+                probs = np.array(probs, dtype=np.float32, copy=True)
+                old = self._entries.pop(sentence, None)
+                if old is not None:
+                    self._bytes -= self._entry_size(sentence, old)
+                self._entries[sentence] = probs
+                self._bytes += self._entry_size(sentence, probs)
+
+            while self._bytes > self.max_bytes and self._entries:
+                sentence, probs = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(sentence, probs)
+                self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            items, used = len(self._entries), self._bytes
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "items": items,
+            "bytes": used,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# =========================================================
+# 모델별 캐시 레지스트리 (Phase-1 모델 이름 기준)
+# =========================================================
+_caches: Dict[str, SentenceProbCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_sentence_cache(model_name: str):
+    """모델별 문장 캐시 (SENTENCE_CACHE_MAX_MB=0이면 None)"""
+    if SENTENCE_CACHE_MAX_MB <= 0:
+        return None
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            cache = SentenceProbCache(int(SENTENCE_CACHE_MAX_MB * 1024 * 1024))
+            _caches[model_name] = cache
+        return cache
+
+
+def sentence_cache_stats() -> Dict[str, Dict[str, object]]:
+    with _caches_lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def reset_sentence_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
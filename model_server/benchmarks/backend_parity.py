@@ -0,0 +1,140 @@
+"""
+추론 백엔드 정합성/속도 비교 (PyTorch FP32 기준)
+
+사용법 (model_server 디렉토리에서):
+    python -m benchmarks.backend_parity --domain steam --backend onnx-int8
+    python -m benchmarks.backend_parity --domain electronics --backend onnx --reviews 256
+    python -m benchmarks.backend_parity --domain cosmetics --backend onnx-int8 --input reviews.txt
+
+- config.json의 실제 모델 사용 (HF Hub 접근 필요, ONNX 변환은 최초 1회 cache/onnx에 저장)
+- 같은 리뷰를 pytorch / 후보 backend로 analyze_reviews 실행 후 비교
+  - aspect 일치율: 리뷰별 감지된 aspect 집합이 같은 비율
+  - label 일치율: (리뷰, aspect) 쌍 합집합 중 양쪽 label이 같은 비율
+  - 점수 차이: 공통 쌍의 POS/NEG 절대 오차 (평균/최대)
+  - speedup: pytorch 시간 / 후보 backend 시간
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+# 캐시가 두 backend 사이에서 결과를 공유하지 않도록 비활성화
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("SENTENCE_CACHE_MAX_MB", "0")
+
+from app.models.backends import BACKENDS
+from .bucketing import _domain_module
+from .corpus import make_reviews
+
+
+def _load_reviews(args):
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            reviews = [line.strip() for line in f if line.strip()]
+        return reviews[: args.reviews] if args.reviews else reviews
+    return make_reviews(args.domain, args.reviews or 256, args.mix, args.seed)
+
+
+def run_backend(module, backend, reviews, batch_size, repeats):
+    module.cfg["backend"] = backend
+    if hasattr(module, "_pipeline_cache"):
+        module._pipeline_cache = None  # cosmetics/electronics 싱글톤 재로드
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        module.analyze_reviews(reviews[:8], debug=False, batch_size=batch_size)  # 로드/변환 + 워밍업
+        load_s = time.perf_counter() - t0
+
+        timings, outputs = [], None
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            outputs = module.analyze_reviews(reviews, debug=False, batch_size=batch_size)
+            timings.append(time.perf_counter() - t0)
+
+    elapsed = min(timings)
+    return outputs, {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "elapsed_s": round(elapsed, 4),
+        "reviews_per_sec": round(len(reviews) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def compare(baseline, candidate):
+    aspect_match = 0
+    pairs = label_match = 0
+    diffs = []
+
+    for base, cand in zip(baseline, candidate):
+        aspect_match += set(base["aspects"]) == set(cand["aspects"])
+        base_map = {r["aspect"]: r for r in base["results"]}
+        cand_map = {r["aspect"]: r for r in cand["results"]}
+
+        for aspect in set(base_map) | set(cand_map):
+            pairs += 1
+            b, c = base_map.get(aspect), cand_map.get(aspect)
+            if b is None or c is None:
+                continue
+            label_match += b["label"] == c["label"]
+            diffs.extend([abs(b["POS"] - c["POS"]), abs(b["NEG"] - c["NEG"])])
+
+    reviews = len(baseline)
+    return {
+        "aspect_agreement": round(aspect_match / reviews, 4) if reviews else 1.0,
+        "label_agreement": round(label_match / pairs, 4) if pairs else 1.0,
+        "pairs": pairs,
+        "score_mean_abs_diff": round(sum(diffs) / len(diffs), 5) if diffs else 0.0,
+        "score_max_abs_diff": round(max(diffs), 5) if diffs else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="inference backend parity / speed check")
+    parser.add_argument("--domain", default="steam", choices=["steam", "cosmetics", "electronics"])
+    parser.add_argument("--backend", default="onnx-int8", choices=[b for b in BACKENDS if b != "pytorch"])
+    parser.add_argument("--reviews", type=int, default=0, help="리뷰 수 (합성 기본 256, 파일은 전체)")
+    parser.add_argument("--mix", default="mixed", choices=["short", "mixed", "long"])
+    parser.add_argument("--input", default=None, help="한 줄에 리뷰 하나인 샘플 코퍼스 파일")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    module = _domain_module(args.domain)
+    reviews = _load_reviews(args)
+    original = module.cfg.get("backend", "pytorch")
+
+    try:
+        base_out, base_row = run_backend(module, "pytorch", reviews, args.batch_size, args.repeats)
+        cand_out, cand_row = run_backend(module, args.backend, reviews, args.batch_size, args.repeats)
+    finally:
+        module.cfg["backend"] = original
+
+    report = {
+        "domain": args.domain,
+        "reviews": len(reviews),
+        "source": args.input or f"synthetic:{args.mix}",
+        "baseline": base_row,
+        "candidate": cand_row,
+        "speedup": round(base_row["elapsed_s"] / cand_row["elapsed_s"], 2) if cand_row["elapsed_s"] else None,
+        **compare(base_out, cand_out),
+    }
+
+    for row in (base_row, cand_row):
+        print(f"[parity] {row['backend']:10s} | {row['reviews_per_sec']:>8.2f} reviews/s | load {row['load_s']}s")
+    print(
+        f"[parity] speedup x{report['speedup']} | aspect agreement {report['aspect_agreement']:.1%} | "
+        f"label agreement {report['label_agreement']:.1%} | score diff mean {report['score_mean_abs_diff']} "
+        f"/ max {report['score_max_abs_diff']}"
+    )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+길이 기반 동적 배치 before/after 벤치마크
+
+사용법 (model_server 디렉토리에서):
+    python -m benchmarks.bucketing --domain steam --reviews 512
+    python -m benchmarks.bucketing --domain cosmetics --reviews 128 --real
+
+- 기본은 랜덤 초기화된 대체 모델 (오프라인 실행 가능)
+- --real: config.json의 실제 모델 로드 (HF Hub 접근 필요)
+- 결과: 고정 크기 배치(before) vs 길이 버킷 배치(after)의 tokens/sec, 패딩 비율
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+# 반복 실행이 결과/문장 캐시에 적중하지 않도록 비활성화
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("SENTENCE_CACHE_MAX_MB", "0")
+
+from .corpus import make_reviews
+from .standins import INSTALLERS, ForwardCounter
+
+
+def _domain_module(domain):
+    if domain == "steam":
+        from app.domains.steam import pipeline
+    elif domain == "cosmetics":
+        from app.domains.cosmetics import pipeline
+    elif domain == "electronics":
+        from app.domains.electronics import pipeline
+    else:
+        raise ValueError(f"지원하지 않는 도메인: {domain}")
+    return pipeline
+
+
+def _real_models(domain, module):
+    if domain == "steam":
+        reg = module._registry()
+        return [reg["aspect_model"], reg["sent_model"]]
+    return [module.get_absa_pipeline().model]
+
+
+def run_mode(module, reviews, batch_size, bucketing, counter, repeats):
+    module.cfg["length_bucketing"] = bucketing
+    timings = []
+    for _ in range(repeats):
+        counter.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            module.analyze_reviews(reviews, debug=False, batch_size=batch_size)
+            timings.append(time.perf_counter() - t0)
+
+    elapsed = min(timings)
+    return {
+        "mode": "bucketed" if bucketing else "fixed",
+        "elapsed_s": round(elapsed, 4),
+        "forward_passes": counter.forward_passes,
+        "real_tokens": counter.real_tokens,
+        "padded_tokens": counter.padded_tokens,
+        "padding_ratio": round(1 - counter.real_tokens / counter.padded_tokens, 4) if counter.padded_tokens else 0.0,
+        "tokens_per_sec": round(counter.real_tokens / elapsed, 1) if elapsed else 0.0,
+        "reviews_per_sec": round(len(reviews) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="length bucketing before/after benchmark")
+    parser.add_argument("--domain", default="steam", choices=sorted(INSTALLERS))
+    parser.add_argument("--reviews", type=int, default=512)
+    parser.add_argument("--mix", default="mixed", choices=["short", "mixed", "long"])
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--real", action="store_true", help="실제 HF 모델 사용")
+    parser.add_argument("--out", default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    module = _domain_module(args.domain)
+    models = _real_models(args.domain, module) if args.real else INSTALLERS[args.domain](args.seed)
+    counter = ForwardCounter(models)
+    reviews = make_reviews(args.domain, args.reviews, args.mix, args.seed)
+    original = module.cfg.get("length_bucketing", True)
+
+    try:
+        # 워밍업 (토크나이저/커널 초기화 비용 제외)
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.analyze_reviews(reviews[:8], debug=False, batch_size=args.batch_size)
+
+        before = run_mode(module, reviews, args.batch_size, False, counter, args.repeats)
+        after = run_mode(module, reviews, args.batch_size, True, counter, args.repeats)
+    finally:
+        module.cfg["length_bucketing"] = original
+        counter.close()
+
+    report = {
+        "domain": args.domain,
+        "reviews": args.reviews,
+        "mix": args.mix,
+        "batch_size": args.batch_size,
+        "max_batch_tokens": module.cfg.get("max_batch_tokens"),
+        "models": "real" if args.real else "standin",
+        "before": before,
+        "after": after,
+        "speedup": round(before["elapsed_s"] / after["elapsed_s"], 2) if after["elapsed_s"] else None,
+    }
+
+    for row in (before, after):
+        print(
+            f"[bench] {row['mode']:8s} | {row['tokens_per_sec']:>10.1f} tok/s | "
+            f"{row['reviews_per_sec']:>8.2f} reviews/s | passes={row['forward_passes']} | "
+            f"padding={row['padding_ratio']:.1%}"
+        )
+    print(f"[bench] speedup: x{report['speedup']}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
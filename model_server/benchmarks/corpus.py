@@ -0,0 +1,82 @@
+import random
+from typing import List
+
+# =========================================================
+# 벤치마크용 한국어 리뷰 합성 코퍼스
+# - 짧은 리뷰("추천", "재밌어요")부터 수십 문장짜리 장문까지 길이 분포를 섞음
+# - seed 고정으로 커밋 간 동일한 입력 보장
+# =========================================================
+STEAM_PHRASES = [
+    "재밌어요", "추천합니다", "최적화 엉망", "가격 대비 괜찮음", "스토리가 정말 좋았어요",
+    "그래픽은 예쁜데 프레임이 자주 떨어집니다", "밸런스 패치가 시급합니다",
+    "친구랑 같이 하면 시간 가는 줄 모르고 빠져서 하게 됩니다",
+    "로딩이 너무 길고 가끔 튕김 현상이 있어서 불편했어요",
+    "세일할 때 샀는데 가성비 최고입니다",
+    "초반 전개는 느리지만 후반부 서사가 몰입도 있게 흘러갑니다",
+    "난이도 조절이 잘 안 돼서 중반 이후로는 불균형이 심하게 느껴졌어요",
+    "UI 디자인이 직관적이라 처음 해도 금방 적응할 수 있었습니다",
+    "버그가 너무 많아서 진행이 막히는 구간이 있습니다",
+]
+
+COSMETICS_PHRASES = [
+    "좋아요", "가성비 최고", "촉촉해요", "향이 너무 좋아요", "발림성이 좋고 흡수가 빨라요",
+    "용기가 튼튼하고 디자인도 예뻐요", "건성 피부인데 보습력이 오래 지속됩니다",
+    "자극 없이 순하게 잘 맞아서 재구매 의사 있어요",
+    "세정력은 괜찮은데 거품이 조금 적게 나는 편이에요",
+    "용량 대비 가격이 조금 비싸다고 느껴졌습니다",
+    "색상이 화면이랑 달라서 아쉬웠지만 지속력은 좋아요",
+    "끈적임 없이 산뜻하게 마무리되어서 여름에 쓰기 좋습니다",
+]
+
+ELECTRONICS_PHRASES = [
+    "좋아요", "배송 빠름", "가성비 좋네요", "배터리가 오래가요", "소음이 거의 없어요",
+    "화질이 선명하고 색감이 자연스럽습니다", "조작이 간편해서 부모님도 잘 쓰세요",
+    "무게가 생각보다 무거워서 들고 다니기 불편합니다",
+    "음질은 괜찮은데 최대 음량이 조금 작게 느껴져요",
+    "마감 품질이 좋고 소재도 고급스러워 보입니다",
+    "충전 속도가 빠르고 소비전력도 낮아서 만족합니다",
+]
+
+DOMAIN_PHRASES = {
+    "steam": STEAM_PHRASES,
+    "cosmetics": COSMETICS_PHRASES,
+    "electronics": ELECTRONICS_PHRASES,
+}
+
+# 길이 분포: (비율, 최소 문구 수, 최대 문구 수)
+LENGTH_MIXES = {
+    "short": [(1.0, 1, 2)],
+    "mixed": [(0.5, 1, 2), (0.35, 3, 6), (0.15, 10, 25)],
+    "long": [(1.0, 8, 25)],
+}
+
+
+def make_reviews(domain: str = "steam", count: int = 512, mix: str = "mixed", seed: int = 42) -> List[str]:
+    """도메인 문구를 길이 분포에 맞춰 이어 붙인 합성 리뷰 목록"""
+    rng = random.Random(seed)
+    phrases = DOMAIN_PHRASES[domain]
+    buckets = LENGTH_MIXES[mix]
+    weights = [b[0] for b in buckets]
+
+    reviews = []
+    for _ in range(count):
+        _, lo, hi = rng.choices(buckets, weights=weights, k=1)[0]
+        n = rng.randint(lo, hi)
+        parts = [rng.choice(phrases) for _ in range(n)]
+        # 문구 1~3개를 한 문장으로 묶음 (문장 단위 중복이 비현실적으로 많아지지 않도록)
+        sentences = []
+        while parts:
+            k = rng.randint(1, 3)
+            sentences.append(", ".join(parts[:k]))
+            parts = parts[k:]
+        reviews.append(". ".join(sentences) + ("." if len(sentences) > 1 else ""))
+    return reviews
+
+
+def all_characters() -> List[str]:
+    """대체 토크나이저 어휘 구성용 문자 집합"""
+    chars = set()
+    for phrases in DOMAIN_PHRASES.values():
+        for phrase in phrases:
+            chars.update(phrase)
+    return sorted(c for c in chars if not c.isspace())
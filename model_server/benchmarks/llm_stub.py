@@ -0,0 +1,203 @@
+"""
+OpenAI 호환 스텁 서버 + 인사이트 LLM 호출 벤치마크
+
+사용법 (model_server 디렉토리에서):
+    python -m benchmarks.llm_stub serve --port 8089 --think 3
+        → OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub 로 모델 서버 실행
+    python -m benchmarks.llm_stub bench --calls 5 --think 1 --chunk-delay 0.02
+
+- serve: /v1/chat/completions (stream / non-stream), 첫 응답 전 --think초 대기(추론 시간 흉내),
+  이후 --chunk-chars 글자씩 --chunk-delay 간격으로 인사이트 JSON(```json 코드 블록) 전송
+  GET /stats → 요청 수, 새 TCP 연결 수
+- bench: 스텁 서버를 띄우고 같은 프롬프트를 반복 호출
+  - before: 호출마다 ChatOpenAI 생성 + invoke (응답 전체를 받은 뒤에야 결과 확인)
+  - after: 공유 LLMClient.astream_json (스트리밍, 필드 완성 시 진행 알림)
+  → 첫 피드백까지 시간(p50), 전체 시간(p50), 새 연결 수
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+
+SAMPLE_INSIGHT = {
+    "summary": {
+        "keywords": {"positive": ["그래픽", "스토리"], "negative": ["최적화", "서버"]},
+        "insight_one_liner": "몰입감 있는 스토리와 그래픽은 호평, 최적화와 서버 안정성은 개선 필요",
+        "recommendation": "프레임 드랍과 서버 접속 문제를 우선 해결",
+    },
+    "report": {
+        "title": "📊 리뷰 분석 보고서",
+        "sentiment_ratio": "긍정: 68%, 부정: 32%",
+        "positive_points": ["그래픽 품질과 연출에 대한 만족도가 높습니다.", "스토리 전개가 몰입감 있다는 평가가 많습니다."],
+        "negative_points": ["저사양 환경에서 프레임 드랍이 자주 언급됩니다.", "피크 시간대 서버 접속 실패 불만이 반복됩니다."],
+        "improvement_suggestions": ["그래픽 옵션 세분화 및 최적화 패치", "서버 증설과 접속 대기열 안내"],
+        "overall_summary": "콘텐츠 자체의 만족도는 높지만 기술적 안정성이 전체 평가를 끌어내리고 있습니다.",
+    },
+}
+
+
+# =========================================================
+# 스텁 서버
+# =========================================================
+def make_stub_app(think: float, chunk_delay: float, chunk_chars: int):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI()
+    stats = {"requests": 0, "connections": 0}
+    peers = set()
+    content = "```json\n" + json.dumps(SAMPLE_INSIGHT, ensure_ascii=False, indent=2) + "\n```"
+
+    def chunk(model, delta, finish_reason=None):
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        peer = (request.client.host, request.client.port) if request.client else None
+        if peer not in peers:
+            peers.add(peer)
+            stats["connections"] += 1
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            await asyncio.sleep(think + chunk_delay * (len(content) // chunk_chars))
+            return JSONResponse({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        async def events():
+            await asyncio.sleep(think)
+            yield f"data: {json.dumps(chunk(model, {'role': 'assistant', 'content': ''}))}\n\n"
+            for i in range(0, len(content), chunk_chars):
+                yield f"data: {json.dumps(chunk(model, {'content': content[i : i + chunk_chars]}), ensure_ascii=False)}\n\n"
+                await asyncio.sleep(chunk_delay)
+            yield f"data: {json.dumps(chunk(model, {}, 'stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app, stats
+
+
+def start_stub_server(port: int, think: float, chunk_delay: float, chunk_chars: int):
+    """백그라운드 스레드에서 스텁 서버 실행, (server, stats) 반환"""
+    import uvicorn
+
+    app, stats = make_stub_app(think, chunk_delay, chunk_chars)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, stats
+
+
+# =========================================================
+# 벤치마크
+# =========================================================
+def _bench_before(calls: int):
+    """기존 방식: 호출마다 클라이언트 생성 + 블로킹 invoke"""
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from langchain_openai import ChatOpenAI
+
+    from utils.generate_insight import SYSTEM_PROMPT
+    from utils.llm_client import LLM_CONFIG, OPENAI_BASE_URL
+
+    first, total = [], []
+    for _ in range(calls):
+        started = time.monotonic()
+        llm = ChatOpenAI(**LLM_CONFIG, base_url=OPENAI_BASE_URL)
+        response = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content="bench")])
+        content = response.content.strip().removeprefix("```json").removesuffix("```")
+        json.loads(content)
+        elapsed = time.monotonic() - started
+        first.append(elapsed)  # 결과를 받기 전까지 보여줄 진행 상황 없음
+        total.append(elapsed)
+    return first, total
+
+
+async def _bench_after(calls: int):
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from utils.generate_insight import SYSTEM_PROMPT
+    from utils.llm_client import close_llm_client, get_llm_client
+
+    client = get_llm_client()
+    first, total = [], []
+    try:
+        for _ in range(calls):
+            started = time.monotonic()
+            seen = []
+
+            def on_progress(event):
+                if event["phase"] != "waiting" and not seen:
+                    seen.append(time.monotonic() - started)
+
+            await client.astream_json([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content="bench")], on_progress)
+            total.append(time.monotonic() - started)
+            first.append(seen[0] if seen else total[-1])
+    finally:
+        await close_llm_client()
+    return first, total
+
+
+def bench(args):
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    server, stats = start_stub_server(args.port, args.think, args.chunk_delay, args.chunk_chars)
+    try:
+        results = {}
+        for name, run in (("before", lambda: _bench_before(args.calls)), ("after", lambda: asyncio.run(_bench_after(args.calls)))):
+            connections = stats["connections"]
+            first, total = run()
+            results[name] = {
+                "first_feedback_p50_s": round(statistics.median(first), 3),
+                "total_p50_s": round(statistics.median(total), 3),
+                "new_connections": stats["connections"] - connections,
+            }
+        print(json.dumps({"calls": args.calls, "think_s": args.think, "base_url": base_url, "results": results}, indent=2))
+    finally:
+        server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server and insight LLM benchmark")
+    parser.add_argument("mode", choices=["serve", "bench"])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--think", type=float, default=1.0, help="첫 청크 전 대기 (초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="청크 간격 (초)")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="청크당 글자 수")
+    parser.add_argument("--calls", type=int, default=5, help="bench: 방식별 호출 수")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        import uvicorn
+
+        app, _ = make_stub_app(args.think, args.chunk_delay, args.chunk_chars)
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
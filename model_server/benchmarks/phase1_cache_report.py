@@ -0,0 +1,202 @@
+"""
+Steam Phase-1 문장 캐시 절감 리포트
+
+사용법 (model_server 디렉토리에서):
+    python -m benchmarks.phase1_cache_report --category 103
+    python -m benchmarks.phase1_cache_report --products 12,15,31 --budget-mb 16
+    python -m benchmarks.phase1_cache_report --input reviews.txt
+    python -m benchmarks.phase1_cache_report --synthetic 5000
+
+- 실제 제품 리뷰(tb_review)를 분석 라우트와 같은 순서/청크(제품별, 8개 리뷰씩)로 흘려보내며
+  캐시 없음(before) vs 문장 캐시(after)의 Phase-1 모델 입력 수와 forward pass 수를 비교
+- 모델은 실행하지 않음 (캐시에는 라벨 수 크기의 더미 확률 벡터 저장 → 메모리 예산/제거는 실제와 동일)
+- 배치 구성은 실제 Phase-1 토크나이저 + config.json 배치 설정 (--standin-tokenizer로 오프라인 실행)
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from app.domains.steam import pipeline as steam
+from app.models.sentence_cache import SENTENCE_CACHE_MAX_MB, SentenceProbCache
+
+CHUNK_REVIEWS = 8  # analyze-product-reviews 라우트의 청크 크기
+
+
+# =========================================================
+# 코퍼스 로드
+# =========================================================
+def load_db_corpus(products=None, category_id=103, limit=None):
+    """[(product_id, [review_text, ...]), ...] (제품/리뷰 id 순)"""
+    from utils.db_connect import close_db_pool, get_connection, init_db_pool
+
+    init_db_pool()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            if products:
+                placeholders = ",".join(["%s"] * len(products))
+                cursor.execute(
+                    f"SELECT product_id, review_text FROM tb_review WHERE product_id IN ({placeholders}) "
+                    "ORDER BY product_id, review_id",
+                    products,
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT r.product_id, r.review_text
+                    FROM tb_review r
+                    JOIN tb_product p ON p.product_id = r.product_id
+                    WHERE p.category_id = %s
+                    ORDER BY r.product_id, r.review_id
+                    """,
+                    (category_id,),
+                )
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+        close_db_pool()
+
+    corpus = {}
+    for row in rows[:limit] if limit else rows:
+        corpus.setdefault(row["product_id"], []).append(row["review_text"])
+    return list(corpus.items())
+
+
+def load_file_corpus(path):
+    """한 줄에 리뷰 하나 (jsonl이면 review_text/product_id 필드 사용)"""
+    corpus = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                row = json.loads(line)
+                corpus.setdefault(row.get("product_id", 0), []).append(row["review_text"])
+            else:
+                corpus.setdefault(0, []).append(line)
+    return list(corpus.items())
+
+
+def load_synthetic_corpus(count, seed):
+    from .corpus import make_reviews
+
+    return [(0, make_reviews("steam", count, "mixed", seed))]
+
+
+# =========================================================
+# 시뮬레이션
+# =========================================================
+def _passes(tokenizer, sentences):
+    if not sentences:
+        return 0
+    buckets, _ = steam._plan(tokenizer, sentences, CHUNK_REVIEWS)
+    return len(buckets)
+
+
+def simulate(corpus, tokenizer, budget_bytes):
+    cache = SentenceProbCache(budget_bytes)
+    dummy = np.zeros(len(steam.ASPECTS), dtype=np.float32)
+    totals = {
+        "products": len(corpus),
+        "reviews": 0,
+        "sentences": 0,
+        "before_inputs": 0,
+        "after_inputs": 0,
+        "before_passes": 0,
+        "after_passes": 0,
+    }
+
+    for _, reviews in corpus:
+        for i in range(0, len(reviews), CHUNK_REVIEWS):
+            chunk = reviews[i : i + CHUNK_REVIEWS]
+            sentences = [s for _, s in steam._collect_sentences(chunk, steam.BATCH_MAX_SENTENCES, 5)]
+
+            # _run_phase1과 같은 규칙: 캐시에 없는 고유 문장만 추론
+            found = cache.get_many(sentences)
+            pending = [s for s in dict.fromkeys(sentences) if s not in found]
+            cache.put_many({s: dummy for s in pending})
+
+            totals["reviews"] += len(chunk)
+            totals["sentences"] += len(sentences)
+            totals["before_inputs"] += len(sentences)
+            totals["after_inputs"] += len(pending)
+            totals["before_passes"] += _passes(tokenizer, sentences)
+            totals["after_passes"] += _passes(tokenizer, pending)
+
+    before, after = totals["before_passes"], totals["after_passes"]
+    totals["saved_inputs"] = totals["before_inputs"] - totals["after_inputs"]
+    totals["saved_passes"] = before - after
+    totals["saved_passes_ratio"] = round((before - after) / before, 4) if before else 0.0
+    totals["cache"] = cache.stats()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="steam phase-1 sentence cache report")
+    parser.add_argument("--products", default=None, help="쉼표로 구분한 product_id 목록")
+    parser.add_argument("--category", type=int, default=103, help="--products 미지정 시 카테고리 전체")
+    parser.add_argument("--limit", type=int, default=None, help="최대 리뷰 수")
+    parser.add_argument("--input", default=None, help="DB 대신 리뷰 파일(.txt/.jsonl)")
+    parser.add_argument("--synthetic", type=int, default=0, help="DB 대신 합성 리뷰 N개")
+    parser.add_argument("--budget-mb", type=float, default=SENTENCE_CACHE_MAX_MB or 64)
+    parser.add_argument("--standin-tokenizer", action="store_true", help="오프라인 문자 단위 토크나이저 사용")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    if args.input:
+        corpus, source = load_file_corpus(args.input), args.input
+    elif args.synthetic:
+        corpus, source = load_synthetic_corpus(args.synthetic, args.seed), "synthetic"
+    else:
+        products = [int(p) for p in args.products.split(",")] if args.products else None
+        corpus = load_db_corpus(products, args.category, args.limit)
+        source = f"db:products={args.products}" if products else f"db:category={args.category}"
+
+    if args.standin_tokenizer:
+        from .standins import build_tokenizer
+
+        tokenizer = build_tokenizer(r for _, reviews in corpus for r in reviews)
+    else:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(steam.cfg["phase1_model"])
+
+    t0 = time.perf_counter()
+    report = simulate(corpus, tokenizer, int(args.budget_mb * 1024 * 1024))
+    report.update(
+        {
+            "source": source,
+            "budget_mb": args.budget_mb,
+            "chunk_reviews": CHUNK_REVIEWS,
+            "max_batch_tokens": steam.cfg.get("max_batch_tokens"),
+            "max_batch_items": steam.cfg.get("max_batch_items"),
+            "elapsed_s": round(time.perf_counter() - t0, 2),
+        }
+    )
+
+    print(
+        f"[phase1-cache] {report['products']} products, {report['reviews']} reviews, "
+        f"{report['sentences']} sentences ({source})"
+    )
+    print(f"[phase1-cache] model inputs : {report['before_inputs']} → {report['after_inputs']}")
+    print(
+        f"[phase1-cache] forward passes: {report['before_passes']} → {report['after_passes']} "
+        f"(saved {report['saved_passes']}, {report['saved_passes_ratio']:.1%})"
+    )
+    print(
+        f"[phase1-cache] cache: hit_rate={report['cache']['hit_rate']:.1%}, items={report['cache']['items']}, "
+        f"evictions={report['cache']['evictions']}, {report['cache']['bytes'] / 1024 / 1024:.1f}MB"
+    )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os
+import string
+import tempfile
+
+import torch
+from transformers import (
+    BertTokenizerFast,
+    ElectraConfig,
+    ElectraForSequenceClassification,
+    RobertaConfig,
+    RobertaForSequenceClassification,
+)
+from transformers import pipeline as hf_pipeline
+
+from app.models import ModelRegistry
+from app.models.backends import resolve_backend
+from .corpus import all_characters
+
+# =========================================================
+# 오프라인 벤치마크용 대체 모델
+# - 실제 모델과 같은 아키텍처 계열/라벨 수, 작은 차원으로 랜덤 초기화
+# - 문자 단위 WordPiece 토크나이저 (합성 코퍼스 + aspect 라벨 문자)
+# =========================================================
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+TINY_DIMS = {
+    "hidden_size": 128,
+    "num_hidden_layers": 2,
+    "num_attention_heads": 2,
+    "intermediate_size": 256,
+}
+
+
+def build_tokenizer(extra_texts=()):
+    chars = set(all_characters())
+    for text in extra_texts:
+        chars.update(c for c in text if not c.isspace())
+    chars.update(string.ascii_letters + string.digits + string.punctuation)
+
+    vocab = list(SPECIAL_TOKENS)
+    for c in sorted(chars):
+        vocab.extend([c, f"##{c}"])
+
+    vocab_dir = tempfile.mkdtemp(prefix="absa_bench_vocab_")
+    vocab_path = os.path.join(vocab_dir, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+
+    return BertTokenizerFast(
+        vocab_file=vocab_path,
+        do_lower_case=False,
+        tokenize_chinese_chars=False,
+        strip_accents=False,
+        model_max_length=512,
+    )
+
+
+def build_model(arch: str, vocab_size: int, num_labels: int, seed: int = 0):
+    torch.manual_seed(seed)
+    if arch == "electra":
+        config = ElectraConfig(
+            vocab_size=vocab_size,
+            embedding_size=TINY_DIMS["hidden_size"],
+            max_position_embeddings=512,
+            num_labels=num_labels,
+            pad_token_id=0,
+            **TINY_DIMS,
+        )
+        model = ElectraForSequenceClassification(config)
+    elif arch == "roberta":
+        config = RobertaConfig(
+            vocab_size=vocab_size,
+            max_position_embeddings=514,
+            num_labels=num_labels,
+            pad_token_id=0,
+            bos_token_id=2,
+            eos_token_id=3,
+            **TINY_DIMS,
+        )
+        model = RobertaForSequenceClassification(config)
+    else:
+        raise ValueError(f"지원하지 않는 아키텍처: {arch}")
+    return model.eval()
+
+
+# =========================================================
+# 도메인 파이프라인에 대체 모델 주입
+# =========================================================
+def install_steam(seed: int = 0):
+    from app.domains.steam import pipeline as steam
+
+    tok = build_tokenizer(steam.ASPECTS)
+    bundle = {
+        "device": "cpu",
+        "aspect_tokenizer": tok,
+        "aspect_model": build_model("electra", tok.vocab_size, len(steam.ASPECTS), seed),
+        "sent_tokenizer": tok,
+        "sent_model": build_model("electra", tok.vocab_size, 2, seed + 1),
+    }
+    # 설정된 backend 키로 등록해 파이프라인이 그대로 대체 모델을 조회하도록 함
+    ModelRegistry.register(steam.cfg["phase1_model"], steam.cfg["phase2_model"], bundle, resolve_backend(steam.cfg))
+    return [bundle["aspect_model"], bundle["sent_model"]]
+
+
+def _install_hf_pipeline(module, arch: str, seed: int):
+    tok = build_tokenizer(module.ASPECTS)
+    model = build_model(arch, tok.vocab_size, len(module.LABEL_MAP), seed)
+    module._pipeline_cache = hf_pipeline(
+        task="text-classification",
+        model=model,
+        tokenizer=tok,
+        device=-1,
+    )
+    return [model]
+
+
+def install_cosmetics(seed: int = 0):
+    from app.domains.cosmetics import pipeline as cosmetics
+
+    return _install_hf_pipeline(cosmetics, "roberta", seed)
+
+
+def install_electronics(seed: int = 0):
+    from app.domains.electronics import pipeline as electronics
+
+    return _install_hf_pipeline(electronics, "electra", seed)
+
+
+INSTALLERS = {
+    "steam": install_steam,
+    "cosmetics": install_cosmetics,
+    "electronics": install_electronics,
+}
+
+
+# =========================================================
+# forward 호출 계측 (호출 수 / 실제 토큰 / 패딩 포함 토큰)
+# =========================================================
+class ForwardCounter:
+    def __init__(self, models):
+        # onnxruntime 세션(OnnxSequenceClassifier)은 hook을 지원하지 않으므로 제외
+        self.handles = [
+            m.register_forward_pre_hook(self._hook, with_kwargs=True) for m in models if isinstance(m, torch.nn.Module)
+        ]
+        self.reset()
+
+    def reset(self):
+        self.forward_passes = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+
+    def _hook(self, module, args, kwargs):
+        mask = kwargs.get("attention_mask")
+        if mask is None and args:
+            mask = torch.ones_like(args[0])
+        self.forward_passes += 1
+        if mask is not None:
+            self.real_tokens += int(mask.sum())
+            self.padded_tokens += int(mask.numel())
+
+    def close(self):
+        for h in self.handles:
+            h.remove()
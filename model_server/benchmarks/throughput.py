@@ -0,0 +1,283 @@
+"""
+도메인 파이프라인 오프라인 처리량 벤치마크
+
+사용법 (model_server 디렉토리에서):
+    python -m benchmarks.throughput                                  # 3개 도메인 기본 sweep
+    python -m benchmarks.throughput --domains steam --batch-sizes 8,16,32 --mixes short,long
+    python -m benchmarks.throughput --out benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.throughput --compare old.json new.json      # 커밋 간 비교
+
+- 랜덤 초기화된 대체 모델(같은 아키텍처 계열/라벨 수) 사용 → 오프라인 실행
+- sweep: batch_size × max_length(cosmetics/electronics) × 리뷰 길이 분포
+- 설정마다 별도 프로세스에서 실행 (peak RSS와 워밍 상태가 서로 섞이지 않도록)
+- 결과 JSON: reviews/sec, forward pass 수, 호출 지연 p50/p95, peak RSS + 커밋/환경 정보
+- 비교 가능성: 고정 seed, 고정 torch 스레드 수, 결과/문장 캐시 비활성화
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("SENTENCE_CACHE_MAX_MB", "0")
+
+DOMAINS = ["steam", "cosmetics", "electronics"]
+_RESULT_MARKER = "@@BENCH_RESULT "
+_MODEL_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# =========================================================
+# 측정 유틸
+# =========================================================
+def percentile(values, q):
+    """nearest-rank 백분위수 (ms)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def git_info():
+    def _git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=_MODEL_SERVER_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = _git("status", "--porcelain")
+    return {"commit": _git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def environment(threads):
+    import torch
+    import transformers
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "torch_threads": threads,
+    }
+
+
+# =========================================================
+# 단일 설정 실행 (worker 프로세스)
+# =========================================================
+def run_config(cfg):
+    import torch
+
+    from .bucketing import _domain_module
+    from .corpus import make_reviews
+    from .standins import INSTALLERS, ForwardCounter
+
+    torch.manual_seed(cfg["seed"])
+    torch.set_num_threads(cfg["threads"])
+
+    domain = cfg["domain"]
+    module = _domain_module(domain)
+    counter = ForwardCounter(INSTALLERS[domain](cfg["seed"]))
+    reviews = make_reviews(domain, cfg["reviews"], cfg["mix"], cfg["seed"])
+
+    kwargs = {"debug": False, "batch_size": cfg["batch_size"]}
+    if cfg["max_length"] is not None:
+        kwargs["max_length"] = cfg["max_length"]
+    request_size = cfg["request_size"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.analyze_reviews(reviews[:request_size], **kwargs)  # 워밍업
+        counter.reset()
+
+        # 배치 경로: request_size개씩 analyze_reviews 호출
+        latencies = []
+        started = time.perf_counter()
+        for i in range(0, len(reviews), request_size):
+            t0 = time.perf_counter()
+            module.analyze_reviews(reviews[i : i + request_size], **kwargs)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+        batch_passes, real_tokens, padded_tokens = counter.forward_passes, counter.real_tokens, counter.padded_tokens
+
+        # 단일 리뷰 경로: analyze_review
+        counter.reset()
+        single_latencies = []
+        for text in reviews[: cfg["single"]]:
+            t0 = time.perf_counter()
+            module.analyze_review(text)
+            single_latencies.append((time.perf_counter() - t0) * 1000)
+        single_passes = counter.forward_passes
+
+    counter.close()
+    return {
+        **cfg,
+        "batch": {
+            "elapsed_s": round(elapsed, 4),
+            "reviews_per_sec": round(len(reviews) / elapsed, 2) if elapsed else 0.0,
+            "forward_passes": batch_passes,
+            "real_tokens": real_tokens,
+            "padded_tokens": padded_tokens,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+        },
+        "single": {
+            "reviews": len(single_latencies),
+            "reviews_per_sec": round(len(single_latencies) / (sum(single_latencies) / 1000), 2) if single_latencies else 0.0,
+            "forward_passes": single_passes,
+            "p50_ms": round(percentile(single_latencies, 50), 2),
+            "p95_ms": round(percentile(single_latencies, 95), 2),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def spawn_config(cfg):
+    """설정 하나를 새 인터프리터에서 실행하고 결과 JSON을 받음"""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.throughput", "--worker", json.dumps(cfg)],
+        cwd=_MODEL_SERVER_DIR,
+        capture_output=True,
+        text=True,
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(_RESULT_MARKER):
+            return json.loads(line[len(_RESULT_MARKER) :])
+    raise RuntimeError(f"benchmark worker 실패 ({cfg}):\n{proc.stderr[-2000:]}")
+
+
+# =========================================================
+# sweep / 비교
+# =========================================================
+def build_configs(args):
+    configs = []
+    for domain in args.domains:
+        # steam은 토크나이저 기본 truncation만 사용 (max_length 인자 없음)
+        max_lengths = [None] if domain == "steam" else args.max_lengths
+        for mix in args.mixes:
+            for batch_size in args.batch_sizes:
+                for max_length in max_lengths:
+                    configs.append(
+                        {
+                            "domain": domain,
+                            "mix": mix,
+                            "batch_size": batch_size,
+                            "max_length": max_length,
+                            "reviews": args.reviews,
+                            "request_size": args.request_size,
+                            "single": args.single,
+                            "seed": args.seed,
+                            "threads": args.threads,
+                        }
+                    )
+    return configs
+
+
+def _config_key(row):
+    return (row["domain"], row["mix"], row["batch_size"], row["max_length"])
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    old_rows = {_config_key(r): r for r in old["results"]}
+    short = lambda report: (report["git"]["commit"] or "?")[:10]
+    print(f"[compare] {short(old)} → {short(new)}")
+    for row in new["results"]:
+        base = old_rows.get(_config_key(row))
+        if not base:
+            continue
+        before, after = base["batch"]["reviews_per_sec"], row["batch"]["reviews_per_sec"]
+        ratio = after / before if before else float("nan")
+        print(
+            f"[compare] {row['domain']:11s} {row['mix']:6s} bs={row['batch_size']:<3} ml={row['max_length']} | "
+            f"{before:>8.2f} → {after:>8.2f} reviews/s (x{ratio:.2f}) | "
+            f"p95 {base['batch']['p95_ms']} → {row['batch']['p95_ms']}ms | "
+            f"passes {base['batch']['forward_passes']} → {row['batch']['forward_passes']}"
+        )
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def _str_list(value):
+    return [v for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline throughput benchmark for domain pipelines")
+    parser.add_argument("--domains", type=_str_list, default=DOMAINS)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[8, 16, 32])
+    parser.add_argument("--max-lengths", type=_int_list, default=[128, 256])
+    parser.add_argument("--mixes", type=_str_list, default=["short", "mixed", "long"])
+    parser.add_argument("--reviews", type=int, default=256, help="설정당 리뷰 수")
+    parser.add_argument("--request-size", type=int, default=32, help="analyze_reviews 1회 호출 리뷰 수 (지연 측정 단위)")
+    parser.add_argument("--single", type=int, default=32, help="analyze_review 단일 호출 측정 수")
+    parser.add_argument("--threads", type=int, default=1, help="torch 스레드 수 (커밋 간 비교 시 고정)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="JSON 결과 저장 경로")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(_RESULT_MARKER + json.dumps(run_config(json.loads(args.worker)), ensure_ascii=False))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    unknown = set(args.domains) - set(DOMAINS)
+    if unknown:
+        parser.error(f"지원하지 않는 도메인: {', '.join(sorted(unknown))}")
+
+    configs = build_configs(args)
+    results = []
+    for i, cfg in enumerate(configs, 1):
+        row = spawn_config(cfg)
+        results.append(row)
+        print(
+            f"[bench {i}/{len(configs)}] {cfg['domain']:11s} {cfg['mix']:6s} bs={cfg['batch_size']:<3} "
+            f"ml={cfg['max_length']} | {row['batch']['reviews_per_sec']:>8.2f} reviews/s | "
+            f"passes={row['batch']['forward_passes']} | p50={row['batch']['p50_ms']}ms p95={row['batch']['p95_ms']}ms | "
+            f"single p50={row['single']['p50_ms']}ms | rss={row['peak_rss_mb']}MB"
+        )
+
+    report = {
+        "benchmark": "throughput",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_info(),
+        "environment": environment(args.threads),
+        "models": "standin",
+        "results": results,
+    }
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[bench] 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
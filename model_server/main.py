@@ -14,21 +14,46 @@ if _model_server_dir not in sys.path:
 
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-from app.api.v1.routes import router as v1_router
+from app.api.v1.routes import router as v1_router, run_product_analysis_job
 from utils.db_connect import init_db_pool, close_db_pool
+from app.models.scheduler import shutdown_schedulers
+from app.models.result_cache import close_result_cache
+from utils.insight_cache import close_llm_cache
+from utils.llm_client import init_llm_client, close_llm_client
+from utils.insight_bulk import cancel_bulk_insight_jobs
+from utils.analysis_jobs import init_analysis_jobs, close_analysis_jobs
+from utils.executors import init_executors, close_executors
+from utils.tokenizer_pool import init_tokenizer_pool, close_tokenizer_pool
+from utils.wordcloud_jobs import init_wordcloud_jobs, close_wordcloud_jobs
+from utils.metrics import render_metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 실행되는 라이프사이클 이벤트"""
     # 시작 시
-    print("🚀 서버 시작: DB Connection Pool 초기화")
+    print("🚀 서버 시작: DB Connection Pool / 실행기 / 형태소 분석 워커 풀 / LLM 클라이언트 / 분석 작업 초기화")
     init_db_pool()
+    init_executors()
+    init_tokenizer_pool()
+    init_wordcloud_jobs()
+    init_llm_client()
+    init_analysis_jobs(run_product_analysis_job)  # 중단된 분석 작업은 체크포인트부터 재개
     yield
     # 종료 시
-    print("🛑 서버 종료: DB Connection Pool 정리")
+    print("🛑 서버 종료: 분석 작업 / 배치 스케줄러 / 워드클라우드 작업 / 실행기 / 형태소 분석 워커 풀 / DB Connection Pool 정리")
+    await close_analysis_jobs()
+    await cancel_bulk_insight_jobs()
+    shutdown_schedulers()
+    close_wordcloud_jobs()
+    close_executors()
+    close_tokenizer_pool()
+    close_result_cache()
+    await close_llm_client()
+    close_llm_cache()
     close_db_pool()
 
 
@@ -49,6 +74,11 @@ app.include_router(v1_router)
 def root():
     return {"status": "ok", "message": "Model server running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text format 메트릭 (단계별 지연, 처리량, DB 풀, 진행 중 분석 수)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
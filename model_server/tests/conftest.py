@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 테스트도 서버와 같은 방식으로 import (model_server 디렉터리 기준: app.*, utils.*)
+MODEL_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MODEL_SERVER_DIR not in sys.path:
+    sys.path.insert(0, MODEL_SERVER_DIR)
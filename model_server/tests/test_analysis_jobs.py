@@ -0,0 +1,326 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+pymysql = pytest.importorskip("pymysql")
+
+# DB 드라이버/풀(pymysql, dbutils)이 없으면 건너뜀
+analysis_jobs = pytest.importorskip("utils.analysis_jobs")
+analysis_pipeline = pytest.importorskip("utils.analysis_pipeline")
+
+
+# ---------------------------------------------------------
+# 가짜 DB: 리뷰/분석 결과/작업 행 + 페이지 트랜잭션
+# ---------------------------------------------------------
+class FakeDB:
+    def __init__(self, reviews, jobs):
+        self.reviews = reviews        # [{"product_id", "review_id", "review_text"}]
+        self.analyzed = set()         # 커밋된 tb_reviewAnalysis의 review_id
+        self.jobs = jobs              # job_id → 작업 행
+        self.commits = 0
+        self.rollbacks = 0
+        self.steal_after = None       # 커밋 N번 뒤 다른 워커가 작업을 가져감
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.db = conn.db
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.rowcount = 0
+        if "FROM tb_review r" in sql:
+            ranges = [tuple(params[i : i + 3]) for i in range(0, len(params), 3)]
+            self._rows = [
+                dict(r)
+                for r in self.db.reviews
+                if r["review_id"] not in self.db.analyzed
+                and any(r["product_id"] == pid and lo < r["review_id"] <= hi for pid, lo, hi in ranges)
+            ]
+            return len(self._rows)
+        if sql.startswith("INSERT INTO tb_reviewAnalysis"):
+            self.conn.pending_reviews.update(params[1::3])
+            return len(params) // 3
+        if "UPDATE tb_analysisJob" in sql:
+            count, written, last_review_id, job_id, owner = params
+            job = self.conn.pending_jobs.get(job_id) or dict(self.db.jobs[job_id])
+            if job["owner"] == owner:
+                job.update(analyzed=job["analyzed"] + count, written=job["written"] + written, last_review_id=last_review_id)
+                self.conn.pending_jobs[job_id] = job
+                self.rowcount = 1
+            return self.rowcount
+        raise AssertionError(sql)
+
+    def fetchmany(self, size):
+        page, self._rows = self._rows[:size], self._rows[size:]
+        return page
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pending_reviews = set()
+        self.pending_jobs = {}
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def begin(self):
+        self.pending_reviews, self.pending_jobs = set(), {}
+
+    def commit(self):
+        self.db.analyzed |= self.pending_reviews
+        self.db.jobs.update(self.pending_jobs)
+        self.db.commits += 1
+        if self.db.steal_after == self.db.commits:
+            for job in self.db.jobs.values():
+                job["owner"] = "other-worker"
+
+    def rollback(self):
+        self.pending_reviews, self.pending_jobs = set(), {}
+        self.db.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+class FakePipeline:
+    @staticmethod
+    def analyze_reviews(texts, debug=False, batch_size=16):
+        return [{"results": [{"aspect": "맛", "label": "긍정"}]} for _ in texts]
+
+
+def _inline_inference(fn, *args, **kwargs):
+    future = Future()
+    future.set_result(fn(*args, **kwargs))
+    return future
+
+
+def _job_row(job_id, product_id, total, analyzed, last_review_id, max_review_id):
+    return {
+        "job_id": job_id,
+        "product_id": product_id,
+        "domain": "steam",
+        "total": total,
+        "analyzed": analyzed,
+        "written": analyzed,
+        "last_review_id": last_review_id,
+        "max_review_id": max_review_id,
+        "attempts": 2,
+        "owner": analysis_jobs.WORKER_ID,
+    }
+
+
+def _reviews(product_id, review_ids):
+    return [{"product_id": product_id, "review_id": i, "review_text": f"리뷰 {i}"} for i in review_ids]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    holder = {}
+    monkeypatch.setattr(analysis_pipeline, "get_connection", lambda: FakeConnection(holder["db"]))
+    monkeypatch.setattr(analysis_pipeline, "submit_inference", _inline_inference)
+    monkeypatch.setattr(analysis_pipeline, "ANALYSIS_PAGE_SIZE", 4)
+
+    def make(reviews, jobs):
+        holder["db"] = FakeDB(reviews, {row["job_id"]: row for row in jobs})
+        return holder["db"]
+
+    return make
+
+
+async def _drain(stream):
+    return [event async for event in stream.run()]
+
+
+class _Job:
+    def __init__(self, row):
+        self.job_id = row["job_id"]
+        self.product_id = row["product_id"]
+        self.row = dict(row)
+
+
+# ---------------------------------------------------------
+# 재개 / 소유권
+# ---------------------------------------------------------
+def test_resume_continues_after_checkpoint_within_scope(fake_db):
+    # 이전 실행이 1~4를 커밋하고 중단, 범위 확정 후 11~12가 새로 들어옴
+    row = _job_row("job-1", 1, total=10, analyzed=4, last_review_id=4, max_review_id=10)
+    db = fake_db(_reviews(1, range(1, 13)), [row])
+    db.analyzed = {1, 2, 3, 4}
+
+    job = _Job(row)
+    events = asyncio.run(_drain(analysis_jobs.CheckpointedAnalysis(job, FakePipeline, {"맛": 7})))
+
+    assert db.analyzed == set(range(1, 11))
+    assert db.jobs["job-1"]["analyzed"] == 10
+    assert db.jobs["job-1"]["last_review_id"] == 10
+    assert db.commits == 2
+    assert job.row["analyzed"] == 10 and job.row["last_review_id"] == 10
+    assert events[-1]["analyzed"] == 10 and events[-1]["written"] == 10
+
+
+def test_lost_ownership_rolls_back_page_and_stops(fake_db):
+    row = _job_row("job-1", 1, total=10, analyzed=0, last_review_id=0, max_review_id=10)
+    db = fake_db(_reviews(1, range(1, 11)), [row])
+    db.steal_after = 1   # 첫 페이지 커밋 직후 다른 워커가 가져감
+
+    stream = analysis_jobs.CheckpointedAnalysis(_Job(row), FakePipeline, {"맛": 7})
+    with pytest.raises(analysis_jobs.JobOwnershipLost):
+        asyncio.run(_drain(stream))
+
+    assert db.analyzed == {1, 2, 3, 4}
+    assert db.rollbacks == 1
+    assert db.jobs["job-1"]["analyzed"] == 4
+    assert db.jobs["job-1"]["last_review_id"] == 4
+
+
+def test_multi_product_checkpoints_each_job(fake_db):
+    first = _job_row("job-a", 1, total=5, analyzed=2, last_review_id=2, max_review_id=5)
+    second = _job_row("job-b", 2, total=3, analyzed=0, last_review_id=0, max_review_id=23)
+    db = fake_db(_reviews(1, range(1, 7)) + _reviews(2, range(21, 25)), [first, second])
+    db.analyzed = {1, 2}
+
+    stream = analysis_jobs.CheckpointedMultiAnalysis(
+        "steam",
+        FakePipeline,
+        {1: {"job": dict(first), "keyword_map": {"맛": 7}}, 2: {"job": dict(second), "keyword_map": {"맛": 8}}},
+    )
+    asyncio.run(_drain(stream))
+    stream.finish()
+
+    assert db.analyzed == {1, 2, 3, 4, 5, 21, 22, 23}
+    assert (db.jobs["job-a"]["analyzed"], db.jobs["job-a"]["last_review_id"]) == (5, 5)
+    assert (db.jobs["job-b"]["analyzed"], db.jobs["job-b"]["last_review_id"]) == (3, 23)
+    assert {pid: (p["committed"], p["total"], p["done"]) for pid, p in stream.products.items()} == {
+        1: (5, 5, True),
+        2: (3, 3, True),
+    }
+
+
+# ---------------------------------------------------------
+# 작업 확보 (tb_analysisJob)
+# ---------------------------------------------------------
+class AcquireCursor:
+    """acquire_product_jobs가 보내는 쿼리만 흉내 내는 커서"""
+
+    def __init__(self, rows, scopes, racing=None):
+        self.rows = rows          # job_id → 작업 행
+        self.scopes = scopes      # product_id → (total, max_review_id)
+        self.racing = racing or {}  # product_id → 확인 직후 다른 워커가 만든 작업 행
+        self.rowcount = 0
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.rowcount = 0
+        sql = sql.strip()
+        if sql.startswith("SELECT") and "GROUP BY" in sql:
+            self._result = [
+                {"product_id": pid, "total": self.scopes[pid][0], "max_review_id": self.scopes[pid][1]}
+                for pid in params
+                if pid in self.scopes
+            ]
+        elif sql.startswith("SELECT") and "product_id IN" in sql:
+            self._result = [
+                dict(r) for r in self.rows.values() if r["product_id"] in params and r["status"] in ("queued", "running")
+            ]
+        elif sql.startswith("SELECT") and "job_id = %s" in sql:
+            self._result = [dict(self.rows[params[0]])]
+        elif "attempts = attempts + 1" in sql:
+            row = self.rows[params[1]]
+            if row["owner"] is None:
+                row.update(owner=params[0], attempts=row["attempts"] + 1)
+                self.rowcount = 1
+        elif sql.startswith("SELECT") and "product_id = %s" in sql:
+            self._result = [
+                dict(r) for r in self.rows.values() if r["product_id"] == params[0] and r["status"] in ("queued", "running")
+            ]
+        elif sql.startswith("INSERT"):
+            job_id, product_id, domain, total, max_review_id, owner = params
+            if product_id in self.racing:
+                row = self.racing.pop(product_id)
+                self.rows[row["job_id"]] = row
+            if any(r["product_id"] == product_id and r["status"] in ("queued", "running") for r in self.rows.values()):
+                raise pymysql.err.IntegrityError(1062, "Duplicate entry for key 'uq_aj_active_product'")
+            self.rows[job_id] = dict(
+                _job_row(job_id, product_id, total, 0, 0, max_review_id),
+                domain=domain, status="running", attempts=1, owner=owner,
+            )
+            self.rowcount = 1
+        elif "SET domain" in sql:
+            domain, total, max_review_id, job_id, owner = params
+            if self.rows[job_id]["owner"] == owner:
+                self.rows[job_id].update(domain=domain, total=total, max_review_id=max_review_id)
+                self.rowcount = 1
+        else:
+            raise AssertionError(sql)
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+
+def test_acquire_product_jobs_claims_resumes_and_creates():
+    released = dict(_job_row("released", 1, 10, 4, 4, 10), status="running", owner=None)
+    running = dict(_job_row("running", 2, 10, 0, 0, 10), status="running", owner="other-worker")
+    unscoped = dict(_job_row("unscoped", 3, None, 0, 0, None), status="running", owner=None, domain=None)
+    cursor = AcquireCursor(
+        {row["job_id"]: row for row in (released, running, unscoped)},
+        {3: (7, 307), 4: (5, 405)},   # 5번 제품은 새 리뷰 없음
+    )
+
+    jobs, busy, empty = analysis_jobs.acquire_product_jobs(
+        cursor, {1: "steam", 2: "steam", 3: "cosmetics", 4: "steam", 5: "steam"}
+    )
+
+    assert sorted(jobs) == [1, 3, 4]
+    assert (jobs[1]["job_id"], jobs[1]["analyzed"], jobs[1]["attempts"]) == ("released", 4, 3)
+    assert (jobs[3]["domain"], jobs[3]["total"], jobs[3]["max_review_id"]) == ("cosmetics", 7, 307)
+    assert (jobs[4]["total"], jobs[4]["max_review_id"], jobs[4]["owner"]) == (5, 405, analysis_jobs.WORKER_ID)
+    assert list(busy) == [2]
+    assert empty == [5]
+
+
+def test_job_created_by_another_worker_is_reported_busy():
+    other = dict(_job_row("other", 6, 4, 0, 0, 60), status="running", owner="other-worker")
+    cursor = AcquireCursor({}, {6: (4, 60), 7: (2, 70)}, racing={6: other})
+
+    jobs, busy, empty = analysis_jobs.acquire_product_jobs(cursor, {6: "steam", 7: "steam"})
+
+    assert list(jobs) == [7]
+    assert (busy[6]["job_id"], busy[6]["owner"]) == ("other", "other-worker")
+    with pytest.raises(analysis_jobs.JobAlreadyActive, match="이미 분석 중"):
+        analysis_jobs._insert_job(cursor, 7, "steam", 2, 70)
+
+
+def test_claim_product_jobs_marks_local_single_product_job_busy(monkeypatch):
+    local = analysis_jobs.AnalysisJob(_job_row("local", 1, 10, 0, 0, 10))
+    seen = {}
+
+    def fake_acquire(cursor, domains):
+        seen.update(domains)
+        return {2: _job_row("new", 2, 5, 0, 0, 50)}, {}, []
+
+    async def run_io_inline(fn, *args):
+        return fn(*args)
+
+    async def claim():
+        monkeypatch.setattr(analysis_jobs, "_start_lock", asyncio.Lock())
+        return await analysis_jobs.claim_product_jobs(None, {1: "steam", 2: "steam"})
+
+    monkeypatch.setitem(analysis_jobs._jobs, "local", local)
+    monkeypatch.setattr(analysis_jobs, "acquire_product_jobs", fake_acquire)
+    monkeypatch.setattr(analysis_jobs, "run_io", run_io_inline)
+    jobs, busy, empty = asyncio.run(claim())
+
+    assert seen == {2: "steam"}
+    assert busy[1]["job_id"] == "local"
+    assert list(jobs) == [2] and empty == []
@@ -0,0 +1,78 @@
+import pytest
+
+analysis_writer = pytest.importorskip("utils.analysis_writer")
+
+
+class UpsertCursor:
+    """(keyword_id, review_id) 테이블을 흉내 내고 MySQL처럼 affected rows(신규 1, 갱신 2)를 돌려주는 커서"""
+
+    def __init__(self, existing=()):
+        self.table = {key: "positive" for key in existing}
+        self.statements = []
+
+    def execute(self, sql, params):
+        rows = [tuple(params[i : i + 3]) for i in range(0, len(params), 3)]
+        self.statements.append(rows)
+        affected = 0
+        for keyword_id, review_id, sentiment in rows:
+            affected += 2 if (keyword_id, review_id) in self.table else 1
+            self.table[(keyword_id, review_id)] = sentiment
+        return affected
+
+
+def test_flush_counts_inserted_and_updated_rows():
+    cursor = UpsertCursor(existing=[(1, 10), (2, 10)])
+    writer = analysis_writer.ReviewAnalysisWriter(cursor, chunk_size=100)
+
+    writer.add(1, 10, "negative")
+    writer.add(2, 10, "negative")
+    writer.add(3, 10, "positive")
+    writer.flush()
+
+    stats = writer.stats()
+    assert (stats["rows"], stats["inserted"], stats["updated"], stats["statements"]) == (3, 1, 2, 1)
+    assert cursor.table[(1, 10)] == "negative"
+
+
+def test_rows_are_sent_in_chunked_multi_row_statements():
+    cursor = UpsertCursor()
+    writer = analysis_writer.ReviewAnalysisWriter(cursor, chunk_size=2)
+
+    for review_id in range(5):
+        writer.add(1, review_id, "positive")
+    writer.flush()
+
+    assert [len(rows) for rows in cursor.statements] == [2, 2, 1]
+    assert writer.stats()["inserted"] == 5
+
+
+def test_same_key_keeps_last_sentiment_and_is_written_once():
+    cursor = UpsertCursor()
+    writer = analysis_writer.ReviewAnalysisWriter(cursor, chunk_size=100)
+
+    writer.add(1, 10, "positive")
+    writer.add(1, 10, "negative")
+    writer.flush()
+    writer.flush()   # 보낼 행이 없으면 쿼리도 없음
+
+    assert cursor.statements == [[(1, 10, "negative")]]
+    assert writer.stats()["rows"] == 1
+
+
+def test_add_result_skips_neutral_and_reports_unknown_aspects():
+    cursor = UpsertCursor()
+    writer = analysis_writer.ReviewAnalysisWriter(cursor)
+    result = {
+        "results": [
+            {"aspect": "가격", "label": "긍정"},
+            {"aspect": "디자인", "label": "중립"},
+            {"aspect": "배송", "label": "부정"},
+            {"aspect": "없는키워드", "label": "긍정"},
+        ]
+    }
+
+    missing = writer.add_result(10, result, {"가격": 1, "디자인": 2, "배송": 3})
+    writer.flush()
+
+    assert missing == {"없는키워드"}
+    assert cursor.table == {(1, 10): "positive", (3, 10): "negative"}
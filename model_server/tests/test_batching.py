@@ -0,0 +1,63 @@
+import pytest
+
+# app.models 패키지가 모델 레지스트리(torch 등)를 import하므로 의존성이 없으면 건너뜀
+batching = pytest.importorskip("app.models.batching")
+
+
+class _WordTokenizer:
+    """단어 수 + special token 2개를 길이로 돌려주는 토크나이저"""
+
+    def __call__(self, texts, truncation=True, add_special_tokens=True, max_length=None):
+        ids = [[0] * (len(text.split()) + 2) for text in texts]
+        if max_length:
+            ids = [row[:max_length] for row in ids]
+        return {"input_ids": ids}
+
+
+def test_make_buckets_groups_longest_first_within_budget():
+    lengths = [5, 40, 12, 40, 3, 25]
+    buckets = batching.make_buckets(lengths, max_tokens=80, max_items=3)
+
+    assert buckets == [[1, 3], [5, 2, 0], [4]]
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(len(lengths)))
+
+
+def test_make_buckets_keeps_oversized_input_alone():
+    buckets = batching.make_buckets([500, 10, 10], max_tokens=100, max_items=8)
+    assert buckets == [[0], [1, 2]]
+
+
+def test_run_batches_scatters_results_back_to_input_order():
+    inputs = ["a", "bbbb", "cc", "ddd"]
+    buckets = [[1, 3], [2], [0]]
+    seen = []
+
+    outputs = batching.run_batches(
+        inputs,
+        buckets,
+        lambda batch: [text.upper() for text in batch],
+        on_batch=lambda num, total, size: seen.append((num, total, size)),
+    )
+
+    assert outputs == ["A", "BBBB", "CC", "DDD"]
+    assert seen == [(1, 3, 2), (2, 3, 1), (3, 3, 1)]
+
+
+def test_plan_batches_caps_buckets_at_batch_size():
+    texts = ["짧은 리뷰"] * 10
+    buckets, stats = batching.plan_batches(_WordTokenizer(), texts, batch_size=4, max_tokens=4096, max_items=64)
+
+    assert [len(bucket) for bucket in buckets] == [4, 4, 2]
+    assert stats["padding_ratio"] == 0.0
+
+
+def test_plan_batches_without_bucketing_keeps_input_order():
+    texts = ["하나", "둘 셋 넷", "다섯", "여섯 일곱", "여덟"]
+    buckets, _ = batching.plan_batches(_WordTokenizer(), texts, batch_size=2, bucketing=False)
+    assert buckets == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.parametrize("bucketing", [True, False])
+def test_plan_batches_without_batch_size_uses_max_items(bucketing):
+    buckets, _ = batching.plan_batches(_WordTokenizer(), ["리뷰"] * 5, batch_size=0, bucketing=bucketing, max_items=2)
+    assert [len(bucket) for bucket in buckets] == [2, 2, 1]
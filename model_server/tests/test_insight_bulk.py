@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+openai = pytest.importorskip("openai")
+insight_bulk = pytest.importorskip("utils.insight_bulk")
+
+
+def _error(cls, retry_after=None):
+    """SDK 버전마다 생성자 인자가 달라서 __init__ 없이 만들고 response만 붙임"""
+    error = cls.__new__(cls)
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    error.response = SimpleNamespace(headers=headers)
+    return error
+
+
+@pytest.fixture(autouse=True)
+def fixed_backoff(monkeypatch):
+    monkeypatch.setattr(insight_bulk, "INSIGHT_BULK_BACKOFF_BASE", 2.0)
+    monkeypatch.setattr(insight_bulk, "INSIGHT_BULK_BACKOFF_MAX", 60.0)
+    monkeypatch.setattr(insight_bulk.random, "uniform", lambda low, high: 1.0)
+
+
+def test_rate_limit_waits_for_retry_after_header():
+    assert insight_bulk.retry_delay(_error(openai.RateLimitError, "7"), attempt=0) == 7.0
+    assert insight_bulk.retry_delay(_error(openai.RateLimitError, "600"), attempt=0) == 60.0   # 상한
+
+
+@pytest.mark.parametrize("header", [None, "Wed, 21 Oct 2026 07:28:00 GMT"])
+def test_rate_limit_without_usable_header_backs_off_exponentially(header):
+    assert insight_bulk.retry_delay(_error(openai.RateLimitError, header), attempt=2) == 8.0
+
+
+@pytest.mark.parametrize("cls", ["APITimeoutError", "APIConnectionError", "InternalServerError"])
+def test_transient_errors_back_off_up_to_the_cap(cls):
+    error = _error(getattr(openai, cls))
+
+    assert [insight_bulk.retry_delay(error, attempt) for attempt in range(3)] == [2.0, 4.0, 8.0]
+    assert insight_bulk.retry_delay(error, attempt=10) == 60.0
+
+
+def test_other_errors_are_not_retried():
+    assert insight_bulk.retry_delay(ValueError("bad prompt"), attempt=0) is None
+
+
+def test_rate_limit_gate_holds_workers_until_the_longest_cooldown(monkeypatch):
+    now = [100.0]
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(insight_bulk.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(insight_bulk.asyncio, "sleep", fake_sleep)
+
+    gate = insight_bulk.RateLimitGate()
+    asyncio.run(gate.wait())
+    assert slept == []
+
+    gate.cool_down(10)
+    gate.cool_down(3)   # 더 짧은 쿨다운이 기존 대기를 줄이지 않음
+    asyncio.run(gate.wait())
+
+    assert slept == [10.0]
+    assert now[0] == 110.0
@@ -0,0 +1,62 @@
+import pytest
+
+insight_cache = pytest.importorskip("utils.insight_cache")
+
+
+def _fingerprint(total, keyword_counts):
+    return {"total_reviews": total, "keyword_counts": keyword_counts, "sample_digest": "-"}
+
+
+def test_drift_without_previous_fingerprint_is_full():
+    assert insight_cache.insight_drift(None, _fingerprint(10, {})) == 1.0
+
+
+def test_drift_identical_inputs_is_zero():
+    counts = {"맛": {"positive": 3, "negative": 1}}
+    assert insight_cache.insight_drift(_fingerprint(4, counts), _fingerprint(4, dict(counts))) == 0.0
+
+
+def test_drift_review_growth_with_same_distribution():
+    before = _fingerprint(100, {"맛": {"positive": 50, "negative": 50}})
+    after = _fingerprint(110, {"맛": {"positive": 55, "negative": 55}})
+    assert insight_cache.insight_drift(before, after) == 0.1
+
+
+def test_drift_distribution_shift_uses_total_variation():
+    before = _fingerprint(100, {"맛": {"positive": 50, "negative": 50}})
+    after = _fingerprint(100, {"맛": {"positive": 75, "negative": 25}})
+    assert insight_cache.insight_drift(before, after) == 0.25
+
+
+def test_drift_new_keyword_counts_as_shift():
+    before = _fingerprint(10, {"맛": {"positive": 10, "negative": 0}})
+    after = _fingerprint(10, {"맛": {"positive": 5, "negative": 0}, "가격": {"positive": 0, "negative": 5}})
+    assert insight_cache.insight_drift(before, after) == 0.5
+
+
+def test_drift_from_empty_product_is_full():
+    assert insight_cache.insight_drift(_fingerprint(0, {}), _fingerprint(3, {"맛": {"positive": 3}})) == 1.0
+
+
+def test_fingerprint_digest_ignores_key_order():
+    first = insight_cache.build_fingerprint({"total_reviews": 2, "representative_reviews": {"a": 1, "b": 2}})
+    second = insight_cache.build_fingerprint({"total_reviews": 2, "representative_reviews": {"b": 2, "a": 1}})
+    assert first["sample_digest"] == second["sample_digest"]
+
+
+def test_stored_prompt_hash_follows_map_reduce_input():
+    generate_insight = pytest.importorskip("utils.generate_insight")
+    partition = {"kind": "time", "label": "2024-01", "counts": {"reviews": 3}, "reviews": ["좋아요"]}
+    prepared = {"prompt": "전체 프롬프트", "partitions": [partition]}
+
+    single = generate_insight.insight_prompt_hash(prepared)
+    assert single == insight_cache.prompt_hash(generate_insight.LLM_CONFIG, generate_insight.SYSTEM_PROMPT, "전체 프롬프트")
+
+    prepared["reduce_prompt"] = "reduce A"
+    first = generate_insight.insight_prompt_hash(prepared)
+    prepared["reduce_prompt"] = "reduce B"   # 부분 요약이 바뀌면 reduce 입력도 바뀜
+    assert first not in (single, generate_insight.insight_prompt_hash(prepared))
+
+    partition["reviews"] = ["별로예요"]
+    prepared["reduce_prompt"] = "reduce A"
+    assert generate_insight.insight_prompt_hash(prepared) != first
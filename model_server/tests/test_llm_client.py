@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+llm_client = pytest.importorskip("utils.llm_client")
+IncrementalJSONParser = llm_client.IncrementalJSONParser
+
+
+def _feed(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_reports_fields_as_they_complete(size):
+    body = {"summary": "좋음", "report": {"positive_points": ["a", "b"], "score": 4.5}, "tags": [1, 2]}
+    text = "```json\n" + json.dumps(body, ensure_ascii=False) + "\n```"
+
+    parser = IncrementalJSONParser(max_depth=2)
+    events = _feed(parser, text, size)
+
+    assert events == ["summary", "report.positive_points", "report.score", "report", "tags"]
+    assert parser.done
+    assert parser.result() == body
+
+
+def test_ignores_braces_and_quotes_inside_strings():
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"a": "x\\"}{,", "b": 1}')
+
+    assert events == ["a", "b"]
+    assert parser.result() == {"a": 'x"}{,', "b": 1}
+
+
+def test_max_depth_limits_reported_paths():
+    parser = IncrementalJSONParser(max_depth=1)
+    events = parser.feed('{"report": {"inner": 1}, "done": true}')
+    assert events == ["report", "done"]
+
+
+def test_text_after_top_level_object_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1}')
+    assert parser.feed('\n``` 끝 {"b": 2}') == []
+    assert parser.result() == {"a": 1}
+
+
+def test_result_without_object_raises():
+    parser = IncrementalJSONParser()
+    parser.feed("응답 없음")
+    with pytest.raises(json.JSONDecodeError):
+        parser.result()
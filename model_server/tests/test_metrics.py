@@ -0,0 +1,91 @@
+import pytest
+
+from utils import metrics
+
+
+def _lines(registry):
+    text = registry.render()
+    assert text.endswith("\n")
+    return text.splitlines()
+
+
+def test_counter_renders_help_type_and_sorted_labelled_samples():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("absa_runs_total", "Runs", ("domain", "status"))
+
+    counter.inc(domain="steam", status="done")
+    counter.inc(2, domain="cosmetics", status="failed")
+    counter.inc(0.5, domain="steam", status="done")
+
+    assert _lines(registry) == [
+        "# HELP absa_runs_total Runs",
+        "# TYPE absa_runs_total counter",
+        'absa_runs_total{domain="cosmetics",status="failed"} 2',
+        'absa_runs_total{domain="steam",status="done"} 1.5',
+    ]
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("absa_stage_seconds", "Stage", ("stage",), buckets=(0.1, 1))
+
+    histogram.observe(0.05, stage="infer")
+    histogram.observe(0.5, stage="infer")
+    histogram.observe(3, stage="infer")
+
+    assert _lines(registry)[2:] == [
+        'absa_stage_seconds_bucket{stage="infer",le="0.1"} 1',
+        'absa_stage_seconds_bucket{stage="infer",le="1"} 2',
+        'absa_stage_seconds_bucket{stage="infer",le="+Inf"} 3',
+        'absa_stage_seconds_sum{stage="infer"} 3.55',
+        'absa_stage_seconds_count{stage="infer"} 3',
+    ]
+
+
+def test_label_values_are_escaped_and_unlabelled_gauge_has_no_braces():
+    registry = metrics.MetricsRegistry()
+    registry.counter("absa_errors_total", "Errors", ("message",)).inc(message='bad "quote"\\n\nline')
+    gauge = registry.gauge("absa_in_flight", "In flight")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    lines = _lines(registry)
+    assert 'absa_errors_total{message="bad \\"quote\\"\\\\n\\nline"} 1' in lines
+    assert "absa_in_flight 1" in lines
+
+
+def test_wrong_labels_are_rejected():
+    counter = metrics.MetricsRegistry().counter("absa_runs_total", "Runs", ("domain",))
+
+    with pytest.raises(ValueError):
+        counter.inc(status="done")
+
+
+def test_registering_the_same_name_returns_the_existing_metric():
+    registry = metrics.MetricsRegistry()
+
+    first = registry.counter("absa_runs_total", "Runs")
+    assert registry.counter("absa_runs_total", "Runs") is first
+
+
+def test_collectors_render_as_gauges_and_failures_are_skipped():
+    registry = metrics.MetricsRegistry()
+
+    @registry.register_collector
+    def pool():
+        return [
+            ("absa_db_pool_connections", "Pool connections", {"state": "idle"}, 3),
+            ("absa_db_pool_connections", "Pool connections", {"state": "busy"}, 1),
+        ]
+
+    @registry.register_collector
+    def broken():
+        raise RuntimeError("DB 풀 없음")
+
+    assert _lines(registry) == [
+        "# HELP absa_db_pool_connections Pool connections",
+        "# TYPE absa_db_pool_connections gauge",
+        'absa_db_pool_connections{state="idle"} 3',
+        'absa_db_pool_connections{state="busy"} 1',
+    ]
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+# app.models 패키지가 모델 레지스트리(torch 등)를 import하므로 의존성이 없으면 건너뜀
+result_cache = pytest.importorskip("app.models.result_cache")
+
+
+class CountingModel:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return [{"label": text.upper()} for text in texts]
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = result_cache.ResultCache(path=str(tmp_path / "results.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def _disk_keys(cache):
+    return {row[0] for row in cache._db.execute("SELECT key FROM results")}
+
+
+def test_normalized_text_is_analyzed_once_and_keeps_original_text(make_cache):
+    cache = make_cache()
+    model = CountingModel()
+
+    outputs = cache.analyze("steam", "sig", ["좋아요  최고", " 좋아요 최고", "좋아요　최고 "], model)
+
+    assert model.seen == ["좋아요  최고"]
+    assert [o["text"] for o in outputs] == ["좋아요  최고", " 좋아요 최고", "좋아요　최고 "]
+    assert {o["label"] for o in outputs} == {"좋아요  최고".upper()}
+    assert cache.stats()["misses"] == 1
+
+
+def test_signature_and_variant_are_part_of_the_key(make_cache):
+    cache = make_cache()
+    model = CountingModel()
+
+    cache.analyze("steam", "sig", ["text"], model, "threshold=0.35")
+    cache.analyze("steam", "sig", ["text"], model, "threshold=0.5")
+    cache.analyze("steam", "new-model", ["text"], model, "threshold=0.35")
+    cache.analyze("cosmetics", "sig", ["text"], model, "threshold=0.35")
+    cache.analyze("steam", "sig", ["text"], model, "threshold=0.35")
+
+    assert model.seen == ["text"] * 4
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_results_survive_restart_from_disk(make_cache):
+    model = CountingModel()
+    make_cache().analyze("steam", "sig", ["a", "b"], model)
+
+    cache = make_cache(memory_items=1)
+    outputs = cache.analyze("steam", "sig", ["b", "a", "c"], model)
+
+    assert model.seen == ["a", "b", "c"]
+    assert [o["label"] for o in outputs] == ["B", "A", "C"]
+    assert cache.stats()["disk_hits"] == 2
+    assert cache.stats()["memory_items"] == 1
+
+
+def test_eviction_drops_least_recently_used_rows(make_cache, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(clock))
+    cache = make_cache(memory_items=100, max_rows=10)
+    model = CountingModel()
+
+    cache.analyze("steam", "current", [f"hot {i}" for i in range(5)], model)
+    cache.analyze("steam", "old-model", [f"old {i}" for i in range(5)], model)
+    cache.analyze("steam", "current", ["hot 0", "hot 1"], model)              # 메모리 적중도 사용 시각 갱신
+    cache.analyze("steam", "current", [f"new {i}" for i in range(4)], model)  # 14행 → 상한 10 + 여유 1까지 제거
+
+    def keys(signature, prefix, ids):
+        return {result_cache._cache_key("steam", signature, "", f"{prefix} {i}") for i in ids}
+
+    kept = _disk_keys(cache)
+    assert keys("current", "hot", (0, 1)) <= kept            # 먼저 저장됐어도 최근에 쓴 행은 남음
+    assert not keys("current", "hot", (2, 3, 4)) & kept
+    assert keys("current", "new", range(4)) <= kept
+    assert cache.stats()["evicted"] == 5
+    assert cache.stats()["disk_items"] == 9
+
+
+def test_cache_file_without_accessed_at_is_upgraded(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE results (key TEXT PRIMARY KEY, domain TEXT NOT NULL, model_sig TEXT NOT NULL, "
+        "result TEXT NOT NULL, created_at REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO results VALUES ('k', 'steam', 'sig', '{}', 42.0)")
+    db.commit()
+    db.close()
+
+    cache = result_cache.ResultCache(path=str(path))
+    try:
+        assert cache._db.execute("SELECT accessed_at FROM results WHERE key = 'k'").fetchone()[0] == 42.0
+    finally:
+        cache.close()
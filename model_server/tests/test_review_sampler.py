@@ -0,0 +1,74 @@
+import pytest
+
+sampler = pytest.importorskip("utils.review_sampler")
+
+BATTERY_GOOD = "배터리가 정말 오래가서 하루 종일 충전 없이 사용했어요"
+BATTERY_BAD = "배터리가 반나절도 못 버티고 금방 방전돼서 실망했습니다"
+SCREEN_GOOD = "화면이 선명하고 밝아서 야외에서도 영상 보기 좋네요"
+SCREEN_BAD = "액정에 빛샘이 심하고 색감이 누렇게 떠서 교환 요청함"
+
+
+def _row(review_id, text, keyword=None, sentiment=None):
+    return {"review_id": review_id, "review_text": text, "keyword_text": keyword, "sentiment": sentiment}
+
+
+def test_near_duplicate_reviews_are_sampled_once():
+    rows = [
+        _row(1, BATTERY_GOOD, "배터리", "positive"),
+        _row(2, BATTERY_GOOD + "!!", "배터리", "positive"),   # 기호만 다른 복붙 리뷰
+        _row(3, "  " + BATTERY_GOOD.replace(" ", "  "), "배터리", "positive"),
+    ]
+
+    sample = sampler.select_representative_reviews(rows, {"배터리": {"positive": 3}})
+
+    assert sample["by_keyword"] == {"배터리": {"positive": [BATTERY_GOOD]}}
+    assert sample["stats"]["candidates"] == 3
+    assert sample["stats"]["near_duplicates"] == 2
+    assert sample["stats"]["selected"] == 1
+
+
+def test_review_mentioning_several_keywords_is_used_once():
+    rows = [
+        _row(1, BATTERY_GOOD + " 화면도 만족", "배터리", "positive"),
+        _row(1, BATTERY_GOOD + " 화면도 만족", "화면", "positive"),
+        _row(2, SCREEN_GOOD, "화면", "positive"),
+    ]
+
+    sample = sampler.select_representative_reviews(rows, {"배터리": {}, "화면": {}})
+
+    picked = [text for kw in sample["by_keyword"].values() for texts in kw.values() for text in texts]
+    assert len(picked) == len(set(picked)) == 2
+    assert sample["stats"]["candidates"] == 2
+
+
+def test_token_budget_covers_every_keyword_before_second_samples():
+    rows = [
+        _row(1, BATTERY_BAD, "배터리", "negative"),
+        _row(2, "충전기를 꽂아도 배터리 잔량이 제대로 안 올라가요", "배터리", "negative"),
+        _row(3, SCREEN_BAD, "화면", "negative"),
+    ]
+    one_each = sampler.estimate_tokens(BATTERY_BAD) + sampler.estimate_tokens(SCREEN_BAD)
+
+    sample = sampler.select_representative_reviews(rows, {"배터리": {}, "화면": {}}, token_budget=one_each)
+
+    assert sample["by_keyword"] == {"배터리": {"negative": [BATTERY_BAD]}, "화면": {"negative": [SCREEN_BAD]}}
+    assert sample["stats"]["keywords_covered"] == 2
+    assert sample["stats"]["estimated_tokens"] <= one_each
+
+
+def test_product_without_analysis_gets_general_samples():
+    rows = [_row(1, BATTERY_GOOD), _row(2, SCREEN_BAD)]
+
+    sample = sampler.select_representative_reviews(rows, {})
+
+    assert sample["by_keyword"] == {}
+    assert sorted(sample["general"]) == sorted([BATTERY_GOOD, SCREEN_BAD])
+
+
+def test_long_review_is_excerpted(monkeypatch):
+    monkeypatch.setattr(sampler, "INSIGHT_SAMPLE_MAX_CHARS", 10)
+
+    sample = sampler.select_representative_reviews([_row(1, BATTERY_GOOD, "배터리", "positive")], {"배터리": {}})
+
+    excerpt = sample["by_keyword"]["배터리"]["positive"][0]
+    assert len(excerpt) <= 10 and excerpt.endswith("…")
@@ -0,0 +1,152 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+# app.models 패키지가 모델 레지스트리(torch 등)를 import하므로 의존성이 없으면 건너뜀
+scheduler_module = pytest.importorskip("app.models.scheduler")
+
+
+def _inline_inference(fn, *args, **kwargs):
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class RecordingModel:
+    """호출마다 받은 텍스트를 기록, gate가 있으면 첫 호출에서 열릴 때까지 대기"""
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.batch_sizes = []
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def __call__(self, texts, debug=False, batch_size=16):
+        self.calls.append(list(texts))
+        self.batch_sizes.append(batch_size)
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [f"결과:{t}" for t in texts]
+
+
+@pytest.fixture(autouse=True)
+def inline_inference(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "submit_inference", _inline_inference)
+
+
+def test_results_are_split_per_request():
+    model = RecordingModel()
+    scheduler = scheduler_module.InferenceScheduler("test", model, max_batch_reviews=16, max_wait_ms=500)
+    try:
+        first = scheduler.submit(["a", "b"])
+        second = scheduler.submit(["c"])
+        third = scheduler.submit(["d", "e", "f"])
+
+        assert first.result(5) == ["결과:a", "결과:b"]
+        assert second.result(5) == ["결과:c"]
+        assert third.result(5) == ["결과:d", "결과:e", "결과:f"]
+        assert model.calls == [["a", "b", "c", "d", "e", "f"]]
+    finally:
+        scheduler.shutdown()
+
+
+def test_request_over_cap_is_carried_to_next_batch():
+    gate = threading.Event()
+    model = RecordingModel(gate)
+    scheduler = scheduler_module.InferenceScheduler("test", model, max_batch_reviews=4, max_wait_ms=200)
+    try:
+        blocker = scheduler.submit(["x"])
+        assert model.entered.wait(5)   # 첫 배치가 실행 중인 동안 나머지가 큐에 쌓임
+
+        r1 = scheduler.submit(["a", "b", "c"])
+        r2 = scheduler.submit(["d", "e"])
+        r3 = scheduler.submit(["f"])
+        gate.set()
+
+        assert r1.result(5) == ["결과:a", "결과:b", "결과:c"]
+        assert r2.result(5) == ["결과:d", "결과:e"]
+        assert r3.result(5) == ["결과:f"]
+        assert blocker.result(5) == ["결과:x"]
+        assert model.calls == [["x"], ["a", "b", "c"], ["d", "e", "f"]]
+    finally:
+        scheduler.shutdown()
+
+
+def test_single_oversized_request_runs_whole():
+    model = RecordingModel()
+    scheduler = scheduler_module.InferenceScheduler("test", model, max_batch_reviews=2, max_wait_ms=0)
+    try:
+        assert scheduler.analyze(["a", "b", "c"], timeout=5) == ["결과:a", "결과:b", "결과:c"]
+        assert model.calls == [["a", "b", "c"]]
+    finally:
+        scheduler.shutdown()
+
+
+def test_model_error_fails_every_request_in_batch():
+    def broken(texts, debug=False, batch_size=16):
+        raise ValueError("모델 오류")
+
+    scheduler = scheduler_module.InferenceScheduler("test", broken, max_batch_reviews=16, max_wait_ms=200)
+    try:
+        futures = [scheduler.submit(["a"]), scheduler.submit(["b"])]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(5)
+        assert scheduler.stats()["queued_reviews"] == 0
+    finally:
+        scheduler.shutdown()
+
+
+def test_shutdown_resolves_carried_and_rejects_new_requests():
+    gate = threading.Event()
+    model = RecordingModel(gate)
+    scheduler = scheduler_module.InferenceScheduler("test", model, max_batch_reviews=2, max_wait_ms=1000)
+
+    blocker = scheduler.submit(["x"])
+    assert model.entered.wait(5)
+    queued = [scheduler.submit(["a"]), scheduler.submit(["b", "c"])]
+    threading.Timer(0.1, gate.set).start()
+    scheduler.shutdown()
+
+    assert blocker.result(5) == ["결과:x"]
+    for future in queued:
+        assert future.done()   # 처리됐거나 종료 예외로 완료 (무한 대기 없음)
+    with pytest.raises(RuntimeError):
+        scheduler.submit(["late"]).result(1)
+    assert scheduler.stats()["queued_reviews"] == 0
+
+
+def test_fail_pending_fails_carry_and_queue():
+    scheduler = scheduler_module.InferenceScheduler("test", RecordingModel())
+    scheduler.shutdown()
+
+    carried = scheduler_module._Request(["a"])
+    queued = scheduler_module._Request(["b"])
+    scheduler._carry = carried
+    scheduler._queue.put(queued)
+    scheduler._queue.put(None)
+    scheduler._fail_pending()
+
+    for request in (carried, queued):
+        with pytest.raises(RuntimeError):
+            request.future.result(1)
+    assert scheduler._carry is None
+    assert scheduler._queue.empty()
+
+
+def test_get_scheduler_passes_domain_batch_size(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "_schedulers", {})
+    model = RecordingModel()
+    scheduler = scheduler_module.get_scheduler("test", model, batch_size=128)
+    try:
+        assert scheduler_module.get_scheduler("test", model) is scheduler
+        scheduler.analyze(["a"], timeout=5)
+        assert model.batch_sizes == [128]
+        assert scheduler.stats()["batch_size"] == 128
+    finally:
+        scheduler_module.shutdown_schedulers()
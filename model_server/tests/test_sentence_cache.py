@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+# app.models 패키지가 모델 레지스트리(torch 등)를 import하므로 의존성이 없으면 건너뜀
+sentence_cache = pytest.importorskip("app.models.sentence_cache")
+
+
+def _probs(value=0.5, size=4):
+    return np.full(size, value, dtype=np.float32)
+
+
+def _entry_size(sentence="a", size=4):
+    return sentence_cache.SentenceProbCache._entry_size(sentence, _probs(size=size))
+
+
+def test_byte_budget_evicts_least_recently_used_sentence():
+    cache = sentence_cache.SentenceProbCache(max_bytes=_entry_size() * 2)
+
+    cache.put_many({"a": _probs(0.1), "b": _probs(0.2)})
+    assert set(cache.get_many(["a"])) == {"a"}      # a가 최근 사용 → b가 먼저 빠짐
+    cache.put_many({"c": _probs(0.3)})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    stats = cache.stats()
+    assert stats["items"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == _entry_size() * 2 <= stats["max_bytes"]
+
+
+def test_replacing_a_sentence_does_not_double_count_bytes():
+    cache = sentence_cache.SentenceProbCache(max_bytes=10_000)
+
+    cache.put_many({"a": _probs(0.1)})
+    cache.put_many({"a": _probs(0.9, size=8)})
+
+    assert cache.stats()["bytes"] == _entry_size(size=8)
+    assert cache.get_many(["a"])["a"][0] == pytest.approx(0.9)
+
+
+def test_entry_larger_than_budget_is_not_kept():
+    cache = sentence_cache.SentenceProbCache(max_bytes=_entry_size() - 1)
+
+    cache.put_many({"a": _probs()})
+
+    assert cache.get_many(["a"]) == {}
+    assert cache.stats()["bytes"] == 0
+
+
+def test_stored_probabilities_do_not_keep_the_batch_array():
+    batch = np.zeros((2, 4), dtype=np.float64)
+    cache = sentence_cache.SentenceProbCache(max_bytes=10_000)
+
+    cache.put_many({"a": batch[0], "b": batch[1]})
+    batch[:] = 1.0
+
+    stored = cache.get_many(["a"])["a"]
+    assert stored.dtype == np.float32
+    assert stored.base is None
+    assert not stored.any()
+
+
+def test_hit_rate_counts_each_lookup():
+    cache = sentence_cache.SentenceProbCache(max_bytes=10_000)
+    cache.put_many({"a": _probs()})
+
+    cache.get_many(["a", "a", "b"])   # 같은 요청 안의 중복 문장은 한 번만 셈
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
@@ -0,0 +1,34 @@
+from utils.stopword_matcher import AhoCorasick, StopwordMatcher, product_terms
+
+
+def test_aho_corasick_follows_failure_links():
+    automaton = AhoCorasick(["abcd", "bc", "aab"])
+
+    assert automaton.contains_any("xabce")   # "abc"에서 실패 링크로 "bc" 종결 상태 도달
+    assert automaton.contains_any("aaab")    # "aa" 다음 "a"에서 되돌아가야 찾음
+    assert not automaton.contains_any("abdc")
+    assert not automaton.contains_any("")
+
+
+def test_matcher_exact_and_substring_rules():
+    matcher = StopwordMatcher(["게임", "진짜", "x", ""])
+
+    assert matcher.is_stopword("게임")
+    assert matcher.is_stopword("게임성")      # 길이 2 이상 불용어는 포함만 돼도 제거
+    assert matcher.is_stopword("x")
+    assert not matcher.is_stopword("xbox")   # 한 글자 불용어는 정확히 일치할 때만
+    assert not matcher.is_stopword("그래픽")
+    assert len(matcher) == 3
+
+
+def test_with_terms_layers_request_terms_over_domain_matcher():
+    base = StopwordMatcher(["게임"])
+    terms = product_terms("엘든 링 디럭스", "프롬")
+    matcher = base.with_terms(terms)
+
+    assert terms == {"엘든", "디럭스", "엘든 링 디럭스", "프롬"}
+    assert matcher.is_stopword("엘든링")
+    assert matcher.is_stopword("게임플레이")
+    assert not base.is_stopword("엘든")       # 도메인 매처는 그대로
+    assert base.with_terms([]) is base
+    assert len(matcher) == len(base) + len(terms)
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+wordcloud_jobs = pytest.importorskip("utils.wordcloud_jobs")
+
+
+class GatedRenderer:
+    """렌더링 호출을 기록, gate가 열릴 때까지 첫 렌더링을 붙잡아 둠"""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, product_id, domain):
+        self.calls.append((product_id, domain))
+        self.started.set()
+        self.gate.wait(5)
+        return f"/static/wordclouds/{product_id}.png"
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = GatedRenderer()
+    monkeypatch.setattr(wordcloud_jobs, "generate_wordcloud_from_db", renderer)
+    monkeypatch.setattr(wordcloud_jobs, "ensure_review_tokens", lambda product_id: 0)
+    monkeypatch.setattr(wordcloud_jobs, "observe_stage", lambda *args: None)
+    return renderer
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_requests_for_queued_product_are_coalesced(renderer):
+    jobs = wordcloud_jobs.WordcloudJobQueue(workers=1)
+    try:
+        jobs.enqueue(1, "steam")          # 워커가 1번 제품을 붙잡고 있는 동안
+        assert renderer.started.wait(5)
+        jobs.enqueue(2, "steam")
+        jobs.enqueue(2, "steam")
+        status = jobs.enqueue(2, "cosmetics")
+
+        assert status["state"] == wordcloud_jobs.QUEUED
+        assert status["coalesced"] == 2
+        assert jobs.stats()["queued"] == 1
+
+        renderer.gate.set()
+        assert _wait_for(lambda: jobs.status(2)["state"] == wordcloud_jobs.DONE)
+        assert renderer.calls == [(1, "steam"), (2, "cosmetics")]
+        assert jobs.stats()["coalesced"] == 2
+    finally:
+        jobs.close(timeout=5)
+
+
+def test_request_while_running_reruns_once(renderer):
+    jobs = wordcloud_jobs.WordcloudJobQueue(workers=1)
+    try:
+        jobs.enqueue(1, "steam")
+        assert renderer.started.wait(5)
+        first = jobs.enqueue(1, "steam")
+        jobs.enqueue(1, "steam")
+
+        assert first["state"] == wordcloud_jobs.RUNNING
+        assert first["rerun_pending"]
+
+        renderer.gate.set()
+        assert _wait_for(lambda: len(renderer.calls) == 2 and jobs.status(1)["state"] == wordcloud_jobs.DONE)
+        time.sleep(0.05)
+        assert renderer.calls == [(1, "steam"), (1, "steam")]
+        assert not jobs.status(1)["rerun_pending"]
+        assert jobs.stats()["completed"] == 2
+    finally:
+        jobs.close(timeout=5)
+
+
+def test_failed_render_is_reported(renderer, monkeypatch):
+    def broken(product_id, domain):
+        raise RuntimeError("렌더링 실패")
+
+    monkeypatch.setattr(wordcloud_jobs, "generate_wordcloud_from_db", broken)
+    jobs = wordcloud_jobs.WordcloudJobQueue(workers=1)
+    try:
+        jobs.enqueue(3, "steam")
+        assert _wait_for(lambda: jobs.status(3)["state"] == wordcloud_jobs.FAILED)
+        assert jobs.status(3)["error"] == "렌더링 실패"
+        assert jobs.stats()["failed"] == 1
+    finally:
+        jobs.close(timeout=5)
+
+
+def test_render_request_does_not_tokenize_pending_reviews(monkeypatch):
+    render_module = pytest.importorskip("utils.generate_wordcloud_from_db")
+
+    class Conn:
+        def cursor(self):
+            return self
+
+        def close(self):
+            pass
+
+    class EmptyCache:
+        def path(self, key):
+            return None
+
+        def put(self, key, png):
+            pass
+
+    rendered = []
+    monkeypatch.setattr(render_module, "get_connection", Conn)
+    monkeypatch.setattr(render_module, "compute_wordcloud_key", lambda *args: ("key", "상품", "브랜드", "font.ttf"))
+    monkeypatch.setattr(render_module, "get_wordcloud_cache", EmptyCache)
+    monkeypatch.setattr(render_module, "count_pending", lambda cursor, product_id: 3)
+    monkeypatch.setattr(render_module, "ensure_review_tokens", lambda *args, **kwargs: pytest.fail("요청 경로에서 토큰화"))
+    monkeypatch.setattr(render_module, "render_wordcloud_png", lambda *args: rendered.append(args) or b"png")
+
+    with pytest.raises(render_module.TokensPending) as pending:
+        render_module.get_wordcloud_png(1, "steam")
+    assert pending.value.pending == 3
+    assert rendered == []
+
+    # 워드클라우드 작업은 토큰화 이후 저장된 토큰만으로 렌더링
+    assert render_module.get_wordcloud_png(1, "steam", allow_pending=True) == ("key", b"png")
@@ -0,0 +1,802 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import pymysql
+from dotenv import load_dotenv
+
+from utils.analysis_pipeline import MultiProductAnalysis, StreamingAnalysis
+from utils.db_connect import get_connection
+from utils.executors import run_io
+
+load_dotenv()
+
+# =========================================================
+# 내구성 있는 제품 분석 작업 (tb_analysisJob)
+# - 분석은 HTTP 응답과 분리된 백그라운드 태스크로 실행, SSE 클라이언트는 구독자일 뿐
+#   → 클라이언트 연결이 끊겨도 분석은 계속되고 GET /v1/analysis/jobs/{job_id}/events로 다시 붙을 수 있음
+# - 작업 범위: 처음 시작할 때의 미분석 리뷰 (max_review_id까지, 이후 들어온 리뷰는 다음 분석에서 처리)
+# - 체크포인트: 페이지 결과(tb_reviewAnalysis)와 진행 상황(analyzed, last_review_id)을 같은 트랜잭션으로 커밋
+# - 재개: 작업 중인 워커는 ANALYSIS_JOB_HEARTBEAT_SEC마다 heartbeat 갱신
+#   · 서버 종료 시 소유권을 반납하고, 비정상 종료면 ANALYSIS_JOB_STALE_SEC 뒤 만료
+#   · 다른(또는 재시작한) 워커가 주기적으로 만료된 작업을 가져가 last_review_id 다음 리뷰부터 재개
+#   → 커밋된 리뷰는 다시 추론하지 않음, ANALYSIS_JOB_MAX_ATTEMPTS번 넘게 중단되면 실패 처리
+# - 단계: analysis (체크포인트에서 재개) → post (인사이트/대시보드/워드클라우드, 재개 시 처음부터)
+# - 작업 본문(이벤트 dict를 yield하는 async generator)은 init_analysis_jobs(runner)로 등록 (app/api/v1/routes.py)
+# - 여러 제품 분석(POST /v1/products/reviews/analysis)도 제품마다 작업 행을 확보하고 제품별로 체크포인트
+#   → 중단되면 각 제품 작업이 위와 같은 방식(runner)으로 따로 재개됨
+# - 제품당 활성 작업 1개: 프로세스 안에서는 _start_lock, 워커 사이에서는 uq_aj_active_product (database/schema.sql)
+#   → 다른 워커가 먼저 만들었으면 INSERT가 중복 키로 실패 → JobAlreadyActive (409)
+# =========================================================
+ANALYSIS_JOB_HEARTBEAT_SEC = float(os.getenv("ANALYSIS_JOB_HEARTBEAT_SEC", 10))
+ANALYSIS_JOB_STALE_SEC = int(os.getenv("ANALYSIS_JOB_STALE_SEC", 45))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", 3))
+ANALYSIS_JOB_EVENT_BUFFER = int(os.getenv("ANALYSIS_JOB_EVENT_BUFFER", 1000))  # 재접속 시 다시 보내는 이벤트 수
+_MAX_FINISHED_JOBS = 50
+
+# 이 프로세스의 작업 소유자 ID (재시작하면 바뀜)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+STAGE_ANALYSIS, STAGE_POST = "analysis", "post"
+
+_JOB_COLUMNS = """
+    job_id, product_id, domain, status, stage, total, analyzed, written, last_review_id, max_review_id,
+    attempts, owner, progress, message, result, error, created_at, updated_at, heartbeat_at
+"""
+_ACTIVE = f"status IN ('{QUEUED}', '{RUNNING}')"
+_CLAIMABLE = f"{_ACTIVE} AND (owner IS NULL OR heartbeat_at < NOW() - INTERVAL %s SECOND)"
+
+
+_DUPLICATE_KEY = 1062   # MySQL ER_DUP_ENTRY
+
+
+class JobOwnershipLost(Exception):
+    """다른 워커가 작업을 가져감 → 이 워커는 쓰기 없이 중단"""
+
+
+class JobAlreadyActive(RuntimeError):
+    """같은 제품의 활성 작업이 이미 있음 (다른 워커가 먼저 생성, uq_aj_active_product 위반)"""
+
+
+# ---------------------------------------------------------
+# tb_analysisJob (블로킹, io 실행기에서 실행)
+# ---------------------------------------------------------
+def _on_cursor(fn, *args):
+    """풀에서 연결을 받아 fn(cursor, *args) 실행 후 반납 (풀 연결은 autocommit)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            return fn(cursor, *args)
+    finally:
+        conn.close()
+
+
+def _load_job(cursor, job_id: str) -> Optional[Dict[str, Any]]:
+    cursor.execute(f"SELECT {_JOB_COLUMNS} FROM tb_analysisJob WHERE job_id = %s", (job_id,))
+    return cursor.fetchone()
+
+
+def _active_job_for_product(cursor, product_id: int) -> Optional[Dict[str, Any]]:
+    cursor.execute(
+        f"""
+        SELECT {_JOB_COLUMNS}
+        FROM tb_analysisJob
+        WHERE product_id = %s AND {_ACTIVE}
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+        (product_id,),
+    )
+    return cursor.fetchone()
+
+
+def _insert_job(
+    cursor, product_id: int, domain: Optional[str], total: Optional[int] = None, max_review_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """새 작업 (total/max_review_id를 모르면 init_job_scope에서 확정)"""
+    job_id = uuid.uuid4().hex
+    try:
+        cursor.execute(
+            f"""
+            INSERT INTO tb_analysisJob (job_id, product_id, domain, status, stage, total, max_review_id, attempts, owner, heartbeat_at)
+            VALUES (%s, %s, %s, '{RUNNING}', '{STAGE_ANALYSIS}', %s, %s, 1, %s, NOW())
+            """,
+            (job_id, product_id, domain, total, max_review_id, WORKER_ID),
+        )
+    except pymysql.err.IntegrityError as e:
+        if e.args and e.args[0] == _DUPLICATE_KEY:
+            raise JobAlreadyActive(f"이미 분석 중인 작업이 있습니다 (product_id={product_id})") from e
+        raise
+    return _load_job(cursor, job_id)
+
+
+def _claim_job(cursor, job_id: str) -> Optional[Dict[str, Any]]:
+    """소유자가 없거나 heartbeat가 만료된 작업을 이 워커로 가져옴 (다른 워커와 경쟁해도 한 곳만 성공)"""
+    cursor.execute(
+        f"""
+        UPDATE tb_analysisJob
+        SET owner = %s, status = '{RUNNING}', attempts = attempts + 1, heartbeat_at = NOW()
+        WHERE job_id = %s AND {_CLAIMABLE}
+        """,
+        (WORKER_ID, job_id, ANALYSIS_JOB_STALE_SEC),
+    )
+    return _load_job(cursor, job_id) if cursor.rowcount else None
+
+
+def _claimable_jobs(cursor, limit: int = 20) -> List[str]:
+    cursor.execute(
+        f"SELECT job_id FROM tb_analysisJob WHERE {_CLAIMABLE} ORDER BY created_at LIMIT %s",
+        (ANALYSIS_JOB_STALE_SEC, limit),
+    )
+    return [row["job_id"] for row in cursor.fetchall()]
+
+
+def _heartbeat(cursor, job_id: str, progress: int, message: Optional[str]) -> bool:
+    """heartbeat 갱신, 소유권을 잃었으면 False"""
+    cursor.execute(
+        """
+        UPDATE tb_analysisJob
+        SET heartbeat_at = NOW(), progress = %s, message = %s
+        WHERE job_id = %s AND owner = %s
+        """,
+        (progress, (message or "")[:255], job_id, WORKER_ID),
+    )
+    return cursor.rowcount > 0
+
+
+def _finish_job(cursor, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str], owner: str = None):
+    """작업 종료 기록 (owner를 주면 그 워커가 소유한 경우에만), 기록했으면 True"""
+    cursor.execute(
+        """
+        UPDATE tb_analysisJob
+        SET status = %s, progress = %s, result = %s, error = %s, owner = NULL
+        WHERE job_id = %s AND (%s IS NULL OR owner = %s)
+        """,
+        (
+            status,
+            100 if status == COMPLETED else 0,
+            json.dumps(result, ensure_ascii=False) if result else None,
+            error,
+            job_id,
+            owner,
+            owner,
+        ),
+    )
+    return cursor.rowcount > 0
+
+
+def _release_job(cursor, job_id: str):
+    """서버 종료 시 소유권 반납 → 다음에 시작한 워커가 바로 재개"""
+    cursor.execute(
+        "UPDATE tb_analysisJob SET owner = NULL, heartbeat_at = NULL WHERE job_id = %s AND owner = %s",
+        (job_id, WORKER_ID),
+    )
+
+
+def _product_scopes(cursor, product_ids) -> Dict[int, Tuple[int, int]]:
+    """제품별 작업 범위 {product_id: (미분석 리뷰 수, 최대 review_id)} (쿼리 1회, 리뷰가 없는 제품은 (0, 0))"""
+    placeholders = ",".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"""
+        SELECT
+            r.product_id,
+            COALESCE(MAX(r.review_id), 0) AS max_review_id,
+            COALESCE(SUM(NOT EXISTS (SELECT 1 FROM tb_reviewAnalysis ra WHERE ra.review_id = r.review_id)), 0) AS total
+        FROM tb_review r
+        WHERE r.product_id IN ({placeholders})
+        GROUP BY r.product_id
+        """,
+        list(product_ids),
+    )
+    scopes = {row["product_id"]: (int(row["total"]), row["max_review_id"]) for row in cursor.fetchall()}
+    return {product_id: scopes.get(product_id, (0, 0)) for product_id in product_ids}
+
+
+def _set_scope(cursor, job_id: str, domain: Optional[str], total: int, max_review_id: int) -> bool:
+    cursor.execute(
+        "UPDATE tb_analysisJob SET domain = %s, total = %s, max_review_id = %s WHERE job_id = %s AND owner = %s",
+        (domain, total, max_review_id, job_id, WORKER_ID),
+    )
+    return cursor.rowcount > 0
+
+
+def _set_stage(cursor, job_id: str, stage: str) -> bool:
+    cursor.execute("UPDATE tb_analysisJob SET stage = %s WHERE job_id = %s AND owner = %s", (stage, job_id, WORKER_ID))
+    return cursor.rowcount > 0
+
+
+def init_job_scope(conn, cursor, job, domain: str) -> Tuple[int, int]:
+    """처음 시작한 작업의 범위 확정 (미분석 리뷰 수, 최대 review_id), 재개한 작업은 저장된 범위 사용"""
+    if job.row["total"] is None:
+        total, max_review_id = _product_scopes(cursor, [job.product_id])[job.product_id]
+        owned = _set_scope(cursor, job.job_id, domain, total, max_review_id)
+        conn.commit()
+        if not owned:
+            raise JobOwnershipLost(job.job_id)
+        job.row.update(domain=domain, total=total, max_review_id=max_review_id)
+    return job.row["total"], job.row["max_review_id"]
+
+
+def set_job_stage(conn, cursor, job, stage: str):
+    owned = _set_stage(cursor, job.job_id, stage)
+    conn.commit()
+    if not owned:
+        raise JobOwnershipLost(job.job_id)
+    job.row["stage"] = stage
+
+
+# ---------------------------------------------------------
+# 여러 제품 분석용 작업 (블로킹, io 실행기에서 실행)
+# ---------------------------------------------------------
+def acquire_product_jobs(
+    cursor, domains: Dict[int, str]
+) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, Any]], List[int]]:
+    """
+    제품마다 분석 작업 행 확보 {product_id: domain} → (jobs, busy, empty)
+    - jobs : 이 워커가 소유한 작업 행 (중단된 작업은 가져와서 체크포인트부터, 없으면 새로 생성)
+    - busy : 다른 요청/워커가 실행 중인 작업 행 (건너뜀)
+    - empty: 분석할 새 리뷰가 없는 제품 (작업을 만들지 않음)
+    """
+    product_ids = list(domains)
+    placeholders = ",".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"SELECT {_JOB_COLUMNS} FROM tb_analysisJob WHERE product_id IN ({placeholders}) AND {_ACTIVE} ORDER BY created_at",
+        product_ids,
+    )
+    active = {row["product_id"]: row for row in cursor.fetchall()}   # 제품별 가장 최근 작업
+
+    jobs, busy = {}, {}
+    for product_id, row in active.items():
+        claimed = _claim_job(cursor, row["job_id"])
+        if claimed is None:
+            busy[product_id] = row
+        elif claimed["attempts"] > ANALYSIS_JOB_MAX_ATTEMPTS:
+            _finish_job(cursor, claimed["job_id"], FAILED, None, f"{ANALYSIS_JOB_MAX_ATTEMPTS}회 넘게 중단되어 실패 처리", WORKER_ID)
+            _counters["failed"] += 1
+        else:
+            jobs[product_id] = claimed
+
+    # 범위가 정해지지 않은 작업(범위 확정 전에 중단) + 새로 만들 작업의 범위 (쿼리 1회)
+    unscoped = [pid for pid in product_ids if pid not in busy and (pid not in jobs or jobs[pid]["total"] is None)]
+    scopes = _product_scopes(cursor, unscoped) if unscoped else {}
+    empty = []
+    for product_id in unscoped:
+        total, max_review_id = scopes[product_id]
+        row = jobs.get(product_id)
+        if row is not None:
+            if not total:
+                _finish_job(cursor, row["job_id"], COMPLETED, None, None, WORKER_ID)
+                del jobs[product_id]
+                empty.append(product_id)
+            elif _set_scope(cursor, row["job_id"], row["domain"] or domains[product_id], total, max_review_id):
+                row.update(domain=row["domain"] or domains[product_id], total=total, max_review_id=max_review_id)
+            else:
+                busy[product_id] = jobs.pop(product_id)
+        elif not total:
+            empty.append(product_id)
+        else:
+            try:
+                jobs[product_id] = _insert_job(cursor, product_id, domains[product_id], total, max_review_id)
+            except JobAlreadyActive:
+                # 확인과 생성 사이에 다른 워커가 먼저 만듦
+                busy[product_id] = _active_job_for_product(cursor, product_id) or {"job_id": None, "owner": None}
+                continue
+            _counters["started"] += 1
+    _counters["resumed"] += sum(1 for row in jobs.values() if row["attempts"] > 1)
+    return jobs, busy, empty
+
+
+def advance_job_stage(job_id: str, stage: str) -> bool:
+    """단계 기록 (소유권을 잃었으면 False)"""
+    return _on_cursor(_set_stage, job_id, stage)
+
+
+def finish_product_job(job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+    """종료 기록 (이 워커가 소유한 경우에만)"""
+    _counters["completed" if status == COMPLETED else "failed"] += 1
+    return _on_cursor(_finish_job, job_id, status, result, error, WORKER_ID)
+
+
+def release_product_jobs(job_ids: List[str]):
+    """소유권 반납 → 만료를 기다리지 않고 재개 루프가 바로 가져감"""
+    def release_all(cursor):
+        for job_id in job_ids:
+            _release_job(cursor, job_id)
+    _on_cursor(release_all)
+    _counters["released"] += len(job_ids)
+
+
+async def keep_jobs_alive(live: Dict[str, Dict[str, Any]]):
+    """
+    live = {job_id: 마지막 이벤트} 작업들의 heartbeat 갱신 (취소할 때까지)
+    소유권을 잃은 작업은 live에서 빠지고, 그 작업의 다음 체크포인트/종료 기록은 쓰이지 않음
+    """
+    while True:
+        await asyncio.sleep(ANALYSIS_JOB_HEARTBEAT_SEC)
+        for job_id, event in list(live.items()):
+            try:
+                owned = await run_io(_on_cursor, _heartbeat, job_id, event.get("progress", 0), event.get("message"))
+            except Exception as e:
+                print(f"⚠️ [AnalysisJob {job_id}] heartbeat 실패: {e}")
+                continue
+            if not owned:
+                print(f"⚠️ [AnalysisJob {job_id}] 다른 워커가 작업을 가져감")
+                live.pop(job_id, None)
+                _counters["lost"] += 1
+
+
+# ---------------------------------------------------------
+# 체크포인트 분석
+# ---------------------------------------------------------
+class CheckpointedAnalysis(StreamingAnalysis):
+    """
+    StreamingAnalysis + 작업 체크포인트
+    - last_review_id 다음부터 max_review_id까지의 미분석 리뷰만 읽음
+    - 페이지마다 tb_analysisJob 진행 상황을 결과와 같은 트랜잭션으로 갱신
+      (소유권을 잃었으면 갱신되는 행이 없음 → 페이지 롤백 후 JobOwnershipLost로 중단)
+    - 진행 이벤트의 analyzed/written은 이전 실행분을 포함한 작업 전체 기준
+    """
+
+    def __init__(self, job, pipeline, keyword_map: Dict[str, int]):
+        super().__init__(job.product_id, pipeline, keyword_map, job.row["total"])
+        self.job = job
+        self._resumed_from = {"analyzed": job.row["analyzed"], "written": job.row["written"]}
+
+    def _fetch_query(self):
+        return (
+            """
+            SELECT r.review_id, r.review_text
+            FROM tb_review r
+            WHERE r.product_id = %s AND r.review_id > %s AND r.review_id <= %s
+              AND NOT EXISTS (SELECT 1 FROM tb_reviewAnalysis ra WHERE ra.review_id = r.review_id)
+            ORDER BY r.review_id
+            """,
+            (self.job.product_id, self.job.row["last_review_id"], self.job.row["max_review_id"]),
+        )
+
+    def _before_commit(self, cursor, batch, written: int, added: List[int]):
+        cursor.execute(
+            """
+            UPDATE tb_analysisJob
+            SET analyzed = analyzed + %s, written = written + %s, last_review_id = %s, heartbeat_at = NOW()
+            WHERE job_id = %s AND owner = %s
+            """,
+            (len(batch), written, batch[-1][0]["review_id"], self.job.job_id, WORKER_ID),
+        )
+        if not cursor.rowcount:
+            raise JobOwnershipLost(self.job.job_id)
+
+    def _on_committed(self, batch, added) -> Dict[str, Any]:
+        with self._lock:
+            written = self.counters["written"]
+        self.job.row.update(
+            analyzed=self.job.row["analyzed"] + len(batch),
+            written=self._resumed_from["written"] + written,
+            last_review_id=batch[-1][0]["review_id"],
+        )
+        return {}
+
+    def _progress(self):
+        event = super()._progress()
+        event["analyzed"] += self._resumed_from["analyzed"]
+        event["written"] += self._resumed_from["written"]
+        return event
+
+
+class CheckpointedMultiAnalysis(MultiProductAnalysis):
+    """
+    MultiProductAnalysis + 제품별 작업 체크포인트
+    - 제품마다 자기 작업의 last_review_id 다음부터 max_review_id까지만 읽음
+    - 페이지에 포함된 제품마다 작업 진행 상황을 결과와 같은 트랜잭션으로 갱신
+      (한 제품이라도 소유권을 잃었으면 페이지 롤백 후 JobOwnershipLost로 중단, 나머지 제품 작업은 반납 후 재개)
+    - 제품별 analyzed/committed/written은 이전 실행분부터 이어서 셈
+    """
+
+    def __init__(self, domain: str, pipeline, products: Dict[int, Dict[str, Any]]):
+        # products = {product_id: {"job": 작업 행, "keyword_map": {...}}}
+        super().__init__(
+            domain,
+            pipeline,
+            {
+                product_id: {"total": p["job"]["total"] - p["job"]["analyzed"], "keyword_map": p["keyword_map"]}
+                for product_id, p in products.items()
+            },
+        )
+        self.jobs = {product_id: p["job"] for product_id, p in products.items()}
+        for product_id, row in self.jobs.items():
+            self.products[product_id].update(
+                analyzed=row["analyzed"], committed=row["analyzed"], written=row["written"], total=row["total"]
+            )
+
+    def _fetch_query(self):
+        ranges, params = [], []
+        for product_id, row in self.jobs.items():
+            ranges.append("(r.product_id = %s AND r.review_id > %s AND r.review_id <= %s)")
+            params += [product_id, row["last_review_id"], row["max_review_id"]]
+        return (
+            f"""
+            SELECT r.product_id, r.review_id, r.review_text
+            FROM tb_review r
+            WHERE ({" OR ".join(ranges)})
+              AND NOT EXISTS (SELECT 1 FROM tb_reviewAnalysis ra WHERE ra.review_id = r.review_id)
+            ORDER BY r.product_id, r.review_id
+            """,
+            params,
+        )
+
+    def _before_commit(self, cursor, batch, written: int, added: List[int]):
+        checkpoints = {}   # product_id → [리뷰 수, 저장 행 수, 마지막 review_id]
+        for (row, _), rows in zip(batch, added):
+            checkpoint = checkpoints.setdefault(row["product_id"], [0, 0, 0])
+            checkpoint[0] += 1
+            checkpoint[1] += rows
+            checkpoint[2] = row["review_id"]
+        for product_id, (count, rows, last_review_id) in checkpoints.items():
+            job_id = self.jobs[product_id]["job_id"]
+            cursor.execute(
+                """
+                UPDATE tb_analysisJob
+                SET analyzed = analyzed + %s, written = written + %s, last_review_id = %s, heartbeat_at = NOW()
+                WHERE job_id = %s AND owner = %s
+                """,
+                (count, rows, last_review_id, job_id, WORKER_ID),
+            )
+            if not cursor.rowcount:
+                raise JobOwnershipLost(job_id)
+
+    def _on_committed(self, batch, added) -> Dict[str, Any]:
+        for (row, _), rows in zip(batch, added):
+            job = self.jobs[row["product_id"]]
+            job.update(analyzed=job["analyzed"] + 1, written=job["written"] + rows, last_review_id=row["review_id"])
+        return super()._on_committed(batch, added)
+
+
+# ---------------------------------------------------------
+# 작업 (메모리: 이벤트 버퍼 + 구독자)
+# ---------------------------------------------------------
+class EventBuffer:
+    """최근 이벤트 버퍼 + 구독자 (구독이 끊겨도 생산자는 계속, 다시 구독하면 after 이후부터 전달)"""
+
+    def __init__(self):
+        self.finished = False
+        self.last_event: Dict[str, Any] = {}
+        self._events = deque(maxlen=ANALYSIS_JOB_EVENT_BUFFER)
+        self._seq = 0
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Dict[str, Any]):
+        self._seq += 1
+        self._events.append((self._seq, event))
+        self.last_event = event
+        self._notify()
+
+    def close(self):
+        self.finished = True
+        self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def events(self, after: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """after 이후 이벤트를 버퍼에서 보내고, 작업이 끝날 때까지 새 이벤트를 계속 전달 (구독 종료는 작업에 영향 없음)"""
+        while True:
+            changed = self._changed
+            for seq, event in list(self._events):
+                if seq > after:
+                    after = seq
+                    yield seq, event
+            if self.finished and after >= self._seq:
+                return
+            await changed.wait()
+
+
+class AnalysisJob(EventBuffer):
+    def __init__(self, row: Dict[str, Any]):
+        super().__init__()
+        self.row = row
+        self.job_id = row["job_id"]
+        self.product_id = row["product_id"]
+        # 이전 워커가 체크포인트를 남겼거나 두 번째 이상 시도
+        self.resumed = row["attempts"] > 1 or row["analyzed"] > 0
+        self.task: Optional[asyncio.Task] = None
+        self.lost = False          # heartbeat 중 다른 워커에게 소유권을 빼앗김
+
+    def publish(self, event: Dict[str, Any]):
+        super().publish({**event, "job_id": self.job_id})
+
+    def snapshot(self) -> Dict[str, Any]:
+        row = self.row
+        return {
+            "job_id": self.job_id,
+            "product_id": self.product_id,
+            "domain": row["domain"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "total": row["total"],
+            "analyzed": row["analyzed"],
+            "written": row["written"],
+            "last_review_id": row["last_review_id"],
+            "attempts": row["attempts"],
+            "resumed": self.resumed,
+            "owner": WORKER_ID,
+            "progress": self.last_event.get("progress", 0),
+            "message": self.last_event.get("message"),
+            "events": self._seq,
+        }
+
+
+def job_row_snapshot(row: Dict[str, Any]) -> Dict[str, Any]:
+    """DB 행 → 상태 응답 (다른 워커가 실행 중이거나 이미 끝난 작업)"""
+    snapshot = {
+        key: row[key]
+        for key in (
+            "job_id", "product_id", "domain", "status", "stage", "total", "analyzed", "written",
+            "last_review_id", "attempts", "owner", "progress", "message", "error",
+        )
+    }
+    snapshot["result"] = json.loads(row["result"]) if isinstance(row.get("result"), str) else row.get("result")
+    for key in ("created_at", "updated_at", "heartbeat_at"):
+        snapshot[key] = row[key].isoformat() if row.get(key) else None
+    return snapshot
+
+
+# ---------------------------------------------------------
+# 실행 / 재개
+# ---------------------------------------------------------
+_runner: Optional[Callable[[AnalysisJob], AsyncIterator[Dict[str, Any]]]] = None
+_jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+_start_lock: Optional[asyncio.Lock] = None
+_sweeper: Optional[asyncio.Task] = None
+_detached: set = set()   # start_detached로 실행 중인 태스크 (여러 제품 분석)
+_counters = {"started": 0, "resumed": 0, "completed": 0, "failed": 0, "released": 0, "lost": 0}
+
+
+async def _heartbeat_loop(job: AnalysisJob):
+    while True:
+        await asyncio.sleep(ANALYSIS_JOB_HEARTBEAT_SEC)
+        try:
+            owned = await run_io(
+                _on_cursor, _heartbeat, job.job_id, job.last_event.get("progress", 0), job.last_event.get("message")
+            )
+        except Exception as e:
+            print(f"⚠️ [AnalysisJob {job.job_id}] heartbeat 실패: {e}")
+            continue
+        if not owned:
+            print(f"⚠️ [AnalysisJob {job.job_id}] 다른 워커가 작업을 가져감 → 이 워커에서는 중단")
+            job.lost = True
+            job.task.cancel()
+            return
+
+
+async def _run(job: AnalysisJob):
+    heartbeat = asyncio.create_task(_heartbeat_loop(job))
+    status, result, error = FAILED, None, None
+    try:
+        async for event in _runner(job):
+            job.publish(event)
+            if event.get("step") == "result":
+                status, result = COMPLETED, event.get("data")
+            elif event.get("step") == "error":
+                error = event.get("message")
+    except (asyncio.CancelledError, JobOwnershipLost) as e:
+        # 서버 종료 / 소유권 상실: DB 상태는 그대로 두고 다음 워커가 체크포인트부터 재개
+        heartbeat.cancel()
+        if isinstance(e, JobOwnershipLost):
+            print(f"⚠️ [AnalysisJob {job.job_id}] 체크포인트 시점에 소유권 상실 → 페이지 롤백 후 중단")
+            job.lost = True
+        if not job.lost:
+            try:
+                await run_io(_on_cursor, _release_job, job.job_id)
+                _counters["released"] += 1
+            except Exception as e:
+                print(f"⚠️ [AnalysisJob {job.job_id}] 소유권 반납 실패 (heartbeat 만료 후 재개): {e}")
+        else:
+            _counters["lost"] += 1
+        job.publish({"step": "interrupted", "progress": job.last_event.get("progress", 0), "message": "작업이 중단되었습니다 (다른 워커에서 재개 예정)"})
+        job.close()
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        return
+    except Exception as e:
+        error = f"분석 실패: {str(e)}"
+        print(f"❌ [AnalysisJob {job.job_id}] 작업 실패: {e}")
+        job.publish({"step": "error", "progress": 0, "message": error})
+    finally:
+        heartbeat.cancel()
+
+    if status == COMPLETED:
+        error = None
+    job.row["status"] = status
+    _counters["completed" if status == COMPLETED else "failed"] += 1
+    try:
+        if not await run_io(_on_cursor, _finish_job, job.job_id, status, result, error, WORKER_ID):
+            print(f"⚠️ [AnalysisJob {job.job_id}] 다른 워커가 작업을 가져가 종료 상태를 기록하지 않음")
+    except Exception as e:
+        print(f"⚠️ [AnalysisJob {job.job_id}] 작업 상태 저장 실패: {e}")
+    job.close()
+    print(f"🏁 [AnalysisJob {job.job_id}] product_id={job.product_id} {status} (시도 {job.row['attempts']}회)")
+
+
+def _launch(row: Dict[str, Any]) -> AnalysisJob:
+    job = AnalysisJob(row)
+    _jobs[job.job_id] = job
+    while len(_jobs) > _MAX_FINISHED_JOBS and next(iter(_jobs.values())).finished:
+        _jobs.popitem(last=False)
+    _counters["resumed" if job.resumed else "started"] += 1
+
+    async def runner():
+        try:
+            await _run(job)
+        except asyncio.CancelledError:
+            pass
+
+    job.task = asyncio.create_task(runner())
+    return job
+
+
+def start_detached(stream: AsyncIterator[Dict[str, Any]]) -> EventBuffer:
+    """
+    이벤트 dict를 yield하는 async generator를 HTTP 응답과 분리된 태스크로 실행 → 구독은 EventBuffer.events()
+    (클라이언트 연결이 끊겨도 끝까지 실행, 서버 종료 시 close_analysis_jobs에서 취소)
+    """
+    buffer = EventBuffer()
+
+    async def pump():
+        try:
+            async for event in stream:
+                buffer.publish(event)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ [AnalysisJobs] 분리 실행 실패: {e}")
+            buffer.publish({"step": "error", "progress": 0, "message": f"분석 실패: {str(e)}"})
+        finally:
+            buffer.close()
+            _detached.discard(task)
+
+    task = asyncio.create_task(pump())
+    _detached.add(task)
+    return buffer
+
+
+def _active_local_job(product_id: int) -> Optional[AnalysisJob]:
+    return next((job for job in _jobs.values() if job.product_id == product_id and not job.finished), None)
+
+
+async def _resume(row: Dict[str, Any]):
+    if row["attempts"] > ANALYSIS_JOB_MAX_ATTEMPTS:
+        error = f"{ANALYSIS_JOB_MAX_ATTEMPTS}회 넘게 중단되어 실패 처리"
+        await run_io(_on_cursor, _finish_job, row["job_id"], FAILED, None, error, WORKER_ID)
+        _counters["failed"] += 1
+        print(f"❌ [AnalysisJob {row['job_id']}] {error}")
+        return None
+    print(
+        f"♻️ [AnalysisJob {row['job_id']}] product_id={row['product_id']} 재개 "
+        f"(stage={row['stage']}, {row['analyzed']}/{row['total']} 리뷰 저장됨, 시도 {row['attempts']}회)"
+    )
+    return _launch(row)
+
+
+async def start_analysis_job(product_id: int, domain: Optional[str] = None) -> Tuple[AnalysisJob, bool]:
+    """
+    제품 분석 작업 시작 → (작업, 기존 작업에 합류했는지)
+    - 이 워커에서 같은 제품을 분석 중이면 그 작업에 합류
+    - 중단된 작업(소유자 없음/heartbeat 만료)이 있으면 가져와서 체크포인트부터 재개
+    - 다른 요청(여러 제품 분석)이나 다른 워커가 실행 중이면 RuntimeError (동시에 만들려 했으면 JobAlreadyActive)
+    """
+    if _runner is None:
+        raise RuntimeError("분석 작업 실행기가 초기화되지 않았습니다 (init_analysis_jobs)")
+    async with _start_lock:
+        job = _active_local_job(product_id)
+        if job:
+            return job, True
+
+        active = await run_io(_on_cursor, _active_job_for_product, product_id)
+        if active:
+            claimed = await run_io(_on_cursor, _claim_job, active["job_id"])
+            if claimed is None:
+                raise RuntimeError(
+                    f"이미 분석 중인 작업이 있습니다 (job_id={active['job_id']}, owner={active['owner']})"
+                )
+            job = await _resume(claimed)
+            if job:
+                return job, True
+
+        row = await run_io(_on_cursor, _insert_job, product_id, domain)
+        return _launch(row), False
+
+
+async def claim_product_jobs(
+    cursor, domains: Dict[int, str]
+) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, Any]], List[int]]:
+    """
+    여러 제품 분석용 작업 확보 (acquire_product_jobs를 start_analysis_job과 같은 잠금 안에서 실행)
+    - 이 워커에서 단일 제품 작업으로 분석 중인 제품은 busy
+    - 잠금 없이 확인 → 생성하면 두 요청이 같은 제품 작업을 하나씩 만들어 같은 리뷰를 두 번 추론
+    """
+    if _start_lock is None:
+        raise RuntimeError("분석 작업 실행기가 초기화되지 않았습니다 (init_analysis_jobs)")
+    async with _start_lock:
+        busy = {}
+        for product_id in domains:
+            job = _active_local_job(product_id)
+            if job:
+                busy[product_id] = job.row
+        rest = {product_id: domain for product_id, domain in domains.items() if product_id not in busy}
+        jobs, db_busy, empty = await run_io(acquire_product_jobs, cursor, rest) if rest else ({}, {}, [])
+        busy.update(db_busy)
+        return jobs, busy, empty
+
+
+async def _sweep():
+    """만료된 작업을 찾아 이 워커에서 재개"""
+    for job_id in await run_io(_on_cursor, _claimable_jobs):
+        if job_id in _jobs and not _jobs[job_id].finished:
+            continue
+        async with _start_lock:
+            row = await run_io(_on_cursor, _claim_job, job_id)
+            if row:
+                await _resume(row)
+
+
+async def _sweep_loop():
+    while True:
+        try:
+            await _sweep()
+        except Exception as e:
+            print(f"⚠️ [AnalysisJobs] 중단된 작업 확인 실패: {e}")
+        await asyncio.sleep(ANALYSIS_JOB_HEARTBEAT_SEC)
+
+
+def get_analysis_job(job_id: str) -> Optional[AnalysisJob]:
+    return _jobs.get(job_id)
+
+
+async def analysis_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    job = _jobs.get(job_id)
+    if job and not job.finished:
+        return job.snapshot()
+    row = await run_io(_on_cursor, _load_job, job_id)
+    return job_row_snapshot(row) if row else None
+
+
+def analysis_jobs() -> List[Dict[str, Any]]:
+    return [job.snapshot() for job in reversed(_jobs.values())]
+
+
+def analysis_job_stats() -> Dict[str, Any]:
+    running = sum(1 for job in _jobs.values() if not job.finished)
+    return {**_counters, "running": running, "worker_id": WORKER_ID}
+
+
+def init_analysis_jobs(runner: Callable[[AnalysisJob], AsyncIterator[Dict[str, Any]]]):
+    """모델 서버 시작 시 작업 본문 등록 + 중단된 작업 재개 루프 시작 (이벤트 루프 안에서 호출)"""
+    global _runner, _start_lock, _sweeper
+    _runner = runner
+    _start_lock = asyncio.Lock()
+    if _sweeper is None:
+        _sweeper = asyncio.create_task(_sweep_loop())
+    print(f"[OK] 분석 작업 관리자 시작 (worker={WORKER_ID}, heartbeat={ANALYSIS_JOB_HEARTBEAT_SEC}s, stale={ANALYSIS_JOB_STALE_SEC}s)")
+
+
+async def close_analysis_jobs():
+    """서버 종료 시 실행 중인 작업 중단 + 소유권 반납 (다음 시작 때 체크포인트부터 재개)"""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
+    for task in list(_detached):
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    for job in list(_jobs.values()):
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            print(f"[OK] 분석 작업 중단, 재개 대기 (job_id={job.job_id}, {job.row['analyzed']}/{job.row['total']} 리뷰 저장됨)")
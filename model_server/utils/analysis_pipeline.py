@@ -0,0 +1,377 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pymysql
+from dotenv import load_dotenv
+
+from utils.analysis_writer import ReviewAnalysisWriter
+from utils.db_connect import get_connection
+from utils.executors import submit_inference
+
+load_dotenv()
+
+# =========================================================
+# 제품 리뷰 스트리밍 분석 (fetch → infer → write)
+# - fetch : 서버 사이드 커서(SSDictCursor)로 미분석 리뷰를 페이지 단위로 읽음
+# - infer : 페이지마다 도메인 analyze_reviews 실행 (inference 실행기에서 직렬화)
+# - write : 페이지 결과를 바로 tb_reviewAnalysis에 upsert 후 커밋 (페이지 = 트랜잭션 1개)
+# - 단계 사이는 크기 제한 큐 → 제품 크기와 무관하게 메모리 일정, 세 단계가 겹쳐서 진행
+# =========================================================
+ANALYSIS_PAGE_SIZE = int(os.getenv("ANALYSIS_PAGE_SIZE", 64))        # 페이지 = analyze_reviews 1회 호출 리뷰 수
+ANALYSIS_MODEL_BATCH = int(os.getenv("ANALYSIS_MODEL_BATCH", 16))    # analyze_reviews의 batch_size
+ANALYSIS_QUEUE_DEPTH = int(os.getenv("ANALYSIS_QUEUE_DEPTH", 2))     # 단계 사이 대기 페이지 수
+ANALYSIS_STOP_TIMEOUT = float(os.getenv("ANALYSIS_STOP_TIMEOUT", 30))  # 중단 시 단계 스레드 종료 대기 (초)
+
+_UNANALYZED_FROM = """
+    FROM tb_review r
+    WHERE r.product_id = %s
+      AND NOT EXISTS (SELECT 1 FROM tb_reviewAnalysis ra WHERE ra.review_id = r.review_id)
+"""
+
+_DONE = object()
+_POLL_SEC = 0.5
+
+
+def count_unanalyzed(cursor, product_id: int) -> int:
+    """분석되지 않은 리뷰 수 (진행률 분모)"""
+    cursor.execute("SELECT COUNT(*) AS cnt" + _UNANALYZED_FROM, (product_id,))
+    return cursor.fetchone()["cnt"]
+
+
+class StreamingAnalysis:
+    """
+    사용법 (async 라우트 안에서):
+        stream = StreamingAnalysis(product_id, pipeline, keyword_map, total)
+        async for event in stream.run():
+            ...  # {"analyzed": n, "written": m, "total": total}
+        stream.stats()
+    """
+
+    def __init__(self, product_id: int, pipeline, keyword_map: Dict[str, int], total: int):
+        self.product_id = product_id
+        self.pipeline = pipeline
+        self.keyword_map = keyword_map
+        self.total = total
+
+        self._infer_q: "queue.Queue" = queue.Queue(maxsize=ANALYSIS_QUEUE_DEPTH)
+        self._write_q: "queue.Queue" = queue.Queue(maxsize=ANALYSIS_QUEUE_DEPTH)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._events: Optional[asyncio.Queue] = None
+        self._running = 0
+        self.error: Optional[BaseException] = None
+        self.missing_keywords = set()
+        self.counters = {
+            "fetched": 0,
+            "analyzed": 0,
+            "written": 0,
+            "pages": 0,
+            "fetch_ms": 0.0,
+            "infer_ms": 0.0,
+            "write_ms": 0.0,
+            "wall_ms": 0.0,
+        }
+
+    # -----------------------------------------------------
+    # 단계 공통
+    # -----------------------------------------------------
+    def _put(self, q: "queue.Queue", item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SEC)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue"):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SEC)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _emit(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+        except RuntimeError:
+            pass  # 이벤트 루프가 이미 종료됨
+
+    def _progress(self):
+        with self._lock:
+            return {"analyzed": self.counters["analyzed"], "written": self.counters["written"], "total": self.total}
+
+    def _add(self, key: str, value):
+        with self._lock:
+            self.counters[key] += value
+
+    def _stage(self, name: str, fn):
+        def runner():
+            try:
+                fn()
+            except BaseException as e:
+                print(f"❌ [StreamingAnalysis] {name} 단계 실패: {e}")
+                with self._lock:
+                    if self.error is None:
+                        self.error = e
+                self._stop.set()
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    finished = self._running == 0
+                if finished:
+                    self._emit(_DONE)
+
+        return threading.Thread(target=runner, name=f"analysis-{name}-{self.product_id}", daemon=True)
+
+    # -----------------------------------------------------
+    # 확장 지점 (MultiProductAnalysis가 재정의)
+    # -----------------------------------------------------
+    def _fetch_query(self):
+        return "SELECT r.review_id, r.review_text" + _UNANALYZED_FROM + " ORDER BY r.review_id", (self.product_id,)
+
+    def _keyword_map_for(self, row) -> Dict[str, int]:
+        return self.keyword_map
+
+    def _before_commit(self, cursor, batch, written: int, added: List[int]):
+        """
+        페이지 결과와 같은 트랜잭션에서 실행할 쓰기 (예: 작업 체크포인트), 예외를 던지면 페이지 롤백
+        written = 페이지 전체 저장 행 수, added = 리뷰별 저장 행 수 (batch와 같은 순서)
+        """
+
+    def _on_analyzed(self, page) -> Dict[str, Any]:
+        """추론이 끝난 페이지 → 진행 이벤트에 덧붙일 필드"""
+        return {}
+
+    def _on_committed(self, batch, added) -> Dict[str, Any]:
+        """커밋된 페이지 [(row, result)]와 리뷰별 저장 행 수 → 진행 이벤트에 덧붙일 필드"""
+        return {}
+
+    # -----------------------------------------------------
+    # 단계
+    # -----------------------------------------------------
+    def _fetch(self):
+        conn = get_connection()
+        cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            started = time.monotonic()
+            cursor.execute(*self._fetch_query())
+            while not self._stop.is_set():
+                page = cursor.fetchmany(ANALYSIS_PAGE_SIZE)
+                self._add("fetch_ms", (time.monotonic() - started) * 1000)
+                if not page:
+                    break
+                self._add("fetched", len(page))
+                if not self._put(self._infer_q, page):
+                    break
+                started = time.monotonic()
+        finally:
+            # SSCursor는 남은 결과를 모두 읽어야 연결을 재사용할 수 있음 (close가 처리)
+            cursor.close()
+            conn.close()
+            self._put(self._infer_q, _DONE)
+
+    def _infer(self):
+        try:
+            while True:
+                page = self._get(self._infer_q)
+                if page is _DONE:
+                    break
+                texts = [row["review_text"] for row in page]
+
+                started = time.monotonic()
+                if hasattr(self.pipeline, "analyze_reviews"):
+                    results = submit_inference(
+                        self.pipeline.analyze_reviews, texts, debug=False, batch_size=ANALYSIS_MODEL_BATCH
+                    ).result()
+                else:
+                    results = [submit_inference(self.pipeline.analyze_review, t).result() for t in texts]
+                self._add("infer_ms", (time.monotonic() - started) * 1000)
+                self._add("analyzed", len(page))
+                extra = self._on_analyzed(page)
+
+                if not self._put(self._write_q, list(zip(page, results))):
+                    break
+                self._emit({**self._progress(), **extra})
+        finally:
+            self._put(self._write_q, _DONE)
+
+    def _write(self):
+        conn = get_connection()
+        cursor = conn.cursor()
+        writer = ReviewAnalysisWriter(cursor)
+        try:
+            while True:
+                batch = self._get(self._write_q)
+                if batch is _DONE:
+                    break
+
+                started = time.monotonic()
+                rows_before = writer.rows
+                added = []
+                conn.begin()  # 풀 연결은 autocommit → 페이지 단위로 한 트랜잭션
+                try:
+                    for row, result in batch:
+                        added_before = writer.added
+                        self.missing_keywords |= writer.add_result(row["review_id"], result, self._keyword_map_for(row))
+                        added.append(writer.added - added_before)
+                    writer.flush()
+                    self._before_commit(cursor, batch, writer.rows - rows_before, added)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()  # 실패한 페이지는 결과도 체크포인트도 남기지 않음
+                    raise
+                self._add("write_ms", (time.monotonic() - started) * 1000)
+                self._add("written", writer.rows - rows_before)
+                self._add("pages", 1)
+                extra = self._on_committed(batch, added)
+                self._emit({**self._progress(), **extra})
+        finally:
+            cursor.close()
+            conn.close()
+
+    # -----------------------------------------------------
+    # 실행
+    # -----------------------------------------------------
+    async def _join(self, threads):
+        deadline = time.monotonic() + ANALYSIS_STOP_TIMEOUT
+        for t in threads:
+            await asyncio.to_thread(t.join, max(deadline - time.monotonic(), 0))
+        alive = [t.name for t in threads if t.is_alive()]
+        if alive:
+            print(f"⚠️ [StreamingAnalysis] {ANALYSIS_STOP_TIMEOUT}초 안에 끝나지 않은 단계: {', '.join(alive)}")
+
+    async def run(self):
+        """단계 스레드를 시작하고 배치마다 진행 상황을 yield (실패 시 예외 전파)"""
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+        threads = [self._stage("fetch", self._fetch), self._stage("infer", self._infer), self._stage("write", self._write)]
+        self._running = len(threads)
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                event = await self._events.get()
+                if event is _DONE:
+                    break
+                yield event
+        finally:
+            # 클라이언트 연결 종료 등으로 중단되면 단계 스레드도 정리
+            # 스레드가 끝날 때까지 기다림 → run()이 끝난 뒤에는 커밋 중인 페이지가 없음 (작업 반납/실패 기록의 전제)
+            self._stop.set()
+            self.counters["wall_ms"] = (time.monotonic() - started) * 1000
+            await self._join(threads)
+
+        if self.missing_keywords:
+            print(f"⚠️ 키워드 없음: {', '.join(sorted(map(str, self.missing_keywords)))}")
+        if self.error is not None:
+            raise self.error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+        busy = c["fetch_ms"] + c["infer_ms"] + c["write_ms"]
+        return {
+            **{k: round(v, 1) if isinstance(v, float) else v for k, v in c.items()},
+            # 1.0 = 완전 직렬, 값이 클수록 단계가 겹쳐서 실행됨
+            "overlap": round(busy / c["wall_ms"], 2) if c["wall_ms"] else 0.0,
+        }
+
+
+# =========================================================
+# 여러 제품 한 번에 분석 (같은 도메인)
+# - 제품 경계와 무관하게 미분석 리뷰를 페이지로 채움 → 작은 제품이 많아도 모델 배치가 꽉 참
+# - 리뷰는 제품 순서대로 읽으므로 제품이 하나씩 차례로 완료됨
+# - 진행 이벤트에 이번 페이지로 바뀐 제품별 상태를 함께 전달 ("products": [...])
+# =========================================================
+class MultiProductAnalysis(StreamingAnalysis):
+    """
+    사용법:
+        stream = MultiProductAnalysis(domain, pipeline, {product_id: {"total": n, "keyword_map": {...}}})
+        async for event in stream.run():
+            for product in event.get("products", []):
+                ...  # {"product_id", "analyzed", "committed", "written", "total", "done"}
+    """
+
+    def __init__(self, domain: str, pipeline, products: Dict[int, Dict[str, Any]]):
+        total = sum(p["total"] for p in products.values())
+        super().__init__(domain, pipeline, {}, total)
+        self.products = {
+            product_id: {
+                "product_id": product_id,
+                "analyzed": 0,
+                "committed": 0,   # 커밋된 리뷰 수
+                "written": 0,     # tb_reviewAnalysis에 보낸 행 수
+                "total": info["total"],
+                "done": False,
+            }
+            for product_id, info in products.items()
+        }
+        self._keyword_maps = {product_id: info["keyword_map"] for product_id, info in products.items()}
+
+    def _fetch_query(self):
+        product_ids = list(self.products)
+        placeholders = ",".join(["%s"] * len(product_ids))
+        return (
+            f"""
+            SELECT r.product_id, r.review_id, r.review_text
+            FROM tb_review r
+            WHERE r.product_id IN ({placeholders})
+              AND NOT EXISTS (SELECT 1 FROM tb_reviewAnalysis ra WHERE ra.review_id = r.review_id)
+            ORDER BY r.product_id, r.review_id
+            """,
+            product_ids,
+        )
+
+    def _keyword_map_for(self, row) -> Dict[str, int]:
+        return self._keyword_maps[row["product_id"]]
+
+    def _snapshot(self, product_ids) -> Dict[str, Any]:
+        with self._lock:
+            return {"products": [dict(self.products[pid]) for pid in product_ids]}
+
+    def _on_analyzed(self, page) -> Dict[str, Any]:
+        touched = []
+        with self._lock:
+            for row in page:
+                product_id = row["product_id"]
+                self.products[product_id]["analyzed"] += 1
+                if product_id not in touched:
+                    touched.append(product_id)
+        return self._snapshot(touched)
+
+    def _on_committed(self, batch, added) -> Dict[str, Any]:
+        touched = []
+        with self._lock:
+            for (row, _), rows in zip(batch, added):
+                product = self.products[row["product_id"]]
+                product["committed"] += 1
+                product["written"] += rows
+                if row["product_id"] not in touched:
+                    touched.append(row["product_id"])
+            # 제품 순서대로 읽으므로 뒤 제품의 리뷰가 커밋됐다면 앞 제품은 끝난 것
+            last = max(touched) if touched else None
+            for product in self.products.values():
+                if not product["done"] and (product["committed"] >= product["total"] or (last is not None and product["product_id"] < last)):
+                    product["done"] = True
+                    if product["product_id"] not in touched:
+                        touched.append(product["product_id"])
+        return self._snapshot(touched)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """스트림 종료 후 아직 완료 표시가 안 된 제품까지 모두 완료 처리, 완료로 바뀐 제품 반환"""
+        finished = []
+        with self._lock:
+            for product in self.products.values():
+                if not product["done"]:
+                    product["done"] = True
+                    finished.append(dict(product))
+        return finished
@@ -0,0 +1,93 @@
+import os
+import time
+from typing import Dict, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# tb_reviewAnalysis 다중 행 upsert 한 번에 보낼 행 수
+ANALYSIS_WRITE_CHUNK = int(os.getenv("ANALYSIS_WRITE_CHUNK", 1000))
+
+_UPSERT_HEAD = "INSERT INTO tb_reviewAnalysis (keyword_id, review_id, sentiment, analyzed_at) VALUES "
+_UPSERT_ROW = "(%s, %s, %s, NOW())"
+_UPSERT_TAIL = """
+    ON DUPLICATE KEY UPDATE
+        sentiment = VALUES(sentiment),
+        analyzed_at = NOW()
+"""
+
+
+class ReviewAnalysisWriter:
+    """
+    tb_reviewAnalysis 배치 writer
+    - add()로 (keyword_id, review_id, sentiment) 행을 모으고 chunk_size마다 다중 행 INSERT 한 번으로 flush
+    - 같은 (keyword_id, review_id)는 마지막 값만 저장 (PK 기준 upsert 의미 유지)
+    - 커밋은 호출자가 결정 (flush 후 conn.commit())
+    """
+
+    def __init__(self, cursor, chunk_size: int = ANALYSIS_WRITE_CHUNK):
+        self.cursor = cursor
+        self.chunk_size = max(int(chunk_size), 1)
+        self._pending: Dict[Tuple[int, int], str] = {}
+        self.rows = 0          # 실제로 upsert한 고유 행 수
+        self.added = 0         # add()로 받은 행 수 (중복 포함, 호출자별 집계용)
+        self.inserted = 0      # 새로 삽입된 행 수
+        self.updated = 0       # 기존 행이 갱신된 수
+        self.statements = 0
+        self.write_ms = 0.0
+
+    def add(self, keyword_id: int, review_id: int, sentiment: str):
+        self._pending[(keyword_id, review_id)] = sentiment
+        self.added += 1
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def add_result(self, review_id: int, result: Dict, keyword_map: Dict[str, int]) -> Set[str]:
+        """
+        도메인 분석 결과(Steam 형식) 한 건을 행으로 변환해 추가
+        - 중립은 저장하지 않음, 키워드 테이블에 없는 aspect는 건너뛰고 반환
+        """
+        missing = set()
+        for aspect_result in result.get("results", []):
+            aspect = aspect_result.get("aspect")
+            label = aspect_result.get("label")
+
+            keyword_id = keyword_map.get(aspect)
+            if not keyword_id:
+                missing.add(aspect)
+                continue
+            if label == "중립":
+                continue
+
+            self.add(keyword_id, review_id, "positive" if label == "긍정" else "negative")
+        return missing
+
+    def flush(self):
+        """모인 행을 chunk_size 단위 다중 행 upsert로 전송 (커밋하지 않음)"""
+        if not self._pending:
+            return
+        rows = [(k, r, s) for (k, r), s in self._pending.items()]
+        self._pending = {}
+
+        started = time.monotonic()
+        for i in range(0, len(rows), self.chunk_size):
+            chunk = rows[i : i + self.chunk_size]
+            sql = _UPSERT_HEAD + ", ".join([_UPSERT_ROW] * len(chunk)) + _UPSERT_TAIL
+            affected = self.cursor.execute(sql, [value for row in chunk for value in row])
+            # MySQL affected rows: 신규 행 1, 갱신된 행 2
+            updated = max(min(affected - len(chunk), len(chunk)), 0)
+            self.updated += updated
+            self.inserted += len(chunk) - updated
+            self.rows += len(chunk)
+            self.statements += 1
+        self.write_ms += (time.monotonic() - started) * 1000
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "statements": self.statements,
+            "write_ms": round(self.write_ms, 1),
+        }
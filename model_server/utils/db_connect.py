@@ -3,6 +3,8 @@ import pymysql
 from dotenv import load_dotenv
 from dbutils.pooled_db import PooledDB
 
+from utils.metrics import registry as metrics_registry
+
 load_dotenv()
 
 # DB Connection Pool
@@ -49,3 +51,25 @@ def close_db_pool():
         db_pool.close()
         db_pool = None
         print("[OK] DB Connection Pool 종료 완료")
+
+
+def pool_stats():
+    """Pool 사용 현황 (DBUtils PooledDB 내부 카운터 기준)"""
+    pool = db_pool
+    if pool is None:
+        return {"in_use": 0, "idle": 0, "max": 0}
+    return {
+        "in_use": getattr(pool, "_connections", 0),
+        "idle": len(getattr(pool, "_idle_cache", [])),
+        "max": getattr(pool, "_maxconnections", 0),
+    }
+
+
+@metrics_registry.register_collector
+def _pool_metrics():
+    stats = pool_stats()
+    return [
+        ("absa_db_pool_connections_in_use", "DB pool connections currently checked out", {}, stats["in_use"]),
+        ("absa_db_pool_connections_idle", "Idle DB pool connections", {}, stats["idle"]),
+        ("absa_db_pool_connections_max", "DB pool maximum connections", {}, stats["max"]),
+    ]
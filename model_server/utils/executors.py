@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 전용 실행기 (이벤트 루프 밖에서 블로킹 작업 실행)
+# - inference: 모델 추론 (torch 연산은 GIL을 놓으므로 스레드로 충분, 기본 1개로 직렬화)
+# - io: DB 쿼리/커밋, 인사이트 LLM 호출, 워드클라우드 렌더링
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+IO_WORKERS = int(os.getenv("IO_WORKERS", 8))
+
+inference_executor = None
+io_executor = None
+
+
+def init_executors():
+    """모델 서버 시작 시 실행기 생성"""
+    global inference_executor, io_executor
+    if inference_executor is None:
+        inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    if io_executor is None:
+        io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="blocking-io")
+    print(f"[OK] 실행기 초기화 완료 (inference={INFERENCE_WORKERS}, io={IO_WORKERS})")
+
+
+def close_executors():
+    """종료 시 실행기 정리 (진행 중 작업은 끝까지 기다림)"""
+    global inference_executor, io_executor
+    for executor in (inference_executor, io_executor):
+        if executor:
+            executor.shutdown(wait=True)
+    inference_executor = None
+    io_executor = None
+    print("[OK] 실행기 종료 완료")
+
+
+def _ensure_executors():
+    if inference_executor is None or io_executor is None:
+        init_executors()
+
+
+def submit_inference(fn, *args, **kwargs):
+    """스레드에서 inference 실행기로 작업 제출 (concurrent Future 반환)"""
+    _ensure_executors()
+    return inference_executor.submit(functools.partial(fn, *args, **kwargs))
+
+
+async def run_inference(fn, *args, **kwargs):
+    """모델 추론을 inference 실행기에서 실행하고 결과를 기다림"""
+    _ensure_executors()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    """DB/네트워크/파일 등 블로킹 작업을 io 실행기에서 실행하고 결과를 기다림"""
+    _ensure_executors()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(fn, *args, **kwargs))
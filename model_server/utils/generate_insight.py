@@ -1,12 +1,33 @@
 # test 함수 실행 시 주석 해제하고 실행해야 오류가 없음
 # import sys
 # sys.path.append('..') 
-import os
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 from utils.db_connect import get_connection
-from langchain_openai import ChatOpenAI
+from utils.review_sampler import INSIGHT_CANDIDATE_REVIEWS, select_representative_reviews
+from utils.insight_map_reduce import (
+    INSIGHT_MAP_CONCURRENCY,
+    MAP_SYSTEM_PROMPT,
+    build_map_prompt,
+    build_reduce_data,
+    fetch_partitions,
+    should_map_reduce,
+)
+from utils.insight_cache import (
+    INSIGHT_DRIFT_THRESHOLD,
+    build_fingerprint,
+    get_llm_cache,
+    insight_drift,
+    load_fingerprint,
+    prompt_hash,
+    save_fingerprint,
+)
+from utils.metrics import INSIGHT_RUNS
+from utils.executors import run_io
+from utils.llm_client import LLM_CONFIG, get_llm_client
 from langchain_core.messages import SystemMessage, HumanMessage
 
 load_dotenv()
@@ -14,13 +35,18 @@ load_dotenv()
 """
 구조:
 
-fetch_review_data() - DB에서 리뷰 데이터 조회
+fetch_review_data() - DB에서 리뷰 데이터 조회 (fetch_review_data_batch: 여러 제품 한 번에)
 build_analysis_prompt() - 인사이트 분석 프롬프트 생성
-generate_insight_with_llm() - LangChain으로 인사이트 생성
+generate_insight_with_llm() - 공유 LLM 클라이언트로 스트리밍 생성 (프롬프트 해시 캐시)
+map_reduce_insight_with_llm() - 대용량 제품: 파티션별 부분 요약을 동시에 생성 후 reduce
+agenerate_insight_with_llm() - 비동기 버전 (SSE 분석 스트림에서 사용, 중간 진행 상황 전달)
 save_insight_to_db() - 인사이트 DB 저장
-generate_insight_from_db() - 메인 함수 (전체 프로세스 실행)
+generate_insight_from_db() - 메인 함수 (입력 변화가 작으면 LLM 호출 생략)
+agenerate_insight_from_db() - 비동기 메인 함수 (DB 작업은 io 실행기, LLM은 이벤트 루프)
 """
 
+SYSTEM_PROMPT = "당신은 데이터 인사이트 분석가입니다. 리뷰 데이터를 기반으로 통찰력 있는 보고서를 작성하세요."
+
 # ===========================
 # 1️⃣ 데이터 조회
 # ===========================
@@ -29,7 +55,7 @@ def fetch_review_data(product_id: int) -> dict:
     제품의 리뷰 데이터 조회
     - 전체 리뷰 수
     - 키워드별 긍정/부정 집계
-    - 샘플 리뷰 (최근 200개)
+    - 대표 리뷰 (최근 리뷰 중 중복 제거 후 키워드 × 감성별 대표, 토큰 예산 내)
     """
     conn = get_connection()
     try:
@@ -61,71 +87,153 @@ def fetch_review_data(product_id: int) -> dict:
         )
         sentiment_data = cursor.fetchall()
         
-        # 3. 샘플 리뷰 (최근 200개)
+        # 3. 대표 리뷰 후보 (최근 리뷰 + 분석된 키워드/감성)
         cursor.execute(
             """
-            SELECT review_text 
-            FROM tb_review 
-            WHERE product_id = %s 
-            ORDER BY review_date DESC 
-            LIMIT 200
+            SELECT r.review_id, r.review_text, k.keyword_text, ra.sentiment
+            FROM (
+                SELECT review_id, review_text, review_date
+                FROM tb_review
+                WHERE product_id = %s
+                ORDER BY review_date DESC
+                LIMIT %s
+            ) r
+            LEFT JOIN tb_reviewAnalysis ra ON ra.review_id = r.review_id
+            LEFT JOIN tb_keyword k ON k.keyword_id = ra.keyword_id
+            ORDER BY r.review_date DESC, r.review_id DESC
             """,
-            (product_id,)
+            (product_id, INSIGHT_CANDIDATE_REVIEWS)
         )
-        reviews_data = cursor.fetchall()
-        
-        # 데이터 구조화
-        sentiment_summary = {
-            item["keyword_text"]: {
-                "positive": int(item["positive"]),
-                "negative": int(item["negative"])
-            }
-            for item in sentiment_data
-        }
+        candidate_rows = cursor.fetchall()
         
-        sample_reviews = [r["review_text"] for r in reviews_data]
-        
-        return {
-            "total_reviews": total_reviews,
-            "sentiment_summary": sentiment_summary,
-            "sample_reviews": sample_reviews
-        }
+        return _assemble_review_data(total_reviews, sentiment_data, candidate_rows)
         
     finally:
         conn.close()
 
 
+def _assemble_review_data(total_reviews: int, sentiment_data: list, candidate_rows: list, verbose: bool = True) -> dict:
+    """조회 결과 → 인사이트 입력 데이터 (키워드 집계 + 대표 리뷰)"""
+    sentiment_summary = {
+        item["keyword_text"]: {
+            "positive": int(item["positive"]),
+            "negative": int(item["negative"])
+        }
+        for item in sentiment_data
+    }
+    
+    samples = select_representative_reviews(candidate_rows, sentiment_summary)
+    stats = samples["stats"]
+    if verbose:
+        print(
+            f"🧩 대표 리뷰 선택: 후보 {stats['candidates']}개 (중복 {stats['near_duplicates']}개 제거) → "
+            f"{stats['selected']}개, 키워드 {stats['keywords_covered']}/{stats['keywords_total']}, "
+            f"약 {stats['estimated_tokens']} 토큰"
+        )
+    
+    return {
+        "total_reviews": total_reviews,
+        "sentiment_summary": sentiment_summary,
+        "representative_reviews": {
+            "by_keyword": samples["by_keyword"],
+            "general": samples["general"]
+        },
+        "sampling": stats
+    }
+
+
+def fetch_review_data_batch(cursor, product_ids: list) -> dict:
+    """
+    여러 제품의 fetch_review_data를 쿼리 3번으로 조회 (대량 인사이트 작업용)
+    Returns: {product_id: data} (리뷰가 없는 제품은 total_reviews=0)
+    """
+    if not product_ids:
+        return {}
+    placeholders = ",".join(["%s"] * len(product_ids))
+    
+    cursor.execute(
+        f"SELECT product_id, COUNT(*) AS total_reviews FROM tb_review WHERE product_id IN ({placeholders}) GROUP BY product_id",
+        product_ids
+    )
+    totals = {row["product_id"]: int(row["total_reviews"]) for row in cursor.fetchall()}
+    
+    cursor.execute(
+        f"""
+        SELECT 
+            r.product_id,
+            k.keyword_text,
+            SUM(CASE WHEN ra.sentiment = 'positive' THEN 1 ELSE 0 END) AS positive,
+            SUM(CASE WHEN ra.sentiment = 'negative' THEN 1 ELSE 0 END) AS negative
+        FROM tb_reviewAnalysis ra
+        JOIN tb_keyword k ON k.keyword_id = ra.keyword_id
+        JOIN tb_review r ON r.review_id = ra.review_id
+        WHERE r.product_id IN ({placeholders})
+        GROUP BY r.product_id, k.keyword_id, k.keyword_text
+        ORDER BY r.product_id, (positive + negative) DESC
+        """,
+        product_ids
+    )
+    sentiment_by_product = {}
+    for row in cursor.fetchall():
+        sentiment_by_product.setdefault(row["product_id"], []).append(row)
+    
+    cursor.execute(
+        f"""
+        SELECT r.product_id, r.review_id, r.review_text, k.keyword_text, ra.sentiment
+        FROM (
+            SELECT
+                product_id, review_id, review_text, review_date,
+                ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY review_date DESC, review_id DESC) AS rn
+            FROM tb_review
+            WHERE product_id IN ({placeholders})
+        ) r
+        LEFT JOIN tb_reviewAnalysis ra ON ra.review_id = r.review_id
+        LEFT JOIN tb_keyword k ON k.keyword_id = ra.keyword_id
+        WHERE r.rn <= %s
+        ORDER BY r.product_id, r.review_date DESC, r.review_id DESC
+        """,
+        [*product_ids, INSIGHT_CANDIDATE_REVIEWS]
+    )
+    candidates_by_product = {}
+    for row in cursor.fetchall():
+        candidates_by_product.setdefault(row["product_id"], []).append(row)
+    
+    return {
+        product_id: _assemble_review_data(
+            totals.get(product_id, 0),
+            sentiment_by_product.get(product_id, []),
+            candidates_by_product.get(product_id, []),
+            verbose=False,
+        )
+        for product_id in product_ids
+    }
+
+
 # ===========================
 # 2️⃣ 프롬프트 생성
 # ===========================
-def build_analysis_prompt(data: dict) -> str:
-    """인사이트 분석 프롬프트 생성"""
-    return f"""당신은 고객 리뷰 분석 전문가입니다.
-아래 리뷰 데이터를 바탕으로, 먼저 **깊이 있는 내부 분석**을 수행한 뒤,
-그 결과를 기반으로 **정제된 간략 요약(summary)**을 함께 작성하세요.
+PROMPT_DATA_KEYS = ("total_reviews", "sentiment_summary", "representative_reviews")
 
-리뷰 데이터:
-{json.dumps(data, ensure_ascii=False, indent=2)}
 
-출력은 아래 JSON 구조를 **반드시 따르세요**:
-{{
-  "summary": {{
-    "keywords": {{
+INSIGHT_OUTPUT_FORMAT = """출력은 아래 JSON 구조를 **반드시 따르세요**:
+{
+  "summary": {
+    "keywords": {
       "positive": ["긍정 키워드1", "긍정 키워드2", ...],
       "negative": ["부정 키워드1", "부정 키워드2", ...]
-    }},
+    },
     "insight_one_liner": "전체 리뷰를 한 줄로 요약한 문장 (짧고 명확하게)",
     "recommendation": "가장 중요한 개선 제안 (간결하게)"
-  }},
-  "report": {{
+  },
+  "report": {
     "title": "📊 리뷰 분석 보고서",
     "sentiment_ratio": "긍정: 70%, 부정: 30%",
     "positive_points": ["고객이 높게 평가한 요인들을 문장 중심으로 자세히 설명"],
     "negative_points": ["불만 요인 및 구체적 상황을 상세히 분석"],
     "improvement_suggestions": ["구체적인 개선 방향을 논리적으로 제안"],
     "overall_summary": "전체 여론과 트렌드를 깊이 있게 정리"
-  }}
-}}
+  }
+}
 
 작성 단계 지침:
 1️⃣ 내부적으로 충분히 생각하고, 상세한 인사이트를 도출하세요.
@@ -134,70 +242,294 @@ def build_analysis_prompt(data: dict) -> str:
 4️⃣ 출력은 반드시 JSON 형식으로만 하세요."""
 
 
+def build_analysis_prompt(data: dict) -> str:
+    """인사이트 분석 프롬프트 생성 (리뷰 데이터는 공백 없는 compact JSON)"""
+    prompt_data = {key: data[key] for key in PROMPT_DATA_KEYS if key in data}
+    return f"""당신은 고객 리뷰 분석 전문가입니다.
+아래 리뷰 데이터를 바탕으로, 먼저 **깊이 있는 내부 분석**을 수행한 뒤,
+그 결과를 기반으로 **정제된 간략 요약(summary)**을 함께 작성하세요.
+
+리뷰 데이터 설명:
+- sentiment_summary: 전체 리뷰 기준 키워드별 긍정/부정 언급 수 (비율 계산은 이 값을 사용)
+- representative_reviews.by_keyword: 키워드별 긍정/부정 대표 리뷰 (중복을 제거한 뒤 유사 리뷰 군집마다 하나씩 선택한 예시)
+- representative_reviews.general: 키워드와 무관한 대표 리뷰
+
+리뷰 데이터:
+{json.dumps(prompt_data, ensure_ascii=False, separators=(",", ":"))}
+
+{INSIGHT_OUTPUT_FORMAT}"""
+
+
+def build_reduce_prompt(reduce_data: dict) -> str:
+    """map-reduce 모드의 최종 프롬프트 (파티션별 부분 요약을 하나의 보고서로 통합)"""
+    return f"""당신은 고객 리뷰 분석 전문가입니다.
+리뷰가 매우 많은 제품이라 리뷰를 여러 묶음(키워드 또는 기간)으로 나눠 부분 요약을 먼저 만들었습니다.
+부분 요약들을 종합해 **깊이 있는 내부 분석**을 수행한 뒤, **정제된 간략 요약(summary)**을 함께 작성하세요.
+
+리뷰 데이터 설명:
+- sentiment_summary: 전체 리뷰 기준 키워드별 긍정/부정 언급 수 (비율 계산은 이 값을 사용)
+- partial_summaries: 묶음별 부분 요약 (label = 키워드 또는 기간), 여러 묶음에 반복되는 내용일수록 중요
+
+리뷰 데이터:
+{json.dumps(reduce_data, ensure_ascii=False, separators=(",", ":"))}
+
+{INSIGHT_OUTPUT_FORMAT}"""
+
+
 # ===========================
 # 3️⃣ LLM 호출
 # ===========================
-def generate_insight_with_llm(prompt: str) -> dict:
-    """LangChain으로 인사이트 생성"""
+# 스트리밍 중 완성된 필드 → 진행 메시지
+INSIGHT_FIELD_LABELS = {
+    "summary.keywords": "핵심 키워드",
+    "summary.insight_one_liner": "한 줄 요약",
+    "summary.recommendation": "핵심 개선 제안",
+    "report.sentiment_ratio": "감성 비율",
+    "report.positive_points": "긍정 요인",
+    "report.negative_points": "부정 요인",
+    "report.improvement_suggestions": "개선 방향",
+    "report.overall_summary": "종합 정리",
+}
+
+
+def _progress_messages(on_progress):
+    """LLM 클라이언트 진행 이벤트를 사용자용 메시지로 바꿔 on_progress(str)에 전달"""
+    if on_progress is None:
+        return None
+
+    def relay(event: dict):
+        if event["phase"] == "waiting":
+            on_progress(f"AI가 리뷰를 분석하는 중... ({event['elapsed']:.0f}초)")
+        elif event["phase"] == "streaming":
+            on_progress(f"인사이트 작성 시작 ({event['elapsed']:.1f}초)")
+        elif event["field"] in INSIGHT_FIELD_LABELS:
+            on_progress(f"{INSIGHT_FIELD_LABELS[event['field']]} 작성 완료")
+
+    return relay
+
+
+def _messages(prompt: str, system_prompt: str = SYSTEM_PROMPT):
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=prompt)
+    ]
+
+
+def generate_insight_with_llm(prompt: str, use_cache: bool = True, on_progress=None, system_prompt: str = SYSTEM_PROMPT) -> dict:
+    """공유 LLM 클라이언트로 인사이트 생성 (같은 프롬프트는 로컬 캐시 응답 재사용)"""
+    cache = get_llm_cache() if use_cache else None
+    key = prompt_hash(LLM_CONFIG, system_prompt, prompt)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"♻️ LLM 응답 캐시 적중 (prompt_hash={key[:12]})")
+            INSIGHT_RUNS.inc(outcome="llm_cache_hit")
+            return cached
+
     try:
-        # OpenAI API 키 확인
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
-        
-        # LLM 초기화
-        # llm = ChatOpenAI(
-        #     model="gpt-4o-mini",
-        #     temperature=0,
-        #     max_tokens=10000
-        # )
-        llm = ChatOpenAI(model = 'gpt-5-mini',
-                max_tokens = 20000,
-                reasoning_effort = "high",  # "minimal" | "low" | "medium" | "high"
-                )
-        
-        # 메시지 구성
-        messages = [
-            SystemMessage(content="당신은 데이터 인사이트 분석가입니다. 리뷰 데이터를 기반으로 통찰력 있는 보고서를 작성하세요."),
-            HumanMessage(content=prompt)
-        ]
-        
-        # LLM 호출
         print("🤖 LLM 인사이트 생성 중...")
-        response = llm.invoke(messages)
-        
-        # 응답 내용 정리 (마크다운 코드 블록 제거)
-        content = response.content.strip()
-        
-        # ```json ... ``` 형태로 감싸져 있으면 제거
-        if content.startswith("```json"):
-            content = content[7:]  # ```json 제거
-        elif content.startswith("```"):
-            content = content[3:]  # ``` 제거
-        
-        if content.endswith("```"):
-            content = content[:-3]  # ``` 제거
-        
-        content = content.strip()
-        
-        # JSON 파싱
-        result = json.loads(content)
+        result = get_llm_client().stream_json(_messages(prompt, system_prompt), _progress_messages(on_progress))
         print("✅ 인사이트 생성 완료")
-        
+        INSIGHT_RUNS.inc(outcome="llm_call")
+        if cache is not None:
+            cache.put(key, result)
+        return result
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON 파싱 오류: {e}")
+        raise
+    except Exception as e:
+        print(f"❌ LLM 호출 오류: {e}")
+        raise
+
+
+async def agenerate_insight_with_llm(
+    prompt: str, use_cache: bool = True, on_progress=None, system_prompt: str = SYSTEM_PROMPT
+) -> dict:
+    """generate_insight_with_llm의 비동기 버전 (캐시 조회/저장은 io 실행기)"""
+    cache = get_llm_cache() if use_cache else None
+    key = prompt_hash(LLM_CONFIG, system_prompt, prompt)
+    if cache is not None:
+        cached = await run_io(cache.get, key)
+        if cached is not None:
+            print(f"♻️ LLM 응답 캐시 적중 (prompt_hash={key[:12]})")
+            INSIGHT_RUNS.inc(outcome="llm_cache_hit")
+            return cached
+
+    try:
+        print("🤖 LLM 인사이트 생성 중 (스트리밍)...")
+        result = await get_llm_client().astream_json(_messages(prompt, system_prompt), _progress_messages(on_progress))
+        print("✅ 인사이트 생성 완료")
+        INSIGHT_RUNS.inc(outcome="llm_call")
+        if cache is not None:
+            await run_io(cache.put, key, result)
         return result
-        
     except json.JSONDecodeError as e:
         print(f"❌ JSON 파싱 오류: {e}")
-        print(f"응답 내용: {response.content}")
         raise
     except Exception as e:
         print(f"❌ LLM 호출 오류: {e}")
         raise
 
 
+# ===========================
+# 3️⃣-2 map-reduce (대용량 제품)
+# ===========================
+def _collect_partials(partitions: list, results: list) -> list:
+    """실패한 파티션은 제외하고 부분 요약만 모음 (전부 실패하면 예외)"""
+    partials = []
+    for partition, result in zip(partitions, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ 부분 요약 실패 ({partition['label']}): {result}")
+        else:
+            partials.append(result)
+    if not partials:
+        raise RuntimeError("모든 파티션의 부분 요약 생성에 실패했습니다.")
+    return partials
+
+
+def map_reduce_insight_with_llm(prepared: dict, on_progress=None) -> dict:
+    """파티션별 부분 요약을 최대 INSIGHT_MAP_CONCURRENCY개씩 동시에 생성한 뒤 reduce"""
+    partitions = prepared["partitions"]
+    print(f"🗺️ map-reduce 인사이트: 파티션 {len(partitions)}개 (동시 {INSIGHT_MAP_CONCURRENCY}개)")
+
+    def map_one(partition):
+        try:
+            return generate_insight_with_llm(build_map_prompt(partition), system_prompt=MAP_SYSTEM_PROMPT)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=INSIGHT_MAP_CONCURRENCY, thread_name_prefix="insight-map") as pool:
+        results = list(pool.map(map_one, partitions))
+    partials = _collect_partials(partitions, results)
+
+    if on_progress:
+        on_progress(f"부분 요약 {len(partials)}/{len(partitions)}개 완료, 최종 보고서 작성 중...")
+    prepared["reduce_prompt"] = build_reduce_prompt(build_reduce_data(prepared["data"], partials))
+    return generate_insight_with_llm(prepared["reduce_prompt"], on_progress=on_progress)
+
+
+async def amap_reduce_insight_with_llm(prepared: dict, on_progress=None) -> dict:
+    """map_reduce_insight_with_llm의 비동기 버전 (세마포어로 동시 호출 수 제한)"""
+    partitions = prepared["partitions"]
+    print(f"🗺️ map-reduce 인사이트: 파티션 {len(partitions)}개 (동시 {INSIGHT_MAP_CONCURRENCY}개)")
+    semaphore = asyncio.Semaphore(INSIGHT_MAP_CONCURRENCY)
+    finished = 0
+
+    async def map_one(partition):
+        nonlocal finished
+        async with semaphore:
+            partial = await agenerate_insight_with_llm(build_map_prompt(partition), system_prompt=MAP_SYSTEM_PROMPT)
+        finished += 1
+        if on_progress:
+            on_progress(f"부분 요약 {finished}/{len(partitions)} 완료 ({partition['label']})")
+        return partial
+
+    results = await asyncio.gather(*(map_one(p) for p in partitions), return_exceptions=True)
+    partials = _collect_partials(partitions, results)
+
+    if on_progress:
+        on_progress("최종 보고서 작성 중...")
+    prepared["reduce_prompt"] = build_reduce_prompt(build_reduce_data(prepared["data"], partials))
+    return await agenerate_insight_with_llm(prepared["reduce_prompt"], on_progress=on_progress)
+
+
+def insight_prompt_hash(prepared: dict) -> str:
+    """
+    fingerprint에 저장할 prompt_hash = 이 인사이트를 만든 LLM 입력
+    - 단일 호출: 분석 프롬프트
+    - map-reduce: 파티션별 map 프롬프트 해시 + 실제로 보낸 reduce 프롬프트 (부분 요약 포함)
+    """
+    reduce_prompt = prepared.get("reduce_prompt")
+    if reduce_prompt is None:
+        return prompt_hash(LLM_CONFIG, SYSTEM_PROMPT, prepared["prompt"])
+    map_hashes = [prompt_hash(LLM_CONFIG, MAP_SYSTEM_PROMPT, build_map_prompt(p)) for p in prepared["partitions"]]
+    return prompt_hash(
+        LLM_CONFIG, SYSTEM_PROMPT, json.dumps({"map": map_hashes, "reduce": reduce_prompt}, ensure_ascii=False)
+    )
+
+
 # ===========================
 # 4️⃣ DB 저장
 # ===========================
+SYSTEM_USER_ID = 10001  # 시스템 자동 생성용 기본 user_id
+
+
+def _insight_columns(insight_data: dict) -> tuple:
+    """LLM 응답 → (pos_top_keywords, neg_top_keywords, insight_summary, improvement_suggestion, content)"""
+    summary = insight_data.get("summary", {})
+    return (
+        ", ".join(summary.get("keywords", {}).get("positive", [])),
+        ", ".join(summary.get("keywords", {}).get("negative", [])),
+        summary.get("insight_one_liner", ""),
+        summary.get("recommendation", ""),
+        json.dumps(insight_data.get("report", {}), ensure_ascii=False),
+    )
+
+
+def _latest_insight_ids(cursor, product_ids: list) -> dict:
+    """제품별 최신 insight_id (save_insight_to_db와 같은 기준: created_at 최신)"""
+    if not product_ids:
+        return {}
+    placeholders = ",".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"""
+        SELECT product_id, insight_id
+        FROM tb_productInsight
+        WHERE product_id IN ({placeholders})
+        ORDER BY created_at DESC, insight_id DESC
+        """,
+        product_ids
+    )
+    latest = {}
+    for row in cursor.fetchall():
+        latest.setdefault(row["product_id"], row["insight_id"])
+    return latest
+
+
+def save_insights_bulk(cursor, items: list) -> dict:
+    """
+    여러 제품의 인사이트를 다중 행 upsert 1회로 저장 (커밋하지 않음)
+    - items: [(product_id, user_id, insight_data)]
+    - 기존 인사이트가 있으면 그 insight_id 행을 갱신, 없으면 새로 생성 (save_insight_to_db와 같은 결과)
+    Returns: {product_id: insight_id}
+    """
+    if not items:
+        return {}
+    product_ids = [product_id for product_id, _, _ in items]
+    existing = _latest_insight_ids(cursor, product_ids)
+    now = datetime.now()
+    values = []
+    for product_id, user_id, insight_data in items:
+        values.append((
+            existing.get(product_id),
+            product_id,
+            SYSTEM_USER_ID if user_id is None else user_id,
+            *_insight_columns(insight_data),
+            now,
+        ))
+    cursor.execute(
+        """
+        INSERT INTO tb_productInsight (
+            insight_id, product_id, user_id, pos_top_keywords, neg_top_keywords,
+            insight_summary, improvement_suggestion, content, created_at
+        ) VALUES """
+        + ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(values))
+        + """
+        ON DUPLICATE KEY UPDATE
+            user_id = VALUES(user_id),
+            pos_top_keywords = VALUES(pos_top_keywords),
+            neg_top_keywords = VALUES(neg_top_keywords),
+            insight_summary = VALUES(insight_summary),
+            improvement_suggestion = VALUES(improvement_suggestion),
+            content = VALUES(content),
+            created_at = VALUES(created_at)
+        """,
+        [v for row in values for v in row]
+    )
+    created = [product_id for product_id in product_ids if product_id not in existing]
+    return {**existing, **_latest_insight_ids(cursor, created)}
+
+
 def save_insight_to_db(product_id: int, user_id: int, insight_data: dict) -> int:
     """
     인사이트 데이터를 DB에 저장
@@ -211,15 +543,10 @@ def save_insight_to_db(product_id: int, user_id: int, insight_data: dict) -> int
         
         # user_id가 None이면 기본값 사용 (시스템 자동 생성)
         if user_id is None:
-            user_id = 10001  # 시스템 자동 생성용 기본 user_id
+            user_id = SYSTEM_USER_ID
         
         # 데이터 추출
-        summary = insight_data.get("summary", {})
-        pos_keywords = ", ".join(summary.get("keywords", {}).get("positive", []))
-        neg_keywords = ", ".join(summary.get("keywords", {}).get("negative", []))
-        insight_summary = summary.get("insight_one_liner", "")
-        improvement_suggestion = summary.get("recommendation", "")
-        content_json = json.dumps(insight_data.get("report", {}), ensure_ascii=False)
+        pos_keywords, neg_keywords, insight_summary, improvement_suggestion, content_json = _insight_columns(insight_data)
         
         # 기존 인사이트 확인 (같은 product_id의 최신 인사이트)
         cursor.execute(
@@ -301,44 +628,134 @@ def save_insight_to_db(product_id: int, user_id: int, insight_data: dict) -> int
 # ===========================
 # 🎯 메인 함수
 # ===========================
-def generate_insight_from_db(product_id: int, user_id: int = None) -> int:
+def _load_previous_fingerprint(product_id: int):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            return load_fingerprint(cursor, product_id)
+    finally:
+        conn.close()
+
+
+def _save_fingerprint(product_id: int, insight_id: int, fingerprint: dict, llm_input_hash: str):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            save_fingerprint(cursor, product_id, insight_id, fingerprint, llm_input_hash)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _prepare_insight(product_id: int, force: bool):
+    """
+    데이터 조회 + 입력 변화량 확인
+    Returns:
+        None: 리뷰 없음
+        int: 변화가 작아 유지할 기존 insight_id
+        dict: LLM 호출에 필요한 {"fingerprint", "prompt", "data", "partitions"(map-reduce 모드)}
+    """
+    # 1. 데이터 조회
+    print("📊 리뷰 데이터 조회 중...")
+    data = fetch_review_data(product_id)
+    
+    if data["total_reviews"] == 0:
+        print("⚠️ 리뷰 데이터가 없습니다.")
+        return None
+    
+    print(f"✅ 리뷰 {data['total_reviews']}개 조회 완료")
+    
+    # 2. 입력 변화량 확인 (이전 인사이트 입력과 거의 같으면 LLM 호출 생략)
+    fingerprint = build_fingerprint(data)
+    previous = _load_previous_fingerprint(product_id)
+    drift = insight_drift(previous, fingerprint)
+    if previous and not force and drift < INSIGHT_DRIFT_THRESHOLD:
+        print(
+            f"⏭️ 입력 변화량 {drift:.4f} < {INSIGHT_DRIFT_THRESHOLD} → 기존 인사이트 유지 "
+            f"(insight_id={previous['insight_id']})"
+        )
+        INSIGHT_RUNS.inc(outcome="skipped")
+        return previous["insight_id"]
+    print(f"📈 입력 변화량 {drift:.4f} (임계값 {INSIGHT_DRIFT_THRESHOLD}) → 인사이트 생성")
+    
+    # 3. 프롬프트 생성 (리뷰가 매우 많으면 map-reduce용 파티션 구성)
+    prepared = {"fingerprint": fingerprint, "prompt": build_analysis_prompt(data), "data": data}
+    if should_map_reduce(data["total_reviews"]):
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                prepared["partitions"] = fetch_partitions(cursor, product_id, data["sentiment_summary"])
+        finally:
+            conn.close()
+        covered = sum(p["candidates"] for p in prepared["partitions"])
+        print(f"🧩 map-reduce 파티션 {len(prepared['partitions'])}개 (후보 리뷰 {covered}개)")
+    return prepared
+
+
+def _store_insight(product_id: int, user_id: int, insight: dict, prepared: dict) -> int:
+    """DB 저장 + fingerprint 기록"""
+    insight_id = save_insight_to_db(product_id, user_id, insight)
+    _save_fingerprint(product_id, insight_id, prepared["fingerprint"], insight_prompt_hash(prepared))
+    print(f"🎉 인사이트 생성 완료 (insight_id={insight_id})")
+    return insight_id
+
+
+def generate_insight_from_db(product_id: int, user_id: int = None, force: bool = False, on_progress=None) -> int:
     """
     제품 리뷰 인사이트 생성 메인 함수
     
     Args:
         product_id: 제품 ID
         user_id: 사용자 ID (선택, 없으면 None)
+        force: True면 입력 변화량과 관계없이 다시 생성
+        on_progress: LLM 응답 중간 진행 메시지(str)를 받을 콜백 (선택)
     
     Returns:
-        insight_id: 생성된 인사이트 ID
+        insight_id: 생성된 인사이트 ID (변화가 작으면 기존 인사이트 ID)
     """
     try:
         print(f"🔍 인사이트 생성 시작 (product_id={product_id})")
+        prepared = _prepare_insight(product_id, force)
+        if not isinstance(prepared, dict):
+            return prepared
         
-        # 1. 데이터 조회
-        print("📊 리뷰 데이터 조회 중...")
-        data = fetch_review_data(product_id)
-        
-        if data["total_reviews"] == 0:
-            print("⚠️ 리뷰 데이터가 없습니다.")
-            return None
-        
-        print(f"✅ 리뷰 {data['total_reviews']}개 조회 완료")
-        
-        # 2. 프롬프트 생성
-        prompt = build_analysis_prompt(data)
-        
-        # 3. LLM 호출
-        insight = generate_insight_with_llm(prompt)
+        # 4. LLM 호출 (같은 프롬프트는 캐시 응답, 대용량 제품은 map-reduce)
+        if prepared.get("partitions"):
+            insight = map_reduce_insight_with_llm(prepared, on_progress=on_progress)
+        else:
+            insight = generate_insight_with_llm(prepared["prompt"], on_progress=on_progress)
         
-        # 4. DB 저장
-        insight_id = save_insight_to_db(product_id, user_id, insight)
+        # 5. DB 저장 + fingerprint 기록
+        return _store_insight(product_id, user_id, insight, prepared)
         
-        print(f"🎉 인사이트 생성 완료 (insight_id={insight_id})")
+    except Exception as e:
+        INSIGHT_RUNS.inc(outcome="failed")
+        print(f"❌ 인사이트 생성 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+async def agenerate_insight_from_db(product_id: int, user_id: int = None, force: bool = False, on_progress=None) -> int:
+    """
+    generate_insight_from_db의 비동기 버전 (SSE 분석 스트림용)
+    - DB 조회/저장은 io 실행기, LLM 스트리밍은 이벤트 루프의 공유 클라이언트에서 실행
+    - on_progress는 이벤트 루프에서 호출됨
+    """
+    try:
+        print(f"🔍 인사이트 생성 시작 (product_id={product_id})")
+        prepared = await run_io(_prepare_insight, product_id, force)
+        if not isinstance(prepared, dict):
+            return prepared
         
-        return insight_id
+        if prepared.get("partitions"):
+            insight = await amap_reduce_insight_with_llm(prepared, on_progress=on_progress)
+        else:
+            insight = await agenerate_insight_with_llm(prepared["prompt"], on_progress=on_progress)
+        return await run_io(_store_insight, product_id, user_id, insight, prepared)
         
     except Exception as e:
+        INSIGHT_RUNS.inc(outcome="failed")
         print(f"❌ 인사이트 생성 실패: {e}")
         import traceback
         traceback.print_exc()
@@ -1,12 +1,11 @@
 import base64
 import os
-import re
 import sys
 from collections import Counter
 from io import BytesIO
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
-from konlpy.tag import Okt
 from wordcloud import WordCloud
 
 # Local import when executed as a script
@@ -17,6 +16,16 @@ if __name__ == "__main__":
         sys.path.insert(0, model_server_dir)
 
 from utils.db_connect import get_connection
+from utils.review_tokens import aggregate_token_counts, count_pending, ensure_review_tokens
+from utils.stopword_matcher import (
+    StopwordMatcher,
+    get_domain_matcher,
+    product_terms,
+    read_stopword_file,
+    stopword_paths,
+    stopword_version,
+)
+from utils.wordcloud_cache import get_wordcloud_cache, wordcloud_key
 
 load_dotenv()
 
@@ -75,41 +84,16 @@ def fetch_product_info(cursor, product_id: int):
     return (info["product_name"], info["brand"]) if info else (None, None)
 
 
-def fetch_reviews(cursor, product_id: int, start_date: str = None, end_date: str = None):
-    where_clause = "WHERE product_id = %s"
-    params = [product_id]
-    if start_date:
-        where_clause += " AND DATE(review_date) >= %s"
-        params.append(start_date)
-    if end_date:
-        where_clause += " AND DATE(review_date) <= %s"
-        params.append(end_date)
-
-    cursor.execute(
-        f"SELECT review_text FROM tb_review {where_clause}",
-        tuple(params),
-    )
-    return [r["review_text"] for r in cursor.fetchall() if r["review_text"]]
-
-
 # ---------------------------------------------------------------------------
 # Stopword / token helpers
 # ---------------------------------------------------------------------------
 def load_stopwords(domain="steam", debug=False):
+    """불용어 set (파일 직접 로드, 필터링에는 캐시된 get_domain_matcher 사용)"""
     stopwords = set()
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    stopword_dir = os.path.join(current_dir, "stopwords")
-    base_path = os.path.join(stopword_dir, "base.txt")
-    domain_path = os.path.join(stopword_dir, f"{domain}.txt")
-
-    for path in [base_path, domain_path]:
+    for path in stopword_paths(domain):
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8-sig") as f:
-                for line in f:
-                    word = line.strip().replace("\ufeff", "").replace("\t", "").replace(" ", "")
-                    if word:
-                        stopwords.add(word)
+            stopwords |= read_stopword_file(path)
             if debug:
                 print(f"[wordcloud] 불용어 로드: {os.path.basename(path)}")
         elif debug:
@@ -122,98 +106,53 @@ def load_stopwords(domain="steam", debug=False):
 
 
 def add_product_stopwords(stopwords, product_name: str, brand: str, debug: bool):
-    if product_name:
-        words = product_name.split()
-        for word in words:
-            if word.strip() and len(word.strip()) > 1:
-                stopwords.add(word.strip())
-        if product_name.strip():
-            stopwords.add(product_name.strip())
-        if debug:
-            print(f"[wordcloud] 상품명 불용어 추가: {product_name}")
-
-    if brand:
-        brand_clean = brand.strip()
-        if brand_clean and len(brand_clean) > 1:
-            stopwords.add(brand_clean)
-            if debug:
-                print(f"[wordcloud] 브랜드 불용어 추가: {brand}")
-
-
-def chunk_long_text(text: str, max_length: int):
-    parts = []
-    current = ""
-    for char in text:
-        current += char
-        if len(current) >= max_length:
-            parts.append(current)
-            current = ""
-    if current:
-        parts.append(current)
-    return parts
-
-
-def tokenize_batch(okt, batch_text: str, max_length: int, batch_index: int):
-    effective_texts = (
-        chunk_long_text(batch_text, max_length) if len(batch_text) > max_length else [batch_text]
-    )
-    tokens = []
-    for idx, text_part in enumerate(effective_texts):
-        try:
-            part_tokens = [
-                t for t, pos in okt.pos(text_part) if pos in ["Noun", "Adjective"] and len(t) > 1
-            ]
-            tokens.extend(part_tokens)
-        except Exception as e:
-            print(f"[wordcloud] ⚠️ 배치 {batch_index} 부분 {idx + 1} 처리 오류 (건너뜀): {e}")
-    return tokens
-
+    stopwords |= product_terms(product_name, brand)
+    if debug and product_name:
+        print(f"[wordcloud] 상품명 불용어 추가: {product_name}")
+    if debug and brand:
+        print(f"[wordcloud] 브랜드 불용어 추가: {brand}")
 
-def tokenize_reviews(reviews, batch_size=100, max_text_length=30000):
-    print("[wordcloud] 형태소 분석 시작...")
-    okt = Okt()
-    all_tokens = []
-    num_batches = (len(reviews) + batch_size - 1) // batch_size
 
-    for i in range(0, len(reviews), batch_size):
-        batch_num = i // batch_size + 1
-        batch_reviews = reviews[i : i + batch_size]
-        batch_text = " ".join(batch_reviews)
-        batch_text = re.sub(r"[^가-힣A-Za-z0-9\s]", " ", batch_text)
-
-        all_tokens.extend(tokenize_batch(okt, batch_text, max_text_length, batch_num))
-        print(f"   진행: {batch_num}/{num_batches} 배치 완료 ({len(all_tokens)}개 토큰)")
-
-    print(f"[wordcloud] 형태소 분석 완료: {len(all_tokens)}개 토큰 추출")
-    return all_tokens
+def build_stopword_matcher(domain: str, product_name: str, brand: str, debug: bool) -> StopwordMatcher:
+    """캐시된 도메인 매처 위에 상품명/브랜드 불용어를 얹은 요청별 매처"""
+    matcher = get_domain_matcher(domain).with_terms(product_terms(product_name, brand))
+    if debug:
+        print(f"[wordcloud] 불용어 매처 준비: domain={domain}, 총 {len(matcher)}개 (상품명: {product_name}, 브랜드: {brand})")
+    return matcher
 
 
 def filter_tokens(tokens, stopwords, product_name: str, brand: str, debug: bool):
+    """
+    불용어 토큰 제거 (토큰 길이에 선형)
+    - stopwords: StopwordMatcher (set이 오면 매처로 변환)
+    - 같은 토큰은 한 번만 판정
+    """
+    matcher = stopwords if isinstance(stopwords, StopwordMatcher) else StopwordMatcher(stopwords)
     filtered_tokens = []
     removed = []
+    decisions = {}
 
     if debug:
-        print(f"[wordcloud] 불용어 갯수: {len(stopwords)}")
+        print(f"[wordcloud] 불용어 갯수: {len(matcher)}")
 
     for token in tokens:
         normalized = token.strip()
         if not normalized:
             continue
 
-        if normalized in stopwords:
-            removed.append(normalized)
-            continue
-        if any(sw in normalized for sw in stopwords if len(sw) > 1):
-            removed.append(normalized)
-            continue
-        if product_name and normalized in product_name:
-            removed.append(normalized)
-            continue
-        if brand and normalized in brand:
-            removed.append(normalized)
-            continue
+        is_stopword = decisions.get(normalized)
+        if is_stopword is None:
+            is_stopword = (
+                matcher.is_stopword(normalized)
+                or bool(product_name and normalized in product_name)
+                or bool(brand and normalized in brand)
+            )
+            decisions[normalized] = is_stopword
 
-        filtered_tokens.append(normalized)
+        if is_stopword:
+            removed.append(normalized)
+        else:
+            filtered_tokens.append(normalized)
 
     if debug:
         tokens_before = len(tokens)
@@ -225,14 +164,31 @@ def filter_tokens(tokens, stopwords, product_name: str, brand: str, debug: bool)
     return filtered_tokens
 
 
-def limit_reviews(reviews, max_reviews=2000):
-    if len(reviews) <= max_reviews:
-        return reviews
-    import random
+def filter_token_counts(counts: Counter, stopwords, product_name: str, brand: str, debug: bool) -> Counter:
+    """저장된 토큰 빈도에서 불용어 제거 (고유 토큰 단위로 판정)"""
+    kept = set(filter_tokens(list(counts), stopwords, product_name, brand, debug=False))
+    filtered = Counter({token: cnt for token, cnt in counts.items() if token in kept})
+    if debug:
+        before, after = sum(counts.values()), sum(filtered.values())
+        print(f"[wordcloud] 불용어 제거 통계: before={before}, after={after}, removed={before - after} (고유 토큰 {len(counts)} → {len(filtered)})")
+    return filtered
+
+
+class TokensPending(Exception):
+    """아직 토큰화되지 않은 리뷰가 있음 → 요청 경로에서 Okt를 돌리지 않고 워드클라우드 작업에 맡김"""
+
+    def __init__(self, product_id: int, pending: int):
+        super().__init__(f"토큰화 대기 중인 리뷰가 {pending}개 있습니다 (product_id={product_id})")
+        self.product_id = product_id
+        self.pending = pending
 
-    sampled = reviews[-max_reviews:] if len(reviews) > max_reviews * 2 else random.sample(reviews, max_reviews)
-    print(f"[wordcloud] 성능 최적화: {len(reviews)}개 → {len(sampled)}개 샘플링")
-    return sampled
+
+def load_token_frequencies(cursor, product_id: int, start_date: str = None, end_date: str = None) -> Counter:
+    """
+    기간 내 저장된 토큰 빈도 합산 (Okt 호출 없음)
+    - 토큰화는 분석 후처리의 워드클라우드 작업과 CLI 일괄 토큰화(python -m utils.review_tokens)에서만
+    """
+    return aggregate_token_counts(cursor, product_id, start_date, end_date)
 
 
 def build_wordcloud(freq, font_path):
@@ -246,31 +202,138 @@ def build_wordcloud(freq, font_path):
 
 
 # ---------------------------------------------------------------------------
-# Public APIs
+# Render cache
 # ---------------------------------------------------------------------------
-def generate_wordcloud_from_db(product_id: int, domain="steam", start_date: str = None, end_date: str = None):
-    conn = get_connection()
-    cursor = conn.cursor()
+def fetch_review_watermark(cursor, product_id: int):
+    """리뷰 추가/삭제 감지용 워터마크 (리뷰 수, 최신 review_id)"""
+    cursor.execute(
+        "SELECT COUNT(*) AS cnt, MAX(review_id) AS max_id FROM tb_review WHERE product_id = %s", (product_id,)
+    )
+    row = cursor.fetchone()
+    return row["cnt"], row["max_id"]
+
 
+def compute_wordcloud_key(cursor, product_id: int, domain: str, start_date: str = None, end_date: str = None):
+    """
+    워드클라우드 캐시 키 (= ETag) 계산, 렌더링 없이 가벼운 쿼리 2개만 실행
+    반환: (key, product_name, brand, font_path), 리뷰/폰트가 없으면 key=None
+    """
     product_name, brand = fetch_product_info(cursor, product_id)
-    reviews = fetch_reviews(cursor, product_id, start_date, end_date)
+    review_count, max_review_id = fetch_review_watermark(cursor, product_id)
+    font_path = get_font_path()
+    if not review_count or not font_path:
+        return None, product_name, brand, font_path
+
+    key = wordcloud_key(
+        product_id=product_id,
+        domain=domain,
+        start_date=start_date,
+        end_date=end_date,
+        review_count=review_count,
+        max_review_id=max_review_id,
+        stopwords=stopword_version(domain),
+        product_name=product_name,
+        brand=brand,
+        font=font_path,
+    )
+    return key, product_name, brand, font_path
 
-    if not reviews:
-        conn.close()
-        return None
 
-    print(f"[wordcloud] 총 리뷰 수: {len(reviews)}")
-    reviews = limit_reviews(reviews)
+def render_wordcloud_png(cursor, product_id: int, domain: str, start_date, end_date, product_name, brand, font_path, debug: bool):
+    """저장된 토큰 빈도 → 불용어 제거 → PNG bytes (대상 토큰이 없으면 None)"""
+    counts = load_token_frequencies(cursor, product_id, start_date, end_date)
+    if not counts:
+        return None
 
-    tokens = tokenize_reviews(reviews)
-    stopwords = load_stopwords(domain, debug=True)
-    add_product_stopwords(stopwords, product_name, brand, debug=True)
-    tokens = filter_tokens(tokens, stopwords, product_name, brand, debug=True)
+    if debug:
+        print(f"[wordcloud] 고유 토큰 수: {len(counts)}")
+    stopwords = build_stopword_matcher(domain, product_name, brand, debug=debug)
+    counts = filter_token_counts(counts, stopwords, product_name, brand, debug=debug)
 
-    freq = dict(Counter(tokens).most_common(200))
+    freq = dict(counts.most_common(200))
     if not freq:
+        return None
+
+    try:
+        wc = build_wordcloud(freq, font_path)
+    except Exception as e:
+        print(f"[wordcloud] 렌더링 실패: {e}, font_path={font_path}")
+        return None
+
+    buffer = BytesIO()
+    wc.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def wordcloud_etag(product_id: int, domain="steam", start_date: str = None, end_date: str = None) -> Optional[str]:
+    """조건부 요청(If-None-Match) 비교용 키만 계산"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            return compute_wordcloud_key(cursor, product_id, domain, start_date, end_date)[0]
+    finally:
+        conn.close()
+
+
+def get_wordcloud_png(
+    product_id: int,
+    domain="steam",
+    start_date: str = None,
+    end_date: str = None,
+    debug: bool = False,
+    allow_pending: bool = False,
+) -> Optional[Tuple[str, bytes]]:
+    """
+    (캐시 키, PNG bytes) 반환
+    - 같은 입력(리뷰 워터마크/불용어/기간...)으로 이미 렌더링했으면 디스크 캐시에서 바로 반환
+    - 아니면 렌더링 후 캐시에 저장
+    - 토큰화되지 않은 리뷰가 남아 있으면 TokensPending (allow_pending=True면 저장된 토큰만으로 렌더링)
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        key, product_name, brand, font_path = compute_wordcloud_key(cursor, product_id, domain, start_date, end_date)
+        if not key:
+            return None
+
+        cache = get_wordcloud_cache()
+        cached_path = cache.path(key)
+        if cached_path:
+            try:
+                with open(cached_path, "rb") as f:
+                    if debug:
+                        print(f"[wordcloud] 캐시 적중: product_id={product_id}, key={key}")
+                    return key, f.read()
+            except OSError:
+                pass  # 읽는 사이 제거됨 → 다시 렌더링
+
+        if not allow_pending:
+            pending = count_pending(cursor, product_id)
+            if pending:
+                raise TokensPending(product_id, pending)
+
+        png = render_wordcloud_png(cursor, product_id, domain, start_date, end_date, product_name, brand, font_path, debug)
+        if png is None:
+            return None
+        cache.put(key, png)
+        return key, png
+    finally:
+        cursor.close()
         conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Public APIs
+# ---------------------------------------------------------------------------
+def generate_wordcloud_from_db(product_id: int, domain="steam", start_date: str = None, end_date: str = None):
+    """
+    워드클라우드 작업(utils/wordcloud_jobs.py)에서 ensure_review_tokens 다음에 호출
+    그 사이 들어온 리뷰는 다음 작업에서 반영 (저장된 토큰만으로 렌더링)
+    """
+    rendered = get_wordcloud_png(product_id, domain, start_date, end_date, debug=True, allow_pending=True)
+    if not rendered:
         return None
+    _, png = rendered
 
     model_server_dir = get_model_server_dir()
     static_dir = os.path.join(model_server_dir, "static", "wordclouds")
@@ -285,77 +348,36 @@ def generate_wordcloud_from_db(product_id: int, domain="steam", start_date: str
     save_path = os.path.join(static_dir, f"product_{product_id}_wc{suffix}.png")
     public_path = f"/static/wordclouds/product_{product_id}_wc{suffix}.png"
 
-    font_path = get_font_path()
-    if not font_path:
-        conn.close()
-        return None
-
-    try:
-        wc = build_wordcloud(freq, font_path)
-    except Exception as e:
-        print(f"[wordcloud] generate_wordcloud_from_db 실패: {e}, font_path={font_path}")
-        conn.close()
-        return None
-
-    wc.to_file(save_path)
+    with open(save_path, "wb") as f:
+        f.write(png)
 
     if not start_date and not end_date:
-        cursor.execute(
-            """
-            UPDATE tb_productDashboard
-            SET wordcloud_path = %s
-            WHERE product_id = %s
-        """,
-            (public_path, product_id),
-        )
-        conn.commit()
-    conn.close()
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE tb_productDashboard
+                    SET wordcloud_path = %s
+                    WHERE product_id = %s
+                """,
+                    (public_path, product_id),
+                )
+            conn.commit()
+        finally:
+            conn.close()
     return public_path
 
 
 def generate_wordcloud_base64(product_id: int, domain="steam", start_date: str = None, end_date: str = None):
     """
-    파일 저장 없이 메모리에서 워드클라우드를 생성해 base64 문자열을 반환합니다.
+    파일 저장 없이 워드클라우드를 base64 data URI로 반환합니다. (렌더 캐시 공유)
+    이미지를 직접 쓰는 클라이언트는 GET /v1/products/{id}/wordcloud.png 사용을 권장합니다.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    product_name, brand = fetch_product_info(cursor, product_id)
-    reviews = fetch_reviews(cursor, product_id, start_date, end_date)
-
-    if not reviews:
-        conn.close()
-        return None
-
-    reviews = limit_reviews(reviews)
-    tokens = tokenize_reviews(reviews)
-
-    stopwords = load_stopwords(domain, debug=False)
-    add_product_stopwords(stopwords, product_name, brand, debug=False)
-    tokens = filter_tokens(tokens, stopwords, product_name, brand, debug=False)
-
-    freq = dict(Counter(tokens).most_common(200))
-    if not freq:
-        conn.close()
-        return None
-
-    font_path = get_font_path()
-    if not font_path:
-        conn.close()
+    rendered = get_wordcloud_png(product_id, domain, start_date, end_date)
+    if not rendered:
         return None
-
-    try:
-        wc = build_wordcloud(freq, font_path)
-    except Exception as e:
-        print(f"[wordcloud] generate_wordcloud_base64 실패: {e}, font_path={font_path}")
-        conn.close()
-        return None
-
-    buffer = BytesIO()
-    wc.to_image().save(buffer, format="PNG")
-    base64_img = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-    conn.close()
+    base64_img = base64.b64encode(rendered[1]).decode("utf-8")
     return f"data:image/png;base64,{base64_img}"
 
 
@@ -373,6 +395,7 @@ if __name__ == "__main__":
         init_db_pool()
 
         print(f"\n[wordcloud] 워드클라우드 생성 시작 (product_id={product_id}, domain={domain})")
+        ensure_review_tokens(product_id, debug=True)
         wc_path = generate_wordcloud_from_db(product_id, domain)
 
         if wc_path:
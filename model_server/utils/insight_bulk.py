@@ -0,0 +1,480 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import openai
+from dotenv import load_dotenv
+
+from utils.db_connect import get_connection
+from utils.executors import run_io
+from utils.generate_insight import (
+    agenerate_insight_with_llm,
+    amap_reduce_insight_with_llm,
+    build_analysis_prompt,
+    fetch_review_data_batch,
+    insight_prompt_hash,
+    save_insights_bulk,
+)
+from utils.insight_cache import (
+    INSIGHT_DRIFT_THRESHOLD,
+    build_fingerprint,
+    insight_drift,
+    load_fingerprints,
+    save_fingerprints,
+)
+from utils.insight_map_reduce import fetch_partitions, should_map_reduce
+from utils.metrics import INSIGHT_RUNS
+
+load_dotenv()
+
+# =========================================================
+# 대량 인사이트 재생성 작업 (야간 일괄 갱신 등)
+# - 입력: 제품 ID 목록 또는 카테고리
+# - 조회: INSIGHT_BULK_FETCH_BATCH개 제품씩 fetch_review_data_batch + fingerprint 일괄 조회 (변화가 작으면 건너뜀)
+# - LLM: 워커 INSIGHT_BULK_CONCURRENCY개가 동시에 호출
+#   · 429(rate limit)면 Retry-After(없으면 지수 백오프)만큼 모든 워커가 함께 대기
+#   · 5xx/타임아웃/연결 오류는 해당 제품만 지수 백오프 후 재시도
+# - 저장: INSIGHT_BULK_WRITE_BATCH개씩 tb_productInsight / fingerprint 다중 행 upsert
+# - deadline_minutes가 지나면 새 제품 시작을 멈추고 남은 제품은 deferred로 보고
+# - 엔드포인트: POST /v1/insights/bulk, GET /v1/insights/bulk/{job_id}
+# - CLI: python -m utils.insight_bulk --category 103 [--force] [--deadline-minutes 240]
+# =========================================================
+INSIGHT_BULK_CONCURRENCY = int(os.getenv("INSIGHT_BULK_CONCURRENCY", 8))
+INSIGHT_BULK_FETCH_BATCH = int(os.getenv("INSIGHT_BULK_FETCH_BATCH", 20))
+INSIGHT_BULK_WRITE_BATCH = int(os.getenv("INSIGHT_BULK_WRITE_BATCH", 50))
+INSIGHT_BULK_MAX_RETRIES = int(os.getenv("INSIGHT_BULK_MAX_RETRIES", 5))
+INSIGHT_BULK_BACKOFF_BASE = float(os.getenv("INSIGHT_BULK_BACKOFF_BASE", 2))   # 초
+INSIGHT_BULK_BACKOFF_MAX = float(os.getenv("INSIGHT_BULK_BACKOFF_MAX", 120))   # 초
+INSIGHT_BULK_LOG_EVERY = int(os.getenv("INSIGHT_BULK_LOG_EVERY", 25))          # 진행 로그 간격 (제품 수)
+_MAX_FINISHED_JOBS = 20
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+# ---------------------------------------------------------
+# 재시도 / rate limit
+# ---------------------------------------------------------
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """재시도 대기 시간 (재시도하지 않을 오류면 None)"""
+    backoff = min(INSIGHT_BULK_BACKOFF_MAX, INSIGHT_BULK_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.8, 1.2)
+    if isinstance(error, openai.RateLimitError):
+        return min(INSIGHT_BULK_BACKOFF_MAX, _retry_after(error) or backoff)
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)):
+        return backoff
+    return None
+
+
+class RateLimitGate:
+    """429를 받으면 쿨다운이 끝날 때까지 모든 워커의 새 호출을 막음"""
+
+    def __init__(self):
+        self.cooldown_until = 0.0
+
+    def cool_down(self, seconds: float):
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    async def wait(self):
+        while True:
+            remaining = self.cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+
+# ---------------------------------------------------------
+# 작업
+# ---------------------------------------------------------
+class BulkInsightJob:
+    def __init__(
+        self,
+        product_ids: List[int],
+        force: bool = False,
+        user_id: Optional[int] = None,
+        concurrency: int = INSIGHT_BULK_CONCURRENCY,
+        deadline_minutes: Optional[float] = None,
+        label: str = "",
+    ):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.product_ids = list(dict.fromkeys(product_ids))  # 중복 제거 (순서 유지)
+        self.force = force
+        self.user_id = user_id
+        self.concurrency = max(1, concurrency)
+        self.deadline_minutes = deadline_minutes
+        self.label = label
+        self.state = QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.counters = {
+            "generated": 0,   # LLM으로 새로 생성 (캐시 적중 포함)
+            "skipped": 0,     # 입력 변화가 작아 유지
+            "empty": 0,       # 리뷰 없음
+            "failed": 0,
+            "deferred": 0,    # 마감 시간으로 시작하지 못함
+            "written": 0,     # DB에 저장된 인사이트 수
+            "retries": 0,
+            "rate_limited": 0,
+        }
+        self.failures: Dict[int, str] = {}
+        self.task: Optional[asyncio.Task] = None
+        self._gate = RateLimitGate()
+        self._pending_writes: List[tuple] = []
+        self._last_log = 0
+
+    # -----------------------------------------------------
+    # 상태
+    # -----------------------------------------------------
+    @property
+    def processed(self) -> int:
+        c = self.counters
+        return c["generated"] + c["skipped"] + c["empty"] + c["failed"] + c["deferred"]
+
+    def _elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = self._elapsed()
+        processed = self.processed
+        rate = processed / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = len(self.product_ids) - processed
+        return {
+            "job_id": self.job_id,
+            "label": self.label,
+            "state": self.state,
+            "total": len(self.product_ids),
+            "processed": processed,
+            **self.counters,
+            "concurrency": self.concurrency,
+            "force": self.force,
+            "deadline_minutes": self.deadline_minutes,
+            "elapsed_s": round(elapsed, 1),
+            "products_per_min": round(rate, 2),
+            "eta_s": round(remaining / rate * 60, 1) if rate > 0 and self.state == RUNNING else None,
+            "error": self.error,
+            "failures": dict(list(self.failures.items())[:50]),
+        }
+
+    def _log_progress(self, force: bool = False):
+        if not force and self.processed - self._last_log < INSIGHT_BULK_LOG_EVERY:
+            return
+        self._last_log = self.processed
+        snap = self.snapshot()
+        print(
+            f"📦 [BulkInsight {self.job_id}] {snap['processed']}/{snap['total']} "
+            f"(생성 {snap['generated']}, 유지 {snap['skipped']}, 실패 {snap['failed']}, 저장 {snap['written']}) "
+            f"{snap['products_per_min']}개/분, 재시도 {snap['retries']}, ETA {snap['eta_s']}s"
+        )
+
+    def _past_deadline(self) -> bool:
+        return self.deadline_minutes is not None and self._elapsed() > self.deadline_minutes * 60
+
+    # -----------------------------------------------------
+    # 단계별 처리
+    # -----------------------------------------------------
+    def _prepare_batch(self, product_ids: List[int]) -> List[tuple]:
+        """제품 묶음 조회 + 재생성 판단 → [(product_id, prepared 또는 None, 상태)]"""
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                batch_data = fetch_review_data_batch(cursor, product_ids)
+                previous = load_fingerprints(cursor, product_ids)
+                prepared = []
+                for product_id in product_ids:
+                    data = batch_data[product_id]
+                    if data["total_reviews"] == 0:
+                        prepared.append((product_id, None, "empty"))
+                        continue
+                    fingerprint = build_fingerprint(data)
+                    before = previous.get(product_id)
+                    if before and not self.force and insight_drift(before, fingerprint) < INSIGHT_DRIFT_THRESHOLD:
+                        INSIGHT_RUNS.inc(outcome="skipped")
+                        prepared.append((product_id, None, "skipped"))
+                        continue
+                    item = {"fingerprint": fingerprint, "prompt": build_analysis_prompt(data), "data": data}
+                    if should_map_reduce(data["total_reviews"]):
+                        item["partitions"] = fetch_partitions(cursor, product_id, data["sentiment_summary"])
+                    prepared.append((product_id, item, "generate"))
+                return prepared
+        finally:
+            conn.close()
+
+    def _write_batch(self, items: List[tuple]) -> int:
+        """[(product_id, insight, prepared)] → 인사이트 + fingerprint 다중 행 upsert, 1회 커밋"""
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                insight_ids = save_insights_bulk(cursor, [(pid, self.user_id, insight) for pid, insight, _ in items])
+                save_fingerprints(
+                    cursor,
+                    [
+                        (pid, insight_ids[pid], prepared["fingerprint"], insight_prompt_hash(prepared))
+                        for pid, _, prepared in items
+                    ],
+                )
+            conn.commit()
+            return len(items)
+        finally:
+            conn.close()
+
+    async def _flush(self, force: bool = False):
+        if not self._pending_writes or (not force and len(self._pending_writes) < INSIGHT_BULK_WRITE_BATCH):
+            return
+        items, self._pending_writes = self._pending_writes, []
+        try:
+            self.counters["written"] += await run_io(self._write_batch, items)
+        except Exception as e:
+            print(f"❌ [BulkInsight {self.job_id}] 인사이트 {len(items)}개 저장 실패: {e}")
+            for product_id, _, _ in items:
+                self.failures[product_id] = f"저장 실패: {e}"
+            self.counters["generated"] -= len(items)
+            self.counters["failed"] += len(items)
+
+    async def _generate(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM 호출 (rate limit 게이트 + 재시도)"""
+        for attempt in range(INSIGHT_BULK_MAX_RETRIES + 1):
+            await self._gate.wait()
+            try:
+                if prepared.get("partitions"):
+                    return await amap_reduce_insight_with_llm(prepared)
+                return await agenerate_insight_with_llm(prepared["prompt"])
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                if delay is None or attempt == INSIGHT_BULK_MAX_RETRIES:
+                    raise
+                if isinstance(e, openai.RateLimitError):
+                    self.counters["rate_limited"] += 1
+                    self._gate.cool_down(delay)
+                self.counters["retries"] += 1
+                print(f"⏳ [BulkInsight {self.job_id}] 재시도 {attempt + 1}/{INSIGHT_BULK_MAX_RETRIES} ({delay:.1f}초 후): {e}")
+                await asyncio.sleep(delay)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            entry = await queue.get()
+            if entry is None:
+                return
+            product_id, prepared = entry
+            if self._past_deadline():
+                self.counters["deferred"] += 1
+                continue
+            try:
+                insight = await self._generate(prepared)
+                self.counters["generated"] += 1
+                self._pending_writes.append((product_id, insight, prepared))
+                await self._flush()
+            except Exception as e:
+                INSIGHT_RUNS.inc(outcome="failed")
+                self.counters["failed"] += 1
+                self.failures[product_id] = str(e)
+                print(f"❌ [BulkInsight {self.job_id}] product_id={product_id} 인사이트 생성 실패: {e}")
+            self._log_progress()
+
+    async def run(self):
+        self.state = RUNNING
+        self.started_at = time.time()
+        print(
+            f"📦 [BulkInsight {self.job_id}] 시작: 제품 {len(self.product_ids)}개 "
+            f"(동시 {self.concurrency}, force={self.force}, 마감 {self.deadline_minutes}분)"
+        )
+        # 조회는 LLM보다 조금만 앞서가도록 큐 크기 제한 (메모리 상한)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            for start in range(0, len(self.product_ids), INSIGHT_BULK_FETCH_BATCH):
+                batch = self.product_ids[start : start + INSIGHT_BULK_FETCH_BATCH]
+                if self._past_deadline():
+                    self.counters["deferred"] += len(self.product_ids) - start
+                    print(f"⏰ [BulkInsight {self.job_id}] 마감 시간 도달, 남은 제품 {len(self.product_ids) - start}개 연기")
+                    break
+                try:
+                    prepared = await run_io(self._prepare_batch, batch)
+                except Exception as e:
+                    print(f"❌ [BulkInsight {self.job_id}] 제품 {len(batch)}개 조회 실패: {e}")
+                    for product_id in batch:
+                        self.failures[product_id] = f"조회 실패: {e}"
+                    self.counters["failed"] += len(batch)
+                    continue
+                for product_id, item, status in prepared:
+                    if status == "generate":
+                        await queue.put((product_id, item))
+                    else:
+                        self.counters[status] += 1
+                self._log_progress()
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            await self._flush(force=True)
+            self.state = DONE
+        except asyncio.CancelledError:
+            for worker in workers:
+                worker.cancel()
+            await self._flush(force=True)
+            self.state = CANCELLED
+            raise
+        except Exception as e:
+            for worker in workers:
+                worker.cancel()
+            self.state = FAILED
+            self.error = str(e)
+            raise
+        finally:
+            self.finished_at = time.time()
+            self._log_progress(force=True)
+
+
+# ---------------------------------------------------------
+# 작업 관리 (서버)
+# ---------------------------------------------------------
+_jobs: "OrderedDict[str, BulkInsightJob]" = OrderedDict()
+
+
+def resolve_product_ids(product_ids: Optional[List[int]] = None, category_id: Optional[int] = None) -> List[int]:
+    """제품 ID 목록 또는 카테고리 → 제품 ID 목록 (둘 다 주면 카테고리 안의 지정 제품만)"""
+    if category_id is None:
+        return list(product_ids or [])
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT product_id FROM tb_product WHERE category_id = %s ORDER BY product_id", (category_id,))
+            ids = [row["product_id"] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    if product_ids:
+        wanted = set(product_ids)
+        ids = [pid for pid in ids if pid in wanted]
+    return ids
+
+
+def _running_job() -> Optional[BulkInsightJob]:
+    return next((job for job in _jobs.values() if job.state in (QUEUED, RUNNING)), None)
+
+
+async def start_bulk_insight_job(
+    product_ids: Optional[List[int]] = None,
+    category_id: Optional[int] = None,
+    force: bool = False,
+    user_id: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    deadline_minutes: Optional[float] = None,
+) -> Dict[str, Any]:
+    """백그라운드 작업 시작 (한 번에 하나만 실행, 실행 중이면 RuntimeError)"""
+    running = _running_job()
+    if running:
+        raise RuntimeError(f"이미 실행 중인 대량 인사이트 작업이 있습니다 (job_id={running.job_id})")
+    ids = await run_io(resolve_product_ids, product_ids, category_id)
+    if not ids:
+        raise ValueError("대상 제품이 없습니다")
+
+    job = BulkInsightJob(
+        ids,
+        force=force,
+        user_id=user_id,
+        concurrency=concurrency or INSIGHT_BULK_CONCURRENCY,
+        deadline_minutes=deadline_minutes,
+        label=f"category={category_id}" if category_id is not None else f"products={len(ids)}",
+    )
+    _jobs[job.job_id] = job
+    while len(_jobs) > _MAX_FINISHED_JOBS and next(iter(_jobs.values())).state not in (QUEUED, RUNNING):
+        _jobs.popitem(last=False)
+
+    async def runner():
+        try:
+            await job.run()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ [BulkInsight {job.job_id}] 작업 실패: {e}")
+
+    job.task = asyncio.create_task(runner())
+    return job.snapshot()
+
+
+def bulk_insight_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    job = _jobs.get(job_id)
+    return job.snapshot() if job else None
+
+
+def bulk_insight_jobs() -> List[Dict[str, Any]]:
+    return [job.snapshot() for job in reversed(_jobs.values())]
+
+
+async def cancel_bulk_insight_jobs():
+    """서버 종료 시 실행 중인 작업 취소 (생성된 인사이트는 저장 후 종료)"""
+    for job in list(_jobs.values()):
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            print(f"[OK] 대량 인사이트 작업 취소 (job_id={job.job_id})")
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+async def _cli(args):
+    from utils.llm_client import close_llm_client
+
+    ids = resolve_product_ids(args.products, args.category)
+    if not ids:
+        print("⚠️ 대상 제품이 없습니다")
+        return
+    job = BulkInsightJob(
+        ids,
+        force=args.force,
+        user_id=args.user_id,
+        concurrency=args.concurrency,
+        deadline_minutes=args.deadline_minutes,
+        label=f"category={args.category}" if args.category is not None else f"products={len(ids)}",
+    )
+    try:
+        await job.run()
+    finally:
+        await close_llm_client()
+    snap = job.snapshot()
+    print(
+        f"✅ 완료: {snap['processed']}/{snap['total']} (생성 {snap['generated']}, 유지 {snap['skipped']}, "
+        f"리뷰 없음 {snap['empty']}, 실패 {snap['failed']}, 연기 {snap['deferred']}) "
+        f"{snap['elapsed_s']}s, {snap['products_per_min']}개/분"
+    )
+
+
+if __name__ == "__main__":
+    from utils.db_connect import close_db_pool, init_db_pool
+    from utils.executors import close_executors
+
+    parser = argparse.ArgumentParser(description="bulk insight regeneration")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--products", type=_int_list, default=None, help="쉼표로 구분한 product_id 목록")
+    target.add_argument("--category", type=int, default=None, help="카테고리 ID (해당 카테고리 전체 제품)")
+    parser.add_argument("--force", action="store_true", help="입력 변화량과 관계없이 모두 다시 생성")
+    parser.add_argument("--concurrency", type=int, default=INSIGHT_BULK_CONCURRENCY)
+    parser.add_argument("--deadline-minutes", type=float, default=None, help="이 시간이 지나면 새 제품 시작 중단")
+    parser.add_argument("--user-id", type=int, default=None)
+    cli_args = parser.parse_args()
+
+    init_db_pool()
+    try:
+        asyncio.run(_cli(cli_args))
+    finally:
+        close_executors()
+        close_db_pool()
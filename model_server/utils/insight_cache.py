@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# 인사이트 재생성 판단 + LLM 응답 캐시
+# - 입력 fingerprint: 전체 리뷰 수 + 키워드별 긍정/부정 수 + 대표 리뷰 digest
+#   → tb_productInsightFingerprint에 인사이트와 함께 저장
+# - drift(이전 fingerprint 대비 변화량)가 INSIGHT_DRIFT_THRESHOLD 미만이면 LLM 호출 없이 기존 인사이트 유지
+# - 프롬프트/응답 쌍은 로컬 SQLite에 해시로 캐시 (같은 프롬프트 재호출 방지)
+# =========================================================
+_MODEL_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(_MODEL_SERVER_DIR, "cache"))
+INSIGHT_DRIFT_THRESHOLD = float(os.getenv("INSIGHT_DRIFT_THRESHOLD", 0.05))
+INSIGHT_LLM_CACHE_ENABLED = os.getenv("INSIGHT_LLM_CACHE_ENABLED", "1") != "0"
+INSIGHT_LLM_CACHE_PATH = os.getenv("INSIGHT_LLM_CACHE_PATH", os.path.join(CACHE_DIR, "insight_llm.sqlite3"))
+
+
+# ---------------------------------------------------------
+# fingerprint / drift
+# ---------------------------------------------------------
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_fingerprint(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "total_reviews": int(data.get("total_reviews", 0)),
+        "keyword_counts": data.get("sentiment_summary", {}),
+        "sample_digest": _digest(data.get("representative_reviews")),
+    }
+
+
+def _distribution(keyword_counts: Dict[str, Dict[str, int]]) -> Dict[str, float]:
+    cells = {
+        f"{keyword}\x1f{sentiment}": int(counts.get(sentiment, 0))
+        for keyword, counts in keyword_counts.items()
+        for sentiment in ("positive", "negative")
+    }
+    total = sum(cells.values())
+    return {cell: count / total for cell, count in cells.items()} if total else {}
+
+
+def insight_drift(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> float:
+    """
+    0.0 = 입력 동일, 값이 클수록 많이 바뀜 (이전 fingerprint가 없으면 1.0)
+    - 리뷰 수 변화율
+    - 키워드 × 감성 분포의 total variation distance (비율이 바뀌었는지)
+    둘 중 큰 값
+    """
+    if not previous:
+        return 1.0
+    if previous["keyword_counts"] == current["keyword_counts"] and previous["total_reviews"] == current["total_reviews"]:
+        return 0.0
+
+    before, after = previous["total_reviews"], current["total_reviews"]
+    review_change = abs(after - before) / before if before else 1.0
+
+    old_dist, new_dist = _distribution(previous["keyword_counts"]), _distribution(current["keyword_counts"])
+    cells = set(old_dist) | set(new_dist)
+    distribution_change = 0.5 * sum(abs(old_dist.get(c, 0.0) - new_dist.get(c, 0.0)) for c in cells)
+    return round(max(review_change, distribution_change), 4)
+
+
+def _fingerprint_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    keyword_counts = row["keyword_counts"]
+    return {
+        "insight_id": row["insight_id"],
+        "total_reviews": int(row["total_reviews"]),
+        "keyword_counts": json.loads(keyword_counts) if isinstance(keyword_counts, (str, bytes)) else keyword_counts,
+        "sample_digest": row["sample_digest"],
+    }
+
+
+def load_fingerprint(cursor, product_id: int) -> Optional[Dict[str, Any]]:
+    """저장된 fingerprint (+ insight_id), 인사이트가 삭제됐으면 None"""
+    cursor.execute(
+        """
+        SELECT f.insight_id, f.total_reviews, f.keyword_counts, f.sample_digest
+        FROM tb_productInsightFingerprint f
+        JOIN tb_productInsight i ON i.insight_id = f.insight_id
+        WHERE f.product_id = %s
+        """,
+        (product_id,),
+    )
+    row = cursor.fetchone()
+    return _fingerprint_from_row(row) if row else None
+
+
+def load_fingerprints(cursor, product_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """여러 제품의 fingerprint를 한 번에 조회 (없는 제품은 결과에 없음)"""
+    if not product_ids:
+        return {}
+    placeholders = ",".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"""
+        SELECT f.product_id, f.insight_id, f.total_reviews, f.keyword_counts, f.sample_digest
+        FROM tb_productInsightFingerprint f
+        JOIN tb_productInsight i ON i.insight_id = f.insight_id
+        WHERE f.product_id IN ({placeholders})
+        """,
+        product_ids,
+    )
+    return {row["product_id"]: _fingerprint_from_row(row) for row in cursor.fetchall()}
+
+
+_FINGERPRINT_UPSERT_TAIL = """
+        ON DUPLICATE KEY UPDATE
+            insight_id = VALUES(insight_id),
+            total_reviews = VALUES(total_reviews),
+            keyword_counts = VALUES(keyword_counts),
+            sample_digest = VALUES(sample_digest),
+            prompt_hash = VALUES(prompt_hash),
+            updated_at = NOW()
+        """
+
+
+def _fingerprint_values(product_id: int, insight_id: int, fingerprint: Dict[str, Any], prompt_hash: str) -> tuple:
+    return (
+        product_id,
+        insight_id,
+        fingerprint["total_reviews"],
+        json.dumps(fingerprint["keyword_counts"], ensure_ascii=False),
+        fingerprint["sample_digest"],
+        prompt_hash,
+    )
+
+
+def save_fingerprint(cursor, product_id: int, insight_id: int, fingerprint: Dict[str, Any], prompt_hash: str):
+    cursor.execute(
+        """
+        INSERT INTO tb_productInsightFingerprint
+            (product_id, insight_id, total_reviews, keyword_counts, sample_digest, prompt_hash, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        """
+        + _FINGERPRINT_UPSERT_TAIL,
+        _fingerprint_values(product_id, insight_id, fingerprint, prompt_hash),
+    )
+
+
+def save_fingerprints(cursor, rows: List[tuple]):
+    """rows: [(product_id, insight_id, fingerprint, prompt_hash)] → 다중 행 upsert 1회 (커밋하지 않음)"""
+    if not rows:
+        return
+    values = [_fingerprint_values(*row) for row in rows]
+    cursor.execute(
+        """
+        INSERT INTO tb_productInsightFingerprint
+            (product_id, insight_id, total_reviews, keyword_counts, sample_digest, prompt_hash, updated_at)
+        VALUES """
+        + ", ".join(["(%s, %s, %s, %s, %s, %s, NOW())"] * len(values))
+        + _FINGERPRINT_UPSERT_TAIL,
+        [v for row in values for v in row],
+    )
+
+
+# ---------------------------------------------------------
+# LLM 프롬프트/응답 캐시
+# ---------------------------------------------------------
+def prompt_hash(llm_config: Dict[str, Any], system_prompt: str, prompt: str) -> str:
+    return _digest({"llm": llm_config, "system": system_prompt, "prompt": prompt})
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = INSIGHT_LLM_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                prompt_hash TEXT PRIMARY KEY,
+                response    TEXT NOT NULL,
+                created_at  REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE prompt_hash = ?", (key,)).fetchone()
+            self._counters["hits" if row else "misses"] += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Dict[str, Any]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (prompt_hash, response, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), time.time()),
+            )
+            self._counters["stores"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"enabled": True, **self._counters, "items": items, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    global _llm_cache
+    if not INSIGHT_LLM_CACHE_ENABLED:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+def close_llm_cache():
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is not None:
+            _llm_cache.close()
+            _llm_cache = None
@@ -0,0 +1,167 @@
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from utils.review_sampler import select_representative_reviews
+
+load_dotenv()
+
+# =========================================================
+# 대용량 제품 인사이트: map-reduce 모드
+# - 리뷰 수가 INSIGHT_MAP_REDUCE_MIN_REVIEWS 이상이면 사용
+# - 파티션
+#   · keyword (기본): 키워드마다 1개, 키워드 × 감성별 최신 리뷰 최대 INSIGHT_MAP_GROUP_CANDIDATES개에서 대표 리뷰 선택
+#   · time: 최신 리뷰 INSIGHT_MAP_MAX_REVIEWS개를 같은 개수씩 기간으로 나눔 (분석 결과가 없는 제품도 이 방식)
+# - map: 파티션별 부분 요약을 동시에 생성 (INSIGHT_MAP_CONCURRENCY개까지)
+# - reduce: 부분 요약 + 전체 집계로 기존 summary/report JSON 생성
+# → 제품이 클수록 파티션/후보 수가 늘어 커버리지가 커지고, 파티션은 동시에 처리되어 소요 시간은 거의 일정
+# =========================================================
+INSIGHT_MAP_REDUCE_MIN_REVIEWS = int(os.getenv("INSIGHT_MAP_REDUCE_MIN_REVIEWS", 5000))  # 0이면 사용 안 함
+INSIGHT_MAP_PARTITION = os.getenv("INSIGHT_MAP_PARTITION", "keyword")   # keyword | time
+INSIGHT_MAP_CONCURRENCY = int(os.getenv("INSIGHT_MAP_CONCURRENCY", 6))  # 동시에 진행할 map LLM 호출 수
+INSIGHT_MAP_MAX_PARTITIONS = int(os.getenv("INSIGHT_MAP_MAX_PARTITIONS", 16))
+INSIGHT_MAP_GROUP_CANDIDATES = int(os.getenv("INSIGHT_MAP_GROUP_CANDIDATES", 1500))  # 키워드 × 감성당 후보 리뷰 수
+INSIGHT_MAP_MAX_REVIEWS = int(os.getenv("INSIGHT_MAP_MAX_REVIEWS", 20000))         # time 파티션 전체 후보 수
+INSIGHT_MAP_TOKEN_BUDGET = int(os.getenv("INSIGHT_MAP_TOKEN_BUDGET", 6000))        # map 프롬프트 1개의 샘플 토큰 예산
+INSIGHT_MAP_SAMPLES_PER_GROUP = int(os.getenv("INSIGHT_MAP_SAMPLES_PER_GROUP", 12))
+
+MAP_SYSTEM_PROMPT = "당신은 리뷰 분석가입니다. 주어진 리뷰 묶음에서 근거 있는 관찰만 간결한 JSON으로 정리하세요."
+
+
+def should_map_reduce(total_reviews: int) -> bool:
+    return 0 < INSIGHT_MAP_REDUCE_MIN_REVIEWS <= total_reviews
+
+
+# ---------------------------------------------------------
+# 파티션 구성
+# ---------------------------------------------------------
+def _keyword_partitions(cursor, product_id: int, sentiment_summary: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+    """언급량 상위 키워드마다 파티션 1개 (키워드 × 감성별 최신 후보를 한 번의 쿼리로 조회)"""
+    cursor.execute(
+        """
+        SELECT review_id, review_text, keyword_text, sentiment
+        FROM (
+            SELECT
+                r.review_id, r.review_text, r.review_date, k.keyword_text, ra.sentiment,
+                ROW_NUMBER() OVER (
+                    PARTITION BY ra.keyword_id, ra.sentiment
+                    ORDER BY r.review_date DESC, r.review_id DESC
+                ) AS rn
+            FROM tb_reviewAnalysis ra
+            JOIN tb_review r ON r.review_id = ra.review_id
+            JOIN tb_keyword k ON k.keyword_id = ra.keyword_id
+            WHERE r.product_id = %s AND ra.sentiment IN ('positive', 'negative')
+        ) ranked
+        WHERE rn <= %s
+        ORDER BY review_date DESC, review_id DESC
+        """,
+        (product_id, INSIGHT_MAP_GROUP_CANDIDATES),
+    )
+    rows_by_keyword = defaultdict(list)
+    for row in cursor.fetchall():
+        rows_by_keyword[row["keyword_text"]].append(row)
+
+    partitions = []
+    for keyword in list(sentiment_summary)[:INSIGHT_MAP_MAX_PARTITIONS]:
+        rows = rows_by_keyword.get(keyword)
+        if not rows:
+            continue
+        counts = sentiment_summary[keyword]
+        samples = select_representative_reviews(
+            rows, {keyword: counts}, token_budget=INSIGHT_MAP_TOKEN_BUDGET, per_group=INSIGHT_MAP_SAMPLES_PER_GROUP
+        )
+        partitions.append({
+            "kind": "keyword",
+            "label": keyword,
+            "counts": counts,
+            "reviews": samples["by_keyword"].get(keyword, {}),
+            "candidates": samples["stats"]["candidates"],
+        })
+    return partitions
+
+
+def _time_partitions(cursor, product_id: int) -> List[Dict[str, Any]]:
+    """최신 리뷰를 같은 개수씩 기간별로 나눈 파티션 (오래된 기간부터)"""
+    cursor.execute(
+        """
+        SELECT review_id, review_text, review_date
+        FROM tb_review
+        WHERE product_id = %s
+        ORDER BY review_date DESC, review_id DESC
+        LIMIT %s
+        """,
+        (product_id, INSIGHT_MAP_MAX_REVIEWS),
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+
+    windows = min(INSIGHT_MAP_MAX_PARTITIONS, max(1, len(rows) // 500))
+    size = -(-len(rows) // windows)
+    partitions = []
+    for start in range(0, len(rows), size):
+        window = rows[start : start + size]
+        samples = select_representative_reviews(
+            window, {}, token_budget=INSIGHT_MAP_TOKEN_BUDGET, per_group=INSIGHT_MAP_SAMPLES_PER_GROUP
+        )
+        partitions.append({
+            "kind": "time",
+            "label": f"{window[-1]['review_date']:%Y-%m-%d} ~ {window[0]['review_date']:%Y-%m-%d}",
+            "counts": {"reviews": len(window)},
+            "reviews": samples["general"],
+            "candidates": samples["stats"]["candidates"],
+        })
+    return partitions[::-1]
+
+
+def fetch_partitions(cursor, product_id: int, sentiment_summary: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+    """설정된 방식으로 파티션 구성 (키워드 분석 결과가 없으면 기간 파티션)"""
+    if INSIGHT_MAP_PARTITION != "time" and sentiment_summary:
+        partitions = _keyword_partitions(cursor, product_id, sentiment_summary)
+        if partitions:
+            return partitions
+    return _time_partitions(cursor, product_id)
+
+
+# ---------------------------------------------------------
+# 프롬프트
+# ---------------------------------------------------------
+def build_map_prompt(partition: Dict[str, Any]) -> str:
+    if partition["kind"] == "keyword":
+        scope = (
+            f"키워드 '{partition['label']}'에 대한 리뷰 "
+            f"(전체 긍정 {partition['counts'].get('positive', 0)}건, 부정 {partition['counts'].get('negative', 0)}건)"
+        )
+        legend = "reviews.positive / reviews.negative: 중복을 제거한 뒤 유사 리뷰 군집마다 하나씩 고른 대표 리뷰"
+    else:
+        scope = f"{partition['label']} 기간의 리뷰 {partition['counts']['reviews']}건"
+        legend = "reviews: 중복을 제거한 뒤 유사 리뷰 군집마다 하나씩 고른 대표 리뷰"
+
+    return f"""아래는 한 제품의 전체 리뷰 중 일부입니다: {scope}
+{legend}
+
+리뷰 데이터:
+{json.dumps({"reviews": partition["reviews"]}, ensure_ascii=False, separators=(",", ":"))}
+
+이 리뷰 묶음만 근거로 부분 요약을 아래 JSON 구조로 작성하세요:
+{{
+  "label": "{partition['label']}",
+  "positive_points": ["고객이 좋게 평가한 점 (구체적으로)"],
+  "negative_points": ["불만 요인과 상황 (구체적으로)"],
+  "improvement_suggestions": ["리뷰에서 도출되는 개선 방향"],
+  "notable_quotes": ["대표적인 리뷰 문장 1~3개 (원문 그대로)"]
+}}
+
+출력은 반드시 JSON 형식으로만 하세요."""
+
+
+def build_reduce_data(data: Dict[str, Any], partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """reduce 프롬프트용 데이터 (전체 집계 + 파티션별 부분 요약)"""
+    return {
+        "total_reviews": data["total_reviews"],
+        "sentiment_summary": data["sentiment_summary"],
+        "partial_summaries": partials,
+    }
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+from utils.metrics import LLM_SECONDS
+
+load_dotenv()
+
+# =========================================================
+# 인사이트용 LLM 클라이언트 (서버 수명 동안 1개)
+# - main.py lifespan에서 생성/종료, httpx 연결 풀 재사용 (매 호출마다 TLS 연결을 새로 맺지 않음)
+# - 응답은 스트리밍으로 받으면서 IncrementalJSONParser로 완성된 필드를 바로 알림
+#   → SSE 스트림에 "긍정 요인 작성 완료" 같은 중간 진행 상황 전달
+# - OPENAI_BASE_URL로 OpenAI 호환 서버 지정 가능 (로컬 테스트: python -m benchmarks.llm_stub serve)
+# =========================================================
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 300))                   # 요청 전체 제한 (초)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 10))    # 연결 제한 (초)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 16))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_PROGRESS_INTERVAL = float(os.getenv("LLM_PROGRESS_INTERVAL", 5))  # 첫 응답 전 대기 알림 주기 (초)
+
+# LLM 설정 (프롬프트 캐시 키에 포함)
+LLM_CONFIG = {
+    "model": "gpt-5-mini",
+    "max_tokens": 20000,
+    "reasoning_effort": "high",  # "minimal" | "low" | "medium" | "high"
+}
+
+
+# ---------------------------------------------------------
+# 점진적 JSON 파싱
+# ---------------------------------------------------------
+class IncrementalJSONParser:
+    """
+    스트리밍 청크를 한 번씩만 훑으면서 JSON 구조를 추적
+    - 첫 '{' 이전(```json 등)과 최상위 객체가 닫힌 뒤의 텍스트는 무시
+    - feed()는 이번 청크에서 값이 완성된 필드 경로 반환 (max_depth 이하, 예: "report.positive_points")
+    - result()는 최상위 객체를 json.loads로 파싱
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self.chars = 0
+        self.completed: List[str] = []
+        self._parts: List[str] = []
+        self._start = None
+        self._end = None
+        self._stack: List[Dict[str, Any]] = []   # {"type": "{"|"[", "key": 현재 키, "expect_key": bool}
+        self._in_string = False
+        self._escape = False
+        self._is_key = False
+        self._key_chars: List[str] = []
+        self._scalar_open = False
+
+    @property
+    def done(self) -> bool:
+        return self._end is not None
+
+    def _complete_value(self, events: List[str]):
+        """현재 위치의 값이 완성됨 → 객체 안의 필드면 경로 기록"""
+        self._scalar_open = False
+        if not self._stack or self._stack[-1]["type"] != "{":
+            return
+        path = [frame["key"] for frame in self._stack if frame["type"] == "{"]
+        if len(path) <= self.max_depth and None not in path:
+            field = ".".join(path)
+            self.completed.append(field)
+            events.append(field)
+
+    def feed(self, text: str) -> List[str]:
+        events: List[str] = []
+        offset = self.chars
+        self._parts.append(text)
+        self.chars += len(text)
+        if self.done:
+            return events
+
+        for i, ch in enumerate(text):
+            if self._start is None:
+                if ch == "{":
+                    self._start = offset + i
+                    self._stack.append({"type": "{", "key": None, "expect_key": True})
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._is_key:
+                        self._stack[-1]["key"] = "".join(self._key_chars)
+                    else:
+                        self._complete_value(events)
+                elif self._is_key:
+                    self._key_chars.append(ch)
+                continue
+
+            if ch == '"':
+                top = self._stack[-1]
+                self._in_string = True
+                self._is_key = top["type"] == "{" and top["expect_key"]
+                self._key_chars = []
+            elif ch == ":":
+                self._stack[-1]["expect_key"] = False
+            elif ch in "{[":
+                self._stack.append({"type": ch, "key": None, "expect_key": ch == "{"})
+            elif ch in "}]":
+                if self._scalar_open:
+                    self._complete_value(events)
+                self._stack.pop()
+                if not self._stack:
+                    self._end = offset + i + 1
+                    break
+                self._complete_value(events)
+            elif ch == ",":
+                if self._scalar_open:
+                    self._complete_value(events)
+                top = self._stack[-1]
+                if top["type"] == "{":
+                    top["expect_key"] = True
+                    top["key"] = None
+            elif not ch.isspace():
+                self._scalar_open = True
+        return events
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def result(self) -> Dict[str, Any]:
+        text = self.text
+        if self._start is None:
+            raise json.JSONDecodeError("응답에 JSON 객체가 없습니다", text, 0)
+        return json.loads(text[self._start : self._end] if self._end else text[self._start :])
+
+
+# ---------------------------------------------------------
+# 클라이언트
+# ---------------------------------------------------------
+class LLMClient:
+    def __init__(self, config: Dict[str, Any] = LLM_CONFIG):
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+
+        timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+        limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+        # 동기 클라이언트: CLI / 실행기 스레드, 비동기 클라이언트: 이벤트 루프 (SSE 분석 스트림)
+        self.http_client = httpx.Client(timeout=timeout, limits=limits)
+        self.http_async_client = httpx.AsyncClient(timeout=timeout, limits=limits)
+        self.chat = ChatOpenAI(
+            **config,
+            api_key=api_key,
+            base_url=OPENAI_BASE_URL,
+            timeout=timeout,
+            max_retries=LLM_MAX_RETRIES,
+            streaming=True,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+        )
+        self._counters = {"requests": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counters[key] += 1
+
+    @staticmethod
+    def _progress(on_progress, **event):
+        if on_progress is not None:
+            on_progress(event)
+
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        content = chunk.content
+        return content if isinstance(content, str) else ""
+
+    def stream_json(self, messages, on_progress: Optional[Callable[[dict], None]] = None) -> Dict[str, Any]:
+        """동기 스트리밍 호출 (실행기 스레드/CLI용), 완성된 JSON 반환"""
+        self._count("requests")
+        parser = IncrementalJSONParser()
+        started = time.monotonic()
+        first = None
+        try:
+            for chunk in self.chat.stream(messages):
+                if first is None:
+                    first = time.monotonic() - started
+                    LLM_SECONDS.observe(first, phase="first_chunk")
+                for field in parser.feed(self._chunk_text(chunk)):
+                    self._progress(on_progress, phase="field", field=field, chars=parser.chars)
+            LLM_SECONDS.observe(time.monotonic() - started, phase="total")
+            return parser.result()
+        except Exception:
+            self._count("errors")
+            raise
+
+    async def astream_json(self, messages, on_progress: Optional[Callable[[dict], None]] = None) -> Dict[str, Any]:
+        """
+        비동기 스트리밍 호출, 완성된 JSON 반환
+        - 첫 청크 전(추론 모델의 생각 시간)에는 LLM_PROGRESS_INTERVAL마다 대기 알림
+        - 필드가 완성될 때마다 on_progress({"phase": "field", "field": ..., "chars": ...})
+        """
+        self._count("requests")
+        parser = IncrementalJSONParser()
+        started = time.monotonic()
+        first = None
+        stream = self.chat.astream(messages).__aiter__()
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(stream.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=LLM_PROGRESS_INTERVAL if first is None else None)
+                if not done:
+                    self._progress(on_progress, phase="waiting", elapsed=round(time.monotonic() - started, 1))
+                    continue
+                try:
+                    chunk = pending.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    pending = None
+                if first is None:
+                    first = time.monotonic() - started
+                    LLM_SECONDS.observe(first, phase="first_chunk")
+                    self._progress(on_progress, phase="streaming", elapsed=round(first, 1))
+                for field in parser.feed(self._chunk_text(chunk)):
+                    self._progress(on_progress, phase="field", field=field, chars=parser.chars)
+            LLM_SECONDS.observe(time.monotonic() - started, phase="total")
+            return parser.result()
+        except BaseException:
+            self._count("errors")
+            raise
+        finally:
+            if pending is not None:
+                pending.cancel()
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "base_url": OPENAI_BASE_URL, "max_connections": LLM_MAX_CONNECTIONS}
+
+    async def aclose(self):
+        await self.http_async_client.aclose()
+        self.http_client.close()
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """공유 클라이언트 (lifespan에서 만들지 못했으면 처음 사용할 때 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+def init_llm_client():
+    """모델 서버 시작 시 클라이언트 생성 (API 키가 없으면 경고만, 인사이트 단계에서 실패)"""
+    try:
+        get_llm_client()
+        print(f"[OK] LLM 클라이언트 초기화 완료 (base_url={OPENAI_BASE_URL or 'default'}, timeout={LLM_TIMEOUT}s)")
+    except ValueError as e:
+        print(f"⚠️ LLM 클라이언트 초기화 생략: {e}")
+
+
+async def close_llm_client():
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+        print("[OK] LLM 클라이언트 종료 완료")
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    client = _client
+    return client.stats() if client else {"initialized": False}
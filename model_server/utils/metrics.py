@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# =========================================================
+# 프로세스 내 메트릭 레지스트리 (Prometheus text format 0.0.4)
+# - Counter / Gauge / Histogram (라벨 지원)
+# - collector: 스크레이프 시점에 값을 읽는 gauge (DB 풀 사용량 등)
+# - main.py의 GET /metrics 에서 render_metrics() 출력
+# =========================================================
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 필요 (받은 값: {tuple(labels)})")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, List[float]] = {}  # [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self._header()
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, fn):
+        """fn() → [(name, help, labels, value), ...] 를 스크레이프 시점에 gauge로 출력"""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        for collect in collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                print(f"⚠️ [Metrics] collector 실패: {e}")
+                continue
+            seen = set()
+            for name, documentation, labels, value in samples:
+                if name not in seen:
+                    lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+                    seen.add(name)
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# =========================================================
+# 리뷰 분석 파이프라인 메트릭
+# =========================================================
+STAGE_SECONDS = registry.histogram(
+    "absa_analysis_stage_seconds",
+    "Duration of each product analysis stage in seconds",
+    ("stage", "domain"),
+)
+ANALYSES_TOTAL = registry.counter(
+    "absa_analyses_total",
+    "Product analysis runs by final status",
+    ("domain", "status"),
+)
+REVIEWS_ANALYZED = registry.counter(
+    "absa_reviews_analyzed_total",
+    "Reviews analyzed by the domain models",
+    ("domain",),
+)
+ROWS_WRITTEN = registry.counter(
+    "absa_review_analysis_rows_written_total",
+    "Rows upserted into tb_reviewAnalysis",
+    ("domain",),
+)
+INSIGHT_RUNS = registry.counter(
+    "absa_insight_runs_total",
+    "Insight generation outcomes (llm_call, llm_cache_hit, skipped, failed)",
+    ("outcome",),
+)
+LLM_SECONDS = registry.histogram(
+    "absa_llm_seconds",
+    "Insight LLM latency in seconds (phase=first_chunk|total)",
+    ("phase",),
+)
+ANALYSES_IN_FLIGHT = registry.gauge(
+    "absa_analyses_in_flight",
+    "Product analyses currently streaming",
+)
+
+
+def observe_stage(stage: str, domain: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage, domain=domain or "unknown")
+
+
+def render_metrics() -> str:
+    return registry.render()
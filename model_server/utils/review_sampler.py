@@ -0,0 +1,221 @@
+import hashlib
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# 인사이트 프롬프트용 대표 리뷰 선택
+# 1. SimHash(문자 3-gram)로 거의 같은 리뷰 제거
+# 2. 키워드 × 감성 그룹 안에서 SimHash 거리 기준으로 묶고(leader clustering) 큰 군집의 중심 리뷰를 대표로 사용
+# 3. 키워드를 언급량 순으로 돌면서(round-robin) 긍정/부정 대표를 하나씩 추가 → 토큰 예산 안에서 키워드 커버리지 최대화
+# =========================================================
+INSIGHT_CANDIDATE_REVIEWS = int(os.getenv("INSIGHT_CANDIDATE_REVIEWS", 2000))   # 후보로 읽을 최근 리뷰 수
+INSIGHT_SAMPLE_TOKEN_BUDGET = int(os.getenv("INSIGHT_SAMPLE_TOKEN_BUDGET", 6000))  # 샘플 리뷰 전체 토큰 예산 (추정치)
+INSIGHT_SAMPLE_MAX_CHARS = int(os.getenv("INSIGHT_SAMPLE_MAX_CHARS", 300))      # 리뷰 1개 최대 글자 수
+INSIGHT_SAMPLES_PER_GROUP = int(os.getenv("INSIGHT_SAMPLES_PER_GROUP", 3))      # 키워드 × 감성당 최대 대표 수
+
+NEAR_DUPLICATE_BITS = 3   # SimHash 해밍 거리 ≤ 3 → 중복
+CLUSTER_BITS = 16         # 해밍 거리 ≤ 16 → 같은 군집
+_MEDOID_LIMIT = 32        # 군집 중심 계산에 쓰는 최대 멤버 수
+
+_WS_RE = re.compile(r"\s+")
+_NON_TEXT_RE = re.compile(r"[^가-힣A-Za-z0-9 ]")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def normalize_review(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    return _WS_RE.sub(" ", text).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 보수적 추정 (한글 1글자 ≈ 1토큰, 그 외 ≈ 4글자당 1토큰)"""
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4 + 2  # +2: JSON 따옴표/구분자
+
+
+# ---------------------------------------------------------
+# SimHash
+# ---------------------------------------------------------
+@lru_cache(maxsize=200_000)
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, ngram: int = 3) -> int:
+    """문자 n-gram SimHash (64bit), 공백/기호 차이에 둔감하도록 정규화 후 계산"""
+    compact = _NON_TEXT_RE.sub("", text.lower()).replace(" ", "")
+    if len(compact) < ngram:
+        shingles = [compact] if compact else []
+    else:
+        shingles = [compact[i : i + ngram] for i in range(len(compact) - ngram + 1)]
+
+    # 비트 슬라이스 카운터: levels[i]의 b번째 비트 = b번째 비트 1 개수의 2^i 자리
+    # (해시 1개당 64번 반복 대신 정수 연산 몇 번으로 64비트를 동시에 더함)
+    levels: List[int] = []
+    for shingle in shingles:
+        carry = _shingle_hash(shingle)
+        for i in range(len(levels)):
+            levels[i], carry = levels[i] ^ carry, levels[i] & carry
+            if not carry:
+                break
+        if carry:
+            levels.append(carry)
+
+    fingerprint = 0
+    for bit in range(64):
+        ones = sum(((level >> bit) & 1) << i for i, level in enumerate(levels))
+        if ones * 2 > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    SimHash 근접 중복 탐지 (4개 16bit 밴드 인덱스)
+    - 해밍 거리 ≤ 3이면 비둘기집 원리로 최소 한 밴드가 정확히 일치 → 전체 비교 없이 후보만 확인
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_BITS):
+        self.max_distance = max_distance
+        self._bands: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(4)]
+
+    def add_if_new(self, fingerprint: int) -> bool:
+        bands = [(fingerprint >> (16 * i)) & 0xFFFF for i in range(4)]
+        for i, band in enumerate(bands):
+            for other in self._bands[i].get(band, ()):
+                if hamming(fingerprint, other) <= self.max_distance:
+                    return False
+        for i, band in enumerate(bands):
+            self._bands[i][band].append(fingerprint)
+        return True
+
+
+# ---------------------------------------------------------
+# 군집 / 대표 선택
+# ---------------------------------------------------------
+def _clusters(items: List[dict]) -> List[List[dict]]:
+    """leader clustering (입력 순서 = 최신순), 큰 군집부터 반환"""
+    clusters: List[List[dict]] = []
+    for item in items:
+        for cluster in clusters:
+            if hamming(cluster[0]["simhash"], item["simhash"]) <= CLUSTER_BITS:
+                cluster.append(item)
+                break
+        else:
+            clusters.append([item])
+    return sorted(clusters, key=len, reverse=True)
+
+
+def _medoid(cluster: List[dict]) -> dict:
+    members = cluster[:_MEDOID_LIMIT]
+    return min(members, key=lambda m: sum(hamming(m["simhash"], o["simhash"]) for o in members))
+
+
+def _excerpt(text: str) -> str:
+    if len(text) <= INSIGHT_SAMPLE_MAX_CHARS:
+        return text
+    return text[: INSIGHT_SAMPLE_MAX_CHARS - 1].rstrip() + "…"
+
+
+def select_representative_reviews(
+    rows: Iterable[dict],
+    sentiment_summary: Dict[str, Dict[str, int]],
+    token_budget: int = INSIGHT_SAMPLE_TOKEN_BUDGET,
+    per_group: int = INSIGHT_SAMPLES_PER_GROUP,
+) -> Dict:
+    """
+    rows: 최신순 [{review_id, review_text, keyword_text(None 가능), sentiment(None 가능)}]
+    반환: {"by_keyword": {키워드: {"positive": [...], "negative": [...]}}, "general": [...], "stats": {...}}
+    - 같은 리뷰는 프롬프트에 한 번만 포함
+    - 분석 결과가 없는 제품은 general에 대표 리뷰만 담음
+    """
+    reviews: Dict[int, dict] = {}
+    groups: Dict[tuple, List[int]] = defaultdict(list)
+    index = NearDuplicateIndex()
+    candidates = duplicates = 0
+
+    for row in rows:
+        review_id = row["review_id"]
+        review = reviews.get(review_id)
+        if review is None and review_id not in reviews:
+            candidates += 1
+            text = normalize_review(row["review_text"])
+            fingerprint = simhash(text)
+            if not text or not index.add_if_new(fingerprint):
+                duplicates += 1
+                reviews[review_id] = None
+                continue
+            review = reviews[review_id] = {"review_id": review_id, "text": text, "simhash": fingerprint}
+        if review is None:
+            continue
+        if row.get("keyword_text") and row.get("sentiment") in ("positive", "negative"):
+            groups[(row["keyword_text"], row["sentiment"])].append(review_id)
+
+    # 그룹별 대표 후보 (큰 군집 순)
+    representatives: Dict[tuple, List[dict]] = {}
+    for key, review_ids in groups.items():
+        items = [reviews[rid] for rid in review_ids]
+        representatives[key] = [_medoid(c) for c in _clusters(items)][:per_group]
+
+    by_keyword: Dict[str, Dict[str, List[str]]] = {}
+    used = set()
+    tokens = 0
+
+    def take(review: dict) -> Optional[str]:
+        nonlocal tokens
+        if review["review_id"] in used:
+            return None
+        excerpt = _excerpt(review["text"])
+        cost = estimate_tokens(excerpt)
+        if tokens + cost > token_budget:
+            return None
+        tokens += cost
+        used.add(review["review_id"])
+        return excerpt
+
+    # 언급량 순 키워드 → 라운드마다 키워드별 긍정/부정 대표 1개씩
+    keyword_order = [kw for kw in sentiment_summary if (kw, "positive") in representatives or (kw, "negative") in representatives]
+    keyword_order += sorted({kw for kw, _ in representatives} - set(keyword_order))
+    for round_index in range(per_group):
+        for keyword in keyword_order:
+            for sentiment in ("negative", "positive"):
+                reps = representatives.get((keyword, sentiment), [])
+                if round_index < len(reps):
+                    excerpt = take(reps[round_index])
+                    if excerpt:
+                        by_keyword.setdefault(keyword, {}).setdefault(sentiment, []).append(excerpt)
+
+    # 남은 예산: 키워드와 무관한 대표 리뷰 (분석 결과가 없는 제품이면 여기만 채워짐)
+    general = []
+    leftovers = [r for r in reviews.values() if r and r["review_id"] not in used]
+    for review in (_medoid(c) for c in _clusters(leftovers)):
+        if len(general) >= per_group * 4:
+            break
+        excerpt = take(review)
+        if excerpt:
+            general.append(excerpt)
+
+    return {
+        "by_keyword": by_keyword,
+        "general": general,
+        "stats": {
+            "candidates": candidates,
+            "near_duplicates": duplicates,
+            "selected": len(used),
+            "keywords_covered": len(by_keyword),
+            "keywords_total": len(sentiment_summary),
+            "estimated_tokens": tokens,
+        },
+    }
@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Local import when executed as a script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_connect import get_connection
+from utils.tokenizer_pool import tokenize_texts
+
+load_dotenv()
+
+# =========================================================
+# 리뷰별 토큰 빈도 저장소 (워드클라우드용)
+# - tb_reviewToken     : (review_id, token) → 리뷰 안 출현 횟수 (명사/형용사)
+# - tb_reviewTokenized : 토큰화 완료 표시 (토큰이 0개인 리뷰도 다시 처리하지 않도록)
+# - 새 리뷰만 증분 토큰화 (ensure_review_tokens), 워드클라우드는 저장된 빈도를 SQL로 합산
+#   · 분석 후처리의 워드클라우드 작업(utils/wordcloud_jobs.py)에서 호출 → 분석 직후 토큰 저장
+#   · CLI 일괄 토큰화 (아래 __main__), 렌더링 요청 경로에서는 호출하지 않음 (남은 리뷰가 있으면 작업 예약 후 202)
+# =========================================================
+TOKEN_BACKFILL_PAGE = int(os.getenv("TOKEN_BACKFILL_PAGE", 500))   # 1회 토큰화/커밋 리뷰 수
+TOKEN_WRITE_CHUNK = int(os.getenv("TOKEN_WRITE_CHUNK", 1000))     # 다중 행 INSERT 1회 행 수
+TOKEN_MAX_LENGTH = 50                                             # tb_reviewToken.token 컬럼 길이
+
+_PENDING_FROM = """
+    FROM tb_review r
+    WHERE r.product_id = %s
+      AND NOT EXISTS (SELECT 1 FROM tb_reviewTokenized tz WHERE tz.review_id = r.review_id)
+"""
+
+
+def _insert_rows(cursor, head: str, row_sql: str, rows: List[tuple], tail: str = ""):
+    for i in range(0, len(rows), TOKEN_WRITE_CHUNK):
+        chunk = rows[i : i + TOKEN_WRITE_CHUNK]
+        cursor.execute(head + ", ".join([row_sql] * len(chunk)) + tail, [v for row in chunk for v in row])
+
+
+def count_pending(cursor, product_id: int) -> int:
+    """아직 토큰화되지 않은 리뷰 수"""
+    cursor.execute("SELECT COUNT(*) AS cnt" + _PENDING_FROM, (product_id,))
+    return cursor.fetchone()["cnt"]
+
+
+def store_review_tokens(cursor, review_tokens: Dict[int, List[str]]):
+    """리뷰별 토큰 리스트를 빈도로 저장 + 완료 표시 (커밋하지 않음, 재실행해도 같은 결과)"""
+    if not review_tokens:
+        return 0
+    token_rows = []
+    marker_rows = []
+    for review_id, tokens in review_tokens.items():
+        counts = Counter(t for t in tokens if len(t) <= TOKEN_MAX_LENGTH)
+        token_rows.extend((review_id, token, cnt) for token, cnt in counts.items())
+        marker_rows.append((review_id, len(counts)))
+
+    _insert_rows(
+        cursor,
+        "INSERT INTO tb_reviewToken (review_id, token, cnt) VALUES ",
+        "(%s, %s, %s)",
+        token_rows,
+        " ON DUPLICATE KEY UPDATE cnt = VALUES(cnt)",
+    )
+    _insert_rows(
+        cursor,
+        "INSERT INTO tb_reviewTokenized (review_id, token_count, tokenized_at) VALUES ",
+        "(%s, %s, NOW())",
+        marker_rows,
+        " ON DUPLICATE KEY UPDATE token_count = VALUES(token_count), tokenized_at = NOW()",
+    )
+    return len(token_rows)
+
+
+def ensure_review_tokens(product_id: int, debug: bool = False) -> int:
+    """
+    제품의 미토큰화 리뷰만 페이지 단위로 토큰화해서 저장 (이미 최신이면 Okt 호출 없음)
+    반환: 새로 토큰화한 리뷰 수
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    done = 0
+    started = time.monotonic()
+    try:
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT r.review_id, r.review_text" + _PENDING_FROM + " AND r.review_id > %s ORDER BY r.review_id LIMIT %s",
+                (product_id, last_id, TOKEN_BACKFILL_PAGE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["review_id"]
+
+            tokens = tokenize_texts([row["review_text"] for row in rows])
+            store_review_tokens(cursor, {row["review_id"]: t for row, t in zip(rows, tokens)})
+            conn.commit()
+            done += len(rows)
+            if debug:
+                print(f"   [review_tokens] product_id={product_id}: {done}개 리뷰 토큰화")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    if done:
+        print(f"[review_tokens] product_id={product_id}: 신규 리뷰 {done}개 토큰화 ({time.monotonic() - started:.2f}s)")
+    return done
+
+
+def aggregate_token_counts(cursor, product_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Counter:
+    """기간 내 리뷰의 저장된 토큰 빈도 합계 (Okt 호출 없음)"""
+    where_clause = "WHERE r.product_id = %s"
+    params = [product_id]
+    if start_date:
+        where_clause += " AND DATE(r.review_date) >= %s"
+        params.append(start_date)
+    if end_date:
+        where_clause += " AND DATE(r.review_date) <= %s"
+        params.append(end_date)
+
+    cursor.execute(
+        f"""
+        SELECT t.token, SUM(t.cnt) AS cnt
+        FROM tb_review r
+        JOIN tb_reviewToken t ON t.review_id = r.review_id
+        {where_clause}
+        GROUP BY t.token
+        """,
+        tuple(params),
+    )
+    return Counter({row["token"]: int(row["cnt"]) for row in cursor.fetchall()})
+
+
+# ---------------------------------------------------------------------------
+# CLI: 기존 리뷰 일괄 토큰화
+#   python -m utils.review_tokens            # 모든 제품
+#   python -m utils.review_tokens 1038 1039  # 지정 제품
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    from utils.db_connect import init_db_pool, close_db_pool
+    from utils.tokenizer_pool import init_tokenizer_pool, close_tokenizer_pool
+
+    init_db_pool()
+    init_tokenizer_pool()
+    try:
+        product_ids = [int(a) for a in sys.argv[1:]]
+        if not product_ids:
+            conn = get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT product_id FROM tb_product ORDER BY product_id")
+                product_ids = [row["product_id"] for row in cursor.fetchall()]
+            conn.close()
+
+        total = 0
+        for pid in product_ids:
+            total += ensure_review_tokens(pid, debug=True)
+        print(f"[review_tokens] 완료: 제품 {len(product_ids)}개, 리뷰 {total}개 토큰화")
+    finally:
+        close_tokenizer_pool()
+        close_db_pool()
@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# 워드클라우드 불용어 매처
+# - 정확히 일치: set 조회
+# - 부분 문자열(길이 2 이상 불용어 포함 여부): Aho-Corasick 오토마톤 한 번 순회
+# - 도메인 매처(base.txt + <domain>.txt)는 캐시, 파일 mtime이 바뀔 때만 재생성
+# - 상품명/브랜드는 요청마다 작은 매처를 도메인 매처 위에 얹어서 사용
+# ---------------------------------------------------------------------------
+STOPWORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords")
+
+
+class AhoCorasick:
+    """'텍스트에 패턴 중 하나라도 포함되는가'만 답하는 최소 구현"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[bool] = [False]
+
+        for pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._terminal.append(False)
+                state = nxt
+            self._terminal[state] = True
+
+        # BFS로 실패 링크 계산, 접미사 상태가 종결이면 현재 상태도 종결로 표시
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0) if state else 0
+                self._terminal[nxt] = self._terminal[nxt] or self._terminal[self._fail[nxt]]
+                queue.append(nxt)
+
+    def contains_any(self, text: str) -> bool:
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+class StopwordMatcher:
+    def __init__(self, words: Iterable[str], parent: Optional["StopwordMatcher"] = None):
+        self.words = set(w for w in words if w)
+        self.parent = parent
+        self._automaton = AhoCorasick(w for w in self.words if len(w) > 1)
+
+    def is_stopword(self, token: str) -> bool:
+        """불용어와 정확히 같거나 길이 2 이상 불용어를 포함하면 True"""
+        if token in self.words or self._automaton.contains_any(token):
+            return True
+        return self.parent.is_stopword(token) if self.parent else False
+
+    def with_terms(self, terms: Iterable[str]) -> "StopwordMatcher":
+        """요청별 추가 불용어(상품명/브랜드)를 얹은 매처 (도메인 매처는 그대로 재사용)"""
+        terms = set(t for t in terms if t)
+        return StopwordMatcher(terms, parent=self) if terms else self
+
+    def __len__(self):
+        return len(self.words) + (len(self.parent) if self.parent else 0)
+
+
+# ---------------------------------------------------------------------------
+# 파일 로드 / 도메인 캐시
+# ---------------------------------------------------------------------------
+def stopword_paths(domain: str) -> List[str]:
+    return [os.path.join(STOPWORD_DIR, "base.txt"), os.path.join(STOPWORD_DIR, f"{domain}.txt")]
+
+
+def read_stopword_file(path: str) -> set:
+    words = set()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            word = line.strip().replace("\ufeff", "").replace("\t", "").replace(" ", "")
+            if word:
+                words.add(word)
+    return words
+
+
+def _mtimes(paths: List[str]) -> Tuple[Optional[float], ...]:
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+
+def stopword_version(domain: str) -> str:
+    """불용어 파일 버전 (mtime 기반, 워드클라우드 캐시 키에 사용)"""
+    return ",".join("-" if m is None else f"{m:.6f}" for m in _mtimes(stopword_paths(domain)))
+
+
+_domain_matchers: Dict[str, Tuple[Tuple[Optional[float], ...], StopwordMatcher]] = {}
+_domain_lock = threading.Lock()
+
+
+def get_domain_matcher(domain: str = "steam") -> StopwordMatcher:
+    """base.txt + <domain>.txt 매처 (파일이 바뀌었을 때만 재생성)"""
+    paths = stopword_paths(domain)
+    mtimes = _mtimes(paths)
+    with _domain_lock:
+        cached = _domain_matchers.get(domain)
+        if cached and cached[0] == mtimes:
+            return cached[1]
+
+        words = set()
+        for path, mtime in zip(paths, mtimes):
+            if mtime is not None:
+                words |= read_stopword_file(path)
+        matcher = StopwordMatcher(words)
+        _domain_matchers[domain] = (mtimes, matcher)
+        print(f"[wordcloud] 불용어 매처 생성: domain={domain}, {len(words)}개")
+        return matcher
+
+
+def product_terms(product_name: str, brand: str) -> set:
+    """상품명(단어 + 전체)과 브랜드에서 만든 요청별 불용어"""
+    terms = set()
+    if product_name:
+        for word in product_name.split():
+            if len(word.strip()) > 1:
+                terms.add(word.strip())
+        if product_name.strip():
+            terms.add(product_name.strip())
+    if brand and len(brand.strip()) > 1:
+        terms.add(brand.strip())
+    return terms
@@ -0,0 +1,157 @@
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# Okt 형태소 분석 워커 풀 (워드클라우드 토큰화)
+# - 워커 프로세스마다 Okt(JVM)를 한 번만 띄우고 계속 재사용
+# - 리뷰 배치를 워커에 나눠 보내고 순서대로 합침 → 워커 수만큼 병렬
+# - 서버: main.py lifespan에서 init/close (워밍업은 백그라운드, 서버 시작을 막지 않음)
+# - 워커마다 JVM을 하나씩 띄우므로 기본 워커 수는 작게 (모델 추론과 CPU/메모리를 나눠 씀)
+# - 풀이 없으면 (CLI 실행, TOKENIZER_WORKERS=0) 현재 프로세스의 Okt로 직렬 처리
+# =========================================================
+TOKENIZER_WORKERS = int(os.getenv("TOKENIZER_WORKERS", 2))
+TOKENIZER_BATCH_REVIEWS = int(os.getenv("TOKENIZER_BATCH_REVIEWS", 100))   # 워커 작업 1개 = 리뷰 수
+TOKENIZER_MAX_TEXT = int(os.getenv("TOKENIZER_MAX_TEXT", 30000))           # okt.pos 1회 입력 최대 글자 수
+
+_KEEP_POS = ("Noun", "Adjective")
+_CLEAN_RE = re.compile(r"[^가-힣A-Za-z0-9\s]")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# 프로세스별 Okt (워커 프로세스 / 풀 없이 실행하는 현재 프로세스)
+_okt = None
+_okt_lock = threading.Lock()
+
+
+def _get_okt():
+    global _okt
+    if _okt is None:
+        with _okt_lock:
+            if _okt is None:
+                from konlpy.tag import Okt
+
+                _okt = Okt()
+    return _okt
+
+
+def _init_worker():
+    """워커 프로세스 시작 시 Okt/JVM 준비 (첫 요청에서 기동 비용을 내지 않도록)"""
+    _get_okt().pos("워밍업")
+
+
+def chunk_long_text(text: str, max_length: int):
+    return [text[i : i + max_length] for i in range(0, len(text), max_length)]
+
+
+def tokenize_batch(okt, batch_text: str, max_length: int, batch_index: int):
+    effective_texts = (
+        chunk_long_text(batch_text, max_length) if len(batch_text) > max_length else [batch_text]
+    )
+    tokens = []
+    for idx, text_part in enumerate(effective_texts):
+        try:
+            part_tokens = [t for t, pos in okt.pos(text_part) if pos in _KEEP_POS and len(t) > 1]
+            tokens.extend(part_tokens)
+        except Exception as e:
+            print(f"[wordcloud] ⚠️ 배치 {batch_index} 부분 {idx + 1} 처리 오류 (건너뜀): {e}")
+    return tokens
+
+
+def _tokenize_task(batch_text: str, max_length: int, batch_index: int) -> List[str]:
+    """워커에서 실행되는 작업 (프로세스에 상주하는 Okt 사용)"""
+    return tokenize_batch(_get_okt(), batch_text, max_length, batch_index)
+
+
+def _tokenize_texts_task(texts: List[str], max_length: int, batch_index: int) -> List[List[str]]:
+    """워커 작업: 리뷰마다 따로 토큰화 (리뷰별 토큰 저장용)"""
+    okt = _get_okt()
+    return [tokenize_batch(okt, _CLEAN_RE.sub(" ", text or ""), max_length, batch_index) for text in texts]
+
+
+# ---------------------------------------------------------
+# 풀 관리
+# ---------------------------------------------------------
+def _warm_up(pool: ProcessPoolExecutor, workers: int):
+    """워커 수만큼 작업을 동시에 넣어 모든 워커 프로세스(Okt/JVM)를 미리 기동"""
+    try:
+        warmups = [pool.submit(_tokenize_task, "워밍업", TOKENIZER_MAX_TEXT, 0) for _ in range(workers)]
+        for future in warmups:
+            future.result()
+        print(f"[OK] 형태소 분석 워커 워밍업 완료 (workers={workers})")
+    except Exception as e:
+        # 종료 중이거나 워커 기동 실패 → 첫 요청에서 다시 기동
+        print(f"⚠️ 형태소 분석 워커 워밍업 실패: {e}")
+
+
+def init_tokenizer_pool(workers: int = TOKENIZER_WORKERS):
+    """모델 서버 시작 시 워커 풀 생성, 워커 Okt 워밍업은 백그라운드 스레드에서 (서버 시작을 기다리게 하지 않음)"""
+    global _pool, _pool_workers
+    if workers <= 0:
+        print("[OK] 형태소 분석 워커 풀 비활성화 (TOKENIZER_WORKERS=0, 프로세스 내 직렬 처리)")
+        return
+    with _pool_lock:
+        if _pool is not None:
+            return
+        # JVM은 fork 이후 안전하지 않으므로 spawn으로 새 인터프리터에서 시작
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        _pool_workers = workers
+        pool = _pool
+
+    threading.Thread(target=_warm_up, args=(pool, workers), name="tokenizer-warmup", daemon=True).start()
+    print(f"[OK] 형태소 분석 워커 풀 생성 (workers={workers}, 워밍업은 백그라운드)")
+
+
+def close_tokenizer_pool():
+    """종료 시 워커 풀 정리"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _pool_workers = 0
+    if pool is not None:
+        pool.shutdown(wait=True)
+        print("[OK] 형태소 분석 워커 풀 종료 완료")
+
+
+# ---------------------------------------------------------
+# 토큰화
+# ---------------------------------------------------------
+def _shard_size(count: int, batch_size: int, workers: int) -> int:
+    # 리뷰가 적어도 모든 워커가 일하도록 배치 크기를 줄임
+    return max(min(batch_size, math.ceil(count / workers)), 1) if workers and count else batch_size
+
+
+def tokenize_texts(texts, batch_size: int = TOKENIZER_BATCH_REVIEWS, max_text_length: int = TOKENIZER_MAX_TEXT) -> List[List[str]]:
+    """리뷰 목록 → 리뷰별 명사/형용사 토큰 리스트 (입력 순서 유지)"""
+    pool, workers = _pool, _pool_workers
+    texts = list(texts)
+    batch_size = _shard_size(len(texts), batch_size, workers if pool is not None else 0)
+    shards = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    results: List[List[str]] = []
+    if pool is None:
+        for batch_num, shard in enumerate(shards, 1):
+            results.extend(_tokenize_texts_task(shard, max_text_length, batch_num))
+    else:
+        futures = [
+            pool.submit(_tokenize_texts_task, shard, max_text_length, batch_num)
+            for batch_num, shard in enumerate(shards, 1)
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
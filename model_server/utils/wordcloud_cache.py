@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# =========================================================
+# 렌더링된 워드클라우드 PNG 디스크 캐시
+# - 키: 워드클라우드 내용을 결정하는 입력 전체의 해시
+#   (제품, 도메인, 기간, 리뷰 워터마크, 불용어 버전, 상품명/브랜드, 폰트, 렌더 설정)
+#   → 입력이 같으면 같은 키, 새 리뷰/불용어 변경 시 키가 바뀌어 자연스럽게 무효화
+# - 키를 그대로 HTTP ETag로 사용
+# - 크기 제한 LRU (WORDCLOUD_CACHE_MAX_MB, 파일 mtime = 마지막 사용 시각)
+# =========================================================
+_MODEL_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDCLOUD_CACHE_DIR = os.getenv(
+    "WORDCLOUD_CACHE_DIR", os.path.join(os.getenv("CACHE_DIR", os.path.join(_MODEL_SERVER_DIR, "cache")), "wordclouds")
+)
+WORDCLOUD_CACHE_MAX_MB = float(os.getenv("WORDCLOUD_CACHE_MAX_MB", 256))
+
+# 렌더링 결과에 영향을 주는 코드 수준 설정 (build_wordcloud 옵션을 바꾸면 올릴 것)
+RENDER_VERSION = 1
+
+
+def wordcloud_key(**parts: Any) -> str:
+    raw = json.dumps({**parts, "render_version": RENDER_VERSION}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+class WordcloudCache:
+    def __init__(self, directory: str = WORDCLOUD_CACHE_DIR, max_bytes: int = int(WORDCLOUD_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key → 파일 크기 (오래된 것부터)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _load(self):
+        """디렉토리의 기존 파일로 LRU 순서 복원 (최초 1회)"""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".png"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            files.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+        self._loaded = True
+
+    def path(self, key: str) -> Optional[str]:
+        """캐시된 PNG 경로 (없으면 None), 사용 시각 갱신"""
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                self._counters["misses"] += 1
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                self._bytes -= self._entries.pop(key)
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, png: bytes) -> str:
+        """PNG 저장 (임시 파일 → rename으로 원자적 교체) 후 용량 초과분 제거"""
+        path = self._path(key)
+        with self._lock:
+            self._load()
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(png)
+            self._bytes += len(png)
+            self._counters["stores"] += 1
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._counters["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: Optional[WordcloudCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_wordcloud_cache() -> WordcloudCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WordcloudCache()
+    return _cache
+
+
+def wordcloud_cache_stats() -> Dict[str, Any]:
+    return get_wordcloud_cache().stats()
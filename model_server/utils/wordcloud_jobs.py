@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.generate_wordcloud_from_db import generate_wordcloud_from_db
+from utils.review_tokens import ensure_review_tokens
+from utils.metrics import observe_stage, registry as metrics_registry
+
+load_dotenv()
+
+# =========================================================
+# 워드클라우드 백그라운드 작업 큐
+# - 분석 커밋 후 enqueue_wordcloud()로 예약, SSE 분석 스트림은 렌더링을 기다리지 않음
+# - 제품당 작업 1개로 중복 제거
+#   · 대기 중인 작업이 있으면 합침 (coalesced)
+#   · 실행 중이면 끝난 뒤 한 번만 다시 실행 (실행 시작 이후 커밋된 리뷰 반영)
+# - 작업 = 분석 후처리: 새 리뷰 토큰화(ensure_review_tokens) → 렌더링
+#   → 분석 직후 토큰이 저장되므로 이후 기간별 워드클라우드/PNG 요청은 저장된 빈도 합산만 함
+# - 완료 시 generate_wordcloud_from_db가 tb_productDashboard.wordcloud_path 갱신
+# - 상태: GET /v1/products/{id}/wordcloud/status
+# =========================================================
+WORDCLOUD_JOB_WORKERS = int(os.getenv("WORDCLOUD_JOB_WORKERS", 1))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class WordcloudJobQueue:
+    def __init__(self, workers: int = WORDCLOUD_JOB_WORKERS):
+        self.workers = max(workers, 1)
+        self._cond = threading.Condition()
+        self._pending = deque()                 # 대기 중인 product_id (FIFO)
+        self._jobs: Dict[int, Dict[str, Any]] = {}  # product_id → 최근 작업 상태
+        self._rerun = set()                     # 실행 중에 다시 요청된 product_id
+        self._threads = []
+        self._closed = False
+        self._counters = {"requested": 0, "coalesced": 0, "completed": 0, "failed": 0}
+
+    # -----------------------------------------------------
+    # 실행
+    # -----------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._closed = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"wordcloud-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def close(self, timeout: Optional[float] = None):
+        """대기 작업은 버리고 실행 중인 작업만 끝날 때까지 기다림"""
+        with self._cond:
+            self._closed = True
+            dropped = len(self._pending)
+            self._pending.clear()
+            self._rerun.clear()
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+        if dropped:
+            print(f"⚠️ [WordcloudJobs] 종료로 대기 작업 {dropped}개 취소")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                product_id = self._pending.popleft()
+                job = self._jobs[product_id]
+                job.update(state=RUNNING, started_at=time.time())
+                domain = job["domain"]
+
+            started = time.monotonic()
+            wc_path, error = None, None
+            try:
+                tokens_started = time.monotonic()
+                ensure_review_tokens(product_id)
+                observe_stage("review_tokens", domain, time.monotonic() - tokens_started)
+                wc_path = generate_wordcloud_from_db(product_id, domain)
+            except Exception as e:
+                error = str(e)
+                print(f"❌ [WordcloudJobs] product_id={product_id} 워드클라우드 생성 실패: {e}")
+            elapsed = time.monotonic() - started
+            observe_stage("wordcloud", domain, elapsed)
+
+            with self._cond:
+                job.update(
+                    state=FAILED if error else DONE,
+                    finished_at=time.time(),
+                    duration_ms=round(elapsed * 1000, 1),
+                    wordcloud_path=wc_path,
+                    error=error,
+                )
+                self._counters["failed" if error else "completed"] += 1
+                if product_id in self._rerun and not self._closed:
+                    self._rerun.discard(product_id)
+                    self._queue(product_id, job["domain"])
+            print(f"🌈 [WordcloudJobs] product_id={product_id} 완료 ({job['state']}, {job['duration_ms']}ms, path={wc_path})")
+
+    # -----------------------------------------------------
+    # 예약 / 조회
+    # -----------------------------------------------------
+    def _queue(self, product_id: int, domain: str):
+        self._jobs[product_id] = {
+            "product_id": product_id,
+            "domain": domain,
+            "state": QUEUED,
+            "requested_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_ms": None,
+            "wordcloud_path": None,
+            "error": None,
+            "coalesced": 0,
+        }
+        self._pending.append(product_id)
+        self._cond.notify()
+
+    def enqueue(self, product_id: int, domain: str) -> Dict[str, Any]:
+        """워드클라우드 생성 예약 (같은 제품 요청은 합침), 현재 작업 상태 반환"""
+        self.start()
+        with self._cond:
+            self._counters["requested"] += 1
+            job = self._jobs.get(product_id)
+            if job and job["state"] in (QUEUED, RUNNING):
+                job["domain"] = domain
+                job["coalesced"] += 1
+                self._counters["coalesced"] += 1
+                if job["state"] == RUNNING:
+                    self._rerun.add(product_id)
+            else:
+                self._queue(product_id, domain)
+            return dict(self._jobs[product_id], rerun_pending=product_id in self._rerun)
+
+    def status(self, product_id: int) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            job = self._jobs.get(product_id)
+            return dict(job, rerun_pending=product_id in self._rerun) if job else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            running = sum(1 for job in self._jobs.values() if job["state"] == RUNNING)
+            return {**self._counters, "queued": len(self._pending), "running": running, "workers": self.workers}
+
+
+_queue: Optional[WordcloudJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def _get_queue() -> WordcloudJobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WordcloudJobQueue()
+    return _queue
+
+
+def init_wordcloud_jobs():
+    """모델 서버 시작 시 작업 스레드 시작"""
+    _get_queue().start()
+    print(f"[OK] 워드클라우드 작업 큐 시작 (workers={WORDCLOUD_JOB_WORKERS})")
+
+
+def close_wordcloud_jobs():
+    global _queue
+    with _queue_lock:
+        queue, _queue = _queue, None
+    if queue is not None:
+        queue.close()
+        print("[OK] 워드클라우드 작업 큐 종료 완료")
+
+
+def enqueue_wordcloud(product_id: int, domain: str) -> Dict[str, Any]:
+    return _get_queue().enqueue(product_id, domain)
+
+
+def wordcloud_job_status(product_id: int) -> Optional[Dict[str, Any]]:
+    return _get_queue().status(product_id)
+
+
+def wordcloud_job_stats() -> Dict[str, Any]:
+    return _get_queue().stats()
+
+
+@metrics_registry.register_collector
+def _wordcloud_job_metrics():
+    queue = _queue
+    if queue is None:
+        return []
+    stats = queue.stats()
+    return [
+        ("absa_wordcloud_jobs_queued", "Wordcloud jobs waiting in the background queue", {}, stats["queued"]),
+        ("absa_wordcloud_jobs_running", "Wordcloud jobs currently rendering", {}, stats["running"]),
+    ]